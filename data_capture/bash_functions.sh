@@ -119,6 +119,7 @@ start_and_run_connection_and_collect_data() {
 # $8: Scenario to use (either "reno", "cubic", or "half").
 # $9: Whether to write the ss data for prediction or not (either 0 or 1).
 # $10: Directory path where the output file should be saved.
+# $11: (optional) Collector of the socket statistics, either "ss" or "netlink" (default: ss).
 run_iperf_and_ss() {
     local duration=$1
     local cc_algorithm=$2
@@ -130,16 +131,22 @@ run_iperf_and_ss() {
     local scenario=$8
     local predict=$9
     local directory_path="${10}"
+    local collector=${11:-ss}
+
+    local capture_function=capture_ss_with_args_periodically
+    if [ "$collector" == "netlink" ]; then
+        capture_function=capture_tcp_info_with_args_periodically
+    fi
 
     # Start iperf and capture socket statistics with specified parameters.
     if [ $bg_flows -eq 0 ]; then
         iperf3 -c 10.2.2.100 --cport 5001 -p 5201 -t $duration -C $cc_algorithm &
-        capture_ss_with_args_periodically $ss_interval $duration $cc_algorithm $bg_flows $delay $bandwidth $queue_size $scenario $predict $directory_path
+        $capture_function $ss_interval $duration $cc_algorithm $bg_flows $delay $bandwidth $queue_size $scenario $predict $directory_path
     elif [ $bg_flows -eq 1 ] && ([ $scenario == "half" ] || [ $scenario == "reno" ]); then
         # Start a single foreground and background flow using Reno.
         iperf3 -c 10.2.2.100 --cport 5001 -p 5201 -t $duration -C $cc_algorithm &
         iperf3 -c 10.2.2.100 --cport 5002 -p 5202 -t $duration -C reno &
-        capture_ss_with_args_periodically $ss_interval $duration $cc_algorithm $bg_flows $delay $bandwidth $queue_size $scenario $predict $directory_path
+        $capture_function $ss_interval $duration $cc_algorithm $bg_flows $delay $bandwidth $queue_size $scenario $predict $directory_path
     elif [ $bg_flows -le 6 ] && ([ $scenario == "reno" ] || [ $scenario == "cubic" ]); then
         # Start a single foreground and multiple background flows where all background flows are using either Reno or Cubic.
         iperf3 -c 10.2.2.100 --cport 5001 -p 5201 -t $duration -C $cc_algorithm &
@@ -148,7 +155,7 @@ run_iperf_and_ss() {
             s_port=$((5202+i))
             iperf3 -c 10.2.2.100 --cport $port -p $s_port -t $duration -C $scenario &
         done
-        capture_ss_with_args_periodically $ss_interval $duration $cc_algorithm $bg_flows $delay $bandwidth $queue_size $scenario $predict $directory_path
+        $capture_function $ss_interval $duration $cc_algorithm $bg_flows $delay $bandwidth $queue_size $scenario $predict $directory_path
     elif [ $bg_flows -le 6 ] && [ $scenario == "half" ]; then
         # Start a single foreground and multiple background flows where half of the background flows use Reno and the other half Cubic.
         iperf3 -c 10.2.2.100 --cport 5001 -p 5201 -t $duration -C $cc_algorithm &
@@ -161,7 +168,7 @@ run_iperf_and_ss() {
                 iperf3 -c 10.2.2.100 --cport $port -p $s_port -t $duration -C cubic &
             fi
         done
-        capture_ss_with_args_periodically $ss_interval $duration $cc_algorithm $bg_flows $delay $bandwidth $queue_size $scenario $predict $directory_path
+        $capture_function $ss_interval $duration $cc_algorithm $bg_flows $delay $bandwidth $queue_size $scenario $predict $directory_path
     fi
 }
 
@@ -298,28 +305,31 @@ extract_pcap_info_with_args() {
 
 
 # Use ss to capture socket statistics from the first Mininet host and append to given file.
+# A single unfiltered poll covers the foreground and all background flows, which are split by 4-tuple when parsed.
 # Parameters:
 # $1: File to write socket statistics to.
 capture_ss() {
 	local file="$1"
 
-	ss -i -o src 10.1.1.100:5001 dst 10.2.2.100:5201 >> "$file"
+	ss -tin -o >> "$file"
 }
 
 
 # Use ss to capture socket statistics from the first Mininet host and write to given file.
+# A single unfiltered poll covers the foreground and all background flows, which are split by 4-tuple when parsed.
 # Parameters:
 # $1: File to write socket statistics to.
 capture_ss_with_overwrite() {
 	local file="$1"
 
-	ss -i -o src 10.1.1.100:5001 dst 10.2.2.100:5201 > "$file"
+	ss -tin -o > "$file"
 }
 
 
-# Call the capture_ss function every given milliseconds until the given seconds have elapsed.
+# Run ss every given milliseconds on a fixed, drift-corrected schedule until the given seconds have elapsed, see capture_ss.py.
+# Each measurement is stamped with the time it was captured at, and the achieved rate, jitter and missed deadlines are printed at the end.
 # Parameters:
-# $1: Interval at which to call capture_ss_with_args function in seconds.
+# $1: Interval between the polls in milliseconds.
 # $2: Duration to run the loop in seconds.
 # $3: Congestion control algorithm used.
 # $4: Number of background flows.
@@ -365,25 +375,45 @@ capture_ss_with_args_periodically() {
         return 1
     fi
 
-    # Set start time.
-    start_time=$(date +%s)
+    local predict_flag=""
+    if [ "$predict" -eq 1 ]; then
+        predict_flag="--predict"
+    fi
 
-    while :
-    do
-        capture_ss "$file_path"
-        if [ "$predict" -eq 1 ]; then
-            capture_ss_with_overwrite "$prediction_file_path"
-        fi
+    python3 ../../tests/test_setup/capture_ss.py -d "$directory_path" -t "$duration" -i "$interval" $predict_flag
 
-        # Calculate elapsed time
-        end_time=$(date +%s)
-        elapsed_time=$((end_time - start_time))
+    # Change owner.
+    chown maxvons "$file_path"
+    chmod u+rwx "$file_path"
 
-        # Stop if elapsed time exceeds the specified duration.
-        if [ "$elapsed_time" -ge "$duration" ]; then
-            break
-        fi
-    done
+    chown maxvons "$prediction_file_path"
+    chmod u+rwx "$prediction_file_path"
+}
+
+
+# Collect the socket statistics through netlink instead of running ss for every poll, see capture_tcp_info.py.
+# Writes the same files as capture_ss_with_args_periodically and takes the same parameters.
+# Parameters:
+# $1: Interval between the polls in milliseconds.
+# $2: Duration to run the loop in seconds.
+# $3-$8: Unused, see capture_ss_with_args_periodically.
+# $9: (optional) Flag to indicate whether to write to prediction file as well.
+# $10: Directory path where the output file should be saved.
+capture_tcp_info_with_args_periodically() {
+    local interval=$1
+    local duration=$2
+    local predict=${9:-0}
+    local directory_path="${10}"
+
+    local file_path="${directory_path}/ss_data.txt"
+    local prediction_file_path="${directory_path}/ss_data_predict.txt"
+
+    local predict_flag=""
+    if [ "$predict" -eq 1 ]; then
+        predict_flag="--predict"
+    fi
+
+    python3 ../../tests/test_setup/capture_tcp_info.py -d "$directory_path" -t "$duration" -i "$interval" $predict_flag
 
     # Change owner.
     chown maxvons "$file_path"
@@ -397,8 +427,11 @@ capture_ss_with_args_periodically() {
 # Watches a given file and dynamically enables or disables ECN based on the file's content.
 # The function reads the content of the file, which should be either 1 (enable ECN) or 0 (disable ECN),
 # and executes corresponding commands to adjust ECN settings.
+# If the path is a Unix socket (*.sock), the predictions are received on it instead, see ecn_actuator.py.
+# If tracing is enabled for the run, i.e. its output directory contains a trace directory, the file is polled
+# by ecn_actuator.py instead, which records when each prediction is seen.
 # Parameters:
-# $1: Path to the file that should be watched for changes.
+# $1: Path to the file that should be watched for changes, or to the socket the predictions are sent to.
 # $2: Round-trip time delay in milliseconds.
 toggle_ecn() {
     local input_file_path="$1"
@@ -406,6 +439,16 @@ toggle_ecn() {
     local watch_interval=$((delay / 3))
     local prev_content=""
 
+    if [[ "$input_file_path" == *.sock ]]; then
+        python3 ../../tests/test_setup/ecn_actuator.py -s "$input_file_path"
+        return
+    fi
+
+    if [[ -d "$(dirname "$input_file_path")/trace" ]]; then
+        python3 ../../tests/test_setup/ecn_actuator.py -i "$input_file_path" -l "$delay"
+        return
+    fi
+
     while true; do
         local file_content=$(cat "$input_file_path")
 
@@ -87,7 +87,7 @@ if ! [[ "$scenario" =~ ^(cubic|reno|half)$ ]]; then
     exit 1
 fi
 
-directory_path="output/text/${cc_algorithm}/${bg_flows}bg_flows/${delay}ms_${bandwidth}mbit_${queue_size}bytes_${duration}s"
+directory_path="output/text/${cc_algorithm}/${bg_flows}bg_flows/${delay}ms_${bandwidth}mbit_${queue_size}bytes_${duration}s_${scenario}"
 
 # Start Mininet and run iperf.
 read -sp "Enter sudo password: " password
@@ -1,8 +1,91 @@
+import collections
 import glob
 import os
 import gzip
+import sys
 
 from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator
+
+# The warmup locator is shared with the modules under tests/utils.
+sys.path.append(str(Path(__file__).resolve().parent.parent / "tests"))
+
+from utils import ss_index  # noqa: E402
+
+# The default size of the blocks (MiB) that are compressed in parallel, each into its own gzip member.
+DEFAULT_BLOCK_SIZE = 16
+
+
+def iter_blocks(file_path: str, offset: int, block_size: int) -> Iterator[bytes]:
+    """Read the given file from the given offset in blocks of whole lines.
+
+    Args:
+        file_path: The path to the file.
+        offset: The byte offset to start reading at.
+        block_size: The number of bytes to read at a time. A block is longer if it does not end in a newline.
+
+    Yields:
+        The blocks of the file, each ending at the end of a line, except for a last line without a newline.
+    """
+    remainder = b""
+    with open(file_path, "rb") as file:
+        file.seek(offset)
+        while data := file.read(block_size):
+            data = remainder + data
+            end = data.rfind(b"\n") + 1
+            remainder = data[end:]
+            if end:
+                yield data[:end]
+
+    if remainder:
+        yield remainder
+
+
+def merge_files(
+    file_paths: Iterable[str],
+    output_path: str,
+    threshold: float,
+    flow: str | None = None,
+    jobs: int | None = None,
+    block_size: int = DEFAULT_BLOCK_SIZE * 1024 * 1024,
+    compresslevel: int = 9,
+) -> None:
+    """Merge the measurements after the RTT threshold of each of the given files into a single gzip file.
+
+    The measurements are streamed from the files straight into a pool of threads, which compress them
+    in blocks of whole lines. Each block is written as its own gzip member, so that the output can be
+    decompressed as a single stream or from the start of any member, and the members are written in the
+    order of the files, so that the output only depends on the order of the given paths.
+
+    Args:
+        file_paths: The paths to the ss output files, in the order to merge them in.
+        output_path: The path to the gzip file to create.
+        threshold: The cumulative RTT (ms) of the measurements to skip at the start of each file.
+        flow: The flow whose RTTs are summed for the threshold, or None to sum the RTTs of all measurements.
+        jobs: The number of threads to compress with, or None to use one per CPU.
+        block_size: The number of bytes of measurements to compress into each gzip member.
+        compresslevel: The gzip compression level.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    with open(output_path, "wb") as outfile, ThreadPoolExecutor(jobs) as executor:
+        # zlib releases the GIL while compressing, so the blocks are compressed in parallel while the
+        # next ones are read. The number of blocks in flight is bounded to keep the memory use constant.
+        pending = collections.deque()
+        for file_path in file_paths:
+            offset = ss_index.locate_warmup_end(file_path, threshold, flow)
+            for block in iter_blocks(file_path, offset, block_size):
+                pending.append(
+                    executor.submit(
+                        gzip.compress, block, compresslevel=compresslevel, mtime=0
+                    )
+                )
+                if len(pending) > 2 * jobs:
+                    outfile.write(pending.popleft().result())
+
+        while pending:
+            outfile.write(pending.popleft().result())
 
 
 def init_argparse() -> ArgumentParser:
@@ -32,6 +115,27 @@ def init_argparse() -> ArgumentParser:
         default="",
         help="Output file path. If not specified, the file will be saved in the current directory with the default name.",
     )
+    parser.add_argument(
+        "-f",
+        "--flow",
+        type=str,
+        default=None,
+        help='Flow whose RTTs are summed for the threshold as "<local address:port> <peer address:port>", e.g. the foreground flow of captures with background flows. If not specified, the RTTs of all measurements are summed.',
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=0,
+        help="Number of threads that compress the merged data in parallel, 0 for one per CPU (default: 0)",
+    )
+    parser.add_argument(
+        "-b",
+        "--block_size",
+        type=int,
+        default=DEFAULT_BLOCK_SIZE,
+        help=f"Size of the blocks in MiB that are compressed into independent gzip members (default: {DEFAULT_BLOCK_SIZE})",
+    )
 
     return parser
 
@@ -49,38 +153,25 @@ def main():
     else:
         output_file = args.output
 
-    outfile = open(output_file, "w")
-
-    rtt_index = 5
-    rtt_value = cumulative_rtt = 0
-
-    threshold = args.threshold * 1000
-
-    for filename in glob.glob("*.txt"):
-        with open(filename) as infile:
-            lines = infile.readlines()
-
-            for i, line in enumerate(lines):
-                if cumulative_rtt > threshold:
-                    outfile.writelines(lines[i:])
-                    break
-
-                if "rtt:" in line:
-                    words = line.split()
-
-                    rtt_value = float(words[rtt_index].split(":")[1].split("/")[0])
-
-                cumulative_rtt += rtt_value / 5
-
-    outfile.close()
-
-    # Gzip the merged file.
-    with open(output_file, "rb") as infile:
-        with gzip.open(f"{output_file}.gz", "wb") as outfile:
-            outfile.writelines(infile)
-
-    # Remove the uncompressed file.
-    os.remove(output_file)
+    if args.jobs < 0 or args.block_size <= 0:
+        print("Invalid number of jobs or block size given, exiting...")
+        raise SystemExit
+
+    # Sort the files, so that the merged data does not depend on the order of the directory entries.
+    file_paths = [
+        filename
+        for filename in sorted(glob.glob("*.txt"))
+        if os.path.abspath(filename) != os.path.abspath(output_file)
+    ]
+
+    merge_files(
+        file_paths,
+        f"{output_file}.gz",
+        args.threshold * 1000,
+        args.flow,
+        args.jobs or None,
+        args.block_size * 1024 * 1024,
+    )
 
     print(f"Merged data saved to {os.path.abspath(output_file)}.gz")
 
@@ -12,10 +12,12 @@ scenario="reno"
 model_inference=0
 threshold=0.5
 timestamp_mode=0
+pipeline="fused"
+trace=0
 
 # Print usage.
 usage() {
-    echo "Usage: $0 [-d <duration>] [-c <congestion control algorithm>] [-n <number of background flows>] [-l <delay>] [-b <bandwidth>] [-q <queue size>] [-s <scenario>] [-m <enable model inference>] [-t <classification threshold>] [-z <timestamp mode>]" 1>&2
+    echo "Usage: $0 [-d <duration>] [-c <congestion control algorithm>] [-n <number of background flows>] [-l <delay>] [-b <bandwidth>] [-q <queue size>] [-s <scenario>] [-m <enable model inference>] [-t <classification threshold>] [-z <timestamp mode>] [-p <prediction pipeline>] [-r <trace>]" 1>&2
     echo "  -d: Duration in seconds (default: $duration)"
     echo "  -c: Congestion control algorithm. Valid options are 'cubic', 'reno', and 'bbr' (default: $cc_algorithm)"
     echo "  -n: Number of background flows. Valid options are 0-6 (default: $bg_flows)"
@@ -26,11 +28,13 @@ usage() {
     echo "  -m: Model inference flag. 0 for false and 1 for true (default: $model_inference)"
     echo "  -t: Classification threshold for predictions when model inference is enabled. should be a float value (default: $threshold)"
     echo "  -z: Timestamp mode flag. 0 for false and 1 for true (default: $timestamp_mode)"
+    echo "  -p: Prediction pipeline when model inference is enabled. 'fused' runs a single sense and predict module, 'split' runs the data persistence and prediction modules connected by a csv file, 'stream' runs them connected by Unix sockets, which also hand the predictions to the ECN toggle (default: $pipeline)"
+    echo "  -r: Latency tracing flag. 0 for false and 1 for true. Traces each sample through the prediction loop and writes the per-stage latency to latency.txt next to metrics.txt (default: $trace)"
     exit 1
 }
 
 # Parse arguments.
-while getopts ":d:c:n:l:b:q:s:m:t:a:z:" opt; do
+while getopts ":d:c:n:l:b:q:s:m:t:a:z:p:r:" opt; do
     case ${opt} in
         d)
             duration=$OPTARG
@@ -62,6 +66,12 @@ while getopts ":d:c:n:l:b:q:s:m:t:a:z:" opt; do
         z)
             timestamp_mode=$OPTARG
             ;;
+        p)
+            pipeline=$OPTARG
+            ;;
+        r)
+            trace=$OPTARG
+            ;;
         \?)
             usage
             ;;
@@ -114,6 +124,14 @@ if ! [[ "$timestamp_mode" =~ ^[0-1]$ ]]; then
     echo "Error: Invalid timestamp mode flag. Valid options are 0 (for false) or 1 (for true)."
     exit 1
 fi
+if ! [[ "$pipeline" =~ ^(fused|split|stream)$ ]]; then
+    echo "Error: Invalid prediction pipeline. Valid options are 'fused', 'split', and 'stream'."
+    exit 1
+fi
+if ! [[ "$trace" =~ ^[0-1]$ ]]; then
+    echo "Error: Invalid trace flag. Valid options are 0 (for false) or 1 (for true)."
+    exit 1
+fi
 
 queue_size=$(calculate_queue_size $delay $bandwidth $queue_size)
 
@@ -133,18 +151,17 @@ echo ""
 echo "$password" | sudo -S mkdir -p "$directory_path"
 echo "$password" | sudo -S chmod -R 777 "$directory_path"
 
+# The modules trace the samples if the trace directory exists, see stage_trace.py.
+echo "$password" | sudo -S rm -rf "${directory_path}/trace"
+if [ "$trace" -eq 1 ]; then
+    echo "$password" | sudo -S mkdir -p "${directory_path}/trace"
+    echo "$password" | sudo -S chmod 777 "${directory_path}/trace"
+fi
+
 if [ "$model_inference" -eq 1 ]; then
-    # Start the data persistence daemon.
     input_file_path_data_persistence_module="${directory_path}/ss_data_predict.txt"
-    output_file_path_data_persistence_module="${directory_path}/input_data.csv"
-
-    gnome-terminal --window --title="Data Persistence Module" \
-    -- bash -c "python ../../tests/test_setup/prepare_data.py -d \"$directory_path\" -i \"$input_file_path_data_persistence_module\" -o \"$output_file_path_data_persistence_module\"" &
-
-    # Start the prediction daemon.
     classifier_name="binary_clf_${cc_algorithm}_phase_three.ubj"
     classifier_path_prediction_module="../../ml_model/single_flow/models/${cc_algorithm}/${classifier_name}"
-    input_file_path_prediction_module="${output_file_path_data_persistence_module}"
     output_file_path_prediction_module="${directory_path}/prediction.txt"
 
     timestamp_flag=""
@@ -152,8 +169,40 @@ if [ "$model_inference" -eq 1 ]; then
         timestamp_flag="--timestamp_mode"
     fi
 
-    gnome-terminal --window --title="Prediction Module" \
-    -- bash -c "python ../../tests/test_setup/predict.py -c \"$classifier_path_prediction_module\" -d \"$directory_path\" -i \"$input_file_path_prediction_module\" -o \"$output_file_path_prediction_module\" -t \"$threshold\" $timestamp_flag" &
+    if [ "$pipeline" == "fused" ]; then
+        # Start the sense and predict daemon, which predicts directly from the ss output.
+        gnome-terminal --window --title="Sense and Predict Module" \
+        -- bash -c "python ../../tests/test_setup/sense_predict.py -c \"$classifier_path_prediction_module\" -d \"$directory_path\" -i \"$input_file_path_data_persistence_module\" -o \"$output_file_path_prediction_module\" -t \"$threshold\" $timestamp_flag" &
+    elif [ "$pipeline" == "stream" ]; then
+        # Start the data persistence daemon, which sends the features to the prediction daemon.
+        features_socket_path="${directory_path}/features.sock"
+
+        gnome-terminal --window --title="Data Persistence Module" \
+        -- bash -c "python ../../tests/test_setup/prepare_data.py -d \"$directory_path\" -i \"$input_file_path_data_persistence_module\" --socket_output \"$features_socket_path\"" &
+
+        # Start the prediction daemon. The predictions are sent to the ECN toggle, unless they are timestamped.
+        prediction_output_flag="--socket_output \"${directory_path}/prediction.sock\""
+        if [ "$timestamp_mode" -eq 1 ]; then
+            prediction_output_flag="-o \"$output_file_path_prediction_module\""
+        else
+            output_file_path_prediction_module="${directory_path}/prediction.sock"
+        fi
+
+        gnome-terminal --window --title="Prediction Module" \
+        -- bash -c "python ../../tests/test_setup/predict.py -c \"$classifier_path_prediction_module\" --socket \"$features_socket_path\" $prediction_output_flag -t \"$threshold\" $timestamp_flag" &
+    else
+        # Start the data persistence daemon.
+        output_file_path_data_persistence_module="${directory_path}/input_data.csv"
+
+        gnome-terminal --window --title="Data Persistence Module" \
+        -- bash -c "python ../../tests/test_setup/prepare_data.py -d \"$directory_path\" -i \"$input_file_path_data_persistence_module\" -o \"$output_file_path_data_persistence_module\"" &
+
+        # Start the prediction daemon.
+        input_file_path_prediction_module="${output_file_path_data_persistence_module}"
+
+        gnome-terminal --window --title="Prediction Module" \
+        -- bash -c "python ../../tests/test_setup/predict.py -c \"$classifier_path_prediction_module\" -d \"$directory_path\" -i \"$input_file_path_prediction_module\" -o \"$output_file_path_prediction_module\" -t \"$threshold\" $timestamp_flag" &
+    fi
 fi
 
 # Start Mininet and run iperf.
@@ -173,6 +222,8 @@ echo "Scenario: $scenario"
 echo "Model inference: $model_inference"
 echo "Threshold: $threshold"
 echo "Timestamp mode: $timestamp_mode"
+echo "Prediction pipeline: $pipeline"
+echo "Trace: $trace"
 
 # Print progress.
 start_time=$(date +%s)
@@ -200,6 +251,11 @@ get_metrics "output/pcap/tshark_data.pcap" "$cc_algorithm" "$bg_flows" "$delay"
 
 echo "Metrics saved to ${directory_path}/metrics.txt"
 
+if [ "$trace" -eq 1 ]; then
+    python ../../tests/test_setup/trace_report.py -d "$directory_path"
+    echo "Latency saved to ${directory_path}/latency.txt"
+fi
+
 python_script_path="../../tests/test_setup/create_cwnd_plot.py"
 
 cmd="python \"$python_script_path\" \
@@ -0,0 +1,143 @@
+import sys
+import time
+
+from argparse import ArgumentParser
+from argparse import BooleanOptionalAction
+from pathlib import Path
+
+# The dataset and labeling helpers are shared with the modules under tests/utils.
+sys.path.append(str(Path(__file__).resolve().parent.parent / "tests"))
+
+from utils import ss_dataset, ss_labels, ss_sample  # noqa: E402
+
+
+def label_dataset(
+    path: Path,
+    sample_horizons: list,
+    time_horizons: list,
+    kernel_counters: bool = False,
+) -> dict:
+    """Label each measurement in the given columnar dataset by whether a loss is detected within each of the horizons.
+
+    The labels of a horizon of k measurements are stored in the column "lost_next_<k>"
+    and the labels of a horizon of x ms in the column "lost_next_<x>ms". In a dataset created with
+    txt_to_csv --coalesce, each row is labeled for the first of the measurements it stands for,
+    and the horizons of k measurements count the measurements that the following rows stand for.
+
+    Args:
+        path: The path to the columnar dataset created by txt_to_csv.
+        sample_horizons: The numbers of following measurements to label for.
+        time_horizons: The times after each measurement (ms) to label for.
+        kernel_counters: Whether or not to also detect losses from the lost_segments and total_retrans columns.
+
+    Returns:
+        A dictionary with the boolean array of labels of each of the new columns, keyed by column name.
+    """
+    dataset = ss_dataset.load_dataset(path)
+    columns = dataset["columns"]
+
+    counters = {}
+    if kernel_counters:
+        counters = {
+            "lost_segments": columns.get("lost_segments"),
+            "retrans": columns.get("total_retrans"),
+        }
+        if any(counter is None for counter in counters.values()):
+            print(
+                "The dataset does not contain the lost_segments and total_retrans columns."
+                + " Create it with txt_to_csv -f lost_segments total_retrans."
+            )
+            raise SystemExit
+
+    segment_starts = ss_labels.get_segment_starts(columns["timestamp"])
+    events = ss_labels.get_loss_events(columns["cwnd"], segment_starts, **counters)
+
+    labels = {
+        f"lost_next_{horizon}": column
+        for horizon, column in ss_labels.label_sample_horizons(
+            events, sample_horizons, segment_starts, columns.get(ss_sample.REPEAT)
+        ).items()
+    }
+    labels.update(
+        (f"lost_next_{horizon}ms", column)
+        for horizon, column in ss_labels.label_time_horizons(
+            events, columns["timestamp"], time_horizons, segment_starts
+        ).items()
+    )
+
+    return labels
+
+
+def init_argparse() -> ArgumentParser:
+    """Initialize the argument parser.
+
+    Returns:
+        The initialized argument parser.
+    """
+    parser = ArgumentParser(
+        description="Add prediction horizon labels to a columnar dataset created by txt_to_csv",
+        usage="python %(prog)s -i <path to the dataset> -k <numbers of measurements> -t <times in ms>",
+    )
+
+    parser.add_argument(
+        "-i",
+        "--input",
+        metavar="INPUT",
+        type=Path,
+        required=True,
+        help="Path to the columnar dataset created by txt_to_csv --output_format columnar",
+    )
+    parser.add_argument(
+        "-k",
+        "--samples",
+        metavar="SAMPLES",
+        type=int,
+        default=[],
+        help="Label whether a loss is detected within the given numbers of following measurements, separated by spaces",
+        nargs="+",
+    )
+    parser.add_argument(
+        "-t",
+        "--times",
+        metavar="TIMES",
+        type=float,
+        default=[],
+        help="Label whether a loss is detected within the given times after each measurement in ms, separated by spaces",
+        nargs="+",
+    )
+    parser.add_argument(
+        "--kernel_counters",
+        metavar="KERNEL_COUNTERS",
+        action=BooleanOptionalAction,
+        default=False,
+        help="Also detect losses from the lost_segments and total_retrans columns",
+    )
+
+    return parser
+
+
+def main():
+    parser = init_argparse()
+    args = parser.parse_args()
+
+    if not (args.input / ss_dataset.METADATA_FILE).is_file():
+        print("Invalid dataset given, exiting...")
+        raise SystemExit
+
+    print("Labeling the measurements...")
+    start_time = time.perf_counter()
+    time_horizons = [
+        int(horizon) if horizon.is_integer() else horizon for horizon in args.times
+    ]
+    labels = label_dataset(
+        args.input, args.samples, time_horizons, args.kernel_counters
+    )
+    elapsed_time = time.perf_counter() - start_time
+    print(f"Created {len(labels)} label columns in {elapsed_time:.3f} s")
+
+    ss_dataset.add_columns(args.input, labels)
+    print("Added the label columns to the dataset under path:", args.input)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,532 +1,475 @@
 import csv
-import re
+import functools
+import itertools
+import multiprocessing
+import shutil
+import sys
 
 from argparse import ArgumentParser
+from argparse import BooleanOptionalAction
 from pathlib import Path
-from typing import List, Dict
+from typing import Iterable, Iterator
 
+# The ss parsing helpers are shared with the real-time modules under tests/utils.
+sys.path.append(str(Path(__file__).resolve().parent.parent / "tests"))
 
-def read_ss(paths: list) -> dict:
-    """Read information from different ss output files and return a dictionary of ss data lists.
+from utils import (  # noqa: E402
+    ss_dataset,
+    ss_features,
+    ss_index,
+    ss_manifest,
+    ss_parser,
+    ss_sample,
+    util,
+)
 
-    Args:
-        paths: A list of paths to the ss output files.
-
-    Returns:
-        A dictionary with the ss output file paths representing the keys and lists containing the information from the ss output files representing the values.
-    """
-    ss_data_lists = {}
-
-    for path in paths:
-        ss_data = []
-        try:
-            with open(path) as data:
-                # Remove all lines containing "Netid".
-                lines = [line for line in data.readlines() if "Netid" not in line]
-
-                # Append every first and second line to the packet string, then add packet to the ss_data list.
-                i = 0
-                packet = ""
-                for line in lines:
-                    if i == 0:
-                        if "tcp" not in line:
-                            continue
-                        packet = line.strip()
-                        i += 1
-                    elif i == 1:
-                        packet += line.strip()
-                        ss_data.append(packet)
-                        packet = ""
-                        i = 0
-            ss_data_lists[path.name] = ss_data
-        except FileNotFoundError as e:
-            print(f"File not found: {e}")
-            raise SystemExit()
-
-    return ss_data_lists
-
-
-def add_timer_info(ss_dict: dict, measurement: str) -> tuple:
-    """Add the timer information from the given measurement to the given dictionary.
-
-    Args:
-        ss_dict: The dictionary to add the timer information to.
-        measurement: The measurement from ss.
-
-    Returns:
-        A tuple with a list containing the timer name, expire time, and retrans and True
-        if the measurement contained timer info or an empty list and False otherwise.
-    """
-    timer_regex = re.compile(r"timer:\((.+?)\)")
-    expire_time_regex = re.compile(r"(\d+)")
+# The index and cache files that are stored next to the ss output files.
+SIDECAR_SUFFIX = ".npz"
 
-    timer_info_match = re.search(timer_regex, measurement)
-    if timer_info_match:
-        timer_info = timer_info_match.group(1)
-        timer_name, expire_time, retrans = timer_info.split(",")
+# The cumulative rtt after which the measurements of a flow are used, i.e. 30 seconds in milliseconds.
+WARMUP_THRESHOLD = 30 * 1000
 
-        expire_time_match = re.search(expire_time_regex, expire_time)
-        if expire_time_match:
-            expire_time = expire_time_match.group(1)
-            expire_time, retrans = int(expire_time), int(retrans)
+# The maximum number of rows in a row group of a columnar dataset.
+ROW_GROUP_SIZE = 65536
 
-            ss_dict["timer_name"] = timer_name
-            ss_dict["expire_time"] = expire_time
-            ss_dict["retrans"] = retrans
-            return [timer_name, expire_time, retrans], True
 
-    return [], False
+def label_packet(
+    sample: ss_sample.SsSample, cwnd: int, prev_cwnd: int, next_cwnd: int
+) -> bool:
+    """Label the packet as either lost or not.
 
+    The packet is labeled as lost or not by comparing its cwnd value with the values of the previous and next measurements.
 
-def add_rto(ss_dict: dict, measurement: str) -> tuple:
-    """Add the rto from the given measurement to the given dictionary.
+    If the cwnd of the previous measurement is smaller or the same as the current one,
+    and the cwnd of the next measurement is smaller than the one of the current measurement, the packet is labeled as lost.
+    Otherwise, it is labeled as not lost.
 
     Args:
-        ss_dict: The dictionary to add the rto to.
-        measurement: The measurement from ss.
+        sample: The sample to add the label to.
+        cwnd: The congestion window value of the current measurement.
+        prev_cwnd: The congestion window value of the previous measurement.
+        next_cwnd: The congestion window value of the next measurement.
 
     Returns:
-        A tuple containing the rto and True if the measurement contained rto information,
-        0 and False otherwise.
+        True if the packet was lost and False otherwise.
     """
-    rto_regex = re.compile(r"rto:(\d+)")
-    rto_match = re.search(rto_regex, measurement)
-    if rto_match:
-        rto = rto_match.group(1)
-        rto = int(rto)
-        ss_dict["rto"] = rto
-        return rto, True
-
-    return 0, False
-
-
-def add_rtt_and_rtt_variance(ss_dict: dict, measurement: str) -> tuple:
-    """Add the rtt and rtt variance from the given measurement to the given dictionary.
-
-    Args:
-        ss_dict: The dictionary to add the rtt and rtt variance to.
-        measurement: The measurement from ss.
+    if prev_cwnd <= cwnd and next_cwnd < cwnd:
+        sample.lost = True
+        return True
 
-    Returns:
-        A tuple containnig a list with the rtt and rtt variance and True if the measurement contained rtt and rtt variance,
-        an empty list and False otherwise.
-    """
-    rtt_and_rtt_var_regex = re.compile(r"rtt:(\d+\.?\d*)/(\d+\.?\d*)")
-    rtt_and_rtt_var_match = re.search(rtt_and_rtt_var_regex, measurement)
-    if rtt_and_rtt_var_match:
-        rtt, rtt_var = rtt_and_rtt_var_match.group(1), rtt_and_rtt_var_match.group(2)
-        rtt, rtt_var = float(rtt), float(rtt_var)
-        ss_dict["rtt"] = rtt
-        ss_dict["rtt_variance"] = rtt_var
-        return [rtt, rtt_var], True
+    sample.lost = False
+    return False
 
-    return [], False
 
+def iter_labeled_packets(
+    samples: Iterable[ss_sample.SsSample],
+) -> Iterator[ss_sample.SsSample]:
+    """Lazily label the packets in the given samples as either lost or not.
 
-def add_cwnd(ss_dict: dict, measurement: str) -> tuple:
-    """Add the cwnd from the given measurement to the given dictionary.
+    Each packet is labeled by label_packet as soon as the measurement after it arrives,
+    so only the previous, current and next measurement are held at once.
+    The first and last packets are not yielded since they cannot be reliably labeled.
 
     Args:
-        ss_dict: The dictionary to add the cwnd to.
-        measurement: The measurement from ss.
+        samples: An iterable of the samples that contain the measurements from ss.
 
-    Returns:
-        A tuple containing the cwnd and True if the measurement contained cwnd information,
-        0 and False otherwise.
+    Yields:
+        The labeled samples.
     """
-    cwnd_regex = re.compile(r"cwnd:(\d+)")
-    cwnd_match = re.search(cwnd_regex, measurement)
-    if cwnd_match:
-        cwnd = cwnd_match.group(1)
-        cwnd = int(cwnd)
-        ss_dict["cwnd"] = cwnd
-        return cwnd, True
-
-    return 0, False
-
-
-def add_ssthresh(ss_dict: dict, measurement: str) -> tuple:
-    """Add the ssthresh from the given measurement to the given dictionary.
+    prev_sample = sample = None
+    for next_sample in samples:
+        if prev_sample is not None:
+            label_packet(sample, sample.cwnd, prev_sample.cwnd, next_sample.cwnd)
+            yield sample
+
+        prev_sample, sample = sample, next_sample
+
+
+def iter_samples(
+    parsed_ss: dict,
+    fields: tuple = ss_parser.SS_RECORD_FIELDS,
+    flow: str | None = None,
+    coalesce: bool = False,
+    warmup: dict | None = None,
+) -> Iterator[ss_sample.SsSample]:
+    """Lazily create a labeled sample for each of the ss measurements of a flow after the warmup period.
+
+    Unless it was already located in the ss output file, the warmup period is found in the parsed rtt column
+    with ss_index.get_warmup_end and skipped without turning the measurements in it into samples.
+    Only their min and max rtt are kept.
+    The features are created by ss_features.create_features, so they are the same as the ones created in real time.
+    Counter fields, such as data_segments_sent, are replaced by the difference to the previous measurement.
+    The measurements are processed one at a time, so this runs in constant memory.
 
     Args:
-        ss_dict: The dictionary to add the ssthresh to.
-        measurement: The measurement from ss.
-
-    Returns:
-        A tuple containing the ssthresh and True if the measurement contained ssthresh information,
-        0 and False otherwise.
+        parsed_ss: The columnar form of the measurements of a single flow, see util.select_flow.
+        fields: The fields of the parsed measurements that should be included (default: the fields the models are trained on).
+        flow: The flow to set on each of the samples, or None to leave it unset.
+        coalesce: Whether or not to coalesce runs of labeled samples whose state did not change, see ss_sample.coalesce.
+        warmup: The warmup period of the flow as returned by ss_index.locate_warmup, if the measurements
+            were parsed from its offset, or None if they include the warmup period.
+
+    Yields:
+        Samples, where each sample consists of the different statistics for each of the measurements.
     """
-    ssthresh_regex = re.compile(r"\bssthresh:(\d+)")
-    ssthresh_match = re.search(ssthresh_regex, measurement)
-    if ssthresh_match:
-        ssthresh = ssthresh_match.group(1)
-        ssthresh = int(ssthresh)
-        ss_dict["ssthresh"] = ssthresh
-        return ssthresh, True
+    state = ss_features.create_state(fields)
+
+    if warmup is None:
+        rtts = parsed_ss["columns"]["rtt"]
+        warmup_end = ss_index.get_warmup_end(rtts.filled(0), WARMUP_THRESHOLD)
+        warmup_rtts = rtts[:warmup_end].compressed()
+        warmup = {"min_rtt": None, "max_rtt": None}
+        if len(warmup_rtts) > 0:
+            warmup = {
+                "min_rtt": warmup_rtts.min().item(),
+                "max_rtt": warmup_rtts.max().item(),
+            }
+        parsed_ss = util.slice_parsed_ss(parsed_ss, warmup_end, None)
+
+    if warmup["min_rtt"] is not None:
+        ss_features.add_rtt(state, warmup["min_rtt"])
+        ss_features.add_rtt(state, warmup["max_rtt"])
+
+    records = util.iter_parsed_records(parsed_ss)
+    samples = iter_labeled_packets(iter_features(records, state, fields))
+    if coalesce:
+        columns = ss_sample.get_columns(fields) + (ss_sample.LABEL,)
+        samples = ss_sample.coalesce(samples, columns)
+
+    if flow is None:
+        yield from samples
+        return
 
-    return 0, False
+    for sample in samples:
+        sample.flow = flow
+        yield sample
 
 
-def add_data_segs_out(ss_dict: dict, measurement: str) -> tuple:
-    """Add the data segments out from the given measurement to the given dictionary.
+def iter_features(
+    ss_data: Iterable[dict], state: dict, fields: tuple = ss_parser.SS_RECORD_FIELDS
+) -> Iterator[ss_sample.SsSample]:
+    """Lazily create the features of each of the complete ss measurements.
 
     Args:
-        ss_dict: The dictionary to add the data segments out to.
-        measurement: The measurement from ss.
+        ss_data: An iterable containing the measurements from ss parsed by ss_parser.parse_record,
+            with the time they were captured at under ss_parser.CAPTURE_TIME if they were stamped with one.
+        state: The state of the features of the flow, see ss_features.create_state.
+        fields: The fields of the parsed measurements that should be included.
 
-    Returns:
-        A tuple containing the data segments out and True if the measurement contained data segments out information,
-        0 and False otherwise.
+    Yields:
+        The features of the measurements, as created by ss_features.create_features.
     """
-    data_segs_out_regex = re.compile(r"data_segs_out:(\d+)")
-    data_segs_out_match = re.search(data_segs_out_regex, measurement)
-    if data_segs_out_match:
-        data_segs_out = data_segs_out_match.group(1)
-        data_segs_out = int(data_segs_out)
-        ss_dict["data_segments_sent"] = data_segs_out
-        return data_segs_out, True
-
-    return 0, False
+    for record in ss_data:
+        capture_time = record.get(ss_parser.CAPTURE_TIME)
+        record = {field: record[field] for field in fields}
+        sample = ss_features.create_features(state, record, capture_time)
+        if ss_parser.record_complete(record):
+            yield sample
 
 
-def add_lastsnd(ss_dict: dict, measurement: str) -> tuple:
-    """Add the last send from the given measurement to the given dictionary.
+def create_samples(parsed_ss: dict, fields: tuple = ss_parser.SS_RECORD_FIELDS) -> list:
+    """Create a sample for each of the ss measurements of a flow after the warmup period.
 
     Args:
-        ss_dict: The dictionary to add the last send to.
-        measurement: The measurement from ss.
+        parsed_ss: The columnar form of the measurements of a single flow, see util.select_flow.
+        fields: The fields of the parsed measurements that should be included (default: the fields the models are trained on).
 
     Returns:
-        A tuple containing the last send and True if the measurement contained last send information,
-        0 and False otherwise.
+        A list of the samples yielded by iter_samples.
     """
-    lastsnd_regex = re.compile(r"lastsnd:(\d+)")
-    last_send_match = re.search(lastsnd_regex, measurement)
-    if last_send_match:
-        last_send = last_send_match.group(1)
-        last_send = int(last_send)
-        ss_dict["last_send"] = last_send
-        return last_send, True
+    return list(iter_samples(parsed_ss, fields))
 
-    return 0, False
 
+def iter_file_samples(
+    path: Path,
+    fields: tuple = ss_parser.SS_RECORD_FIELDS,
+    include_flow: bool = False,
+    coalesce: bool = False,
+) -> Iterator[Iterator[ss_sample.SsSample]]:
+    """Lazily read the given ss output file and create the samples of each of its flows.
 
-def add_pacing_rate(ss_dict: dict, measurement: str) -> tuple:
-    """Add the pacing rate from the given measurement to the given dictionary.
+    A valid cache of the parsed form of the file (see util.read_parsed_ss) is used as is. Otherwise, the end of the
+    warmup period is located with ss_index.locate_warmup, which only scans the rtt tokens, and the file is parsed
+    from there. The warmup period of all records ends no later than the one of any flow, so a flow whose own
+    warmup period ends later is parsed again from its own offset.
+    The measurements of each flow, i.e. each 4-tuple, are processed separately, in the order the flows first appear in the parsed ss outputs.
 
     Args:
-        ss_dict: The dictionary to add the pacing rate to.
-        measurement: The measurement from ss.
+        path: The path to the ss output file, which may be gzip compressed.
+        fields: The fields of the parsed measurements that should be included.
+        include_flow: Whether or not to set the flow of each of the samples.
+        coalesce: Whether or not to coalesce runs of samples whose state did not change.
 
-    Returns:
-        A tuple containing the pacing rate and True if the measurement contained pacing rate information,
-        empty string and False otherwise.
+    Yields:
+        An iterator over the samples of each of the flows, as yielded by iter_samples.
     """
-    pacing_rate_regex = re.compile(r"pacing_rate (\d+\.?\d*)Mbps")
-    pacing_rate_match = re.search(pacing_rate_regex, measurement)
-    if pacing_rate_match:
-        pacing_rate = pacing_rate_match.group(1)
-        pacing_rate = float(pacing_rate)
-        ss_dict["pacing_rate"] = pacing_rate
-        return pacing_rate, True
-
-    return "", False
-
+    parsed_ss = util.load_ss_cache(path)
+    if parsed_ss is not None:
+        for flow in util.get_flows(parsed_ss):
+            yield iter_samples(
+                util.select_flow(parsed_ss, flow),
+                fields,
+                flow if include_flow else None,
+                coalesce,
+            )
+        return
 
-def add_min_and_max_cwnd(
-    ss_dict: dict, cwnd: int, min_cwnd: int, max_cwnd: int
-) -> tuple:
-    """Add the minimum and maximum congestion window from the given measurements to the given dictionary.
+    offset = ss_index.locate_warmup_end(path, WARMUP_THRESHOLD)
+    parsed_ss = util.parse_ss_file(path, offset)
+    for flow in util.get_flows(parsed_ss):
+        warmup = ss_index.locate_warmup(path, WARMUP_THRESHOLD, flow)
+        flow_parsed_ss = parsed_ss
+        if warmup["offset"] != offset:
+            flow_parsed_ss = util.parse_ss_file(path, warmup["offset"])
+
+        yield iter_samples(
+            util.select_flow(flow_parsed_ss, flow),
+            fields,
+            flow if include_flow else None,
+            coalesce,
+            warmup,
+        )
+
+
+def create_file_samples(
+    path: Path,
+    fields: tuple = ss_parser.SS_RECORD_FIELDS,
+    include_flow: bool = False,
+    coalesce: bool = False,
+) -> list:
+    """Read the given ss output file and create the sample lists of each of its flows.
 
     Args:
-        ss_dict: The dictionary to add the minimum and maximum congestion window to.
-        cwnd: The congestion window.
-        min_cwnd: The minimum congestion window.
-        max_cwnd: The maximum congestion window.
+        path: The path to the ss output file.
+        fields: The fields of the parsed measurements that should be included.
+        include_flow: Whether or not to set the flow of each of the samples.
+        coalesce: Whether or not to coalesce runs of samples whose state did not change.
 
     Returns:
-        The minimum and maximum congestion window.
+        A list with the sample list of each of the flows, see iter_file_samples.
     """
-    min_cwnd = cwnd if min_cwnd == 0 or cwnd < min_cwnd else min_cwnd
-    max_cwnd = cwnd if max_cwnd == 0 or cwnd > max_cwnd else max_cwnd
-
-    ss_dict["min_cwnd"] = min_cwnd
-    ss_dict["max_cwnd"] = max_cwnd
-
-    return min_cwnd, max_cwnd
-
-
-def add_min_and_max_ssthresh(
-    ss_dict: dict, ssthresh: int, min_ssthresh: int, max_ssthresh: int
-) -> tuple:
-    """Add the minimum and maximum slow start threshold from the given measurements to the given dictionary.
+    return [
+        list(samples)
+        for samples in iter_file_samples(path, fields, include_flow, coalesce)
+    ]
+
+
+def iter_sample_lists(
+    paths: list,
+    fields: tuple = ss_parser.SS_RECORD_FIELDS,
+    include_flow: bool = False,
+    jobs: int = 1,
+    coalesce: bool = False,
+) -> Iterator[tuple]:
+    """Create the sample lists of each of the given ss output files, optionally in parallel.
+
+    With a single job, the samples of each flow are created lazily while they are consumed, so that the
+    conversion runs in bounded memory. With more than one job, the files are read and labeled by a pool of processes,
+    which each return the sample lists of a whole file. The sample lists are always yielded in the order
+    of the given paths, as soon as the files before them are done, so that they can be written while the remaining
+    files are still being processed.
 
     Args:
-        ss_dict: The dictionary to add the minimum and maximum slow start threshold to.
-        ssthresh: The slow start threshold.
-        min_ssthresh: The minimum slow start threshold.
-        max_ssthresh: The maximum slow start threshold.
+        paths: A list of paths to the ss output files.
+        fields: The fields of the parsed measurements that should be included.
+        include_flow: Whether or not to set the flow of each of the samples.
+        jobs: The number of processes to use, or None to use one per CPU.
+        coalesce: Whether or not to coalesce runs of samples whose state did not change.
 
-    Returns:
-        The minimum and maximum slow start threshold.
+    Yields:
+        Tuples with the path to each of the ss output files and the samples of each of its flows.
     """
-    min_ssthresh = (
-        ssthresh if min_ssthresh == 0 or ssthresh < min_ssthresh else min_ssthresh
-    )
-    max_ssthresh = (
-        ssthresh if max_ssthresh == 0 or ssthresh > max_ssthresh else max_ssthresh
-    )
-
-    ss_dict["min_ssthresh"] = min_ssthresh
-    ss_dict["max_ssthresh"] = max_ssthresh
+    if jobs == 1:
+        for path in paths:
+            for samples in iter_file_samples(path, fields, include_flow, coalesce):
+                yield path, samples
+        return
 
-    return min_ssthresh, max_ssthresh
+    create = functools.partial(
+        create_file_samples,
+        fields=fields,
+        include_flow=include_flow,
+        coalesce=coalesce,
+    )
+    with multiprocessing.Pool(jobs) as pool:
+        for path, sample_lists in zip(paths, pool.imap(create, paths)):
+            for sample_list in sample_lists:
+                yield path, sample_list
 
 
-def add_min_and_max_rtt(ss_dict: dict, rtt: int, min_rtt: int, max_rtt: int) -> tuple:
-    """Add the minimum and maximum round trip time (rtt) from the given measurements to the given dictionary.
+def iter_counted_samples(
+    ss_data_samples: Iterable[tuple], counts: dict
+) -> Iterator[tuple]:
+    """Count the coalesced samples and the measurements they stand for while they are consumed.
 
     Args:
-        ss_dict: The dictionary to add the minimum and maximum round trip time (rtt) to.
-        rtt: The round trip time (rtt).
-        min_rtt: The minimum rtt.
-        max_rtt: The maximum rtt.
+        ss_data_samples: An iterable of tuples with the path to an ss output file and the coalesced samples
+        of one of its flows, as yielded by iter_sample_lists.
+        counts: The dictionary to add the number of samples under "rows" and the number of measurements
+        under "measurements" to.
 
-    Returns:
-        The minimum and maximum round trip time (rtt).
+    Yields:
+        The tuples of ss_data_samples, whose samples are counted as they are consumed.
     """
-    min_rtt = rtt if min_rtt == 0 or rtt < min_rtt else min_rtt
-    max_rtt = rtt if max_rtt == 0 or rtt > max_rtt else max_rtt
 
-    ss_dict["min_rtt"] = min_rtt
-    ss_dict["max_rtt"] = max_rtt
+    def count(samples: Iterable[ss_sample.SsSample]) -> Iterator[ss_sample.SsSample]:
+        for sample in samples:
+            counts["rows"] += 1
+            counts["measurements"] += sample.repeat
+            yield sample
 
-    return min_rtt, max_rtt
+    for path, samples in ss_data_samples:
+        yield path, count(samples)
 
 
-def add_cwnd_diff(
-    ss_dicts: list, ss_dict: dict, cwnd: int, prev_cwnd: int, current_index: int
-) -> None:
-    """Add the difference between the current congestion window and the previous congestion window value that was not the same.
-       The previous value in this case refers to an earlier value in the same measurement that was not the same as the current.
-       Meaning, that if the current congestion window is 10 and the one directly before it was also 10, the previous congestion
-       window will the one before that, and so on.
+def print_coalescing_report(counts: dict) -> None:
+    """Print how much the measurements were compressed by coalescing.
 
     Args:
-        ss_dicts: The list of dictionaries that contain the measurements from ss.
-        ss_dict. The dictionary to add the cwnd diff to.
-        cwnd: The current congestion window value.
-        prev_cwnd: The previous congestion window value that was not the same.
-        current_index: The index of the current measurement in in ss_dicts.
+        counts: The counts of the rows and measurements, see iter_counted_samples.
     """
-    if current_index == 0:
-        ss_dict["cwnd_diff"] = 0
-        return
-
-    if cwnd == prev_cwnd:
-        prev_cwnd = ss_dicts[current_index - 1]["cwnd"]
-        if prev_cwnd == cwnd:
-            return add_cwnd_diff(ss_dicts, ss_dict, cwnd, prev_cwnd, current_index - 1)
-        else:
-            ss_dict["cwnd_diff"] = cwnd - prev_cwnd
-            return
-
-
-def label_packet(ss_dict: dict, cwnd: int, prev_cwnd: int, next_cwnd: int) -> bool:
-    """Label the packet as either lost or not.
+    rows, measurements = counts["rows"], counts["measurements"]
+    ratio = measurements / rows if rows else 1
+    print(
+        f"Coalesced {measurements} measurements into {rows} rows"
+        + f" ({measurements - rows} duplicates removed, {ratio:.2f}x fewer rows)"
+    )
 
-    The packet is labeled as lost or not by comparing its cwnd value with the values of the previous and next measurements.
 
-    If the cwnd of the previous measurement is smaller or the same as the current one,
-    and the cwnd of the next measurement is smaller than the one of the current measurement, the packet is labeled as lost.
-    Otherwise, it is labeled as not lost.
+def iter_row_groups(ss_data_samples: Iterable[tuple]) -> Iterator[tuple]:
+    """Split the samples of each of the flows of each of the ss output files into row groups of a columnar dataset.
 
     Args:
-        ss_dict: The dictionary to add the label to.
-        cwnd: The congestion window value of the current measurement.
-        prev_cwnd: The congestion window value of the previous measurement.
-        next_cwnd: The congestion window value of the next measurement.
+        ss_data_samples: An iterable of tuples with the path to an ss output file and the samples of one of its flows,
+        as yielded by iter_sample_lists.
 
-    Returns:
-        True if the packet was lost and False otherwise.
+    Yields:
+        Tuples with the measurement parameters parsed from the directory of the ss output file
+        and a list of at most ROW_GROUP_SIZE of the samples, see ss_dataset.create_dataset.
     """
-    if prev_cwnd <= cwnd and next_cwnd < cwnd:
-        ss_dict["lost"] = True
-        return True
+    for path, samples in ss_data_samples:
+        metadata = ss_dataset.parse_directory_path(path.parent)
+        samples = iter(samples)
+        while rows := list(itertools.islice(samples, ROW_GROUP_SIZE)):
+            yield metadata, rows
 
-    ss_dict["lost"] = False
-    return False
 
+def create_csv(
+    samples: Iterable[Iterable[ss_sample.SsSample]], columns: tuple, path: str
+) -> None:
+    """Create a csv file from the ss measurements in the given iterables of samples.
 
-def label_packets(cwnd_dicts: list) -> None:
-    """Label all of the packets in the given list of dictionaries.
+    The samples are written one at a time, as they are produced.
 
     Args:
-        cwnd_dicts: The list of dictionaries that contain the measurements
-        from ss where the cwnd field was present but potentially not some other fields.
+        samples: An iterable of lists or iterators, each containing samples representing the measurements from ss.
+        columns: The columns of the samples to write, in order, see ss_sample.get_columns.
+        path: Where to create the csv file.
     """
-    for i in range(1, len(cwnd_dicts) - 1):
-        cwnd = cwnd_dicts[i]["cwnd"]
-        prev_cwnd = cwnd_dicts[i - 1]["cwnd"]
-        next_cwnd = cwnd_dicts[i + 1]["cwnd"]
+    get_row = ss_sample.create_row_getter(columns)
+    with open(path, "w", newline="") as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(columns)
+        writer.writerows(map(get_row, itertools.chain.from_iterable(samples)))
 
-        label_packet(cwnd_dicts[i], cwnd, prev_cwnd, next_cwnd)
+    print("Created csv file under path:", path)
 
 
-def create_dictionary_list(ss_data: list) -> list:
-    """Create a dictionary for each of the ss measurements in the given list.
+def create_shards(
+    ss_data_samples: Iterable[tuple],
+    columns: tuple,
+    shard_directory: Path,
+    entries: dict,
+) -> None:
+    """Write the samples of each of the ss output files to its own shard, a csv file without a header.
 
     Args:
-        ss_data: A list containing the measurements from ss.
-
-    Returns:
-        A list of dictionaries, where each dictionary consists of the different statistics for each of the measurements.
+        ss_data_samples: An iterable of tuples with the path to an ss output file and the samples of one of its flows,
+        as yielded by iter_sample_lists.
+        columns: The columns of the samples to write, in order, see ss_sample.get_columns.
+        shard_directory: The path to the directory containing the shards.
+        entries: The manifest entries of the ss output files keyed by path, see ss_manifest.get_stale_paths.
+        The number of rows written to each of the shards is stored in its entry.
     """
-    prev_data_segs_sent = 0
-    min_rtt = (
-        max_rtt
-    ) = min_cwnd = max_cwnd = min_ssthresh = max_ssthresh = cumulative_rtt = 0
-    timestamp = index = 0
-    threshold = 30 * 1000  # 30 seconds in milliseconds.
-    dicts = []
-    cwnd_dicts = []
-    for measurement in ss_data:
-        if cumulative_rtt > threshold:
-            ss_dict = {}
-            field_missing = False
-
-            # Add the timer info.
-            timer_info_added = add_timer_info(ss_dict, measurement)[1]
-            if not timer_info_added:
-                field_missing = True
-
-            # Add the rto.
-            rto_added = add_rto(ss_dict, measurement)[1]
-            if not rto_added:
-                field_missing = True
-
-            # Add the rtt and rtt variance.
-            rtt_and_rtt_var, rtt_and_rtt_var_added = add_rtt_and_rtt_variance(
-                ss_dict, measurement
-            )
-            if not rtt_and_rtt_var_added:
-                field_missing = True
-            else:
-                rtt = rtt_and_rtt_var[0]
-                cumulative_rtt += rtt
-
-            # Add the cwnd.
-            cwnd, cwnd_added = add_cwnd(ss_dict, measurement)
-            if not cwnd_added:
-                field_missing = True
-
-            # Add the ssthresh.
-            ssthresh, ssthresh_added = add_ssthresh(ss_dict, measurement)
-            if not ssthresh_added:
-                field_missing = True
-
-            # Add the data segments out.
-            data_segs_out, data_segs_out_added = add_data_segs_out(ss_dict, measurement)
-            if not data_segs_out_added:
-                field_missing = True
-
-            # Add the lastsnd.
-            last_send_added = add_lastsnd(ss_dict, measurement)[1]
-            if not last_send_added:
-                field_missing = True
-
-            # Add the pacing rate.
-            pacing_rate_added = add_pacing_rate(ss_dict, measurement)[1]
-            if not pacing_rate_added:
-                field_missing = True
-
-            # Add the timestamp (ms when ss was ran).
-            ss_dict["timestamp"] = timestamp
-            timestamp += 20
-
-            # Add the min and max rtt.
-            if rtt_and_rtt_var_added:
-                min_rtt, max_rtt = add_min_and_max_rtt(
-                    ss_dict, rtt_and_rtt_var[0], min_rtt, max_rtt
-                )
-
-            # Add the cwnd diff and min and max cwnd.
-            if cwnd_added:
-                try:
-                    add_cwnd_diff(cwnd_dicts, ss_dict, cwnd, cwnd, index)
-                except RecursionError:
-                    field_missing = True
-                min_cwnd, max_cwnd = add_min_and_max_cwnd(
-                    ss_dict, cwnd, min_cwnd, max_cwnd
-                )
-
-            # Add the min and max ssthresh.
-            if ssthresh_added:
-                min_ssthresh, max_ssthresh = add_min_and_max_ssthresh(
-                    ss_dict, ssthresh, min_ssthresh, max_ssthresh
-                )
-
-            # Calculate the difference between the current and previous data segments sent.
-            if data_segs_out_added:
-                data_segments_sent_diff = data_segs_out - prev_data_segs_sent
-                prev_data_segs_sent = data_segs_out
-                ss_dict["data_segments_sent"] = data_segments_sent_diff
-
-            if not field_missing:
-                dicts.append(ss_dict)
-
-            if cwnd_added:
-                cwnd_dicts.append(ss_dict)
-                index += 1
-        else:
-            rtt_and_rtt_var, rtt_and_rtt_var_added = add_rtt_and_rtt_variance(
-                {}, measurement
-            )
-
-            if rtt_and_rtt_var_added:
-                rtt = rtt_and_rtt_var[0]
-                cumulative_rtt += rtt
-                min_rtt, max_rtt = add_min_and_max_rtt({}, rtt, min_rtt, max_rtt)
-
-    # Label all the packets as either lost or not.
-    label_packets(dicts)
-
-    # Remove the first and last packets since they cannot be reliably labeled.
-    dicts = dicts[1:-1]
-
-    return dicts
-
+    get_row = ss_sample.create_row_getter(columns)
+    for path, samples in ss_data_samples:
+        entry = entries[str(path)]
+        with open(shard_directory / entry["shard"], "a", newline="") as shard_file:
+            writer = csv.writer(shard_file)
+            for sample in samples:
+                writer.writerow(get_row(sample))
+                entry["rows"] += 1
+
+
+def create_csv_incrementally(
+    paths: list,
+    fields: tuple,
+    include_flow: bool,
+    jobs: int | None,
+    columns: tuple,
+    path: str,
+    coalesce: bool = False,
+) -> None:
+    """Create a csv file from the given ss output files, only converting the files that changed since the last run.
 
-def create_dictionary_lists(ss_data: dict) -> list:
-    """Create a dictionary for each of the ss measurements for each of the lists in the given list of ss data and add the various dictionary lists to a list.
+    The rows of each ss output file are stored in a shard next to the csv file, and a manifest records
+    the size and hash of each of the files, along with the parser version and the columns. Files whose
+    shards are current are not read or parsed again, and the csv file is assembled from the shards
+    in the order of the given paths, so it is the same as the one created by converting all of the files.
 
     Args:
-        ss_data: A dictionary containing lists with measurements from ss.
+        paths: A list of paths to the ss output files.
+        fields: The fields of the parsed measurements that should be included.
+        include_flow: Whether or not to set the flow of each of the samples.
+        jobs: The number of processes to use, or None to use one per CPU.
+        columns: The columns of the samples to write, in order, see ss_sample.get_columns.
+        path: Where to create the csv file.
+        coalesce: Whether or not to coalesce runs of samples whose state did not change.
+    """
+    shard_directory = ss_manifest.get_shard_directory(path)
+    shard_directory.mkdir(parents=True, exist_ok=True)
 
-    Returns:
+    manifest = ss_manifest.load_manifest(shard_directory, columns)
+    stale_paths, entries = ss_manifest.get_stale_paths(
+        shard_directory, manifest, paths
+    )
+    print(
+        f"Converting {len(stale_paths)} new or changed ss output files,"
+        + f" reusing the shards of {len(paths) - len(stale_paths)}..."
+    )
 
-        A list of dictionary lists where each dictionary consists of the different statistics for each of the measurements.
-    """
-    return [create_dictionary_list(value) for value in ss_data.values()]
+    for stale_path in stale_paths:
+        entry = entries[str(stale_path)]
+        (shard_directory / entry["shard"]).write_bytes(b"")
+        entry["rows"] = 0
 
+    ss_data_samples = iter_sample_lists(
+        stale_paths, fields, include_flow, jobs, coalesce
+    )
+    counts = {"rows": 0, "measurements": 0}
+    if coalesce:
+        ss_data_samples = iter_counted_samples(ss_data_samples, counts)
 
-def create_csv(ss_dicts: List[List[Dict]], path: str) -> None:
-    """Create a csv file from the ss measurements in the given list of lists of dictionaries.
+    create_shards(ss_data_samples, columns, shard_directory, entries)
+    if coalesce:
+        print_coalescing_report(counts)
 
-    Args:
-        ss_dicts: A list of lists, each containing dictionaries representing the measurements from ss.
-        path: Where to create the csv file.
-    """
-    flattened_ss_dicts = [ss_dict for sublist in ss_dicts for ss_dict in sublist]
+    # Remove the shards of the files that are no longer converted.
+    for file_path, entry in manifest["files"].items():
+        if file_path not in entries:
+            (shard_directory / entry["shard"]).unlink(missing_ok=True)
 
-    with open(path, "w", newline="") as csv_file:
-        writer = csv.DictWriter(csv_file, fieldnames=flattened_ss_dicts[0].keys())
+    manifest["files"] = entries
+    ss_manifest.save_manifest(shard_directory, manifest)
 
-        writer.writeheader()
-        for ss_dict in flattened_ss_dicts:
-            writer.writerow(ss_dict)
+    with open(path, "w", newline="") as csv_file:
+        csv.writer(csv_file).writerow(columns)
+        for entry in entries.values():
+            with open(shard_directory / entry["shard"], newline="") as shard_file:
+                shutil.copyfileobj(shard_file, csv_file)
 
-    print("Created csv file under path:", path)
+    rows = sum(entry["rows"] for entry in entries.values())
+    print(f"Created csv file with {rows} rows under path:", path)
 
 
 def init_argparse() -> ArgumentParser:
@@ -554,7 +497,7 @@ def init_argparse() -> ArgumentParser:
         metavar="OUTPUT",
         type=str,
         default="",
-        help="Output path (default: output/ss_data_[algorithm].csv)",
+        help="Output path (default: output/ss_data_[algorithm].csv, or output/ss_data_[algorithm] for a columnar dataset)",
     )
     parser.add_argument(
         "-s",
@@ -565,6 +508,57 @@ def init_argparse() -> ArgumentParser:
         help="Paths to folders that contain the ss output files separated by spaces, for example: folderpath1 folderpath2 ... folderpath3",
         nargs="+",
     )
+    parser.add_argument(
+        "-f",
+        "--fields",
+        metavar="FIELDS",
+        type=str,
+        default=[],
+        choices=[
+            field
+            for field in ss_parser.SS_SCHEMA_FIELDS
+            if field not in ss_parser.SS_RECORD_FIELDS
+        ],
+        help="Additional ss fields to include in the csv file separated by spaces, for example: bytes_retrans lost_segments delivery_rate",
+        nargs="+",
+    )
+    parser.add_argument(
+        "--include_flow",
+        metavar="INCLUDE_FLOW",
+        action=BooleanOptionalAction,
+        default=False,
+        help="Add the flow (local and peer address) of each measurement as the first column",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        metavar="JOBS",
+        type=int,
+        default=1,
+        help="Number of processes that read and label the ss output files in parallel, 0 for one per CPU (default: 1)",
+    )
+    parser.add_argument(
+        "--output_format",
+        metavar="OUTPUT_FORMAT",
+        type=str,
+        default="csv",
+        choices=["csv", "columnar"],
+        help="Format of the output: a csv file, or a columnar dataset directory with a file per column that includes the measurement parameters from the directory of each ss output file (default: csv)",
+    )
+    parser.add_argument(
+        "--coalesce",
+        metavar="COALESCE",
+        action=BooleanOptionalAction,
+        default=False,
+        help="Store each run of consecutive measurements of a flow whose state did not change, apart from the timestamp, lastsnd and the timer countdown, once with the number of measurements in a repeat column",
+    )
+    parser.add_argument(
+        "--incremental",
+        metavar="INCREMENTAL",
+        action=BooleanOptionalAction,
+        default=False,
+        help="Only convert the ss output files that are new or changed since the last run with the same output path, reusing the rows of the others from the [output].shards directory (csv output only)",
+    )
 
     return parser
 
@@ -592,10 +586,15 @@ def read_paths(paths: list) -> list:
         paths: A list containing the paths to the folders that contain the ss output files.
 
     Returns:
-        A list containing the paths to the ss output files.
+        A list containing the paths to the ss output files, without the index and cache files next to them.
     """
     if paths_valid(paths):
-        return [child.resolve() for path in paths for child in path.iterdir()]
+        return [
+            child.resolve()
+            for path in paths
+            for child in path.iterdir()
+            if child.suffix != SIDECAR_SUFFIX
+        ]
     else:
         print("Invalid paths given, exiting...")
         raise SystemExit
@@ -608,17 +607,59 @@ def main():
     print("Collecting paths containing ss output files...")
     ss_outputs = read_paths(args.ss)
 
-    print("Reading ss output files...")
-    ss_data_lists_dict = read_ss(ss_outputs)
+    if args.jobs < 0:
+        print("Invalid number of jobs given, exiting...")
+        raise SystemExit
 
-    print("Creating dictionaries for each of the ss measurements...")
-    ss_data_dicts = create_dictionary_lists(ss_data_lists_dict)
+    if args.incremental and args.output_format != "csv":
+        print("Incremental conversion is only supported for csv files, exiting...")
+        raise SystemExit
+
+    fields = ss_parser.SS_RECORD_FIELDS + tuple(args.fields)
+    columns = ss_sample.get_columns(fields, args.include_flow) + (ss_sample.LABEL,)
+    if args.coalesce:
+        columns += (ss_sample.REPEAT,)
+
+    if args.incremental:
+        print("Reading new or changed ss output files and creating csv file...")
+        create_csv_incrementally(
+            ss_outputs,
+            fields,
+            args.include_flow,
+            args.jobs or None,
+            columns,
+            args.output or "output/ss_data_" + args.algorithm + ".csv",
+            args.coalesce,
+        )
+        return
 
-    print("Creating csv file...")
+    ss_data_samples = iter_sample_lists(
+        ss_outputs, fields, args.include_flow, args.jobs or None, args.coalesce
+    )
+    counts = {"rows": 0, "measurements": 0}
+    if args.coalesce:
+        ss_data_samples = iter_counted_samples(ss_data_samples, counts)
+
+    if args.output_format == "columnar":
+        print("Reading ss output files and creating columnar dataset...")
+        path = args.output or "output/ss_data_" + args.algorithm
+        rows = ss_dataset.create_dataset(
+            iter_row_groups(ss_data_samples), path, columns
+        )
+        print(f"Created columnar dataset with {rows} rows under path:", path)
+        if args.coalesce:
+            print_coalescing_report(counts)
+        return
+
+    print("Reading ss output files and creating csv file...")
+    samples = (samples for _, samples in ss_data_samples)
     if args.output != "":
-        create_csv(ss_data_dicts, args.output)
+        create_csv(samples, columns, args.output)
     else:
-        create_csv(ss_data_dicts, "output/ss_data_" + args.algorithm + ".csv")
+        create_csv(samples, columns, "output/ss_data_" + args.algorithm + ".csv")
+
+    if args.coalesce:
+        print_coalescing_report(counts)
 
 
 if __name__ == "__main__":
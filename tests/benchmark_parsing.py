@@ -0,0 +1,162 @@
+import timeit
+import utils.util as utils
+import utils.ss_bytes as ss_bytes
+import utils.ss_parser as ss_parser
+
+from argparse import ArgumentParser
+from pathlib import Path
+
+EXAMPLE_RECORD = (
+    "tcp   ESTAB 0      5655000    10.1.1.100:5001   10.2.2.100:5201 timer:(on,300ms,0)"
+    "ts sack ecn reno wscale:9,9 rto:300 rtt:99.413/0.261 mss:1448 pmtu:1500 rcvmss:536"
+    " advmss:1448 cwnd:669 ssthresh:412 bytes_sent:2441365 bytes_retrans:70952"
+    " bytes_acked:1180158 segs_out:1689 segs_in:829 data_segs_out:1687 send 78Mbps"
+    " lastsnd:12 lastrcv:556 pacing_rate 115Mbps delivery_rate 47.8Mbps delivered:918"
+    " busy:504ms rwnd_limited:48ms(9.5%) unacked:822 retrans:49/49 lost:101 sacked:101"
+    " rcv_space:14480 rcv_ssthresh:42242 notsent:4464744 minrtt:50.036"
+)
+
+
+def init_argparse() -> ArgumentParser:
+    """Initialize the argument parser.
+
+    Returns:
+        The initialized argument parser.
+    """
+    parser = ArgumentParser(
+        usage="python %(prog)s [-i <input_file>] [-n <num_executions>]",
+        description="Benchmark the per-record cost of the different ss parsing paths",
+    )
+    parser.add_argument(
+        "-i",
+        "--input_file",
+        metavar="INPUT_FILE",
+        type=Path,
+        help="Path to an ss output file whose records should be parsed (default: a built-in example record). "
+        "Uncompressed files are also parsed as a whole with both the str and bytes parsers to compare their throughput",
+    )
+    parser.add_argument(
+        "-n",
+        "--num_executions",
+        metavar="NUM_EXECUTIONS",
+        type=int,
+        default=100000,
+        help="Number of records to parse per parsing path (default: 100000)",
+    )
+
+    return parser
+
+
+def parse_record_with_regexes(measurement: str) -> dict:
+    """Parse the given record with the per-field add_* helpers.
+
+    Args:
+        measurement: The measurement from ss.
+
+    Returns:
+        A dictionary containing the parsed fields.
+    """
+    ss_dict = {}
+    utils.add_timer_info(ss_dict, measurement)
+    utils.add_rto(ss_dict, measurement)
+    utils.add_rtt_and_rtt_variance(ss_dict, measurement)
+    utils.add_cwnd(ss_dict, measurement)
+    utils.add_ssthresh(ss_dict, measurement)
+    utils.add_data_segs_out(ss_dict, measurement)
+    utils.add_lastsnd(ss_dict, measurement)
+    utils.add_pacing_rate(ss_dict, measurement)
+
+    return ss_dict
+
+
+def time_per_record(parse: object, records: list) -> float:
+    """Time how long the given parse function takes per record.
+
+    Args:
+        parse: The function that parses a single record.
+        records: The records that should be parsed.
+
+    Returns:
+        The average time per record in seconds.
+    """
+    execution_time = timeit.timeit(
+        lambda: [parse(record) for record in records], number=1
+    )
+    return execution_time / len(records)
+
+
+def benchmark_record_parsing(records: list, num_executions: int) -> None:
+    """Time the per-field regex path against the single-pass tokenizer and print the results.
+
+    The tokenizer is timed for the fields the models are trained on and for all of the fields in the schema.
+
+    Args:
+        records: The ss records to cycle through.
+        num_executions: The number of records that should be parsed per path.
+    """
+    records = (records * (num_executions // len(records) + 1))[:num_executions]
+    print(f"Parsing {len(records)} records per path...")
+
+    regex_time = time_per_record(parse_record_with_regexes, records)
+    tokenizer_time = time_per_record(ss_parser.parse_record, records)
+    all_fields = tuple(ss_parser.SS_SCHEMA_FIELDS)
+    schema_time = time_per_record(
+        lambda record: ss_parser.parse_record(record, all_fields), records
+    )
+
+    print(f"Per-field regexes (add_* helpers): {regex_time * 1e6:.2f}us per record")
+    print(f"Single-pass tokenizer (parse_record): {tokenizer_time * 1e6:.2f}us per record")
+    print(f"Speedup: {regex_time / tokenizer_time:.2f}x")
+    print(
+        f"All {len(all_fields)} schema fields (parse_record): {schema_time * 1e6:.2f}us per record"
+    )
+
+
+def benchmark_file_parsing(file_path: Path) -> None:
+    """Time parsing the given file into its columnar form by decoding it record by record against scanning its bytes.
+
+    Each parser is run three times and the fastest run is used.
+
+    Args:
+        file_path: The path to the uncompressed ss output file.
+    """
+    file_size = file_path.stat().st_size / 1e6
+    str_time = min(
+        timeit.repeat(
+            lambda: utils.create_parsed_ss(ss_parser.iter_ss(file_path)),
+            number=1,
+            repeat=3,
+        )
+    )
+    bytes_time = min(
+        timeit.repeat(lambda: ss_bytes.parse_file(file_path), number=1, repeat=3)
+    )
+    num_records = len(ss_bytes.parse_file(file_path)["columns"]["flow"])
+
+    print(f"Parsing {file_path} ({file_size:.1f} MB, {num_records} records)...")
+    print(
+        f"Decoded records (create_parsed_ss): {str_time:.2f}s, {file_size / str_time:.1f} MB/s,"
+        f" {num_records / str_time:.0f} records/s"
+    )
+    print(
+        f"Memory mapped bytes (ss_bytes.parse_file): {bytes_time:.2f}s, {file_size / bytes_time:.1f} MB/s,"
+        f" {num_records / bytes_time:.0f} records/s"
+    )
+    print(f"Speedup: {str_time / bytes_time:.2f}x")
+
+
+def main():
+    parser = init_argparse()
+    args = parser.parse_args()
+
+    records = [EXAMPLE_RECORD]
+    if args.input_file:
+        records = utils.read_ss(args.input_file)
+
+    benchmark_record_parsing(records, args.num_executions)
+    if args.input_file and args.input_file.suffix != ".gz":
+        benchmark_file_parsing(args.input_file)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import tracemalloc
+import utils.util as utils
+import utils.ss_features as ss_features
+import utils.ss_parser as ss_parser
+import utils.ss_sample as ss_sample
+
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Callable
+
+
+def init_argparse() -> ArgumentParser:
+    """Initialize the argument parser.
+
+    Returns:
+        The initialized argument parser.
+    """
+    parser = ArgumentParser(
+        usage="python %(prog)s -i <input_file> [-f <flow>]",
+        description="Benchmark the memory used by the features of a capture as samples and as dictionaries",
+    )
+    parser.add_argument(
+        "-i",
+        "--input_file",
+        metavar="INPUT_FILE",
+        type=Path,
+        required=True,
+        help="Path to an ss output file, e.g. a full 300 s capture",
+    )
+    parser.add_argument(
+        "-f",
+        "--flow",
+        metavar="FLOW",
+        type=str,
+        default=utils.FOREGROUND_FLOW,
+        help=f'The flow whose features should be created (default: "{utils.FOREGROUND_FLOW}")',
+    )
+
+    return parser
+
+
+def select_fields(record: dict) -> dict:
+    """Select the fields the models are trained on from the given parsed record, as txt_to_csv does.
+
+    Args:
+        record: The parsed record.
+
+    Returns:
+        A dictionary with the values of the SS_RECORD_FIELDS.
+    """
+    return {field: record[field] for field in ss_parser.SS_RECORD_FIELDS}
+
+
+def create_samples(parsed_ss: dict) -> list:
+    """Create the features of each of the measurements as samples.
+
+    Args:
+        parsed_ss: The columnar form of the measurements of a single flow.
+
+    Returns:
+        A list of the samples.
+    """
+    state = ss_features.create_state()
+    return [
+        ss_features.create_features(state, select_fields(record))
+        for record in utils.iter_parsed_records(parsed_ss)
+    ]
+
+
+def create_dictionaries(parsed_ss: dict) -> list:
+    """Create the features of each of the measurements as dictionaries, as they were before the samples.
+
+    Args:
+        parsed_ss: The columnar form of the measurements of a single flow.
+
+    Returns:
+        A list of the dictionaries, which contain the same values as the samples.
+    """
+    state = ss_features.create_state()
+    return [
+        ss_sample.to_dict(
+            ss_features.create_features(state, select_fields(record))
+        )
+        for record in utils.iter_parsed_records(parsed_ss)
+    ]
+
+
+def measure(create: Callable[[dict], list], parsed_ss: dict) -> tuple:
+    """Measure the memory that the features created by the given function take while they are held.
+
+    Args:
+        create: The function that creates the features.
+        parsed_ss: The columnar form of the measurements of a single flow.
+
+    Returns:
+        A tuple with the number of features, the memory they take in bytes
+        and the peak memory while they were created in bytes.
+    """
+    tracemalloc.start()
+    features = create(parsed_ss)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return len(features), current, peak
+
+
+def benchmark_memory(parsed_ss: dict) -> None:
+    """Compare the memory used by the features of the given flow as samples and as dictionaries and print the results.
+
+    Args:
+        parsed_ss: The columnar form of the measurements of a single flow.
+    """
+    results = {}
+    for name, create in [("dict", create_dictionaries), ("SsSample", create_samples)]:
+        count, current, peak = measure(create, parsed_ss)
+        results[name] = current
+        print(
+            f"{name}: {count} measurements, {current / 2**20:.2f} MiB held"
+            + f" ({current / count:.0f} bytes each), {peak / 2**20:.2f} MiB peak"
+        )
+
+    print(f"Reduction: {results['dict'] / results['SsSample']:.2f}x")
+
+
+def main():
+    parser = init_argparse()
+    args = parser.parse_args()
+
+    parsed_ss = utils.select_flow(utils.read_parsed_ss(args.input_file), args.flow)
+    if len(parsed_ss["columns"]["flow"]) == 0:
+        print("The flow is not in the ss output file, exiting...")
+        raise SystemExit
+
+    print(f"Fields: {', '.join(ss_sample.get_columns(ss_parser.SS_RECORD_FIELDS))}")
+    benchmark_memory(parsed_ss)
+
+
+if __name__ == "__main__":
+    main()
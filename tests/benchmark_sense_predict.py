@@ -0,0 +1,317 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import utils.ss_parser as ss_parser
+
+from argparse import ArgumentParser
+from argparse import Namespace
+from pathlib import Path
+from typing import Iterator
+
+# The ways of turning the ss output into predictions: a single sense and predict module (sense_predict.py),
+# or the data persistence module (prepare_data.py) and prediction module (predict.py) connected by a csv file.
+MODES = ("fused", "split")
+
+# The files in the watched directory, as in start_and_run_connection.sh.
+SS_FILE = "ss_data_predict.txt"
+INPUT_DATA_FILE = "input_data.csv"
+PREDICTION_FILE = "prediction.txt"
+
+# The time the modules take to load the classifier and start observing (s).
+STARTUP_TIME = 3
+
+# The time the modules only collect the rtt before making predictions, see prepare_data.parse_packet,
+# along with a margin (s).
+WARMUP_TIME = 1.5
+
+
+def init_argparse() -> ArgumentParser:
+    """Initialize the argument parser.
+
+    Returns:
+        The initialized argument parser.
+    """
+    parser = ArgumentParser(
+        usage="python %(prog)s -c <classifier> -i <input_file> [-m <modes>] [-n <num_samples>]",
+        description="Replay an ss output file to the prediction modules and report the latency from each ss poll to its prediction",
+        epilog="For reference, 300 polls of a reno capture replayed with models/binary_clf_reno_phase_three.ubj on a single core "
+        "took p50 6.60ms and p99 43.28ms in the fused mode and p50 29.97ms and p99 48.15ms in the split mode, "
+        "with 6 polls dropped in each mode",
+    )
+    parser.add_argument(
+        "-c",
+        "--classifier_path",
+        metavar="CLASSIFIERPATH",
+        type=str,
+        required=True,
+        help="Path to the saved classifier to use for the prediction",
+    )
+    parser.add_argument(
+        "-i",
+        "--input_file",
+        metavar="INPUT_FILE",
+        type=Path,
+        required=True,
+        help="Path to an ss output file whose polls should be replayed",
+    )
+    parser.add_argument(
+        "-m",
+        "--modes",
+        metavar="MODES",
+        nargs="+",
+        choices=MODES,
+        default=list(MODES),
+        help=f"The modes to measure (default: {' '.join(MODES)})",
+    )
+    parser.add_argument(
+        "-n",
+        "--num_samples",
+        metavar="NUM_SAMPLES",
+        type=int,
+        default=500,
+        help="Number of ss polls to measure per mode (default: 500)",
+    )
+    parser.add_argument(
+        "--interval",
+        metavar="INTERVAL",
+        type=float,
+        default=20,
+        help="Interval between the ss polls in ms (default: 20)",
+    )
+    parser.add_argument(
+        "--timeout",
+        metavar="TIMEOUT",
+        type=float,
+        default=1000,
+        help="Time to wait for the prediction of an ss poll before it is counted as dropped in ms (default: 1000)",
+    )
+    parser.add_argument(
+        "-t",
+        "--threshold",
+        metavar="THRESHOLD",
+        type=float,
+        help="Classification threshold to use for the prediction",
+    )
+
+    return parser
+
+
+def iter_polls(file_path: Path) -> Iterator[str]:
+    """Lazily read the ss polls in the given ss output file, each starting with its header.
+
+    Args:
+        file_path: The path to the ss output file.
+
+    Yields:
+        The text of each ss poll, as written to the ss output file of the prediction modules.
+    """
+    poll = []
+    with ss_parser.open_ss(file_path) as data:
+        for line in data:
+            if ss_parser.is_header(line) and poll:
+                yield "".join(poll)
+                poll = []
+            poll.append(line)
+
+    if poll:
+        yield "".join(poll)
+
+
+def start_modules(
+    mode: str, directory: str, classifier_path: str, threshold: float | None
+) -> list:
+    """Start the prediction modules of the given mode, watching the given directory.
+
+    The predictions are appended in timestamp mode, so every prediction changes the size of the prediction file.
+
+    Args:
+        mode: The mode, one of MODES.
+        directory: The directory containing the ss output file and the prediction file.
+        classifier_path: The path to the saved classifier.
+        threshold: The optional classification threshold.
+
+    Returns:
+        The processes of the modules.
+    """
+    script_directory = Path(__file__).resolve().parent
+    classifier_path = str(Path(classifier_path).resolve())
+    threshold_args = [] if threshold is None else ["-t", str(threshold)]
+
+    if mode == "fused":
+        commands = [
+            [
+                "sense_predict.py",
+                *("-c", classifier_path, "-d", ".", "-i", SS_FILE),
+                *("-o", PREDICTION_FILE, "--timestamp_mode", *threshold_args),
+            ]
+        ]
+    else:
+        commands = [
+            ["prepare_data.py", "-d", ".", "-i", SS_FILE, "-o", INPUT_DATA_FILE],
+            [
+                "predict.py",
+                *("-c", classifier_path, "-d", ".", "-i", INPUT_DATA_FILE),
+                *("-o", PREDICTION_FILE, "--timestamp_mode", *threshold_args),
+            ],
+        ]
+
+    return [
+        subprocess.Popen(
+            [sys.executable, str(script_directory / script), *args],
+            cwd=directory,
+            stdout=subprocess.DEVNULL,
+        )
+        for script, *args in commands
+    ]
+
+
+def get_size(file_path: Path) -> int:
+    """Get the size of the given file.
+
+    Args:
+        file_path: The path to the file.
+
+    Returns:
+        The size in bytes, or 0 if the file does not exist.
+    """
+    try:
+        return os.stat(file_path).st_size
+    except FileNotFoundError:
+        return 0
+
+
+def write_poll(ss_path: Path, poll: str) -> float:
+    """Write the given ss poll to the ss output file, replacing the previous poll as capture_ss_with_overwrite does.
+
+    Args:
+        ss_path: The path to the ss output file.
+        poll: The ss poll.
+
+    Returns:
+        The time the ss poll was written, from time.perf_counter.
+    """
+    written = time.perf_counter()
+    with open(ss_path, "w") as ss_file:
+        ss_file.write(poll)
+
+    return written
+
+
+def wait_for_prediction(
+    prediction_path: Path, size: int, timeout: float
+) -> float | None:
+    """Wait until a prediction has been appended to the prediction file.
+
+    Args:
+        prediction_path: The path to the prediction file.
+        size: The size of the prediction file before the prediction.
+        timeout: The maximum time to wait in seconds.
+
+    Returns:
+        The time the prediction was found, from time.perf_counter, or None if the timeout was reached.
+    """
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if get_size(prediction_path) != size:
+            return time.perf_counter()
+        time.sleep(0.0001)
+
+    return None
+
+
+def measure_latencies(
+    mode: str, polls: Iterator[str], args: Namespace, directory: str
+) -> tuple:
+    """Replay the given ss polls to the prediction modules of the given mode and measure the latency of each prediction.
+
+    Args:
+        mode: The mode, one of MODES.
+        polls: The ss polls, which are replayed at the interval given in the arguments.
+        args: The parsed arguments.
+        directory: The empty directory the modules should watch.
+
+    Returns:
+        A tuple containing the latencies in seconds from writing each ss poll to finding its prediction,
+        and the number of ss polls for which no prediction was found.
+    """
+    ss_path = Path(directory) / SS_FILE
+    prediction_path = Path(directory) / PREDICTION_FILE
+    interval = args.interval / 1000
+
+    processes = start_modules(mode, directory, args.classifier_path, args.threshold)
+    try:
+        time.sleep(STARTUP_TIME)
+
+        # The first ss polls only update the min and max rtt, so they are not measured.
+        warmup_end = time.perf_counter() + WARMUP_TIME
+        while time.perf_counter() < warmup_end:
+            write_poll(ss_path, next(polls))
+            time.sleep(interval)
+        time.sleep(0.5)
+
+        latencies = []
+        dropped = 0
+        for _ in range(args.num_samples):
+            size = get_size(prediction_path)
+            written = write_poll(ss_path, next(polls))
+            predicted = wait_for_prediction(prediction_path, size, args.timeout / 1000)
+            if predicted is None:
+                dropped += 1
+            else:
+                latencies.append(predicted - written)
+
+            time.sleep(max(interval - (time.perf_counter() - written), 0))
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+    return latencies, dropped
+
+
+def print_latency_report(mode: str, latencies: list, dropped: int) -> None:
+    """Print the mean, median, 99th percentile and max of the given latencies.
+
+    Args:
+        mode: The mode the latencies were measured for.
+        latencies: The latencies in seconds.
+        dropped: The number of ss polls for which no prediction was found.
+    """
+    if not latencies:
+        print(f"{mode}: no predictions, {dropped} dropped")
+        return
+
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    print(
+        f"{mode}: {len(latencies)} predictions, {dropped} dropped,"
+        f" mean {np.mean(latencies) * 1000:.2f}ms, p50 {p50:.2f}ms,"
+        f" p99 {p99:.2f}ms, max {np.max(latencies) * 1000:.2f}ms"
+    )
+
+
+def main():
+    parser = init_argparse()
+    args = parser.parse_args()
+
+    # The ss polls are replayed from the start again if the file does not contain enough of them.
+    polls = list(iter_polls(args.input_file))
+    if not polls:
+        print(f"No ss polls found in {args.input_file}")
+        return
+
+    for mode in args.modes:
+        print(f"Measuring the latency of the {mode} mode...")
+        replayed_polls = (polls[i % len(polls)] for i in range(sys.maxsize))
+        with tempfile.TemporaryDirectory() as directory:
+            latencies, dropped = measure_latencies(
+                mode, replayed_polls, args, directory
+            )
+
+        print_latency_report(mode, latencies, dropped)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+import os
+import socket
+import time
+import utils.sock_diag as sock_diag
+import utils.ss_features as ss_features
+import utils.ss_parser as ss_parser
+import utils.tcp_sampler as tcp_sampler
+import predict
+import sense_predict
+
+from argparse import ArgumentParser
+from argparse import BooleanOptionalAction
+from typing import Callable
+
+# The file the samples are archived to in the output directory, as written by capture_ss_with_args_periodically.
+SS_FILE = "ss_data.txt"
+
+
+def init_argparse() -> ArgumentParser:
+    """Initialize the argument parser.
+
+    Returns:
+        The initialized argument parser.
+    """
+    parser = ArgumentParser(
+        usage="python %(prog)s (-s | -a <address>) [-p <port>] [--cport <port>] [-t <duration>] [-C <algorithm>] "
+        "[-d <directory_path>] [-c <classifier> -o <output_file>]",
+        description="Bulk sender and receiver that sample the tcp_info of the sending socket in-process, "
+        "as a replacement for the iperf3 foreground flow and ss",
+    )
+    parser.add_argument(
+        "-s",
+        "--server",
+        action="store_true",
+        help="Run the receiver, which accepts a single connection",
+    )
+    parser.add_argument(
+        "-a",
+        "--address",
+        metavar="ADDRESS",
+        type=str,
+        help="Address of the receiver to send to, or to listen on with --server (default: all addresses)",
+    )
+    parser.add_argument(
+        "-p",
+        "--port",
+        metavar="PORT",
+        type=int,
+        default=5201,
+        help="Port of the receiver (default: 5201)",
+    )
+    parser.add_argument(
+        "--cport",
+        metavar="CPORT",
+        type=int,
+        default=5001,
+        help="Local port of the sender (default: 5001)",
+    )
+    parser.add_argument(
+        "-t",
+        "--duration",
+        metavar="DURATION",
+        type=float,
+        default=10,
+        help="Duration to send for in seconds (default: 10)",
+    )
+    parser.add_argument(
+        "-C",
+        "--congestion",
+        metavar="ALGORITHM",
+        type=str,
+        help="Congestion control algorithm of the sender (default: the system default)",
+    )
+    parser.add_argument(
+        "-i",
+        "--interval",
+        metavar="INTERVAL",
+        type=float,
+        default=ss_features.TIMESTAMP_INTERVAL,
+        help=f"Interval between the tcp_info samples in ms (default: {ss_features.TIMESTAMP_INTERVAL})",
+    )
+    parser.add_argument(
+        "-d",
+        "--directory_path",
+        metavar="DIRECTORY_PATH",
+        type=str,
+        help=f"Path to the directory that the samples should be archived to as ss output in {SS_FILE}",
+    )
+    parser.add_argument(
+        "-c",
+        "--classifier_path",
+        metavar="CLASSIFIERPATH",
+        type=str,
+        help="Path to the saved classifier to predict packet loss for each sample with",
+    )
+    parser.add_argument(
+        "-o",
+        "--output_file",
+        metavar="OUTPUT_FILE",
+        type=str,
+        default="prediction.txt",
+        help="Path to the file that the predictions are written to (default: prediction.txt)",
+    )
+    parser.add_argument(
+        "--threshold",
+        metavar="THRESHOLD",
+        type=float,
+        help="Classification threshold to use for the prediction",
+    )
+    parser.add_argument(
+        "--timestamp_mode",
+        metavar="TIMESTAMP_MODE",
+        type=bool,
+        action=BooleanOptionalAction,
+        default=False,
+        help="If predictions should be appended to the output file along with timestamps",
+    )
+
+    return parser
+
+
+def create_predictor(
+    output_path: str,
+    classifier_path: str,
+    classification_threshold: float = None,
+    timestamp_mode: bool = False,
+) -> Callable[[dict], None]:
+    """Create a function that passes a sample to the feature engine and classifier, and writes the prediction.
+
+    Args:
+        output_path: Path to the file that the predictions are written to.
+        classifier_path: The path to the saved classifier to use for the prediction.
+        classification_threshold: The optional classification threshold to use for the prediction.
+        timestamp_mode: Whether or not the predictions are appended to the output file along with timestamps.
+
+    Returns:
+        A function that takes a sample of tcp_sampler.sample_tcp_info.
+    """
+    event_handler = sense_predict.EventHandler(
+        None,
+        None,
+        output_path,
+        predict.load_classifier(classifier_path),
+        classification_threshold,
+        timestamp_mode,
+    )
+    state = ss_features.create_state()
+
+    def predict_sample(sample: dict) -> None:
+        record = sock_diag.decode_record(sample["message"])
+        capture_time = sample["timestamp"] / 1000
+        event_handler.predict_sample(
+            event_handler.parse_record(record, state, capture_time)
+        )
+
+    return predict_sample
+
+
+def send(args) -> None:
+    """Connect to the receiver and send to it for the given duration, while sampling the tcp_info of the socket.
+
+    Each sample is archived as ss output and passed to the classifier, if they are given in the arguments.
+
+    Args:
+        args: The parsed arguments.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if args.congestion is not None:
+        sock.setsockopt(
+            socket.IPPROTO_TCP, socket.TCP_CONGESTION, args.congestion.encode()
+        )
+    sock.bind(("", args.cport))
+    sock.connect((args.address, args.port))
+
+    consumers = []
+    ss_file = None
+    if args.directory_path is not None:
+        os.makedirs(args.directory_path, exist_ok=True)
+        ss_file = open(os.path.join(args.directory_path, SS_FILE), "w")
+        consumers.append(
+            lambda sample: ss_file.write(
+                ss_parser.add_capture_time(
+                    sock_diag.format_poll([sample["message"]]),
+                    sample["timestamp"] / 1000,
+                )
+            )
+        )
+    if args.classifier_path is not None:
+        consumers.append(
+            create_predictor(
+                args.output_file,
+                args.classifier_path,
+                args.threshold,
+                args.timestamp_mode,
+            )
+        )
+
+    def on_sample(sample: dict) -> None:
+        for consumer in consumers:
+            consumer(sample)
+
+    thread, stop = tcp_sampler.start_sampler(sock, on_sample, args.interval)
+    try:
+        start_time = time.time()
+        sent = tcp_sampler.send_bulk(sock, args.duration)
+        elapsed_time = time.time() - start_time
+    finally:
+        stop.set()
+        thread.join()
+        sock.close()
+        if ss_file is not None:
+            ss_file.close()
+
+    print(
+        f"Sent {sent} bytes in {elapsed_time:.2f} seconds"
+        f" ({sent * 8 / elapsed_time / 1000000:.2f} Mbit/s)."
+    )
+
+
+def receive(args) -> None:
+    """Accept a single connection and receive from it until the sender closes it.
+
+    Args:
+        args: The parsed arguments.
+    """
+    with socket.create_server((args.address or "", args.port)) as server:
+        print(f"Receiver listening on port {args.port}...")
+        connection, address = server.accept()
+        with connection:
+            start_time = time.time()
+            received = tcp_sampler.receive_bulk(connection)
+            elapsed_time = time.time() - start_time
+
+    print(
+        f"Received {received} bytes from {address[0]}:{address[1]} in {elapsed_time:.2f} seconds"
+        f" ({received * 8 / max(elapsed_time, 1e-9) / 1000000:.2f} Mbit/s)."
+    )
+
+
+def main():
+    parser = init_argparse()
+    args = parser.parse_args()
+
+    if args.server:
+        receive(args)
+    elif args.address is None:
+        parser.error("the address of the receiver is required unless --server is given")
+    else:
+        send(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+import os
+import time
+import utils.util as utils
+import utils.sock_diag as sock_diag
+import utils.ss_parser as ss_parser
+import utils.ss_ring as ss_ring
+import utils.ss_stream as ss_stream
+import utils.fixed_rate as fixed_rate
+import utils.stage_trace as stage_trace
+
+from argparse import ArgumentParser
+from argparse import BooleanOptionalAction
+
+# The files written to the output directory, as in capture_ss_with_args_periodically in bash_functions.sh.
+SS_FILE = "ss_data.txt"
+SS_PREDICT_FILE = "ss_data_predict.txt"
+
+
+def init_argparse() -> ArgumentParser:
+    """Initialize the argument parser.
+
+    Returns:
+        The initialized argument parser.
+    """
+    parser = ArgumentParser(
+        usage="python %(prog)s -d <directory_path> -t <duration> [-i <interval>] [-f <flows>] [--predict] [--ring <ring>] [--socket <socket_path>] [--measurement_flow <flow>]",
+        description="Periodically collect the tcp_info of the tcp sockets through netlink and write it as ss output, without running ss",
+    )
+    parser.add_argument(
+        "-d",
+        "--directory_path",
+        metavar="DIRECTORY_PATH",
+        type=str,
+        required=True,
+        help="Path to the directory that the ss output should be written to",
+    )
+    parser.add_argument(
+        "-t",
+        "--duration",
+        metavar="DURATION",
+        type=float,
+        required=True,
+        help="Duration to collect for in seconds",
+    )
+    parser.add_argument(
+        "-i",
+        "--interval",
+        metavar="INTERVAL",
+        type=float,
+        default=0,
+        help="Interval between the polls in ms (default: 0, i.e. poll continuously)",
+    )
+    parser.add_argument(
+        "-f",
+        "--flows",
+        metavar="FLOWS",
+        type=str,
+        nargs="+",
+        help='The flows to collect as "<local address:port> <peer address:port>" (default: all of the tcp sockets)',
+    )
+    parser.add_argument(
+        "--predict",
+        metavar="PREDICT",
+        type=bool,
+        action=BooleanOptionalAction,
+        default=False,
+        help=f"If the latest poll should also be written to {SS_PREDICT_FILE} for the prediction modules",
+    )
+    parser.add_argument(
+        "--ring",
+        metavar="RING",
+        type=str,
+        help="Name of the shared memory ring that the measurement of the flow given by --measurement_flow is pushed to for the data persistence module",
+    )
+    parser.add_argument(
+        "--socket",
+        metavar="SOCKET_PATH",
+        type=str,
+        help="Path to the Unix socket of the data persistence module that the measurement of the flow given by --measurement_flow is sent to",
+    )
+    parser.add_argument(
+        "--measurement_flow",
+        metavar="MEASUREMENT_FLOW",
+        type=str,
+        default=utils.FOREGROUND_FLOW,
+        help=f'The flow whose measurements are pushed to the ring or sent to the socket as "<local address:port> <peer address:port>" (default: "{utils.FOREGROUND_FLOW}")',
+    )
+
+    return parser
+
+
+def collect(
+    directory_path: str,
+    duration: float,
+    interval: float = 0,
+    flows: list | None = None,
+    predict: bool = False,
+    ring_name: str | None = None,
+    measurement_flow: str = utils.FOREGROUND_FLOW,
+    socket_path: str | None = None,
+) -> dict:
+    """Collect the tcp_info of the tcp sockets through netlink and write each poll as ss -tin -o output.
+
+    The polls run at a fixed rate, see fixed_rate.run_at_fixed_rate, and their measurements are stamped with
+    the time they were captured at, see ss_parser.add_capture_time. Each poll is appended to the ss output file,
+    which can be archived and parsed like the output of ss, and optionally written to the ss output file of the
+    prediction modules, replacing the previous poll. The measurement of a flow is optionally pushed to a
+    shared memory ring, see ss_ring.push_measurement,
+    or sent to a Unix socket, see ss_stream.send_measurement. If tracing is enabled for the run, the time of
+    each poll and of its write for the prediction modules are recorded, see stage_trace.
+
+    Args:
+        directory_path: The path to the directory that the ss output should be written to.
+        duration: The duration to collect for in seconds.
+        interval: The interval between the polls in ms.
+        flows: The flows to collect, or None to collect all of the tcp sockets.
+        predict: Whether or not the latest poll is also written for the prediction modules.
+        ring_name: The name of the ring that is created for the measurements, or None to not create one.
+        measurement_flow: The flow whose measurements are pushed to the ring or sent to the socket.
+        socket_path: The path to the Unix socket that the measurements are sent to, or None to not send them.
+
+    Returns:
+        The report of the schedule of the polls, see fixed_rate.create_report.
+    """
+    os.makedirs(directory_path, exist_ok=True)
+    ss_path = os.path.join(directory_path, SS_FILE)
+    ss_predict_path = os.path.join(directory_path, SS_PREDICT_FILE)
+    flows = None if flows is None else set(flows)
+
+    ring = None
+    if ring_name is not None:
+        ring = ss_ring.create_ring(ring_name, ss_ring.MEASUREMENT_COLUMNS)
+
+    tracer = stage_trace.create_tracer(directory_path, "capture_tcp_info")
+
+    sender = None
+    if socket_path is not None:
+        sender = ss_stream.create_sender(socket_path, ss_ring.MEASUREMENT_COLUMNS)
+
+    try:
+        with sock_diag.open_socket() as sock, open(ss_path, "w") as ss_file:
+
+            def poll(capture_time: float) -> None:
+                snapshot_time = time.monotonic_ns()
+                output = sock_diag.format_poll(sock_diag.dump_flows(sock, flows))
+                output = ss_parser.add_capture_time(output, capture_time)
+                ss_file.write(output)
+                if predict:
+                    utils.write_to_file(ss_predict_path, output)
+                    trace_id = stage_trace.get_trace_id(capture_time)
+                    stage_trace.record(
+                        tracer, trace_id, stage_trace.CAPTURE, snapshot_time
+                    )
+                    stage_trace.record(tracer, trace_id, stage_trace.CAPTURE_WRITE)
+                if ring is not None:
+                    ss_ring.push_measurement(ring, output, measurement_flow)
+                if sender is not None:
+                    ss_stream.send_measurement(sender, output, measurement_flow)
+
+            return fixed_rate.run_at_fixed_rate(poll, interval, duration)
+    finally:
+        if ring is not None:
+            ss_ring.close_ring(ring, unlink=True)
+        if sender is not None:
+            ss_stream.close_sender(sender)
+        stage_trace.close_tracer(tracer)
+
+
+def main():
+    parser = init_argparse()
+    args = parser.parse_args()
+
+    report = collect(
+        args.directory_path,
+        args.duration,
+        args.interval,
+        args.flows,
+        args.predict,
+        args.ring,
+        args.measurement_flow,
+        args.socket,
+    )
+    print(fixed_rate.format_report(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -72,6 +72,25 @@ def init_argparse() -> ArgumentParser:
         required=True,
         help="The time the connection was running for (in seconds)",
     )
+    parser.add_argument(
+        "--start",
+        metavar="START",
+        type=float,
+        help="Start of the time window that should be plotted (in seconds)",
+    )
+    parser.add_argument(
+        "--end",
+        metavar="END",
+        type=float,
+        help="End of the time window that should be plotted (in seconds)",
+    )
+    parser.add_argument(
+        "--flow",
+        metavar="FLOW",
+        type=str,
+        default=utils.FOREGROUND_FLOW,
+        help=f'The flow that should be plotted as "<local address:port> <peer address:port>" (default: "{utils.FOREGROUND_FLOW}")',
+    )
     parser.add_argument(
         "-o",
         "--output",
@@ -164,10 +183,11 @@ def create_and_save_cwnd_plot(args: object) -> None:
             print("Prediction file not found: {}".format(args.prediction_file))
             raise SystemExit(e)
 
-    ss_outputs = utils.read_ss(args.input_file)
-    ss_interval = utils.calculate_ss_interval(args.time, len(ss_outputs))
-    cc_algo = utils.get_cc_algo(ss_outputs)
-    cwnd_values = utils.get_cwnd_values(ss_outputs)
+    parsed_ss, ss_interval, first_ss_output = utils.read_parsed_ss_window(
+        args.input_file, args.time, args.start, args.end, args.flow
+    )
+    cc_algo = parsed_ss["cc_algo"]
+    cwnd_values = parsed_ss["columns"]["cwnd"].compressed().tolist()
 
     utils.create_and_save_cwnd_plot(
         cwnd_values,
@@ -182,6 +202,7 @@ def create_and_save_cwnd_plot(args: object) -> None:
         predictions_and_timestamps,
         args.show,
         args.larger_fonts,
+        first_ss_output * ss_interval,
     )
 
 
@@ -201,9 +222,10 @@ def create_and_save_cwnd_plot_without_title_and_caption(args: object) -> None:
             print("Prediction file not found: {}".format(args.prediction_file))
             raise SystemExit(e)
 
-    ss_outputs = utils.read_ss(args.input_file)
-    ss_interval = utils.calculate_ss_interval(args.time, len(ss_outputs))
-    cwnd_values = utils.get_cwnd_values(ss_outputs)
+    parsed_ss, ss_interval, first_ss_output = utils.read_parsed_ss_window(
+        args.input_file, args.time, args.start, args.end, args.flow
+    )
+    cwnd_values = parsed_ss["columns"]["cwnd"].compressed().tolist()
 
     utils.create_and_save_cwnd_plot_without_title_and_caption(
         cwnd_values,
@@ -212,6 +234,7 @@ def create_and_save_cwnd_plot_without_title_and_caption(args: object) -> None:
         predictions_and_timestamps,
         args.show,
         args.larger_fonts,
+        first_ss_output * ss_interval,
     )
 
 
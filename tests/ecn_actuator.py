@@ -0,0 +1,146 @@
+import os
+import subprocess
+import time
+import utils.util as utils
+import utils.ss_stream as ss_stream
+import utils.stage_trace as stage_trace
+
+from argparse import ArgumentParser
+
+# The iptables rule that enables ECN, as in toggle_ecn in bash_functions.sh.
+ECN_RULE = ("POSTROUTING", "-p", "tcp", "-j", "TOS", "--set-tos", "3")
+
+
+def init_argparse() -> ArgumentParser:
+    """Initialize the argument parser.
+
+    Returns:
+        The initialized argument parser.
+    """
+    parser = ArgumentParser(
+        usage="python %(prog)s (-s <socket_path> [-f <flow>] | -i <input_file> -l <delay>)",
+        description="Receive the predictions of the prediction module on a Unix socket or poll them from its output file, and enable or disable ECN accordingly",
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument(
+        "-s",
+        "--socket_path",
+        metavar="SOCKET_PATH",
+        type=str,
+        help="Path to the Unix socket to receive the predictions on",
+    )
+    source.add_argument(
+        "-i",
+        "--input_file",
+        metavar="INPUT_FILE",
+        type=str,
+        help="Path to the output file of the prediction module to poll, as toggle_ecn in bash_functions.sh does",
+    )
+    parser.add_argument(
+        "-l",
+        "--delay",
+        metavar="DELAY",
+        type=int,
+        default=50,
+        help="Round-trip time delay in ms, a third of which is the interval between the polls of the input file (default: 50)",
+    )
+    parser.add_argument(
+        "-f",
+        "--flow",
+        metavar="FLOW",
+        type=str,
+        default=utils.FOREGROUND_FLOW,
+        help=f'The flow whose predictions toggle ECN as "<local address:port> <peer address:port>" (default: "{utils.FOREGROUND_FLOW}")',
+    )
+
+    return parser
+
+
+def set_ecn(enabled: bool) -> None:
+    """Enable or disable ECN by adding or removing the iptables rule that sets the ECN bits of the tcp packets.
+
+    Args:
+        enabled: Whether ECN should be enabled.
+    """
+    # Clear previous rules.
+    subprocess.run(("iptables", "-t", "mangle", "-F", "OUTPUT"))
+    action = "-A" if enabled else "-D"
+    subprocess.run(("iptables", "-t", "mangle", action, *ECN_RULE))
+
+
+def actuate(socket_path: str, flow: str = utils.FOREGROUND_FLOW) -> None:
+    """Receive the predictions on the given Unix socket and toggle ECN whenever the prediction changes.
+
+    This replaces polling the prediction file in toggle_ecn, so ECN is toggled as soon as a prediction
+    is made. Like toggle_ecn, this runs until it is stopped.
+
+    Args:
+        socket_path: The path to the Unix socket that the prediction module sends the predictions to.
+        flow: The flow whose predictions toggle ECN.
+    """
+    previous = None
+
+    def on_message(message: dict) -> None:
+        nonlocal previous
+        if message["type"] != "prediction" or message["flow"] != flow:
+            return
+
+        if message["prediction"] != previous:
+            set_ecn(message["prediction"])
+            previous = message["prediction"]
+
+    ss_stream.serve(socket_path, on_message, timeout=None)
+
+
+def poll(input_file_path: str, delay: int) -> None:
+    """Poll the output file of the prediction module and toggle ECN whenever the prediction changes.
+
+    This is toggle_ecn in bash_functions.sh for traced runs, in which the prediction module writes the trace id
+    after each prediction, see predict.write_prediction. The time each new prediction is seen is recorded,
+    see stage_trace. Like toggle_ecn, this runs until it is stopped.
+
+    Args:
+        input_file_path: The path to the output file of the prediction module.
+        delay: The round-trip time delay in ms, a third of which is the interval between the polls.
+    """
+    tracer = stage_trace.create_tracer(os.path.dirname(input_file_path), "toggle_ecn")
+    interval = delay / 3 / 1000
+    previous = None
+    previous_trace_id = None
+
+    try:
+        while True:
+            try:
+                with open(input_file_path) as input_file:
+                    fields = input_file.read().split()
+            except FileNotFoundError:
+                fields = []
+
+            prediction = fields[0] if fields else ""
+            if prediction != previous:
+                if prediction in ("0", "1"):
+                    set_ecn(prediction == "1")
+                previous = prediction
+
+            trace_id = fields[1] if len(fields) > 1 else None
+            if trace_id != previous_trace_id:
+                stage_trace.record(tracer, trace_id, stage_trace.TOGGLE_ECN)
+                previous_trace_id = trace_id
+
+            time.sleep(interval)
+    finally:
+        stage_trace.close_tracer(tracer)
+
+
+def main():
+    parser = init_argparse()
+    args = parser.parse_args()
+
+    if args.socket_path is not None:
+        actuate(args.socket_path, args.flow)
+    else:
+        poll(args.input_file, args.delay)
+
+
+if __name__ == "__main__":
+    main()
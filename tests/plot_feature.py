@@ -1,5 +1,7 @@
 import utils.util as utils
 import utils.types as types
+import utils.ss_parser as ss_parser
+import numpy as np
 
 from argparse import ArgumentParser
 from pathlib import Path
@@ -12,7 +14,7 @@ def init_argparse() -> ArgumentParser:
         The initialized argument parser.
     """
     parser = ArgumentParser(
-        usage="python %(prog)s -i <input_file> -f <feature> -d <duration>",
+        usage="python %(prog)s -i <input_file> -f <feature> -d <duration> [--start <start>] [--end <end>]",
         description="Plot a given feature vs. the timestamps.",
     )
     parser.add_argument(
@@ -39,24 +41,58 @@ def init_argparse() -> ArgumentParser:
         required=True,
         help="Duration that the measurement was running for in seconds",
     )
+    parser.add_argument(
+        "--start",
+        metavar="START",
+        type=float,
+        help="Start of the time window that should be plotted in seconds (default: the start of the measurement)",
+    )
+    parser.add_argument(
+        "--end",
+        metavar="END",
+        type=float,
+        help="End of the time window that should be plotted in seconds (default: the end of the measurement)",
+    )
+    parser.add_argument(
+        "--flow",
+        metavar="FLOW",
+        type=str,
+        default=utils.FOREGROUND_FLOW,
+        help=f'The flow that should be plotted as "<local address:port> <peer address:port>" (default: "{utils.FOREGROUND_FLOW}")',
+    )
 
     return parser
 
 
-def plot_feature(input_file: Path, feature: types.Feature, duration: int) -> None:
+def plot_feature(
+    input_file: Path,
+    feature: types.Feature,
+    duration: int,
+    start: float = None,
+    end: float = None,
+    flow: str = None,
+) -> None:
     """Plot the given feature vs. the timestamps.
 
     Args:
         input_file: Path to the input file that contains the ss data.
         feature: The feature that should be plotted.
         duration: Duration that the measurement was running for in seconds.
+        start: Start of the time window that should be plotted in seconds.
+        end: End of the time window that should be plotted in seconds.
+        flow: The flow that should be plotted (default: all flows).
     """
-    ss_outputs = utils.read_ss(input_file)
-    ss_interval = utils.calculate_ss_interval(duration, len(ss_outputs))
+    parsed_ss, ss_interval, first_ss_output = utils.read_parsed_ss_window(
+        input_file, duration, start, end, flow
+    )
 
-    feature_values = utils.get_feature_values(ss_outputs, feature)
+    column = parsed_ss["columns"][ss_parser.FEATURE_FIELDS[feature]]
 
-    timestamps = [i * ss_interval for i in range(len(feature_values))]
+    # Keep the timestamps of the ss outputs that contained the feature aligned with their values.
+    timestamps = (
+        first_ss_output + np.arange(len(column))[~np.ma.getmaskarray(column)]
+    ) * ss_interval
+    feature_values = column.compressed()
 
     output_path = input_file.parent
 
@@ -73,7 +109,9 @@ def main():
     parser = init_argparse()
     args = parser.parse_args()
 
-    plot_feature(args.input_file, args.feature, args.duration)
+    plot_feature(
+        args.input_file, args.feature, args.duration, args.start, args.end, args.flow
+    )
 
 
 if __name__ == "__main__":
@@ -1,6 +1,10 @@
 import xgboost as xgb
+import numpy as np
 import pandas as pd
 import utils.util as utils
+import utils.ss_ring as ss_ring
+import utils.ss_stream as ss_stream
+import utils.stage_trace as stage_trace
 import sys
 import time
 
@@ -11,6 +15,8 @@ from argparse import BooleanOptionalAction
 
 output_path = ""
 timestamp_mode = False
+output_sender = None
+tracer = None
 
 
 class EventHandler(FileSystemEventHandler):
@@ -62,6 +68,7 @@ class EventHandler(FileSystemEventHandler):
             event (FileSystemEvent): Event representing filesystem change.
         """
         self.timeout = time.time() + 5
+        event_time = time.monotonic_ns()
 
         if event.is_directory:
             return
@@ -73,16 +80,7 @@ class EventHandler(FileSystemEventHandler):
             print("Not the relevant output file.")
             return
 
-        input = load_dataframe(self.file_path)
-        if input is None:
-            return
-
-        prediction = predict(self.classifier, input, self.classification_threshold)
-        if output_path != "" and timestamp_mode:
-            timestamp = time.time() - self.time_started
-            utils.append_to_file(output_path, f"{timestamp}: {int(prediction)}\n")
-        elif output_path != "":
-            utils.write_to_file(output_path, str(int(prediction)))
+        self.predict_input_data(event_time)
 
     def on_created(self, event):
         """Handles the file or directory creation event.
@@ -95,6 +93,7 @@ class EventHandler(FileSystemEventHandler):
             event (FileSystemEvent): Event representing filesystem change.
         """
         self.timeout = time.time() + 5
+        event_time = time.monotonic_ns()
 
         if event.is_directory:
             return
@@ -107,16 +106,30 @@ class EventHandler(FileSystemEventHandler):
             print("Not the relevant output file.")
             return
 
+        self.predict_input_data(event_time)
+
+    def predict_input_data(self, event_time: int) -> None:
+        """Load the input data and perform a prediction, which is handed over to the ECN toggle.
+
+        If the input data carries a trace id, it is removed before the prediction and the stage boundaries
+        are recorded for it, see stage_trace.
+
+        Args:
+            event_time: The time of the event in ns from time.monotonic_ns.
+        """
         input = load_dataframe(self.file_path)
         if input is None:
             return
 
+        trace_id = None
+        if stage_trace.TRACE_COLUMN in input.columns:
+            trace_ids = input.pop(stage_trace.TRACE_COLUMN)
+            trace_id = trace_ids.iloc[0] if len(trace_ids) > 0 else None
+        stage_trace.record(tracer, trace_id, stage_trace.PREDICT_EVENT, event_time)
+
         prediction = predict(self.classifier, input, self.classification_threshold)
-        if output_path != "" and timestamp_mode:
-            timestamp = time.time() - self.time_started
-            utils.append_to_file(output_path, f"{timestamp}: {int(prediction)}\n")
-        elif output_path != "":
-            utils.write_to_file(output_path, str(int(prediction)))
+        stage_trace.record(tracer, trace_id, stage_trace.PREDICT)
+        handle_prediction(prediction, self.time_started, trace_id=trace_id)
 
     def on_moved(self, event):
         """Handles the file or directory movement event.
@@ -143,7 +156,7 @@ def init_argparse() -> ArgumentParser:
     """
     parser = ArgumentParser(
         description="Predict packet loss using the chosen classifier",
-        usage="python %(prog)s -c <classifier> -d <directory_path> -i <input_file> -o <output_file> -t <classification_threshold>",
+        usage="python %(prog)s -c <classifier> (-d <directory_path> -i <input_file> | --ring <ring> | --socket <socket_path>) [-o <output_file>] [--socket_output <socket_path>] -t <classification_threshold>",
     )
 
     parser.add_argument(
@@ -159,7 +172,9 @@ def init_argparse() -> ArgumentParser:
         "--directory_path",
         metavar="DIRECTORY_PATH",
         type=str,
-        required="--time" not in sys.argv,
+        required="--time" not in sys.argv
+        and "--ring" not in sys.argv
+        and "--socket" not in sys.argv,
         help="Path to the directory that should be watched for changes",
     )
     parser.add_argument(
@@ -167,9 +182,23 @@ def init_argparse() -> ArgumentParser:
         "--input_file",
         metavar="INPUT_FILE",
         type=str,
-        required="--time" not in sys.argv,
+        required="--time" not in sys.argv
+        and "--ring" not in sys.argv
+        and "--socket" not in sys.argv,
         help="Path to the csv file that contains the input data",
     )
+    parser.add_argument(
+        "--ring",
+        metavar="RING",
+        type=str,
+        help="Name of the shared memory ring of the data persistence module to read the features from, instead of watching the directory",
+    )
+    parser.add_argument(
+        "--socket",
+        metavar="SOCKET_PATH",
+        type=str,
+        help="Path to the Unix socket to receive the features from the data persistence module on, instead of watching the directory",
+    )
     parser.add_argument(
         "-o",
         "--output_file",
@@ -177,6 +206,12 @@ def init_argparse() -> ArgumentParser:
         type=str,
         help="Path to the file that should contain the output data",
     )
+    parser.add_argument(
+        "--socket_output",
+        metavar="SOCKET_OUTPUT",
+        type=str,
+        help="Path to the Unix socket of the ECN actuator to send the predictions to, see ecn_actuator.py",
+    )
     parser.add_argument(
         "-t",
         "--threshold",
@@ -242,6 +277,73 @@ def observe(
         observer.join()
 
 
+def consume(
+    ring_name: str, classifier_path: str, classification_threshold: float = None
+) -> None:
+    """Read the features from the ring of the data persistence module and perform a prediction for each of them.
+
+    The features are handed over in shared memory, so no csv file is written and watched for them.
+    Like the observer, this stops once no features have been pushed for 5 seconds.
+
+    Args:
+        ring_name: The name of the ring of the data persistence module, whose columns are the ones the classifier was trained on.
+        classifier_path: The path to the saved classifier to use for the prediction.
+        classification_threshold: The optional classification threshold to use for the prediction.
+    """
+    classifier = load_classifier(classifier_path)
+    ring = ss_ring.attach_ring(ring_name, timeout=5)
+    reader = ss_ring.create_reader(ring)
+    time_started = time.time()
+    timeout = time.time() + 5
+
+    print("Prediction module started. Waiting for features...\n\n")
+
+    try:
+        while time.time() < timeout:
+            for _, features in ss_ring.wait_for_records(reader, 1):
+                timeout = time.time() + 5
+                prediction = predict_features(
+                    classifier, features.astype(np.float32), classification_threshold
+                )
+                handle_prediction(prediction, time_started)
+    finally:
+        if reader["overruns"] > 0:
+            overruns = reader["overruns"]
+            print(f"{overruns} features were overwritten before they were read.")
+        ss_ring.close_ring(ring)
+
+
+def receive(
+    socket_path: str, classifier_path: str, classification_threshold: float = None
+) -> None:
+    """Receive the features from the data persistence module on a Unix socket and perform a prediction for each of them.
+
+    The features are streamed as feature vectors, so no csv file is written and watched for them.
+    The prediction is made for the flow of each feature vector. Like the observer, this stops once
+    no features have been received for 5 seconds.
+
+    Args:
+        socket_path: The path to the Unix socket, whose columns are the ones the classifier was trained on.
+        classifier_path: The path to the saved classifier to use for the prediction.
+        classification_threshold: The optional classification threshold to use for the prediction.
+    """
+    classifier = load_classifier(classifier_path)
+    time_started = time.time()
+
+    def on_message(message: dict) -> None:
+        if message["type"] != "features":
+            return
+
+        prediction = predict_features(
+            classifier, message["values"].astype(np.float32), classification_threshold
+        )
+        handle_prediction(prediction, time_started, message["flow"])
+
+    print("Prediction module started. Waiting for features...\n\n")
+
+    ss_stream.serve(socket_path, on_message, timeout=5)
+
+
 def load_dataframe(input_path: str) -> pd.DataFrame | None:
     """Load the input data as a pandas dataframe.
 
@@ -252,7 +354,7 @@ def load_dataframe(input_path: str) -> pd.DataFrame | None:
         The loaded data as a pandas dataframe or None if an error occurred.
     """
     try:
-        return pd.read_csv(input_path)
+        return pd.read_csv(input_path, dtype={stage_trace.TRACE_COLUMN: str})
     except Exception as e:
         print(f"Error loading input data: {e}")
         return None
@@ -306,6 +408,82 @@ def predict(
     return prediction >= classification_threshold
 
 
+def predict_features(
+    classifier: xgb.XGBClassifier,
+    features: np.ndarray,
+    classification_threshold: float = None,
+) -> bool:
+    """Predict the result for a single feature vector with an optional classification threshold.
+
+    The booster is called in place on the NumPy array, so no dataframe or DMatrix has to be built per prediction.
+    The result is the same as that of predict for a dataframe with the same row.
+
+    Args:
+        classifier: The classifier to use for the prediction.
+        features: The features in the order of the columns the classifier was trained on, see prepare_data.get_input_columns.
+        classification_threshold: The optional classification threshold to use for the prediction.
+
+    Returns:
+        The result of the prediction.
+    """
+    probability = classifier.get_booster().inplace_predict(
+        features.reshape(1, -1), validate_features=False
+    )[0]
+
+    # XGBClassifier.predict predicts a loss if the probability is greater than 0.5.
+    if classification_threshold is None:
+        return bool(probability > 0.5)
+
+    return bool(probability >= classification_threshold)
+
+
+def write_prediction(
+    output_path: str,
+    prediction: bool,
+    timestamp: float | None = None,
+    trace_id: str | None = None,
+) -> None:
+    """Write the given prediction to the output file, which toggle_ecn in bash_functions.sh reads.
+
+    Args:
+        output_path: The path to the output file.
+        prediction: The result of the prediction.
+        timestamp: The time since the module started if the prediction should be appended along
+            with it (timestamp mode), or None if the prediction should replace the previous one.
+        trace_id: The trace id of the prediction, which follows the prediction when it replaces the
+            previous one, so the ECN actuator can record when it was applied, see ecn_actuator.py.
+    """
+    if timestamp is not None:
+        utils.append_to_file(output_path, f"{timestamp}: {int(prediction)}\n")
+    elif trace_id is not None:
+        utils.write_to_file(output_path, f"{int(prediction)} {trace_id}")
+    else:
+        utils.write_to_file(output_path, str(int(prediction)))
+
+
+def handle_prediction(
+    prediction: bool,
+    time_started: float,
+    flow: str = utils.FOREGROUND_FLOW,
+    trace_id: str | None = None,
+) -> None:
+    """Hand the given prediction over to the ECN toggle, i.e. write it to the output file and/or send it to the output socket.
+
+    Args:
+        prediction: The result of the prediction.
+        time_started: The time the module started at, which the timestamps are relative to.
+        flow: The flow that the prediction was made for.
+        trace_id: The trace id of the input data of the prediction, or None if it is not traced.
+    """
+    if output_path != "":
+        timestamp = time.time() - time_started if timestamp_mode else None
+        write_prediction(output_path, prediction, timestamp, trace_id)
+        stage_trace.record(tracer, trace_id, stage_trace.WRITE_PREDICTION)
+
+    if output_sender is not None:
+        ss_stream.send(output_sender, ss_stream.encode_prediction(flow, prediction))
+
+
 def predict_test(classifier_path: str) -> None:
     """Perform a test prediction using the given classifier and example input data.
 
@@ -330,22 +508,40 @@ def main():
     if args.timestamp_mode:
         timestamp_mode = True
 
-    if args.time:
-        utils.time_execution(
-            lambda: predict_test(args.classifier_path),
-            "predict_test",
-            num_executions=10000,
-        )
-    else:
-        if args.threshold:
-            observe(
-                args.directory_path,
-                args.input_file,
-                args.classifier_path,
-                args.threshold,
+    # The ECN actuator is started with the network, so the socket is only connected to once there is a prediction.
+    global output_sender
+    if args.socket_output:
+        output_sender = ss_stream.create_sender(args.socket_output, timeout=None)
+
+    global tracer
+    if args.directory_path is not None:
+        tracer = stage_trace.create_tracer(args.directory_path, "predict")
+
+    try:
+        if args.time:
+            utils.time_execution(
+                lambda: predict_test(args.classifier_path),
+                "predict_test",
+                num_executions=10000,
             )
+        elif args.ring is not None:
+            consume(args.ring, args.classifier_path, args.threshold)
+        elif args.socket is not None:
+            receive(args.socket, args.classifier_path, args.threshold)
         else:
-            observe(args.directory_path, args.input_file, args.classifier_path)
+            if args.threshold:
+                observe(
+                    args.directory_path,
+                    args.input_file,
+                    args.classifier_path,
+                    args.threshold,
+                )
+            else:
+                observe(args.directory_path, args.input_file, args.classifier_path)
+    finally:
+        if output_sender is not None:
+            ss_stream.close_sender(output_sender)
+        stage_trace.close_tracer(tracer)
 
 
 if __name__ == "__main__":
@@ -1,4 +1,11 @@
 import utils.util as utils
+import utils.ss_parser as ss_parser
+import utils.ss_features as ss_features
+import utils.ss_sample as ss_sample
+import utils.ss_ring as ss_ring
+import utils.ss_stream as ss_stream
+import utils.stage_trace as stage_trace
+import numpy as np
 import time
 import sys
 
@@ -8,6 +15,7 @@ from argparse import ArgumentParser
 from argparse import BooleanOptionalAction
 
 timestamps = False
+tracer = None
 
 
 class EventHandler(FileSystemEventHandler):
@@ -20,10 +28,22 @@ class EventHandler(FileSystemEventHandler):
     Attributes:
         dir_path: The directory path that should be watched.
         file_path: Path to the file that should contain the input data.
+        flow: The flow that the classifier makes predictions for.
+        flows: The state of the features of each of the flows in the ss output, keyed by flow.
+        output_ring: The shared memory ring that the features are pushed to instead of writing the csv, see ss_ring.
+        output_sender: The sender of the Unix socket that the features are sent to instead of writing the csv, see ss_stream.
     """
 
     def __init__(
-        self, dir_path: str, file_path: str, output_path: str, *args, **kwargs
+        self,
+        dir_path: str,
+        file_path: str,
+        output_path: str,
+        flow: str = utils.FOREGROUND_FLOW,
+        output_ring: dict | None = None,
+        output_sender: dict | None = None,
+        *args,
+        **kwargs,
     ):
         """Initializes the EventHandler with a specific file path.
 
@@ -31,6 +51,9 @@ class EventHandler(FileSystemEventHandler):
             dir_path: The directory path that should be watched.
             file_path: Path to the file that should be loaded and parsed.
             output_path: Path to where the output should be saved.
+            flow: The flow that the classifier makes predictions for.
+            output_ring: The ring that the features are pushed to instead of writing the csv.
+            output_sender: The sender that the features are sent to instead of writing the csv.
             *args: Variable length argument list.
             **kwargs: Arbitrary keyword arguments.
         """
@@ -38,17 +61,13 @@ class EventHandler(FileSystemEventHandler):
         self.dir_path = dir_path
         self.file_path = file_path
         self.output_path = output_path
+        self.flow = flow
         self.timeout = time.time() + 5
-        self.timestamp = 0
         self.time_started = 0
-        self.min_rtt = 0
-        self.max_rtt = 0
-        self.min_cwnd = 0
-        self.max_cwnd = 0
-        self.min_ssthresh = 0
-        self.max_ssthresh = 0
-        self.prev_data_segs_out = 0
-        self.prev_cwnd = 0
+        self.flows = {}
+        self.output_ring = output_ring
+        self.output_sender = output_sender
+        self.trace_id = None
 
     def on_modified(self, event):
         """Handles the file or directory modification event.
@@ -57,6 +76,7 @@ class EventHandler(FileSystemEventHandler):
             event (FileSystemEvent): Event representing filesystem change.
         """
         self.timeout = time.time() + 5
+        event_time = time.monotonic_ns()
 
         if event.is_directory:
             return
@@ -70,6 +90,9 @@ class EventHandler(FileSystemEventHandler):
 
         self.debug_prints()
         input_data_created = self.prepare_input_data()
+        stage_trace.record(
+            tracer, self.trace_id, stage_trace.PREPARE_EVENT, event_time
+        )
         print("input data created:", input_data_created)
         self.debug_prints()
 
@@ -80,6 +103,7 @@ class EventHandler(FileSystemEventHandler):
             event (FileSystemEvent): Event representing filesystem change.
         """
         self.timeout = time.time() + 5
+        event_time = time.monotonic_ns()
 
         if event.is_directory:
             return
@@ -93,6 +117,9 @@ class EventHandler(FileSystemEventHandler):
             return
 
         input_data_created = self.prepare_input_data()
+        stage_trace.record(
+            tracer, self.trace_id, stage_trace.PREPARE_EVENT, event_time
+        )
         print("input data created:", input_data_created)
 
     def on_moved(self, event):
@@ -111,140 +138,192 @@ class EventHandler(FileSystemEventHandler):
         """
         # Not relevant.
 
-    def parse_packet(self, packet: str) -> dict | None:
+    def parse_packet(self, packet: str, state: dict) -> ss_sample.SsSample | None:
         """Parse the given packet.
 
         Args:
             packet: The packet that should be parsed.
+            state: The state of the features of the flow that the packet belongs to,
+                as returned by ss_features.create_state, which is updated.
+
+        Returns:
+            A sample containing the relevant ss fields of the parsed packet
+            and the features derived from them.
+        """
+        record = ss_parser.parse_record(packet, ss_ring.MEASUREMENT_COLUMNS)
+        capture_time = record.pop(ss_parser.CAPTURE_TIME)
+        return self.parse_record(record, state, capture_time)
+
+    def parse_record(
+        self, record: dict, state: dict, capture_time: float | None = None
+    ) -> ss_sample.SsSample | None:
+        """Create the sample of the given parsed measurement.
+
+        Args:
+            record: The measurement, parsed by ss_parser.parse_record or decoded by sock_diag.decode_record.
+            state: The state of the features of the flow that the measurement belongs to,
+                as returned by ss_features.create_state, which is updated.
+            capture_time: The time the measurement was captured at in ms, if it was stamped with one.
 
         Returns:
-            A dictionary containing the parsed packet with the relevant
-            ss fields as keys and their formatted values as values.
+            A sample containing the relevant ss fields of the measurement
+            and the features derived from them.
         """
         if self.time_started == 0:
             self.time_started = time.time()
 
         # Only parse rtt and rtt var from the initial slow start phase.
         if time.time() - self.time_started < 1:  # TODO: Keep this in mind
-            rtt_and_rtt_var, rtt_and_rtt_var_added = utils.add_rtt_and_rtt_variance(
-                {}, packet
-            )
-            if rtt_and_rtt_var_added:
-                rtt = rtt_and_rtt_var[0]
-                self.min_rtt, self.max_rtt = utils.add_min_and_max_rtt(
-                    {}, rtt, self.min_rtt, self.max_rtt
-                )
+            if record["rtt"] is not None:
+                ss_features.add_rtt(state, record["rtt"])
             return None
 
-        parsed_packet = {}
-
-        _, timer_info_added = utils.add_timer_info(parsed_packet, packet)
+        parsed_packet = ss_features.create_features(state, record, capture_time)
+        if record["timer_name"] is not None:
+            parsed_packet.timer_name = 1 if record["timer_name"] == "on" else 0
 
-        _, rto_added = utils.add_rto(parsed_packet, packet)
-
-        rtt_and_rtt_var, rtt_and_rtt_var_added = utils.add_rtt_and_rtt_variance(
-            parsed_packet, packet
-        )
+        if not ss_parser.record_complete(record):
+            return None
 
-        cwnd, cwnd_added = utils.add_cwnd(parsed_packet, packet)
+        return parsed_packet
 
-        ssthresh, ssthresh_added = utils.add_ssthresh(parsed_packet, packet)
+    def create_sample(self, flow: str, packet: str) -> ss_sample.SsSample | None:
+        """Parse the given packet of the given flow into a sample.
 
-        data_segs_out, data_segs_out_added = utils.add_data_segs_out(
-            parsed_packet, packet
-        )
+        Args:
+            flow: The flow that the packet belongs to.
+            packet: The packet that should be parsed.
 
-        _, last_send_added = utils.add_lastsnd(parsed_packet, packet)
+        Returns:
+            The sample of the packet, or None if it could not be parsed, see parse_packet.
+        """
+        state = self.flows.setdefault(flow, ss_features.create_state())
+        return self.parse_packet(packet, state)
 
-        _, pacing_rate_added = utils.add_pacing_rate(parsed_packet, packet)
+    def create_input_samples(self) -> list | None:
+        """Load and parse the ss output of each flow into the samples for the classifier.
 
-        if timestamps:
-            parsed_packet["timestamp"] = self.timestamp
-        self.timestamp += 20
+        If tracing is enabled, the trace id of the poll is kept for the input data, see stage_trace.
 
-        if rtt_and_rtt_var_added:
-            self.min_rtt, self.max_rtt = utils.add_min_and_max_rtt(
-                parsed_packet, rtt_and_rtt_var[0], self.min_rtt, self.max_rtt
-            )
+        Returns:
+            The samples of the flows that could be parsed, starting with the flow that the classifier
+            makes predictions for, or None if the ss output was not valid or that flow could not be parsed.
+        """
+        packets = utils.read_ss_poll(self.file_path)
+        if tracer is not None:
+            self.trace_id = stage_trace.find_trace_id(packets.get(self.flow, ""))
 
-        cwnd_diff_added = False
-        if cwnd_added:
-            _, cwnd_diff_added = utils.add_cwnd_diff_simple(
-                parsed_packet, self.prev_cwnd
-            )
+        if not packets:
+            print("ss output file not valid.")
+            return None
 
-        if cwnd_added:
-            self.prev_cwnd = parsed_packet["cwnd"]
-            self.min_cwnd, self.max_cwnd = utils.add_min_and_max_cwnd(
-                parsed_packet, cwnd, self.min_cwnd, self.max_cwnd
-            )
+        samples = {}
+        for flow, packet in packets.items():
+            sample = self.create_sample(flow, packet)
+            if sample is not None:
+                samples[flow] = sample
 
-        if ssthresh_added:
-            self.min_ssthresh, self.max_ssthresh = utils.add_min_and_max_ssthresh(
-                parsed_packet, ssthresh, self.min_ssthresh, self.max_ssthresh
+        if self.flow not in samples:
+            print(
+                "Error parsing packet. This could be due to missing ss fields"
+                + " or because the threshold has not been reached yet."
             )
-
-        if data_segs_out_added:
-            data_segs_out_diff = data_segs_out - self.prev_data_segs_out
-            self.prev_data_segs_out = data_segs_out
-            parsed_packet["data_segments_sent"] = data_segs_out_diff
-
-        if utils.field_missing(
-            timer_info_added,
-            rto_added,
-            rtt_and_rtt_var_added,
-            cwnd_added,
-            ssthresh_added,
-            data_segs_out_added,
-            last_send_added,
-            pacing_rate_added,
-            cwnd_diff_added,
-        ):
             return None
 
-        return parsed_packet
+        return [samples.pop(self.flow), *samples.values()]
 
     def prepare_input_data(self) -> bool:
-        """Load and parse ss output, and create csv for the classifier.
+        """Load and parse the ss output of each flow, and create csv for the classifier.
+
+        The csv has a row for each of the flows that could be parsed. The row of the
+        flow that the classifier makes predictions for is always the first one.
 
         Returns:
             True if the input data was successfully prepared, False otherwise.
         """
-        packet = utils.read_ss_single_output(self.file_path)
-        if packet == "":
-            print("ss output file not valid.")
+        samples = self.create_input_samples()
+        if samples is None:
             return False
 
-        packet_dict = self.parse_packet(packet)
-        if packet_dict is None:
-            print(
-                "Error parsing packet. This could be due to missing ss fields"
-                + " or because the threshold has not been reached yet."
-            )
+        self.write_input_data(samples)
+        stage_trace.record(tracer, self.trace_id, stage_trace.CREATE_CSV)
+
+        return True
+
+    def prepare_measurement_data(self, values: np.ndarray, columns: tuple) -> bool:
+        """Parse a measurement of the flow that was read from the ring or socket of a collector, and prepare input data.
+
+        Args:
+            values: The values of the record of the measurement, see ss_ring.encode_measurement.
+            columns: The columns of the record, i.e. the columns of the ring or connection.
+
+        Returns:
+            True if the input data was successfully prepared, False otherwise.
+        """
+        record = ss_ring.decode_record(values, columns)
+        capture_time = record.pop(ss_parser.CAPTURE_TIME, None)
+        state = self.flows.setdefault(self.flow, ss_features.create_state())
+        sample = self.parse_record(record, state, capture_time)
+        if sample is None:
             return False
 
-        utils.create_csv(packet_dict, self.output_path)
+        self.write_input_data([sample])
 
         return True
 
+    def write_input_data(self, samples: list) -> None:
+        """Write the input data of the classifier.
+
+        Either all of the samples are written to the csv, or the features of the first sample,
+        i.e. the one of the flow that the classifier makes predictions for, are pushed to the output ring
+        and/or sent to the output socket.
+
+        Args:
+            samples: The samples, starting with the one of the flow that the classifier makes predictions for.
+        """
+        if self.output_ring is None and self.output_sender is None:
+            utils.create_csv_rows(
+                samples, get_input_columns(), self.output_path, trace_id=self.trace_id
+            )
+            return
+
+        if self.output_ring is not None:
+            columns = self.output_ring["columns"]
+            features = {column: getattr(samples[0], column) for column in columns}
+            ss_ring.push(self.output_ring, ss_ring.encode_record(features, columns))
+
+        if self.output_sender is not None:
+            columns = self.output_sender["columns"]
+            features = {column: getattr(samples[0], column) for column in columns}
+            values = ss_ring.encode_record(features, columns)
+            frame = ss_stream.encode_record(ss_stream.FEATURES, self.flow, values)
+            ss_stream.send(self.output_sender, frame)
+
     def debug_prints(self) -> None:
         """Prints the current values of the instance variables."""
         print("\n\n---DEBUG PRINTS---")
         print(f"dir_path: {self.dir_path}")
         print(f"file_path: {self.file_path}")
-        print(f"timestamp: {self.timestamp}")
+        print(f"flow: {self.flow}")
         print(f"time_started: {self.time_started}")
-        print(f"min_rtt: {self.min_rtt}")
-        print(f"max_rtt: {self.max_rtt}")
-        print(f"min_cwnd: {self.min_cwnd}")
-        print(f"max_cwnd: {self.max_cwnd}")
-        print(f"min_ssthresh: {self.min_ssthresh}")
-        print(f"max_ssthresh: {self.max_ssthresh}")
-        print(f"prev_data_segs_out: {self.prev_data_segs_out}")
-        print(f"prev_cwnd: {self.prev_cwnd}")
+        for flow, state in self.flows.items():
+            print(f"{flow}: {state}")
         print("\n\n---END DEBUG PRINTS---")
 
 
+def get_input_columns() -> tuple:
+    """Get the columns of the input data of the classifier.
+
+    Returns:
+        The columns of the samples, see ss_sample.get_columns. The timestamp is only included with --timestamps.
+    """
+    columns = ss_sample.get_columns()
+    if not timestamps:
+        columns = tuple(column for column in columns if column != "timestamp")
+
+    return columns
+
+
 def init_argparse() -> ArgumentParser:
     """Initialize the argument parser.
 
@@ -252,7 +331,7 @@ def init_argparse() -> ArgumentParser:
         The initialized argument parser.
     """
     parser = ArgumentParser(
-        usage="python %(prog)s -d <directory_path> -i <input_file>",
+        usage="python %(prog)s (-d <directory_path> -i <input_file> | --ring_input <ring> | --socket_input <socket_path>) (-o <output_path> | --ring_output <ring> | --socket_output <socket_path>)",
         description="Watch for changes to a given directory and prepare input data for classifier",
     )
 
@@ -261,7 +340,9 @@ def init_argparse() -> ArgumentParser:
         "--directory_path",
         metavar="DIRECTORY_PATH",
         type=str,
-        required="--time" not in sys.argv,
+        required="--time" not in sys.argv
+        and "--ring_input" not in sys.argv
+        and "--socket_input" not in sys.argv,
         help="Path to the directory that should be watched for changes",
     )
     parser.add_argument(
@@ -269,7 +350,9 @@ def init_argparse() -> ArgumentParser:
         "--input_file",
         metavar="INPUT_FILE",
         type=str,
-        required="--time" not in sys.argv,
+        required="--time" not in sys.argv
+        and "--ring_input" not in sys.argv
+        and "--socket_input" not in sys.argv,
         help="Path to the text file that should be loaded and parsed",
     )
     parser.add_argument(
@@ -277,9 +360,43 @@ def init_argparse() -> ArgumentParser:
         "--output_path",
         metavar="OUTPUT_PATH",
         type=str,
-        required="--time" not in sys.argv,
+        required="--time" not in sys.argv
+        and "--ring_output" not in sys.argv
+        and "--socket_output" not in sys.argv,
         help="Path to where the output should be saved",
     )
+    parser.add_argument(
+        "--ring_input",
+        metavar="RING_INPUT",
+        type=str,
+        help="Name of the shared memory ring of the collector to read the measurements of the flow from, instead of watching the directory",
+    )
+    parser.add_argument(
+        "--ring_output",
+        metavar="RING_OUTPUT",
+        type=str,
+        help="Name of the shared memory ring to push the features of the flow to for the prediction module, instead of writing the csv",
+    )
+    parser.add_argument(
+        "--socket_input",
+        metavar="SOCKET_INPUT",
+        type=str,
+        help="Path to the Unix socket to receive the measurements of the flow from the collector on, instead of watching the directory",
+    )
+    parser.add_argument(
+        "--socket_output",
+        metavar="SOCKET_OUTPUT",
+        type=str,
+        help="Path to the Unix socket of the prediction module to send the features of the flow to, instead of writing the csv",
+    )
+    parser.add_argument(
+        "-f",
+        "--flow",
+        metavar="FLOW",
+        type=str,
+        default=utils.FOREGROUND_FLOW,
+        help=f'The flow that the classifier makes predictions for as "<local address:port> <peer address:port>" (default: "{utils.FOREGROUND_FLOW}")',
+    )
     parser.add_argument(
         "--timestamps",
         metavar="TIMESTAMPS",
@@ -300,7 +417,14 @@ def init_argparse() -> ArgumentParser:
     return parser
 
 
-def observe(dir_path: str, file_path: str, output_path: str) -> None:
+def observe(
+    dir_path: str,
+    file_path: str,
+    output_path: str,
+    flow: str = utils.FOREGROUND_FLOW,
+    output_ring: dict | None = None,
+    output_sender: dict | None = None,
+) -> None:
     """Observe the directory with the given path for changes and prepare input data.
 
     Observes the directory with the given path for changes. If there is a change,
@@ -311,9 +435,14 @@ def observe(dir_path: str, file_path: str, output_path: str) -> None:
         dir_path: The directory path that should be watched.
         file_path: The path to the text file that should be loaded and parsed.
         output_path: Path to where the output should be saved.
+        flow: The flow that the classifier makes predictions for.
+        output_ring: The ring that the features are pushed to instead of writing the csv.
+        output_sender: The sender that the features are sent to instead of writing the csv.
     """
     observer = Observer()
-    event_handler = EventHandler(dir_path, file_path, output_path)
+    event_handler = EventHandler(
+        dir_path, file_path, output_path, flow, output_ring, output_sender
+    )
     observer.schedule(event_handler, path=dir_path)
     observer.start()
 
@@ -327,13 +456,89 @@ def observe(dir_path: str, file_path: str, output_path: str) -> None:
         observer.join()
 
 
+def consume(
+    ring_name: str,
+    output_path: str,
+    flow: str = utils.FOREGROUND_FLOW,
+    output_ring: dict | None = None,
+    output_sender: dict | None = None,
+) -> None:
+    """Read the measurements of the flow from the ring of a collector and prepare input data for each of them.
+
+    The measurements are handed over in shared memory, so no file is written and watched for them.
+    Like the observer, this stops once no measurement has been pushed for 5 seconds.
+
+    Args:
+        ring_name: The name of the ring of the collector, see ss_ring.push_measurement.
+        output_path: Path to where the output should be saved.
+        flow: The flow that the classifier makes predictions for, whose measurements the collector pushes.
+        output_ring: The ring that the features are pushed to instead of writing the csv.
+        output_sender: The sender that the features are sent to instead of writing the csv.
+    """
+    event_handler = EventHandler(
+        None, None, output_path, flow, output_ring, output_sender
+    )
+    ring = ss_ring.attach_ring(ring_name, timeout=5)
+    reader = ss_ring.create_reader(ring)
+
+    print("Data persistence module started. Waiting for measurements...\n\n")
+
+    try:
+        while time.time() < event_handler.timeout:
+            for _, values in ss_ring.wait_for_records(reader, 1):
+                event_handler.timeout = time.time() + 5
+                event_handler.prepare_measurement_data(values, ring["columns"])
+    finally:
+        if reader["overruns"] > 0:
+            overruns = reader["overruns"]
+            print(f"{overruns} measurements were overwritten before they were read.")
+        ss_ring.close_ring(ring)
+
+
+def receive(
+    socket_path: str,
+    output_path: str,
+    flow: str = utils.FOREGROUND_FLOW,
+    output_ring: dict | None = None,
+    output_sender: dict | None = None,
+) -> None:
+    """Receive the measurements of the flow from the collectors on a Unix socket and prepare input data for each of them.
+
+    The measurements are streamed as sample records, see ss_stream.send_measurement, so no file is written
+    and watched for them. Like the observer, this stops once no measurement has been received for 5 seconds.
+
+    Args:
+        socket_path: The path to the Unix socket that the collectors send the measurements to.
+        output_path: Path to where the output should be saved.
+        flow: The flow that the classifier makes predictions for, whose measurements are used.
+        output_ring: The ring that the features are pushed to instead of writing the csv.
+        output_sender: The sender that the features are sent to instead of writing the csv.
+    """
+    event_handler = EventHandler(
+        None, None, output_path, flow, output_ring, output_sender
+    )
+
+    def on_message(message: dict) -> None:
+        if message["type"] != "sample" or message["flow"] != flow:
+            return
+        if message["columns"] is None:
+            print("Received a measurement before the columns of the connection.")
+            return
+
+        event_handler.prepare_measurement_data(message["values"], message["columns"])
+
+    print("Data persistence module started. Waiting for measurements...\n\n")
+
+    ss_stream.serve(socket_path, on_message, timeout=5)
+
+
 def prepare_input_data_test(input_path: str) -> None:
     """Load and parse example ss output, and create example csv for the classifier.
 
     Args:
         input_path: The path to the text file containing the ss data.
     """
-    packet = utils.read_ss_single_output(input_path)
+    packet = utils.read_ss_poll(input_path).get(utils.FOREGROUND_FLOW, "")
     if packet == "":
         print("ss output file not valid.")
         return False
@@ -363,13 +568,60 @@ def main():
     if args.timestamps:
         timestamps = True
 
+    global tracer
+    if args.directory_path is not None:
+        tracer = stage_trace.create_tracer(args.directory_path, "prepare_data")
+
     if args.time:
         utils.time_execution(
             lambda: prepare_input_data_test("output/test/ss_output.txt"),
             "prepare_input_data_test",
         )
     else:
-        observe(args.directory_path, args.input_file, args.output_path)
+        output_ring = None
+        if args.ring_output is not None:
+            output_ring = ss_ring.create_ring(args.ring_output, get_input_columns())
+
+        # The prediction module may still be loading the classifier, so the socket is only connected to
+        # once there are features. Until it listens, the features are dropped like a stale csv would be.
+        output_sender = None
+        if args.socket_output is not None:
+            output_sender = ss_stream.create_sender(
+                args.socket_output, get_input_columns(), timeout=None
+            )
+
+        try:
+            if args.ring_input is not None:
+                consume(
+                    args.ring_input,
+                    args.output_path,
+                    args.flow,
+                    output_ring,
+                    output_sender,
+                )
+            elif args.socket_input is not None:
+                receive(
+                    args.socket_input,
+                    args.output_path,
+                    args.flow,
+                    output_ring,
+                    output_sender,
+                )
+            else:
+                observe(
+                    args.directory_path,
+                    args.input_file,
+                    args.output_path,
+                    args.flow,
+                    output_ring,
+                    output_sender,
+                )
+        finally:
+            if output_ring is not None:
+                ss_ring.close_ring(output_ring, unlink=True)
+            if output_sender is not None:
+                ss_stream.close_sender(output_sender)
+            stage_trace.close_tracer(tracer)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,368 @@
+import xgboost as xgb
+import numpy as np
+import utils.util as utils
+import utils.ss_features as ss_features
+import utils.ss_sample as ss_sample
+import utils.sock_diag as sock_diag
+import utils.fixed_rate as fixed_rate
+import prepare_data
+import predict
+import time
+import sys
+
+from watchdog.observers import Observer
+from argparse import ArgumentParser
+from argparse import BooleanOptionalAction
+
+
+class EventHandler(prepare_data.EventHandler):
+    """Event handler for the watchdog observer that turns each ss poll into a prediction in a single process.
+
+    The ss output is parsed into the sample of the flow that the classifier makes predictions for, which is
+    passed to the classifier as a feature vector in memory. Unlike the data persistence module (prepare_data.py)
+    and prediction module (predict.py), no csv file is written and read back between parsing and predicting,
+    and each ss poll only causes a single filesystem notification. Only the prediction is written.
+    Alternatively, the measurements of the flow are queried through netlink (see predict_socket),
+    which skips running ss and parsing its output altogether.
+
+    Attributes:
+        dir_path: The directory path that should be watched.
+        file_path: Path to the file that should contain the ss output.
+        output_path: Path to the file that the predictions are written to.
+        flow: The flow that the classifier makes predictions for.
+        flows: The state of the features of each of the flows in the ss output, keyed by flow.
+        classifier: The classifier to use for the prediction.
+        classification_threshold: The optional classification threshold to use for the prediction.
+        timestamp_mode: Whether or not the predictions are appended to the output file along with timestamps.
+    """
+
+    def __init__(
+        self,
+        dir_path: str,
+        file_path: str,
+        output_path: str,
+        classifier: xgb.XGBClassifier,
+        classification_threshold: float = None,
+        timestamp_mode: bool = False,
+        flow: str = utils.FOREGROUND_FLOW,
+        *args,
+        **kwargs,
+    ):
+        """Initializes the EventHandler with a specific file path.
+
+        Args:
+            dir_path: The directory path that should be watched.
+            file_path: Path to the file that should be loaded and parsed.
+            output_path: Path to the file that the predictions are written to.
+            classifier: The classifier to use for the prediction.
+            classification_threshold: The optional classification threshold to use for the prediction.
+            timestamp_mode: Whether or not the predictions are appended to the output file along with timestamps.
+            flow: The flow that the classifier makes predictions for.
+            *args: Variable length argument list.
+            **kwargs: Arbitrary keyword arguments.
+        """
+        super().__init__(dir_path, file_path, output_path, flow, *args, **kwargs)
+        self.classifier = classifier
+        self.classification_threshold = classification_threshold
+        self.timestamp_mode = timestamp_mode
+        self.time_created = time.time()
+        self.get_features = ss_sample.create_row_getter(
+            prepare_data.get_input_columns()
+        )
+
+    def on_modified(self, event):
+        """Handles the file or directory modification event.
+
+        Args:
+            event (FileSystemEvent): Event representing filesystem change.
+        """
+        self.timeout = time.time() + 5
+
+        if event.is_directory:
+            return
+
+        if utils.get_relative_path(event.src_path) == self.file_path:
+            self.predict()
+
+    def on_created(self, event):
+        """Handles the file or directory creation event.
+
+        Args:
+            event (FileSystemEvent): Event representing filesystem change.
+        """
+        self.on_modified(event)
+
+    def predict(self) -> bool:
+        """Load and parse the ss output of the flow, and predict whether or not a loss follows.
+
+        The ss output of the other flows is not parsed, since the classifier only makes predictions
+        for a single flow and the features of a flow do not depend on the other flows.
+
+        Returns:
+            True if a prediction was written, False if the ss output of the flow could not be parsed.
+        """
+        packet = utils.read_ss_poll(self.file_path).get(self.flow)
+        if packet is None:
+            return False
+
+        return self.predict_sample(self.create_sample(self.flow, packet))
+
+    def predict_socket(self, sock) -> bool:
+        """Query the tcp_info of the flow through netlink, and predict whether or not a loss follows.
+
+        The tcp_info is decoded directly into the measurement, so ss is not run and its output is not parsed.
+
+        Args:
+            sock: The netlink socket, see sock_diag.open_socket.
+
+        Returns:
+            True if a prediction was written, False if the socket of the flow was not found or its
+            measurement could not be parsed.
+        """
+        message = sock_diag.query_flow(sock, self.flow)
+        if message is None or message["info"] is None:
+            return False
+
+        self.timeout = time.time() + 5
+        state = self.flows.setdefault(self.flow, ss_features.create_state())
+        return self.predict_sample(
+            self.parse_record(sock_diag.decode_record(message), state)
+        )
+
+    def predict_sample(self, sample: ss_sample.SsSample | None) -> bool:
+        """Predict whether or not a loss follows the given sample of the flow, and write the prediction.
+
+        Args:
+            sample: The sample, or None if the measurement could not be parsed.
+
+        Returns:
+            True if a prediction was written, False if there was no sample.
+        """
+        if sample is None:
+            return False
+
+        features = np.array(self.get_features(sample), dtype=np.float32)
+        prediction = predict.predict_features(
+            self.classifier, features, self.classification_threshold
+        )
+
+        timestamp = time.time() - self.time_created if self.timestamp_mode else None
+        predict.write_prediction(self.output_path, prediction, timestamp)
+
+        return True
+
+
+def init_argparse() -> ArgumentParser:
+    """Initialize the argument parser.
+
+    Returns:
+        The initialized argument parser.
+    """
+    parser = ArgumentParser(
+        usage="python %(prog)s -c <classifier> (-d <directory_path> -i <input_file> | --netlink) -o <output_file> -t <classification_threshold>",
+        description="Watch for changes to the ss output and predict packet loss using the chosen classifier in a single process",
+    )
+
+    parser.add_argument(
+        "-c",
+        "--classifier_path",
+        metavar="CLASSIFIERPATH",
+        type=str,
+        required=True,
+        help="Path to the saved classifier to use for the prediction",
+    )
+    parser.add_argument(
+        "-d",
+        "--directory_path",
+        metavar="DIRECTORY_PATH",
+        type=str,
+        required="--netlink" not in sys.argv,
+        help="Path to the directory that should be watched for changes",
+    )
+    parser.add_argument(
+        "-i",
+        "--input_file",
+        metavar="INPUT_FILE",
+        type=str,
+        required="--netlink" not in sys.argv,
+        help="Path to the text file that contains the ss output",
+    )
+    parser.add_argument(
+        "-o",
+        "--output_file",
+        metavar="OUTPUT_FILE",
+        type=str,
+        required=True,
+        help="Path to the file that should contain the output data",
+    )
+    parser.add_argument(
+        "-t",
+        "--threshold",
+        metavar="THRESHOLD",
+        type=float,
+        help="Classification threshold to use for the prediction",
+    )
+    parser.add_argument(
+        "-f",
+        "--flow",
+        metavar="FLOW",
+        type=str,
+        default=utils.FOREGROUND_FLOW,
+        help=f'The flow that the classifier makes predictions for as "<local address:port> <peer address:port>" (default: "{utils.FOREGROUND_FLOW}")',
+    )
+    parser.add_argument(
+        "--netlink",
+        metavar="NETLINK",
+        type=bool,
+        action=BooleanOptionalAction,
+        default=False,
+        help="Query the tcp_info of the flow through netlink at a fixed interval instead of watching the ss output. "
+        "Has to run in the network namespace of the flow, e.g. on its Mininet host",
+    )
+    parser.add_argument(
+        "--interval",
+        metavar="INTERVAL",
+        type=float,
+        default=ss_features.TIMESTAMP_INTERVAL,
+        help=f"Interval between the netlink queries in ms (default: {ss_features.TIMESTAMP_INTERVAL})",
+    )
+    parser.add_argument(
+        "--timestamp_mode",
+        metavar="TIMESTAMP_MODE",
+        type=bool,
+        action=BooleanOptionalAction,
+        default=False,
+        help="If predictions should be appended to the output file along with timestamps",
+    )
+    parser.add_argument(
+        "--timestamps",
+        metavar="TIMESTAMPS",
+        type=bool,
+        action=BooleanOptionalAction,
+        default=False,
+        help="If the classifier was trained with timestamps",
+    )
+
+    return parser
+
+
+def observe(
+    dir_path: str,
+    file_path: str,
+    output_path: str,
+    classifier_path: str,
+    classification_threshold: float = None,
+    timestamp_mode: bool = False,
+    flow: str = utils.FOREGROUND_FLOW,
+) -> None:
+    """Observe the directory with the given path for changes and perform a prediction for each ss poll.
+
+    Args:
+        dir_path: The directory path that should be watched.
+        file_path: The path to the text file that contains the ss output.
+        output_path: Path to the file that the predictions are written to.
+        classifier_path: The path to the saved classifier to use for the prediction.
+        classification_threshold: The optional classification threshold to use for the prediction.
+        timestamp_mode: Whether or not the predictions are appended to the output file along with timestamps.
+        flow: The flow that the classifier makes predictions for.
+    """
+    classifier = predict.load_classifier(classifier_path)
+    event_handler = EventHandler(
+        dir_path,
+        file_path,
+        output_path,
+        classifier,
+        classification_threshold,
+        timestamp_mode,
+        flow,
+    )
+
+    observer = Observer()
+    observer.schedule(event_handler, path=dir_path)
+    observer.start()
+
+    print("Sense and predict module started. Waiting for changes...\n\n")
+
+    try:
+        while observer.is_alive() and time.time() < event_handler.timeout:
+            observer.join(1)
+    finally:
+        observer.stop()
+        observer.join()
+
+
+def sample(
+    output_path: str,
+    classifier_path: str,
+    classification_threshold: float = None,
+    timestamp_mode: bool = False,
+    flow: str = utils.FOREGROUND_FLOW,
+    interval: float = ss_features.TIMESTAMP_INTERVAL,
+) -> None:
+    """Query the tcp_info of the flow through netlink at the given interval and perform a prediction for each measurement.
+
+    The queries run at a fixed rate, see fixed_rate.run_at_fixed_rate, so the interval between the measurements
+    does not drift with the time the predictions take. Stops once the socket of the flow has not been found for 5 seconds.
+
+    Args:
+        output_path: Path to the file that the predictions are written to.
+        classifier_path: The path to the saved classifier to use for the prediction.
+        classification_threshold: The optional classification threshold to use for the prediction.
+        timestamp_mode: Whether or not the predictions are appended to the output file along with timestamps.
+        flow: The flow that the classifier makes predictions for.
+        interval: The interval between the queries in ms.
+    """
+    classifier = predict.load_classifier(classifier_path)
+    event_handler = EventHandler(
+        None,
+        None,
+        output_path,
+        classifier,
+        classification_threshold,
+        timestamp_mode,
+        flow,
+    )
+
+    print("Sense and predict module started. Querying the flow through netlink...\n\n")
+
+    with sock_diag.open_socket() as sock:
+        report = fixed_rate.run_at_fixed_rate(
+            lambda _: event_handler.predict_socket(sock),
+            interval,
+            float("inf"),
+            lambda: time.time() >= event_handler.timeout,
+        )
+
+    print(fixed_rate.format_report(report))
+
+
+def main():
+    parser = init_argparse()
+    args = parser.parse_args()
+
+    prepare_data.timestamps = args.timestamps
+
+    if args.netlink:
+        sample(
+            args.output_file,
+            args.classifier_path,
+            args.threshold,
+            args.timestamp_mode,
+            args.flow,
+            args.interval,
+        )
+        return
+
+    observe(
+        args.directory_path,
+        args.input_file,
+        args.output_file,
+        args.classifier_path,
+        args.threshold,
+        args.timestamp_mode,
+        args.flow,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import os
+import utils.stage_trace as stage_trace
+
+from argparse import ArgumentParser
+
+
+def init_argparse() -> ArgumentParser:
+    """Initialize the argument parser.
+
+    Returns:
+        The initialized argument parser.
+    """
+    parser = ArgumentParser(
+        usage="python %(prog)s -d <directory_path>",
+        description="Create the per-stage latency report of the samples that were traced through the prediction loop of a run",
+    )
+    parser.add_argument(
+        "-d",
+        "--directory_path",
+        metavar="DIRECTORY_PATH",
+        type=str,
+        required=True,
+        help=f"Path to the output directory of the run, which contains the {stage_trace.TRACE_DIRECTORY} directory and which {stage_trace.LATENCY_FILE} is written to",
+    )
+
+    return parser
+
+
+def main():
+    parser = init_argparse()
+    args = parser.parse_args()
+
+    traces = stage_trace.read_traces(args.directory_path)
+    report = stage_trace.format_latency_report(
+        stage_trace.create_latency_report(traces)
+    )
+
+    with open(os.path.join(args.directory_path, stage_trace.LATENCY_FILE), "w") as file:
+        file.write(f"Traced samples: {len(traces)}\n{report}\n")
+
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
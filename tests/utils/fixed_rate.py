@@ -0,0 +1,119 @@
+import time
+import numpy as np
+
+from typing import Callable
+
+# The percentiles of the jitter that are reported (%).
+JITTER_PERCENTILES = (50, 90, 99)
+
+
+def run_at_fixed_rate(
+    task: Callable[[float], None],
+    interval: float,
+    duration: float,
+    stop: Callable[[], bool] | None = None,
+) -> dict:
+    """Run the given task at a fixed rate on a monotonic schedule for the given duration.
+
+    The runs are scheduled at multiples of the interval from the start, so the schedule does not drift
+    with the time the task takes. A run that overruns the next deadline delays it, and the deadlines
+    that passed entirely during a run are missed instead of being caught up with a burst of runs.
+
+    Args:
+        task: The function that is run, which is called with the time of the run in ms since the start.
+        interval: The interval between the deadlines in ms, or 0 to run the task back to back.
+        duration: The duration to run for in seconds, which may be infinite if a stop condition is given.
+        stop: The optional function that is called before each run, which ends the schedule by returning True.
+
+    Returns:
+        The report of the schedule, see create_report.
+    """
+    period = interval / 1000
+    lateness = []
+    missed = 0
+    deadline_index = 0
+
+    start = time.monotonic()
+    end = start + duration
+    deadline = start
+    while deadline < end:
+        now = time.monotonic()
+        if now < deadline:
+            time.sleep(deadline - now)
+            now = time.monotonic()
+
+        if stop is not None and stop():
+            break
+
+        lateness.append((now - deadline) * 1000)
+        task((now - start) * 1000)
+
+        if period <= 0:
+            deadline = time.monotonic()
+            continue
+
+        deadline_index += 1
+        deadline = start + deadline_index * period
+        # Skip the deadlines that passed entirely during the run instead of catching up on them.
+        now = time.monotonic()
+        while deadline + period <= now and deadline < end:
+            missed += 1
+            deadline_index += 1
+            deadline = start + deadline_index * period
+
+    # The schedule lasts until its next deadline, which is only passed if the last run overran it.
+    elapsed = max(time.monotonic(), deadline) - start
+    return create_report(lateness, missed, elapsed, interval)
+
+
+def create_report(lateness: list, missed: int, elapsed: float, interval: float) -> dict:
+    """Create the report of a fixed-rate schedule.
+
+    Args:
+        lateness: The time between the deadline and the start of each run in ms.
+        missed: The number of deadlines that were missed.
+        elapsed: The duration of the schedule in seconds.
+        interval: The interval between the deadlines in ms.
+
+    Returns:
+        A dictionary with the number of runs, the number of missed deadlines, the elapsed time,
+        the target and achieved rate in runs per second, and the percentiles and max of the jitter,
+        i.e. the lateness of the runs, in ms under "jitter".
+    """
+    jitter = {f"p{percentile}": 0.0 for percentile in JITTER_PERCENTILES} | {"max": 0.0}
+    if lateness:
+        values = np.percentile(lateness, JITTER_PERCENTILES)
+        jitter = {
+            f"p{percentile}": value.item()
+            for percentile, value in zip(JITTER_PERCENTILES, values)
+        } | {"max": max(lateness)}
+
+    return {
+        "runs": len(lateness),
+        "missed": missed,
+        "elapsed": elapsed,
+        "target_rate": 1000 / interval if interval > 0 else None,
+        "rate": len(lateness) / elapsed if elapsed > 0 else 0.0,
+        "jitter": jitter,
+    }
+
+
+def format_report(report: dict) -> str:
+    """Format the given report of a fixed-rate schedule for printing.
+
+    Args:
+        report: The report, see create_report.
+
+    Returns:
+        The formatted report.
+    """
+    target_rate = report["target_rate"]
+    target = "" if target_rate is None else f" (target: {target_rate:.1f}/s)"
+    jitter = ", ".join(
+        f"{name} {value:.3f}" for name, value in report["jitter"].items()
+    )
+    return (
+        f"Ran {report['runs']} times in {report['elapsed']:.2f} seconds"
+        f" at {report['rate']:.1f}/s{target}, missed {report['missed']} deadlines.\n"
+        f"Jitter (ms): {jitter}"
+    )
@@ -0,0 +1,794 @@
+import os
+import socket
+import struct
+
+from typing import Iterator
+from utils import ss_parser
+
+# The netlink protocol of the socket diagnostics and the message type of its requests, see linux/sock_diag.h.
+NETLINK_SOCK_DIAG = 4
+SOCK_DIAG_BY_FAMILY = 20
+
+# The netlink message types and flags, see linux/netlink.h.
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+
+# The attributes of the replies, see linux/inet_diag.h. Each one is requested by setting the bit
+# 1 << (attribute - 1) in the extensions of the request.
+INET_DIAG_INFO = 2
+INET_DIAG_VEGASINFO = 3
+INET_DIAG_CONG = 4
+INET_DIAG_DCTCPINFO = 9
+INET_DIAG_BBRINFO = 16
+
+# Requests the tcp_info, the name of the congestion control algorithm and its info, as ss does.
+# The extensions are a single byte, so the info of dctcp and bbr is also returned for the vegas bit.
+EXTENSIONS = (
+    1 << (INET_DIAG_INFO - 1)
+    | 1 << (INET_DIAG_VEGASINFO - 1)
+    | 1 << (INET_DIAG_CONG - 1)
+)
+
+# The cookie of a socket that is looked up by its 4-tuple only.
+INET_DIAG_NOCOOKIE = b"\xff" * 8
+
+# The names ss prints for the tcp states, indexed by state.
+TCP_STATES = (
+    "UNKNOWN",
+    "ESTAB",
+    "SYN-SENT",
+    "SYN-RECV",
+    "FIN-WAIT-1",
+    "FIN-WAIT-2",
+    "TIME-WAIT",
+    "UNCONN",
+    "CLOSE-WAIT",
+    "LAST-ACK",
+    "LISTEN",
+    "CLOSING",
+    "NEW-SYN-RECV",
+)
+
+# The states ss -t shows by default, i.e. all of the connected states except TIME-WAIT and SYN-RECV,
+# which have no tcp_info.
+DEFAULT_STATES = sum(
+    1 << state
+    for state, name in enumerate(TCP_STATES)
+    if name not in ("UNKNOWN", "SYN-RECV", "TIME-WAIT", "UNCONN", "LISTEN")
+)
+
+# The names ss prints for the timers, indexed by timer.
+TIMER_NAMES = ("off", "on", "keepalive", "timewait", "persist", "unknown")
+
+# The bits of tcpi_options and the names ss prints for them. The window scaling option is printed with its values.
+TCP_OPTIONS = ((0x1, "ts"), (0x2, "sack"), (0x8, "ecn"), (0x10, "ecnseen"))
+TCPI_OPT_WSCALE = 0x4
+
+# ss does not print a slow start threshold of 0xFFFF or more, i.e. while it is still infinite.
+MAX_SSTHRESH = 0xFFFF
+
+# The values of the tcp_info that mean that the value is not set.
+UNSET_U32 = 0xFFFFFFFF
+UNSET_U64 = 0xFFFFFFFFFFFFFFFF
+
+NLMSGHDR = struct.Struct("=IHHII")
+NLATTR = struct.Struct("=HH")
+NLMSGERR = struct.Struct("=i")
+
+# struct inet_diag_req_v2 without its socket id, which is packed by pack_sockid.
+INET_DIAG_REQ_V2 = struct.Struct("=BBBxI")
+
+# struct inet_diag_sockid, whose ports and addresses are in network byte order.
+INET_DIAG_SOCKID = struct.Struct(">HH16s16s")
+INET_DIAG_SOCKID_TAIL = struct.Struct("=I8s")
+
+# struct inet_diag_msg without its socket id.
+INET_DIAG_MSG_HEAD = struct.Struct("=BBBB")
+INET_DIAG_MSG_TAIL = struct.Struct("=IIIII")
+
+# The fields of struct tcp_info in linux/tcp.h up to tcpi_bytes_retrans, which covers the fields that ss prints.
+# Older kernels return a shorter struct, whose missing fields are 0 as in ss.
+TCP_INFO_FIELDS = (
+    ("state", "B"),
+    ("ca_state", "B"),
+    ("retransmits", "B"),
+    ("probes", "B"),
+    ("backoff", "B"),
+    ("options", "B"),
+    ("wscale", "B"),
+    ("app_limited", "B"),
+    ("rto", "I"),
+    ("ato", "I"),
+    ("snd_mss", "I"),
+    ("rcv_mss", "I"),
+    ("unacked", "I"),
+    ("sacked", "I"),
+    ("lost", "I"),
+    ("retrans", "I"),
+    ("fackets", "I"),
+    ("last_data_sent", "I"),
+    ("last_ack_sent", "I"),
+    ("last_data_recv", "I"),
+    ("last_ack_recv", "I"),
+    ("pmtu", "I"),
+    ("rcv_ssthresh", "I"),
+    ("rtt", "I"),
+    ("rttvar", "I"),
+    ("snd_ssthresh", "I"),
+    ("snd_cwnd", "I"),
+    ("advmss", "I"),
+    ("reordering", "I"),
+    ("rcv_rtt", "I"),
+    ("rcv_space", "I"),
+    ("total_retrans", "I"),
+    ("pacing_rate", "Q"),
+    ("max_pacing_rate", "Q"),
+    ("bytes_acked", "Q"),
+    ("bytes_received", "Q"),
+    ("segs_out", "I"),
+    ("segs_in", "I"),
+    ("notsent_bytes", "I"),
+    ("min_rtt", "I"),
+    ("data_segs_in", "I"),
+    ("data_segs_out", "I"),
+    ("delivery_rate", "Q"),
+    ("busy_time", "Q"),
+    ("rwnd_limited", "Q"),
+    ("sndbuf_limited", "Q"),
+    ("delivered", "I"),
+    ("delivered_ce", "I"),
+    ("bytes_sent", "Q"),
+    ("bytes_retrans", "Q"),
+)
+
+TCP_INFO = struct.Struct("=" + "".join(fmt for _, fmt in TCP_INFO_FIELDS))
+TCP_INFO_NAMES = tuple(name for name, _ in TCP_INFO_FIELDS)
+
+# The info of the congestion control algorithms that report it, i.e. struct tcpvegas_info, tcp_dctcp_info
+# and tcp_bbr_info, keyed by attribute.
+CONG_INFO = {
+    INET_DIAG_VEGASINFO: (
+        struct.Struct("=IIII"),
+        ("vegas_enabled", "vegas_rtt_count", "vegas_rtt", "vegas_min_rtt"),
+    ),
+    INET_DIAG_DCTCPINFO: (
+        struct.Struct("=HHIII"),
+        (
+            "dctcp_enabled",
+            "dctcp_ce_state",
+            "dctcp_alpha",
+            "dctcp_ab_ecn",
+            "dctcp_ab_tot",
+        ),
+    ),
+    INET_DIAG_BBRINFO: (
+        struct.Struct("=IIIII"),
+        (
+            "bbr_bw_lo",
+            "bbr_bw_hi",
+            "bbr_min_rtt",
+            "bbr_pacing_gain",
+            "bbr_cwnd_gain",
+        ),
+    ),
+}
+
+# The header ss -t prints before each poll.
+SS_HEADER = "State Recv-Q Send-Q Local Address:Port Peer Address:Port Process"
+
+
+def open_socket() -> socket.socket:
+    """Open a netlink socket for querying the socket diagnostics of the kernel.
+
+    Only the sockets in the network namespace of the calling process can be queried, so in Mininet
+    the collector has to run on the host of the connections.
+
+    Returns:
+        The netlink socket, which should be closed by the caller.
+    """
+    return socket.socket(
+        socket.AF_NETLINK, socket.SOCK_RAW | socket.SOCK_CLOEXEC, NETLINK_SOCK_DIAG
+    )
+
+
+def split_address(address: str) -> tuple:
+    """Split the given address and port as printed by ss, e.g. 10.1.1.100:5001 or [::ffff:10.2.2.100]:5201.
+
+    Args:
+        address: The address and port.
+
+    Returns:
+        A tuple containing the address family, the packed address padded to 16 bytes and the port.
+    """
+    host, _, port = address.rpartition(":")
+    host = host.strip("[]")
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    return family, socket.inet_pton(family, host).ljust(16, b"\0"), int(port)
+
+
+def join_address(family: int, address: bytes, port: int) -> str:
+    """Format the given address and port as ss prints it.
+
+    Args:
+        family: The address family.
+        address: The packed address padded to 16 bytes.
+        port: The port.
+
+    Returns:
+        The address and port, with IPv6 addresses in brackets.
+    """
+    if family == socket.AF_INET:
+        return f"{socket.inet_ntop(family, address[:4])}:{port}"
+
+    return f"[{socket.inet_ntop(family, address)}]:{port}"
+
+
+def pack_sockid(flow: str | None) -> tuple:
+    """Pack the socket id of the given flow, which identifies the socket by its 4-tuple.
+
+    Args:
+        flow: The flow as "<local address:port> <peer address:port>", see ss_parser.get_flow,
+            or None for a socket id that does not identify a socket.
+
+    Returns:
+        A tuple containing the address family of the flow and the packed struct inet_diag_sockid.
+    """
+    if flow is None:
+        return socket.AF_INET, bytes(INET_DIAG_SOCKID.size + INET_DIAG_SOCKID_TAIL.size)
+
+    local_address, peer_address = flow.split()
+    family, src, sport = split_address(local_address)
+    peer_family, dst, dport = split_address(peer_address)
+    if family != peer_family:
+        raise ValueError(f"The addresses of the flow {flow} are not of the same family")
+
+    return family, INET_DIAG_SOCKID.pack(
+        sport, dport, src, dst
+    ) + INET_DIAG_SOCKID_TAIL.pack(0, INET_DIAG_NOCOOKIE)
+
+
+def pack_request(
+    flow: str | None = None,
+    family: int = socket.AF_INET,
+    states: int = DEFAULT_STATES,
+    seq: int = 0,
+) -> bytes:
+    """Pack a netlink request for the tcp_info and congestion control info of the tcp sockets.
+
+    Args:
+        flow: The flow whose socket should be looked up by its 4-tuple, or None to dump all of the
+            sockets of the given family in the given states.
+        family: The address family of the sockets to dump, which is taken from the flow if it is given.
+        states: The bitmask of the tcp states of the sockets to dump (default: the states ss -t shows).
+        seq: The sequence number of the request.
+
+    Returns:
+        The request, i.e. a netlink header followed by a struct inet_diag_req_v2.
+    """
+    flags = NLM_F_REQUEST
+    if flow is None:
+        flags |= NLM_F_DUMP
+        _, sockid = pack_sockid(None)
+    else:
+        family, sockid = pack_sockid(flow)
+
+    request = (
+        INET_DIAG_REQ_V2.pack(family, socket.IPPROTO_TCP, EXTENSIONS, states) + sockid
+    )
+    header = NLMSGHDR.pack(
+        NLMSGHDR.size + len(request), SOCK_DIAG_BY_FAMILY, flags, seq, 0
+    )
+    return header + request
+
+
+def iter_messages(data: bytes) -> Iterator[tuple]:
+    """Lazily split the given data received from a netlink socket into its messages.
+
+    Args:
+        data: The received data.
+
+    Yields:
+        A tuple containing the type and the payload of each message.
+    """
+    offset = 0
+    while offset + NLMSGHDR.size <= len(data):
+        length, message_type, _, _, _ = NLMSGHDR.unpack_from(data, offset)
+        if length < NLMSGHDR.size:
+            break
+
+        yield message_type, data[offset + NLMSGHDR.size : offset + length]
+        offset += (length + 3) & ~3
+
+
+def iter_attributes(data: bytes) -> Iterator[tuple]:
+    """Lazily split the given attributes of a netlink message.
+
+    Args:
+        data: The attributes, which follow the fixed part of the payload of a message.
+
+    Yields:
+        A tuple containing the type and the payload of each attribute.
+    """
+    offset = 0
+    while offset + NLATTR.size <= len(data):
+        length, attribute_type = NLATTR.unpack_from(data, offset)
+        if length < NLATTR.size:
+            break
+
+        yield attribute_type, data[offset + NLATTR.size : offset + length]
+        offset += (length + 3) & ~3
+
+
+def decode_tcp_info(data: bytes) -> dict:
+    """Decode a struct tcp_info.
+
+    Args:
+        data: The payload of the INET_DIAG_INFO attribute.
+
+    Returns:
+        A dictionary with the fields of the struct in TCP_INFO_FIELDS, without the tcpi_ prefix, as keys.
+    """
+    data = data[: TCP_INFO.size].ljust(TCP_INFO.size, b"\0")
+    return dict(zip(TCP_INFO_NAMES, TCP_INFO.unpack(data)))
+
+
+def decode_message(payload: bytes) -> dict:
+    """Decode the reply of the kernel for a single socket, i.e. a struct inet_diag_msg and its attributes.
+
+    Args:
+        payload: The payload of the SOCK_DIAG_BY_FAMILY message.
+
+    Returns:
+        A dictionary with the flow, the state, timer, retrans, expires, rqueue and wqueue of the socket,
+        its decoded tcp_info under "info" (None for sockets without one, e.g. in the TIME-WAIT state),
+        the name of its congestion control algorithm under "cc_algo" and the fields of the info
+        of the congestion control algorithm, if it reports any, under "cong_info".
+    """
+    family, state, timer, retrans = INET_DIAG_MSG_HEAD.unpack_from(payload)
+    sport, dport, src, dst = INET_DIAG_SOCKID.unpack_from(
+        payload, INET_DIAG_MSG_HEAD.size
+    )
+    tail_offset = (
+        INET_DIAG_MSG_HEAD.size + INET_DIAG_SOCKID.size + INET_DIAG_SOCKID_TAIL.size
+    )
+    expires, rqueue, wqueue, _, _ = INET_DIAG_MSG_TAIL.unpack_from(
+        payload, tail_offset
+    )
+
+    local_address = join_address(family, src, sport)
+    peer_address = join_address(family, dst, dport)
+    message = {
+        "flow": f"{local_address} {peer_address}",
+        "state": state,
+        "timer": timer,
+        "retrans": retrans,
+        "expires": expires,
+        "rqueue": rqueue,
+        "wqueue": wqueue,
+        "info": None,
+        "cc_algo": "",
+        "cong_info": {},
+    }
+
+    attributes = payload[tail_offset + INET_DIAG_MSG_TAIL.size :]
+    for attribute_type, data in iter_attributes(attributes):
+        if attribute_type == INET_DIAG_INFO:
+            message["info"] = decode_tcp_info(data)
+        elif attribute_type == INET_DIAG_CONG:
+            message["cc_algo"] = data.split(b"\0", 1)[0].decode()
+        elif attribute_type in CONG_INFO:
+            cong_info, names = CONG_INFO[attribute_type]
+            data = data[: cong_info.size].ljust(cong_info.size, b"\0")
+            message["cong_info"] = dict(zip(names, cong_info.unpack(data)))
+
+    return message
+
+
+def receive_messages(sock: socket.socket, dump: bool) -> Iterator[dict]:
+    """Lazily receive and decode the replies to a request that was sent on the given socket.
+
+    Args:
+        sock: The netlink socket.
+        dump: Whether or not the request was a dump, whose replies end with an NLMSG_DONE message.
+
+    Yields:
+        The decoded reply for each socket, see decode_message.
+
+    Raises:
+        OSError: If the kernel reported an error, e.g. ENOENT if the socket of a flow was not found.
+    """
+    while True:
+        data = sock.recv(65536)
+        for message_type, payload in iter_messages(data):
+            if message_type == NLMSG_DONE:
+                return
+
+            if message_type == NLMSG_ERROR:
+                (error,) = NLMSGERR.unpack_from(payload)
+                if error == 0:
+                    return
+                raise OSError(-error, os.strerror(-error))
+
+            if message_type == SOCK_DIAG_BY_FAMILY:
+                yield decode_message(payload)
+
+        if not dump:
+            return
+
+
+def query_flow(sock: socket.socket, flow: str) -> dict | None:
+    """Query the socket of the given flow, which the kernel looks up by its 4-tuple.
+
+    Args:
+        sock: The netlink socket, see open_socket.
+        flow: The flow as "<local address:port> <peer address:port>", see ss_parser.get_flow.
+
+    Returns:
+        The decoded reply for the socket, see decode_message, or None if there is no such socket.
+    """
+    sock.send(pack_request(flow))
+    try:
+        return next(receive_messages(sock, dump=False), None)
+    except FileNotFoundError:
+        return None
+
+
+def dump_flows(
+    sock: socket.socket, flows: set | None = None, states: int = DEFAULT_STATES
+) -> list:
+    """Query all of the IPv4 and IPv6 tcp sockets in the given states, as a single ss -t poll does.
+
+    Args:
+        sock: The netlink socket, see open_socket.
+        flows: The flows to include, or None to include all of them.
+        states: The bitmask of the tcp states of the sockets to include (default: the states ss -t shows).
+
+    Returns:
+        The decoded replies for the sockets, see decode_message, in the order the kernel returned them.
+    """
+    messages = []
+    for family in (socket.AF_INET, socket.AF_INET6):
+        sock.send(pack_request(family=family, states=states))
+        messages.extend(
+            message
+            for message in receive_messages(sock, dump=True)
+            if flows is None or message["flow"] in flows
+        )
+
+    return messages
+
+
+def format_ms(us: int) -> str:
+    """Format the given number of microseconds in ms as ss prints rtts and timeouts, i.e. with %g.
+
+    Args:
+        us: The number of microseconds.
+
+    Returns:
+        The number of ms.
+    """
+    return f"{us / 1000:g}"
+
+
+def format_bandwidth(bps: float) -> str:
+    """Format the given rate as ss -n prints rates, i.e. in whole bits per second.
+
+    Args:
+        bps: The rate in bits per second.
+
+    Returns:
+        The rate with its unit, e.g. 47800000bps.
+    """
+    return f"{bps:.0f}bps"
+
+
+def format_ms_timer(timeout: int) -> str:
+    """Format the given timeout as ss prints the expire time of a timer, e.g. 300ms, 1.200ms or 1min12sec.
+
+    Args:
+        timeout: The timeout in ms.
+
+    Returns:
+        The formatted timeout, which is empty for a timeout of 0.
+    """
+    minutes, secs = divmod(timeout // 1000, 60)
+    msecs = timeout % 1000
+    formatted = ""
+    if minutes:
+        msecs = 0
+        formatted = f"{minutes}min"
+        if minutes > 9:
+            secs = 0
+    if secs:
+        if secs > 9:
+            msecs = 0
+        formatted += f"{secs}{'.' if msecs else 'sec'}"
+    if msecs:
+        formatted += f"{msecs:03d}ms"
+
+    return formatted
+
+
+def get_ms(us: int) -> float:
+    """Convert the given number of microseconds to ms, rounded to the precision ss prints them with.
+
+    Args:
+        us: The number of microseconds.
+
+    Returns:
+        The number of ms.
+    """
+    return float(format_ms(us))
+
+
+def get_mbps(bps: float) -> float:
+    """Convert the given rate to Mbps, rounded to the whole bits per second ss -n prints.
+
+    Args:
+        bps: The rate in bits per second.
+
+    Returns:
+        The rate in Mbps, as ss_parser.parse_rate returns it for the rate ss prints.
+    """
+    return round(bps) / ss_parser.RATE_UNITS[""]
+
+
+def get_expire_time(timeout: int) -> int | None:
+    """Get the expire time of a timer, as ss_parser.parse_timer reads it from the timer ss prints.
+
+    The parser takes the first number of the expire time, so this is the number of minutes, seconds
+    or ms, depending on the largest unit ss prints for the timeout.
+
+    Args:
+        timeout: The timeout in ms.
+
+    Returns:
+        The expire time, or None for a timeout of 0, which ss prints without a number.
+    """
+    minutes, secs = divmod(timeout // 1000, 60)
+    return minutes or secs or timeout % 1000 or None
+
+
+def get_rates(info: dict) -> dict:
+    """Get the rates ss prints for the given tcp_info, i.e. the send rate, pacing rate and delivery rate.
+
+    Args:
+        info: The decoded tcp_info, see decode_tcp_info.
+
+    Returns:
+        A dictionary with the rates in bits per second that ss prints, keyed by their ss token.
+    """
+    rates = {}
+    if info["rtt"] and info["snd_mss"] and info["snd_cwnd"]:
+        rates["send"] = info["snd_cwnd"] * info["snd_mss"] * 8000000.0 / info["rtt"]
+    if info["pacing_rate"] and info["pacing_rate"] != UNSET_U64:
+        rates["pacing_rate"] = info["pacing_rate"] * 8.0
+    if info["delivery_rate"]:
+        rates["delivery_rate"] = info["delivery_rate"] * 8.0
+
+    return rates
+
+
+def get_ssthresh(info: dict) -> int:
+    """Get the slow start threshold ss prints for the given tcp_info.
+
+    Args:
+        info: The decoded tcp_info, see decode_tcp_info.
+
+    Returns:
+        The slow start threshold, or 0 while it is infinite, in which case ss does not print it.
+    """
+    return info["snd_ssthresh"] if info["snd_ssthresh"] < MAX_SSTHRESH else 0
+
+
+def get_min_rtt(info: dict) -> int:
+    """Get the minimum rtt in microseconds ss prints for the given tcp_info.
+
+    Args:
+        info: The decoded tcp_info, see decode_tcp_info.
+
+    Returns:
+        The minimum rtt, or 0 if it is not set, in which case ss does not print it.
+    """
+    return info["min_rtt"] if info["min_rtt"] != UNSET_U32 else 0
+
+
+def decode_values(message: dict) -> dict:
+    """Decode the fields of SS_SCHEMA from the given socket, as ss_parser extracts them from the ss output.
+
+    Fields that ss does not print, e.g. because their value is 0, are None, like tokens missing from the ss output.
+
+    Args:
+        message: The decoded reply for the socket, see decode_message, which must have a tcp_info.
+
+    Returns:
+        A dictionary with the names of all of the fields in ss_parser.SS_SCHEMA_FIELDS as keys and their values as values.
+    """
+    info = message["info"]
+    rates = get_rates(info)
+    ssthresh = get_ssthresh(info)
+    min_rtt = get_min_rtt(info)
+    busy_time = info["busy_time"] // 1000
+    rwnd_limited = info["rwnd_limited"] // 1000
+
+    timer_name = expire_time = retrans = None
+    if message["timer"]:
+        expire_time = get_expire_time(message["expires"])
+        if expire_time is not None:
+            timer_name = TIMER_NAMES[min(message["timer"], len(TIMER_NAMES) - 1)]
+            retrans = message["retrans"]
+
+    printed_retrans = info["retrans"] or info["total_retrans"]
+    pacing_rate = rates.get("pacing_rate")
+    delivery_rate = rates.get("delivery_rate")
+    send_rate = rates.get("send")
+    return {
+        "timer_name": timer_name,
+        "expire_time": expire_time,
+        "retrans": retrans,
+        "rto": info["rto"] // 1000 if info["rto"] and info["rto"] != 3000000 else None,
+        "rtt": get_ms(info["rtt"]) if info["rtt"] else None,
+        "rtt_variance": get_ms(info["rttvar"]) if info["rtt"] else None,
+        "cwnd": info["snd_cwnd"] or None,
+        "ssthresh": ssthresh or None,
+        "data_segments_sent": info["data_segs_out"] or None,
+        "last_send": info["last_data_sent"] or None,
+        "pacing_rate": None if pacing_rate is None else get_mbps(pacing_rate),
+        "bytes_sent": info["bytes_sent"] or None,
+        "bytes_retrans": info["bytes_retrans"] or None,
+        "bytes_acked": info["bytes_acked"] or None,
+        "delivery_rate": None if delivery_rate is None else get_mbps(delivery_rate),
+        "send_rate": None if send_rate is None else get_mbps(send_rate),
+        "unacked": info["unacked"] or None,
+        "retrans_in_flight": info["retrans"] if printed_retrans else None,
+        "total_retrans": info["total_retrans"] if printed_retrans else None,
+        "lost_segments": info["lost"] or None,
+        "sacked": info["sacked"] or None,
+        "notsent": info["notsent_bytes"] or None,
+        "path_min_rtt": get_ms(min_rtt) if min_rtt else None,
+        "busy_time": busy_time or None,
+        "rwnd_limited": rwnd_limited if busy_time and rwnd_limited else None,
+        # The reply does not contain the time it was captured at, see ss_parser.add_capture_time.
+        ss_parser.CAPTURE_TIME: None,
+    }
+
+
+def decode_record(message: dict, fields: tuple = ss_parser.SS_RECORD_FIELDS) -> dict:
+    """Decode the given socket into a fixed-schema dictionary, as ss_parser.parse_record parses its ss output.
+
+    The values are taken directly from the tcp_info, so nothing is formatted or parsed, but they are rounded
+    to the precision ss prints them with, so that the records are the same as the ones parsed from the
+    archived ss output.
+
+    Args:
+        message: The decoded reply for the socket, see decode_message, which must have a tcp_info.
+        fields: The names of the fields in SS_SCHEMA_FIELDS that should be decoded (default: SS_RECORD_FIELDS).
+
+    Returns:
+        A dictionary with the given fields as keys and their values as values.
+        Fields that ss does not print are set to their default, which is None for the SS_RECORD_FIELDS.
+    """
+    values = decode_values(message)
+    record = {}
+    for name in fields:
+        value = values[name]
+        default = ss_parser.SS_SCHEMA_FIELDS[name].default
+        record[name] = default if value is None else value
+
+    return record
+
+
+def get_tokens(message: dict) -> dict:
+    """Get the key/value tokens of the statistics ss prints for the given socket, in the order ss prints them.
+
+    Tokens that ss does not print, e.g. because their value is 0, are left out.
+
+    Args:
+        message: The decoded reply for the socket, see decode_message, which must have a tcp_info.
+
+    Returns:
+        A dictionary with the ss token keys as keys and their formatted values as values.
+    """
+    info = message["info"]
+    rates = get_rates(info)
+    busy_time = info["busy_time"] // 1000
+    rwnd_limited = info["rwnd_limited"] // 1000
+
+    tokens = {}
+    if info["rto"] and info["rto"] != 3000000:
+        tokens["rto"] = format_ms(info["rto"])
+    if info["rtt"]:
+        tokens["rtt"] = f"{format_ms(info['rtt'])}/{format_ms(info['rttvar'])}"
+    tokens["mss"] = info["snd_mss"]
+    tokens["pmtu"] = info["pmtu"]
+    tokens["rcvmss"] = info["rcv_mss"]
+    tokens["advmss"] = info["advmss"]
+    tokens["cwnd"] = info["snd_cwnd"]
+    tokens["ssthresh"] = get_ssthresh(info)
+    tokens["bytes_sent"] = info["bytes_sent"]
+    tokens["bytes_retrans"] = info["bytes_retrans"]
+    tokens["bytes_acked"] = info["bytes_acked"]
+    tokens["bytes_received"] = info["bytes_received"]
+    tokens["segs_out"] = info["segs_out"]
+    tokens["segs_in"] = info["segs_in"]
+    tokens["data_segs_out"] = info["data_segs_out"]
+    tokens["data_segs_in"] = info["data_segs_in"]
+    if "send" in rates:
+        tokens["send"] = format_bandwidth(rates["send"])
+    tokens["lastsnd"] = info["last_data_sent"]
+    tokens["lastrcv"] = info["last_data_recv"]
+    tokens["lastack"] = info["last_ack_recv"]
+    if "pacing_rate" in rates:
+        tokens["pacing_rate"] = format_bandwidth(rates["pacing_rate"])
+    if "delivery_rate" in rates:
+        tokens["delivery_rate"] = format_bandwidth(rates["delivery_rate"])
+    tokens["delivered"] = info["delivered"]
+    if busy_time:
+        tokens["busy"] = f"{busy_time}ms"
+        if rwnd_limited:
+            percentage = rwnd_limited * 100 / busy_time
+            tokens["rwnd_limited"] = f"{rwnd_limited}ms({percentage:.1f}%)"
+    tokens["unacked"] = info["unacked"]
+    if info["retrans"] or info["total_retrans"]:
+        tokens["retrans"] = f"{info['retrans']}/{info['total_retrans']}"
+    tokens["lost"] = info["lost"]
+    tokens["sacked"] = info["sacked"]
+    tokens["rcv_space"] = info["rcv_space"]
+    tokens["rcv_ssthresh"] = info["rcv_ssthresh"]
+    tokens["notsent"] = info["notsent_bytes"]
+    if get_min_rtt(info):
+        tokens["minrtt"] = format_ms(get_min_rtt(info))
+
+    return {key: str(value) for key, value in tokens.items() if value}
+
+
+def format_record(message: dict) -> str:
+    """Format the given socket as the two lines ss -tin -o prints for it.
+
+    Args:
+        message: The decoded reply for the socket, see decode_message, which must have a tcp_info.
+
+    Returns:
+        The two lines, each ending with a newline.
+    """
+    local_address, peer_address = message["flow"].split()
+    socket_line = (
+        f"{TCP_STATES[message['state']]} {message['rqueue']} {message['wqueue']}"
+        f" {local_address} {peer_address}"
+    )
+    if message["timer"]:
+        timer_name = TIMER_NAMES[min(message["timer"], len(TIMER_NAMES) - 1)]
+        expire_time = format_ms_timer(message["expires"])
+        socket_line += f" timer:({timer_name},{expire_time},{message['retrans']})"
+
+    info = message["info"]
+    words = [name for bit, name in TCP_OPTIONS if info["options"] & bit]
+    if message["cc_algo"]:
+        words.append(message["cc_algo"])
+    if info["options"] & TCPI_OPT_WSCALE:
+        words.append(f"wscale:{info['wscale'] & 0xF},{info['wscale'] >> 4}")
+
+    for key, value in get_tokens(message).items():
+        separator = " " if key in ss_parser.SPACE_SEPARATED_KEYS else ":"
+        words.append(f"{key}{separator}{value}")
+
+    return f"{socket_line}\n\t {' '.join(words)}\n"
+
+
+def format_poll(messages: list) -> str:
+    """Format the given sockets as a single ss -tin -o poll, i.e. the header followed by the two lines of each socket.
+
+    Sockets without a tcp_info are left out, since ss_parser skips sockets without statistics.
+
+    Args:
+        messages: The decoded replies for the sockets, see decode_message.
+
+    Returns:
+        The ss poll.
+    """
+    records = "".join(
+        format_record(message) for message in messages if message["info"] is not None
+    )
+    return f"{SS_HEADER}\n{records}"
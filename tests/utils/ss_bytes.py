@@ -0,0 +1,456 @@
+import mmap
+import re
+
+import numpy as np
+
+from pathlib import Path
+from utils import ss_columns
+from utils import ss_parser
+
+# The bytes that str.split() treats as whitespace in ss outputs.
+WHITESPACE = b" \t\n\r\x0b\x0c"
+
+# A lookup table telling which bytes are whitespace.
+IS_SPACE = np.zeros(256, dtype=bool)
+IS_SPACE[list(WHITESPACE)] = True
+
+# The maximum number of bytes of a timer value without its parentheses, e.g. "keepalive,1min12sec,0".
+TIMER_WIDTH = 3 * ss_columns.TIMER_FIELD_WIDTH
+
+# The same pattern as in util.get_cc_algo.
+CC_ALGO_REGEX = re.compile(rb"ts sack ecn (reno|cubic|bbr)")
+
+
+def get_key_token(key: str) -> bytes:
+    """Get the bytes that precede the raw value of the given ss key, see ss_parser.tokenize.
+
+    Args:
+        key: The key of the ss token.
+
+    Returns:
+        The key preceded by a space and followed by its separator.
+    """
+    if key == "timer":
+        return b" timer:("
+
+    separator = " " if key in ss_parser.SPACE_SEPARATED_KEYS else ":"
+    return f" {key}{separator}".encode()
+
+
+def take(array: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """Get the elements at the given offsets, repeating the last element for offsets past the end.
+
+    Args:
+        array: The byte array or a mask with one entry per byte.
+        offsets: The offsets.
+
+    Returns:
+        The elements at the offsets.
+    """
+    return array.take(offsets, mode="clip")
+
+
+def get_lines(buffer: np.ndarray) -> tuple:
+    """Get the start and end offsets of the lines in the given buffer.
+
+    Args:
+        buffer: The bytes of the ss output file.
+
+    Returns:
+        A tuple containing the offsets of the first byte of each line and of the newline that ends it.
+    """
+    ends = np.flatnonzero(buffer == ord("\n"))
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    return starts, ends
+
+
+def get_line_records(buffer: np.ndarray, is_space: np.ndarray) -> tuple:
+    """Find the two lines of each ss measurement in the given buffer, as ss_parser.iter_records does.
+
+    Args:
+        buffer: The bytes of the ss output file.
+        is_space: A mask telling which bytes are whitespace.
+
+    Returns:
+        A tuple containing the offsets of the first byte of each line, the number of the record
+        each line belongs to (-1 for lines that are not part of a record) and the offsets
+        of the first and last byte of the first line of each record.
+    """
+    starts, ends = get_lines(buffer)
+    blank = ~np.logical_or.reduceat(~is_space, starts)
+
+    header = has_bytes(buffer, starts, b"State")
+    netid_offsets = ss_columns.find_token(buffer, {}, b"Netid")
+    header[np.searchsorted(starts, netid_offsets - 1, side="right") - 1] = True
+
+    # A record is an indented line that directly follows a socket line, skipping headers and blank lines.
+    lines = np.flatnonzero(~blank & ~header)
+    indented = is_space[starts[lines]]
+    is_second = np.flatnonzero(indented[1:] & ~indented[:-1]) + 1
+    first_lines, second_lines = lines[is_second - 1], lines[is_second]
+
+    line_records = np.full(len(starts), -1)
+    line_records[first_lines] = np.arange(len(first_lines))
+    line_records[second_lines] = np.arange(len(second_lines))
+
+    return starts, line_records, starts[first_lines], ends[first_lines]
+
+
+def decode_bytes(
+    buffer: np.ndarray, offsets: np.ndarray, lengths: np.ndarray
+) -> np.ndarray:
+    """Decode the given number of bytes starting at each of the given offsets into strings.
+
+    Each distinct string is only decoded once, so the number of strings created does not
+    depend on the number of offsets, e.g. when there are only a few flows or timer names.
+
+    Args:
+        buffer: The bytes of the ss output file.
+        offsets: The offsets of the strings.
+        lengths: The number of bytes of each string.
+
+    Returns:
+        An object array with the decoded strings.
+    """
+    width = -(-max(lengths.max(initial=0), 1) // 8) * 8
+    windows = ss_columns.get_windows(buffer, offsets, width)
+    windows[np.arange(width) >= lengths[:, None]] = 0
+
+    # Number the distinct windows by combining the numbers of the distinct 8-byte words in each
+    # column, which only sorts integers instead of the windows themselves.
+    codes = np.zeros(len(windows), dtype=np.int64)
+    for words in windows.view(np.uint64).T:
+        _, word_codes = np.unique(words, return_inverse=True)
+        _, codes = np.unique(
+            codes * (word_codes.max(initial=0) + 1) + word_codes, return_inverse=True
+        )
+
+    _, first_windows = np.unique(codes, return_index=True)
+    strings = [windows[i].tobytes().rstrip(b"\0").decode() for i in first_windows]
+    return np.array(strings or [""], dtype=object)[codes]
+
+
+def get_flows(
+    buffer: np.ndarray,
+    is_space: np.ndarray,
+    first_starts: np.ndarray,
+    first_ends: np.ndarray,
+) -> np.ndarray:
+    """Get the flow of each record, as ss_parser.get_flow does.
+
+    Args:
+        buffer: The bytes of the ss output file.
+        is_space: A mask telling which bytes are whitespace.
+        first_starts: The offsets of the first byte of the first line of each record.
+        first_ends: The offsets of the last byte of the first line of each record.
+
+    Returns:
+        An object array with the flow of each record, which is empty if it does not contain one.
+    """
+    word_starts = np.flatnonzero(~is_space & np.concatenate(([True], is_space[:-1])))
+    word_ends = np.flatnonzero(~is_space & np.concatenate((is_space[1:], [True]))) + 1
+
+    # The Netid column is only printed when ss is not limited to tcp sockets with -t.
+    has_netid = has_bytes(buffer, first_starts, b"tcp")
+    has_netid &= take(is_space, first_starts + 3)
+    local_words = np.searchsorted(word_starts, first_starts) + 3 + has_netid
+    peer_words = np.minimum(local_words + 1, len(word_starts) - 1)
+    found = (local_words + 1 < len(word_starts)) & (
+        take(word_starts, peer_words) < first_ends
+    )
+
+    starts = take(word_starts, local_words)
+    lengths = np.where(found, take(word_ends, peer_words) - starts, 0)
+    addresses = decode_bytes(buffer, starts, lengths)
+
+    flows = {}
+    for address in set(addresses):
+        local_address, _, peer_address = address.partition(" ")
+        peer_address = ss_parser.ADDRESS_REGEX.match(peer_address.strip())
+        flows[address] = (
+            f"{local_address} {peer_address.group()}" if peer_address else ""
+        )
+
+    return np.array([flows[address] for address in addresses], dtype=object)
+
+
+def parse_numbers(
+    buffer: np.ndarray, is_space: np.ndarray, offsets: np.ndarray
+) -> tuple:
+    """Parse the numbers at the given offsets that make up the whole remaining value of their token.
+
+    Args:
+        buffer: The bytes of the ss output file.
+        is_space: A mask telling which bytes are whitespace.
+        offsets: The offsets of the numbers.
+
+    Returns:
+        A tuple containing the parsed numbers, the offsets of the bytes following the numbers
+        and a mask telling which offsets contained a valid number followed by whitespace.
+    """
+    numbers, ends, valid = ss_columns.parse_numbers(buffer, offsets)
+    return numbers, ends, valid & take(is_space, ends)
+
+
+def has_bytes(buffer: np.ndarray, offsets: np.ndarray, expected: bytes) -> np.ndarray:
+    """Check which of the given offsets start with the given bytes.
+
+    Args:
+        buffer: The bytes of the ss output file.
+        offsets: The offsets.
+        expected: The bytes.
+
+    Returns:
+        A mask telling which offsets start with the bytes.
+    """
+    windows = ss_columns.get_windows(buffer, offsets, len(expected))
+    return (windows == np.frombuffer(expected, np.uint8)).all(axis=1)
+
+
+def parse_ints(
+    buffer: np.ndarray, is_space: np.ndarray, offsets: np.ndarray
+) -> tuple:
+    """The vectorized counterpart of ss_parser.parse_int, see PARSERS."""
+    numbers, _, valid = parse_numbers(buffer, is_space, offsets)
+    return (np.trunc(numbers),), valid
+
+
+def parse_floats(
+    buffer: np.ndarray, is_space: np.ndarray, offsets: np.ndarray
+) -> tuple:
+    """The vectorized counterpart of ss_parser.parse_float, see PARSERS."""
+    numbers, _, valid = parse_numbers(buffer, is_space, offsets)
+    return (numbers,), valid
+
+
+def parse_durations(
+    buffer: np.ndarray, is_space: np.ndarray, offsets: np.ndarray
+) -> tuple:
+    """The vectorized counterpart of ss_parser.parse_duration, see PARSERS."""
+    numbers, ends, valid = ss_columns.parse_numbers(buffer, offsets)
+    return (np.trunc(numbers),), valid & has_bytes(buffer, ends, b"ms")
+
+
+def parse_rates(
+    buffer: np.ndarray, is_space: np.ndarray, offsets: np.ndarray
+) -> tuple:
+    """The vectorized counterpart of ss_parser.parse_rate, see PARSERS."""
+    rates, ends, valid = ss_columns.parse_numbers(buffer, offsets)
+    units = take(buffer, ends)
+
+    # Numbers that are not followed by one of the units are in bps.
+    unit_found = np.zeros(len(offsets), dtype=bool)
+    for unit, divisor in sorted(ss_parser.RATE_UNITS.items(), reverse=True):
+        is_unit = units == ord(unit) if unit else ~unit_found
+        unit_found |= is_unit
+        if divisor >= 1:
+            rates[is_unit] /= divisor
+        else:
+            rates[is_unit] *= round(1 / divisor)
+        ends[is_unit] += len(unit)
+
+    valid &= has_bytes(buffer, ends, b"bps") & take(is_space, ends + 3)
+    return (rates,), valid
+
+
+def parse_rtts(
+    buffer: np.ndarray, is_space: np.ndarray, offsets: np.ndarray
+) -> tuple:
+    """The vectorized counterpart of ss_parser.parse_rtt, see PARSERS."""
+    rtts, ends, valid = ss_columns.parse_numbers(buffer, offsets)
+    rtt_vars, _, var_valid = parse_numbers(buffer, is_space, ends + 1)
+    return (rtts, rtt_vars), valid & (take(buffer, ends) == ord("/")) & var_valid
+
+
+def parse_retrans(
+    buffer: np.ndarray, is_space: np.ndarray, offsets: np.ndarray
+) -> tuple:
+    """The vectorized counterpart of ss_parser.parse_retrans, see PARSERS."""
+    (retrans, total_retrans), valid = parse_rtts(buffer, is_space, offsets)
+    return (np.trunc(retrans), np.trunc(total_retrans)), valid
+
+
+def parse_timers(
+    buffer: np.ndarray, is_space: np.ndarray, offsets: np.ndarray
+) -> tuple:
+    """The vectorized counterpart of ss_parser.parse_timer, see PARSERS."""
+    windows = ss_columns.get_windows(buffer, offsets, TIMER_WIDTH)
+    positions = np.arange(TIMER_WIDTH)
+
+    # The value ends at the closing parenthesis and must consist of exactly three fields.
+    is_end = (windows == ord(")")) | IS_SPACE[windows]
+    end = np.argmax(is_end, axis=1)
+    is_comma = (windows == ord(",")) & (positions < end[:, None])
+    first_comma = np.argmax(is_comma, axis=1)
+    second_comma = np.argmax(is_comma & (positions > first_comma[:, None]), axis=1)
+    valid = is_end.any(axis=1) & (is_comma.sum(axis=1) == 2)
+    names = decode_bytes(buffer, offsets, np.where(valid, first_comma, 0))
+
+    # The expire time is the first run of digits, e.g. 1 in 1.2sec.
+    is_digit = (windows >= ord("0")) & (windows <= ord("9"))
+    is_expire_digit = (
+        is_digit
+        & (positions > first_comma[:, None])
+        & (positions < second_comma[:, None])
+    )
+    expire_times, _, expire_valid = ss_columns.parse_numbers(
+        buffer, offsets + np.argmax(is_expire_digit, axis=1)
+    )
+    retrans, retrans_ends, retrans_valid = ss_columns.parse_numbers(
+        buffer, offsets + second_comma + 1
+    )
+
+    valid &= is_expire_digit.any(axis=1) & expire_valid & retrans_valid
+    valid &= retrans_ends == offsets + end
+    return (names, np.trunc(expire_times), np.trunc(retrans)), valid
+
+
+# The vectorized counterpart of each of the parse functions of the fields in ss_parser.SS_SCHEMA.
+# Each takes the buffer, its whitespace mask and the offsets of the raw values and returns a tuple
+# containing the parts of the values and a mask telling which values are valid.
+PARSERS = {
+    ss_parser.parse_int: parse_ints,
+    ss_parser.parse_float: parse_floats,
+    ss_parser.parse_duration: parse_durations,
+    ss_parser.parse_rate: parse_rates,
+    ss_parser.parse_timer: parse_timers,
+    ss_parser.parse_rtt: parse_rtts,
+    ss_parser.parse_retrans: parse_retrans,
+}
+
+
+def assign_to_records(
+    records: np.ndarray,
+    num_records: int,
+    values: np.ndarray,
+    valid: np.ndarray,
+    field: ss_parser.SsField,
+) -> np.ma.MaskedArray:
+    """Assign the given values of a field to the records they were found in.
+
+    Only the last value of each record is used, since the later token of a key replaces the earlier one in ss_parser.tokenize.
+
+    Args:
+        records: The number of the record each value was found in, or -1 if it is not part of a record.
+        num_records: The number of records.
+        values: The values.
+        valid: A mask telling which values are valid.
+        field: The field in ss_parser.SS_SCHEMA.
+
+    Returns:
+        A masked array with one value per record, as in util.create_parsed_ss.
+    """
+    # The tokens were found in order, so the last value of a record is followed by another record.
+    in_record = records >= 0
+    records, values, valid = records[in_record], values[in_record], valid[in_record]
+    last_indices = np.flatnonzero(np.diff(records, append=-1))
+    record_indices = records[last_indices]
+    last_valid = valid[last_indices]
+
+    dtype = object if field.type is str else field.type
+    data = np.full(num_records, field.type(), dtype=dtype)
+    mask = np.ones(num_records, dtype=bool)
+    data[record_indices[last_valid]] = values[last_indices[last_valid]]
+    mask[record_indices[last_valid]] = False
+
+    if field.default is not None:
+        data[mask] = field.default
+        mask[:] = False
+
+    return np.ma.MaskedArray(data.astype(field.type), mask=mask)
+
+
+def get_cc_algo(
+    data: mmap.mmap | bytes, starts: np.ndarray, line_records: np.ndarray
+) -> str:
+    """Get the congestion control algorithm of the first record that contains it, as util.get_cc_algo does.
+
+    Args:
+        data: The memory map of the ss output file.
+        starts: The offsets of the first byte of each line.
+        line_records: The number of the record each line belongs to.
+
+    Returns:
+        The congestion control algorithm that was used.
+    """
+    for cc_algo_match in CC_ALGO_REGEX.finditer(data):
+        line = np.searchsorted(starts, cc_algo_match.start(), side="right") - 1
+        if line_records[line] >= 0:
+            return cc_algo_match.group(1).decode()
+
+    return ""
+
+
+def parse_buffer(buffer: np.ndarray, data: mmap.mmap | bytes) -> dict:
+    """Parse the ss outputs in the given bytes into their columnar form.
+
+    Args:
+        buffer: The bytes of the ss output file, which must end with a newline.
+        data: The memory map or bytes object that the buffer was created from.
+
+    Returns:
+        The columnar form as returned by util.create_parsed_ss.
+    """
+    is_space = IS_SPACE[buffer]
+    starts, line_records, first_starts, first_ends = get_line_records(buffer, is_space)
+    num_records = len(first_starts)
+
+    columns = {
+        "flow": np.ma.MaskedArray(
+            get_flows(buffer, is_space, first_starts, first_ends).astype(str)
+        )
+    }
+    anchors = {}
+    parsed_tokens = {}
+    for field in ss_parser.SS_SCHEMA:
+        if field.token not in parsed_tokens:
+            token = get_key_token(field.token)
+            offsets = ss_columns.find_token(buffer, anchors, token)
+            records = line_records[
+                np.searchsorted(starts, offsets - 1, side="right") - 1
+            ]
+            parsed_tokens[field.token] = (
+                records,
+                *PARSERS[field.parse](buffer, is_space, offsets),
+            )
+
+        records, parts, valid = parsed_tokens[field.token]
+        columns[field.name] = assign_to_records(
+            records, num_records, parts[field.part or 0], valid, field
+        )
+
+    return {"cc_algo": get_cc_algo(data, starts, line_records), "columns": columns}
+
+
+def parse_file(file_path: str | Path, offset: int = 0) -> dict:
+    """Parse the ss outputs in the given uncompressed file into their columnar form.
+
+    The file is memory mapped and scanned as a NumPy byte array, so the records are located and their numbers
+    converted into the columns with vectorized operations, without decoding the file or creating a string
+    per line or token. Only the distinct flows and timer names are decoded. The columns are the same as those
+    created by util.create_parsed_ss from ss_parser.iter_ss.
+
+    Args:
+        file_path: The path to the ss output file.
+        offset: The byte offset of the line at which to start parsing, e.g. as returned by
+            ss_index.locate_warmup_end, so that the bytes before it are not read (default: the start of the file).
+
+    Returns:
+        The columnar form as returned by util.create_parsed_ss.
+    """
+    # Empty files cannot be memory mapped.
+    data = b""
+    if Path(file_path).stat().st_size > 0:
+        with open(file_path, "rb") as file:
+            # The memory map is closed once the buffer is no longer referenced, since all of the columns are copies.
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if offset > 0:
+        data = memoryview(data)[offset:]
+
+    # Windows past the end repeat the last byte, which must not extend a number.
+    # Files that do not end with a newline are copied once with a newline appended.
+    if data[-1:] != b"\n":
+        data = bytes(data) + b"\n"
+
+    return parse_buffer(np.frombuffer(data, np.uint8), data)
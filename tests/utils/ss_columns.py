@@ -0,0 +1,352 @@
+import numpy as np
+
+from utils import ss_parser
+from utils import types
+
+# The maximum number of bytes of a number, including the decimal point.
+NUMBER_WIDTH = 20
+
+# Bytes that are rare in ss outputs, in order of preference. A token is located by first
+# finding all occurrences of one of these bytes and then checking the surrounding bytes.
+ANCHOR_BYTES = b"(_:d"
+
+# The maximum number of bytes of the timer name and expire time, e.g. "keepalive" and "1min12sec".
+TIMER_FIELD_WIDTH = 16
+
+# The bytes that directly follow a rate, mapped to the divisor that converts the rate to Mbps.
+# Divisors smaller than one are multiplied by their reciprocal instead.
+RATE_UNIT_DIVISORS = {b"b": 1000000.0, b"k": 1000.0, b"M": 1.0, b"G": 0.001}
+
+# The token prefix of each feature that is a plain number.
+NUMBER_FEATURE_TOKENS = {
+    types.Feature.CWND: b" cwnd:",
+    types.Feature.SSTHRESH: b" ssthresh:",
+    types.Feature.RTO: b" rto:",
+    types.Feature.RTT: b" rtt:",
+    types.Feature.LAST_SEND: b" lastsnd:",
+    types.Feature.PACING_RATE: b" pacing_rate ",
+}
+
+
+def to_buffer(ss_outputs: list) -> np.ndarray:
+    """Join the given ss outputs into a byte array that can be scanned with NumPy.
+
+    The array is padded, so that windows starting inside the text never run past its end.
+
+    Args:
+        ss_outputs: The ss outputs.
+
+    Returns:
+        The ss outputs joined by newlines as a padded byte array.
+    """
+    padding = "\n" * NUMBER_WIDTH
+    return np.frombuffer("\n".join([*ss_outputs, padding]).encode(), dtype=np.uint8)
+
+
+def get_record_ends(buffer: np.ndarray) -> np.ndarray:
+    """Get the offsets at which the newline-separated records in the given buffer end.
+
+    Args:
+        buffer: The byte array returned by to_buffer.
+
+    Returns:
+        The offsets of the newlines, used to map an offset to the index of its record.
+    """
+    return np.flatnonzero(buffer == ord("\n"))
+
+
+def get_anchor_offsets(
+    buffer: np.ndarray, anchors: dict, anchor_byte: int, prev_byte: int
+) -> np.ndarray:
+    """Get the offsets of the given anchor byte in the buffer where it directly follows the given byte.
+
+    The occurrences of each anchor byte are grouped by the byte preceding them once, so that every token
+    only has to check the occurrences of its anchor that are preceded by the same byte as in the token.
+
+    Args:
+        buffer: The byte array returned by to_buffer.
+        anchors: A dictionary caching the grouped offsets of the anchor bytes in the buffer.
+        anchor_byte: The anchor byte.
+        prev_byte: The byte preceding the anchor byte.
+
+    Returns:
+        The offsets of the anchor byte, in ascending order.
+    """
+    if anchor_byte not in anchors:
+        offsets = np.flatnonzero(buffer[1:] == anchor_byte) + 1
+        prev_bytes = buffer[offsets - 1]
+        order = np.argsort(prev_bytes, kind="stable")
+        bounds = np.searchsorted(prev_bytes[order], np.arange(257))
+        anchors[anchor_byte] = (offsets[order], bounds)
+
+    offsets, bounds = anchors[anchor_byte]
+    return offsets[bounds[prev_byte] : bounds[prev_byte + 1]]
+
+
+def find_token(buffer: np.ndarray, anchors: dict, token: bytes) -> np.ndarray:
+    """Find all occurrences of the given token in the buffer.
+
+    Args:
+        buffer: The byte array returned by to_buffer.
+        anchors: A dictionary caching the grouped offsets of the anchor bytes in the buffer.
+        token: The token to search for, which has to contain one of the anchor bytes after its first byte.
+
+    Returns:
+        The offsets of the bytes directly following each occurrence of the token.
+    """
+    anchor_index = next(
+        index for byte in ANCHOR_BYTES if (index := token.find(byte, 1)) > 0
+    )
+    candidates = (
+        get_anchor_offsets(
+            buffer, anchors, token[anchor_index], token[anchor_index - 1]
+        )
+        - anchor_index
+    )
+    candidates = candidates[
+        (candidates >= 0) & (candidates <= len(buffer) - len(token))
+    ]
+
+    # Check the bytes closest to the anchor first, since they narrow down the candidates the most.
+    # The anchor and the byte preceding it were already checked.
+    for i in sorted(range(len(token)), key=lambda i: abs(i - anchor_index))[2:]:
+        candidates = candidates[buffer[candidates + i] == token[i]]
+
+    return candidates + len(token)
+
+
+def get_windows(buffer: np.ndarray, offsets: np.ndarray, width: int) -> np.ndarray:
+    """Get the bytes starting at each of the given offsets.
+
+    Windows that run past the end of the buffer repeat its last byte, which is a newline
+    both for the padded buffers returned by to_buffer and for ss output files.
+
+    Args:
+        buffer: The byte array returned by to_buffer.
+        offsets: The offsets of the windows.
+        width: The number of bytes per window.
+
+    Returns:
+        A two-dimensional array with one row of bytes per offset.
+    """
+    return buffer.take(offsets[:, None] + np.arange(width), mode="clip")
+
+
+def find_byte(buffer: np.ndarray, offsets: np.ndarray, byte: bytes, width: int) -> tuple:
+    """Find the first occurrence of the given byte after each of the given offsets.
+
+    Args:
+        buffer: The byte array returned by to_buffer.
+        offsets: The offsets to start searching from.
+        byte: The byte to search for.
+        width: The number of bytes to search.
+
+    Returns:
+        A tuple containing the offsets of the found bytes and a mask telling which ones were found.
+    """
+    is_byte = get_windows(buffer, offsets, width) == ord(byte)
+    return offsets + np.argmax(is_byte, axis=1), is_byte.any(axis=1)
+
+
+def parse_numbers(buffer: np.ndarray, offsets: np.ndarray) -> tuple:
+    """Parse the unsigned decimal numbers starting at each of the given offsets.
+
+    The digits are combined into an integer mantissa that is divided by the power of ten
+    given by the number of decimals, so the result is the same as Python's float().
+
+    Args:
+        buffer: The byte array returned by to_buffer.
+        offsets: The offsets of the numbers.
+
+    Returns:
+        A tuple containing the parsed numbers, the offsets of the bytes following
+        the numbers and a mask telling which offsets contained a valid number.
+    """
+    windows = get_windows(buffer, offsets, NUMBER_WIDTH)
+    is_digit = (windows >= ord("0")) & (windows <= ord("9"))
+    rows = np.arange(len(offsets))
+
+    # The integer part ends at the first non-digit. If that is a decimal point followed by
+    # a digit, the number ends at the first non-digit after the decimal point instead.
+    int_length = np.argmin(is_digit, axis=1)
+    has_decimals = (windows[rows, int_length] == ord(".")) & (
+        is_digit[rows, np.minimum(int_length + 1, NUMBER_WIDTH - 1)]
+    )
+    after_int = np.arange(NUMBER_WIDTH) > int_length[:, None]
+    end = np.where(
+        has_decimals, np.argmax(after_int & ~is_digit, axis=1), int_length
+    )
+    frac_length = np.where(has_decimals, end - int_length - 1, 0)
+
+    mantissa = np.zeros(len(offsets), dtype=np.int64)
+    for position in range(end.max(initial=0)):
+        in_number = is_digit[:, position] & (position < end)
+        mantissa = np.where(
+            in_number, mantissa * 10 + (windows[:, position] - ord("0")), mantissa
+        )
+
+    return mantissa / 10.0**frac_length, offsets + end, int_length > 0
+
+
+def assign_to_records(
+    record_ends: np.ndarray,
+    num_records: int,
+    offsets: np.ndarray,
+    values: np.ndarray,
+    valid: np.ndarray,
+    dtype: type,
+) -> np.ma.MaskedArray:
+    """Assign the given values to the records they were found in.
+
+    Only the first value of each record is used.
+
+    Args:
+        record_ends: The offsets returned by get_record_ends.
+        num_records: The number of records in the buffer.
+        offsets: The offsets the values were found at.
+        values: The values.
+        valid: A mask telling which values are valid.
+        dtype: The type of the resulting column.
+
+    Returns:
+        A masked array with one value per record, where the records without a valid value are masked.
+    """
+    record_indices, first_indices = np.unique(
+        np.searchsorted(record_ends, offsets), return_index=True
+    )
+    first_values = values[first_indices]
+    first_valid = valid[first_indices] & (record_indices < num_records)
+
+    data = np.zeros(num_records, dtype=dtype)
+    mask = np.ones(num_records, dtype=bool)
+    data[record_indices[first_valid]] = first_values[first_valid]
+    mask[record_indices[first_valid]] = False
+
+    return np.ma.MaskedArray(data, mask=mask)
+
+
+def extract_rates(buffer: np.ndarray, offsets: np.ndarray) -> tuple:
+    """Parse the rates starting at each of the given offsets and convert them to Mbps.
+
+    Args:
+        buffer: The byte array returned by to_buffer.
+        offsets: The offsets of the rates.
+
+    Returns:
+        A tuple containing the rates in Mbps and a mask telling which rates were valid.
+    """
+    rates, ends, valid = parse_numbers(buffer, offsets)
+    units = buffer[ends]
+
+    unit_found = np.zeros(len(offsets), dtype=bool)
+    for unit, divisor in RATE_UNIT_DIVISORS.items():
+        is_unit = units == ord(unit)
+        unit_found |= is_unit
+        if divisor > 1:
+            rates[is_unit] /= divisor
+        elif divisor < 1:
+            rates[is_unit] *= round(1 / divisor)
+
+    return rates, valid & unit_found
+
+
+def extract_timer_fields(buffer: np.ndarray, offsets: np.ndarray) -> tuple:
+    """Parse the expire time and retrans of the timers starting at each of the given offsets.
+
+    Args:
+        buffer: The byte array returned by to_buffer.
+        offsets: The offsets directly following "timer:(".
+
+    Returns:
+        A tuple containing the expire times, retrans and a mask for each telling which
+        values were valid. Expire times that are not given in ms are treated as missing.
+    """
+    expire_offsets, name_found = find_byte(buffer, offsets, b",", TIMER_FIELD_WIDTH)
+    expire_times, expire_ends, expire_valid = parse_numbers(buffer, expire_offsets + 1)
+    in_ms = (buffer[expire_ends] == ord("m")) & (buffer[expire_ends + 1] == ord("s"))
+
+    retrans_offsets, expire_found = find_byte(
+        buffer, expire_offsets + 1, b",", TIMER_FIELD_WIDTH
+    )
+    retrans, retrans_ends, retrans_valid = parse_numbers(buffer, retrans_offsets + 1)
+    closed = buffer[retrans_ends] == ord(")")
+
+    return (
+        expire_times,
+        name_found & expire_valid & in_ms,
+        retrans,
+        name_found & expire_found & retrans_valid & closed,
+    )
+
+
+def extract_column(
+    buffer: np.ndarray,
+    anchors: dict,
+    record_ends: np.ndarray,
+    num_records: int,
+    feature: types.Feature,
+) -> np.ma.MaskedArray:
+    """Extract a single feature from the given buffer into a typed NumPy column.
+
+    Args:
+        buffer: The byte array returned by to_buffer.
+        anchors: A dictionary caching the offsets of the anchor bytes in the buffer.
+        record_ends: The offsets returned by get_record_ends.
+        num_records: The number of records in the buffer.
+        feature: The feature that should be extracted.
+
+    Returns:
+        A masked array with one value per record, where the records that did not contain the feature are masked.
+        Its type is the one of the field of the feature in ss_parser.SS_SCHEMA.
+    """
+    dtype = ss_parser.SS_SCHEMA_FIELDS[ss_parser.FEATURE_FIELDS[feature]].type
+
+    if feature in (types.Feature.EXPIRE_TIME, types.Feature.RETRANS):
+        offsets = find_token(buffer, anchors, b" timer:(")
+        expire_times, expire_valid, retrans, retrans_valid = extract_timer_fields(
+            buffer, offsets
+        )
+        if feature == types.Feature.EXPIRE_TIME:
+            values, valid = expire_times, expire_valid
+        else:
+            values, valid = retrans, retrans_valid
+    elif feature == types.Feature.RTT_VAR:
+        offsets = find_token(buffer, anchors, NUMBER_FEATURE_TOKENS[types.Feature.RTT])
+        _, rtt_ends, rtt_valid = parse_numbers(buffer, offsets)
+        values, _, valid = parse_numbers(buffer, rtt_ends + 1)
+        valid &= rtt_valid & (buffer[rtt_ends] == ord("/"))
+    elif feature == types.Feature.PACING_RATE:
+        offsets = find_token(buffer, anchors, NUMBER_FEATURE_TOKENS[feature])
+        values, valid = extract_rates(buffer, offsets)
+    else:
+        offsets = find_token(buffer, anchors, NUMBER_FEATURE_TOKENS[feature])
+        values, _, valid = parse_numbers(buffer, offsets)
+
+    return assign_to_records(record_ends, num_records, offsets, values, valid, dtype)
+
+
+def extract_columns(ss_outputs: list, features: list = None) -> dict:
+    """Extract the given features from all of the ss outputs into typed NumPy columns.
+
+    All of the ss outputs are scanned at once with vectorized NumPy operations,
+    without looping over the ss outputs in Python.
+
+    Args:
+        ss_outputs: The ss outputs.
+        features: The features that should be extracted (default: all features).
+
+    Returns:
+        A dictionary with the features as keys and masked arrays as values.
+        The arrays have one entry per ss output and the missing values are masked.
+    """
+    if features is None:
+        features = list(ss_parser.FEATURE_FIELDS)
+
+    buffer = to_buffer(ss_outputs)
+    anchors = {}
+    record_ends = get_record_ends(buffer)
+
+    return {
+        feature: extract_column(buffer, anchors, record_ends, len(ss_outputs), feature)
+        for feature in features
+    }
@@ -0,0 +1,264 @@
+import re
+import operator
+import numpy as np
+
+from pathlib import Path
+from typing import Iterable
+from utils import ss_sample
+
+# The version of the dataset layout, which is stored in the metadata of each dataset.
+SS_DATASET_VERSION = 1
+
+# The file containing the names, types and row groups of the columns of a dataset.
+METADATA_FILE = "metadata.npz"
+
+# The type of a column whose values are stored as indices into its categories.
+DICTIONARY = "dictionary"
+
+# The types that the columns of a dataset are stored as, keyed by the type of their values.
+COLUMN_DTYPES = {bool: "|b1", int: "<i8", float: "<f8", str: DICTIONARY}
+
+# The dtype of the indices of a dictionary column.
+DICTIONARY_INDEX_DTYPE = "<i4"
+
+# Matches the directory that data_capture.sh saves the output of a measurement in, e.g.
+# "reno/2bg_flows/100ms_50mbit_312500bytes_60s_half". The scenario is missing from older measurements.
+DIRECTORY_REGEX = re.compile(
+    r"(?P<cc_algo>[^/]+)/(?P<bg_flows>\d+)bg_flows/"
+    r"(?P<delay>\d+)ms_(?P<bandwidth>\d+)mbit_(?P<queue_size>\d+)bytes_(?P<duration>\d+)s"
+    r"(?:_(?P<scenario>[^/]+))?$"
+)
+
+# The metadata columns that are parsed from the directory of each ss output file and their defaults.
+METADATA_COLUMNS = {
+    "cc_algo": "",
+    "bg_flows": -1,
+    "delay": -1,
+    "bandwidth": -1,
+    "queue_size": -1,
+    "duration": -1,
+    "scenario": "",
+}
+
+
+def parse_directory_path(directory_path: str | Path) -> dict:
+    """Parse the parameters of a measurement from the directory that its output was saved in.
+
+    Args:
+        directory_path: The directory containing the ss output file.
+
+    Returns:
+        A dictionary with the congestion control algorithm, the number of background flows, the delay (ms),
+        the bandwidth (Mbit/s), the queue size (bytes), the duration (s) and the scenario of the measurement.
+        Parameters that are not part of the directory path are set to "" or -1.
+    """
+    metadata = dict(METADATA_COLUMNS)
+    match = DIRECTORY_REGEX.search(Path(directory_path).as_posix())
+    if match is None:
+        return metadata
+
+    for name, value in match.groupdict().items():
+        if value is not None:
+            metadata[name] = type(METADATA_COLUMNS[name])(value)
+
+    return metadata
+
+
+def get_column_path(path: str | Path, name: str) -> Path:
+    """Get the path of the file containing the values of the given column of a dataset.
+
+    Args:
+        path: The path to the dataset directory.
+        name: The name of the column.
+
+    Returns:
+        The path of the column file.
+    """
+    return Path(path) / f"{name}.bin"
+
+
+def get_column_dtype(name: str, value) -> str:
+    """Get the type that the given column of a dataset is stored as.
+
+    The type of a field of the samples is the one in ss_sample.SAMPLE_FIELD_TYPES and the type of a metadata
+    column is the one of its default in METADATA_COLUMNS, so it does not depend on the values of any single file.
+
+    Args:
+        name: The name of the column.
+        value: A value of the column, whose type is used for any other column.
+
+    Returns:
+        The type of the column, see COLUMN_DTYPES.
+    """
+    if name in METADATA_COLUMNS:
+        return COLUMN_DTYPES[type(METADATA_COLUMNS[name])]
+
+    return COLUMN_DTYPES[ss_sample.SAMPLE_FIELD_TYPES.get(name, type(value))]
+
+
+def create_dataset(
+    row_groups: Iterable[tuple], path: str | Path, columns: tuple
+) -> int:
+    """Create a columnar dataset from the given groups of rows, writing each group as soon as it is produced.
+
+    The values of each column are appended to their own file, so that a column can be loaded without
+    reading any of the others. The type of each column is given by get_column_dtype, and string columns
+    are stored as indices into a list of categories.
+
+    Args:
+        row_groups: An iterable of tuples with a dictionary of metadata, such as the one returned by
+        parse_directory_path, and a list of ss_sample.SsSample representing the measurements from ss.
+        The metadata is added to each of the measurements in the group.
+        path: The path to the dataset directory, which is created if it does not exist.
+        columns: The columns of the samples to store, in order, see ss_sample.get_columns.
+
+    Returns:
+        The number of rows in the dataset.
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+
+    dtypes = {}
+    categories = {}
+    files = {}
+    row_group_sizes = []
+    try:
+        for metadata, rows in row_groups:
+            if not rows:
+                continue
+
+            if not dtypes:
+                first_row = {name: getattr(rows[0], name) for name in columns}
+                first_row.update(metadata)
+                for name, value in first_row.items():
+                    dtypes[name] = get_column_dtype(name, value)
+                    if dtypes[name] == DICTIONARY:
+                        categories[name] = {}
+                    files[name] = open(get_column_path(path, name), "wb")
+
+            for name, dtype in dtypes.items():
+                if name in metadata:
+                    values = [metadata[name]] * len(rows)
+                else:
+                    values = list(map(operator.attrgetter(name), rows))
+
+                if dtype == DICTIONARY:
+                    column_categories = categories[name]
+                    values = [
+                        column_categories.setdefault(value, len(column_categories))
+                        for value in values
+                    ]
+                    dtype = DICTIONARY_INDEX_DTYPE
+
+                np.asarray(values, dtype=dtype).tofile(files[name])
+
+            row_group_sizes.append(len(rows))
+    finally:
+        for file in files.values():
+            file.close()
+
+    np.savez(
+        path / METADATA_FILE,
+        version=SS_DATASET_VERSION,
+        columns=np.array(list(dtypes), dtype=str),
+        dtypes=np.array(list(dtypes.values()), dtype=str),
+        row_groups=np.array(row_group_sizes, dtype=np.int64),
+        **{
+            f"categories_{name}": np.array(list(column_categories), dtype=str)
+            for name, column_categories in categories.items()
+        },
+    )
+
+    return sum(row_group_sizes)
+
+
+def add_columns(path: str | Path, columns: dict) -> None:
+    """Add the given columns to the columnar dataset at the given path, replacing any columns with the same names.
+
+    Args:
+        path: The path to the dataset directory.
+        columns: The boolean, integer or float arrays of the columns keyed by column name,
+        with a value for each of the rows of the dataset.
+    """
+    path = Path(path)
+    with np.load(path / METADATA_FILE) as metadata:
+        metadata = dict(metadata)
+
+    rows = int(metadata["row_groups"].sum())
+    names = metadata["columns"].tolist()
+    dtypes = metadata["dtypes"].tolist()
+    for name, values in columns.items():
+        values = np.asarray(values)
+        if len(values) != rows:
+            raise ValueError(
+                f"Column {name} has {len(values)} values, but the dataset has {rows} rows"
+            )
+
+        dtype = COLUMN_DTYPES[type(values.dtype.type(0).item())]
+        values.astype(dtype).tofile(get_column_path(path, name))
+        if name in names:
+            dtypes[names.index(name)] = dtype
+            metadata.pop(f"categories_{name}", None)
+        else:
+            names.append(name)
+            dtypes.append(dtype)
+
+    metadata["columns"] = np.array(names, dtype=str)
+    metadata["dtypes"] = np.array(dtypes, dtype=str)
+    np.savez(path / METADATA_FILE, **metadata)
+
+
+def load_dataset(path: str | Path) -> dict:
+    """Load the columnar dataset at the given path without copying or parsing any of the values.
+
+    The columns are memory mapped, so only the parts that are used are read from disk.
+
+    Args:
+        path: The path to the dataset directory.
+
+    Returns:
+        A dictionary with the read-only column arrays keyed by column name under "columns",
+        the categories of the dictionary columns under "categories" and the number of rows
+        in each of the row groups under "row_groups".
+        The arrays of dictionary columns contain the indices into their categories, see get_column.
+    """
+    path = Path(path)
+    with np.load(path / METADATA_FILE) as metadata:
+        if metadata["version"] != SS_DATASET_VERSION:
+            raise ValueError(f"Unsupported dataset version: {metadata['version']}")
+
+        row_groups = metadata["row_groups"]
+        rows = int(row_groups.sum())
+        columns = {}
+        categories = {}
+        for name, dtype in zip(metadata["columns"], metadata["dtypes"]):
+            name = str(name)
+            if dtype == DICTIONARY:
+                categories[name] = metadata[f"categories_{name}"]
+                dtype = DICTIONARY_INDEX_DTYPE
+
+            if rows == 0:
+                columns[name] = np.empty(0, dtype=dtype)
+            else:
+                columns[name] = np.memmap(
+                    get_column_path(path, name), dtype=dtype, mode="r", shape=(rows,)
+                )
+
+    return {"columns": columns, "categories": categories, "row_groups": row_groups}
+
+
+def get_column(dataset: dict, name: str) -> np.ndarray:
+    """Get the values of the given column of a dataset, decoding dictionary columns into their categories.
+
+    Args:
+        dataset: The dataset, as returned by load_dataset.
+        name: The name of the column.
+
+    Returns:
+        The values of the column.
+    """
+    column = dataset["columns"][name]
+    if name in dataset["categories"]:
+        return dataset["categories"][name][column]
+
+    return column
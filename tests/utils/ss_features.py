@@ -0,0 +1,144 @@
+from utils import ss_parser, ss_sample
+
+# The interval between two ss measurements in the timestamps of the features (ms),
+# which is assumed for measurements without a capture time, see ss_parser.add_capture_time.
+TIMESTAMP_INTERVAL = 20
+
+
+def create_state(fields: tuple = ss_parser.SS_RECORD_FIELDS) -> dict:
+    """Create the state of the features of a flow that has not been measured yet.
+
+    Args:
+        fields: The fields of the parsed measurements of the flow.
+
+    Returns:
+        A dictionary with the timestamp, the capture time of the first measurement, the running min and max values,
+        the last two distinct congestion windows and the previous value of each of the counter fields of the flow.
+    """
+    return {
+        "timestamp": 0,
+        "first_capture_time": None,
+        "min_rtt": 0,
+        "max_rtt": 0,
+        "min_cwnd": 0,
+        "max_cwnd": 0,
+        "min_ssthresh": 0,
+        "max_ssthresh": 0,
+        "cwnd": None,
+        "prev_distinct_cwnd": None,
+        "counters": {
+            field: 0
+            for field in fields
+            if ss_parser.SS_SCHEMA_FIELDS[field].kind == ss_parser.COUNTER
+        },
+    }
+
+
+def get_min_and_max(
+    value: int | float, min_value: int | float, max_value: int | float
+) -> tuple:
+    """Update the running min and max with the given value.
+
+    A min or max of 0 has not been set yet, as in util.add_min_and_max_rtt.
+
+    Args:
+        value: The current value.
+        min_value: The min of the previous values.
+        max_value: The max of the previous values.
+
+    Returns:
+        The min and max including the current value.
+    """
+    min_value = value if min_value == 0 or value < min_value else min_value
+    max_value = value if max_value == 0 or value > max_value else max_value
+    return min_value, max_value
+
+
+def add_rtt(state: dict, rtt: float) -> None:
+    """Add an rtt measured before the features are created, e.g. during a warmup period, to the min and max rtt.
+
+    Args:
+        state: The state of the flow, as returned by create_state, which is updated.
+        rtt: The round trip time (rtt).
+    """
+    state["min_rtt"], state["max_rtt"] = get_min_and_max(
+        rtt, state["min_rtt"], state["max_rtt"]
+    )
+
+
+def add_cwnd_diff(state: dict, sample: ss_sample.SsSample, cwnd: int) -> None:
+    """Add the difference between the given congestion window and the last congestion window value that was not the same.
+
+    If the current congestion window is 10 and the one directly before it was also 10, the difference is taken
+    to the last value before the plateau of 10s. The value is kept in the state, so this takes constant time
+    regardless of the length of the plateau. The difference is 0 until the congestion window has changed.
+
+    Args:
+        state: The state of the flow, as returned by create_state, which is updated.
+        sample: The sample to add the cwnd diff to.
+        cwnd: The current congestion window value.
+    """
+    if state["cwnd"] is not None and cwnd != state["cwnd"]:
+        state["prev_distinct_cwnd"] = state["cwnd"]
+    state["cwnd"] = cwnd
+
+    prev_distinct_cwnd = state["prev_distinct_cwnd"]
+    sample.cwnd_diff = 0 if prev_distinct_cwnd is None else cwnd - prev_distinct_cwnd
+
+
+def create_features(
+    state: dict, record: dict, capture_time: float | None = None
+) -> ss_sample.SsSample:
+    """Create the features of the given measurement of a flow in constant time.
+
+    The features are the fields of the measurement, its timestamp, the running min and max rtt, cwnd
+    and ssthresh, the cwnd diff, and the difference of each counter field, such as data_segments_sent,
+    to its previous value.
+
+    Args:
+        state: The state of the flow, as returned by create_state, which is updated.
+        record: The measurement, parsed by ss_parser.parse_record.
+        capture_time: The time the measurement was captured at in ms, see ss_parser.add_capture_time.
+            The timestamp is the time since the first measurement that was captured, or, if the
+            capture time is missing, a multiple of TIMESTAMP_INTERVAL.
+
+    Returns:
+        The sample with the features of the measurement. Features that could not be derived,
+        e.g. the cwnd diff of a measurement without a cwnd, are None.
+    """
+    sample = ss_sample.SsSample(**record)
+    rtt, cwnd, ssthresh = record["rtt"], record["cwnd"], record["ssthresh"]
+
+    # Add the timestamp (ms when ss was ran).
+    if capture_time is not None:
+        if state["first_capture_time"] is None:
+            state["first_capture_time"] = capture_time - state["timestamp"]
+        state["timestamp"] = round(capture_time - state["first_capture_time"], 3)
+    sample.timestamp = state["timestamp"]
+    state["timestamp"] += TIMESTAMP_INTERVAL
+
+    if rtt is not None:
+        add_rtt(state, rtt)
+        sample.min_rtt, sample.max_rtt = state["min_rtt"], state["max_rtt"]
+
+    if cwnd is not None:
+        add_cwnd_diff(state, sample, cwnd)
+        state["min_cwnd"], state["max_cwnd"] = get_min_and_max(
+            cwnd, state["min_cwnd"], state["max_cwnd"]
+        )
+        sample.min_cwnd, sample.max_cwnd = state["min_cwnd"], state["max_cwnd"]
+
+    if ssthresh is not None:
+        state["min_ssthresh"], state["max_ssthresh"] = get_min_and_max(
+            ssthresh, state["min_ssthresh"], state["max_ssthresh"]
+        )
+        sample.min_ssthresh = state["min_ssthresh"]
+        sample.max_ssthresh = state["max_ssthresh"]
+
+    counters = state["counters"]
+    for field, prev_value in counters.items():
+        if record[field] is not None:
+            setattr(sample, field, record[field] - prev_value)
+            counters[field] = record[field]
+
+    return sample
@@ -0,0 +1,382 @@
+import gzip
+import itertools
+import mmap
+import os
+import re
+import numpy as np
+
+from pathlib import Path
+from typing import BinaryIO, Iterator
+from utils import ss_parser
+
+# The arrays stored in an index.
+INDEX_ARRAYS = ("offsets", "flows", "cumulative_rtts")
+
+# Matches the rtt token of an ss line, e.g. "rtt:99.413/0.261".
+RTT_REGEX = re.compile(rb"(?<!\S)rtt:(\d+(?:\.\d+)?)/")
+
+# Matches the peer address of the first line of an ss record as bytes, see ss_parser.ADDRESS_REGEX.
+ADDRESS_REGEX = re.compile(ss_parser.ADDRESS_REGEX.pattern.encode())
+
+# The number of bytes of a gzip compressed ss output file that are decompressed and scanned at a time.
+WARMUP_CHUNK_SIZE = 1 << 20
+
+
+def get_index_path(file_path: str | Path) -> Path:
+    """Get the path of the sidecar index of the given ss output file.
+
+    Args:
+        file_path: The path to the ss output file.
+
+    Returns:
+        The path of the index, which is stored next to the ss output file.
+    """
+    file_path = Path(file_path)
+    return file_path.with_name(f"{file_path.name}.index.npz")
+
+
+def build_index(file_path: str | Path) -> dict:
+    """Build an index of the records in the given ss output file in a single pass over the memory mapped file.
+
+    The records are found the same way as in ss_parser.iter_records. The cumulative rtt of a record
+    is the sum of the rtts of all of the records of the same flow before it, which is the position
+    used for the warmup period in txt_to_csv.iter_samples.
+
+    Args:
+        file_path: The path to the uncompressed ss output file.
+
+    Returns:
+        A dictionary with the byte offset at which each record starts under "offsets", the flow of each
+        record (see ss_parser.get_flow) under "flows" and the cumulative rtt (ms) before each record under "cumulative_rtts".
+    """
+    offsets = []
+    flows = []
+    cumulative_rtts = []
+    flow_rtts = {}
+
+    with open(file_path, "rb") as file:
+        if os.fstat(file.fileno()).st_size > 0:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                offset = 0
+                record_offset = first_line = None
+                for line in iter(data.readline, b""):
+                    if not line.strip() or ss_parser.is_header(line.decode()):
+                        pass
+                    elif not line[:1].isspace():
+                        record_offset, first_line = offset, line
+                    elif record_offset is not None:
+                        flow = ss_parser.get_flow(first_line.decode()) or ""
+                        offsets.append(record_offset)
+                        flows.append(flow)
+                        cumulative_rtts.append(flow_rtts.get(flow, 0.0))
+
+                        rtt_match = RTT_REGEX.search(first_line + line)
+                        if rtt_match:
+                            flow_rtts[flow] = cumulative_rtts[-1] + float(
+                                rtt_match.group(1)
+                            )
+                        record_offset = first_line = None
+
+                    offset += len(line)
+
+    return {
+        "offsets": np.array(offsets, dtype=np.int64),
+        "flows": np.array(flows, dtype=str),
+        "cumulative_rtts": np.array(cumulative_rtts, dtype=np.float64),
+    }
+
+
+def load_index(file_path: str | Path) -> dict:
+    """Load the sidecar index of the given ss output file, or build and save it if it is missing or outdated.
+
+    The index is outdated if the size or modification time of the ss output file or the parser version has changed.
+
+    Args:
+        file_path: The path to the uncompressed ss output file.
+
+    Returns:
+        The index, as returned by build_index.
+    """
+    stat = os.stat(file_path)
+    key = {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "parser_version": ss_parser.SS_PARSER_VERSION,
+    }
+    index_path = get_index_path(file_path)
+
+    if index_path.is_file():
+        with np.load(index_path) as index:
+            up_to_date = all(
+                name in index and index[name] == value for name, value in key.items()
+            )
+            if up_to_date:
+                return {name: index[name] for name in INDEX_ARRAYS}
+
+    index = build_index(file_path)
+    np.savez(index_path, **key, **index)
+
+    return index
+
+
+def get_flow_records(index: dict, flow: str = None) -> np.ndarray:
+    """Get the numbers of the records of the given flow.
+
+    Args:
+        index: The index, as returned by load_index.
+        flow: The flow (default: all flows).
+
+    Returns:
+        The numbers of the records of the flow, in ascending order.
+    """
+    if flow is None:
+        return np.arange(len(index["offsets"]))
+
+    return np.flatnonzero(index["flows"] == flow)
+
+
+def get_record_at_rtt(index: dict, cumulative_rtt: float, flow: str = None) -> int:
+    """Get the first record whose cumulative rtt exceeds the given one.
+
+    For example, a cumulative rtt of 30000 gives the first record after the 30 second warmup period.
+
+    Args:
+        index: The index, as returned by load_index.
+        cumulative_rtt: The cumulative rtt (ms).
+        flow: The flow whose records should be searched (default: all flows).
+
+    Returns:
+        The number of the record, or the number of records if no record exceeds the cumulative rtt.
+    """
+    records = get_flow_records(index, flow)
+    position = np.searchsorted(
+        index["cumulative_rtts"][records], cumulative_rtt, side="right"
+    )
+    if position == len(records):
+        return len(index["offsets"])
+
+    return int(records[position])
+
+
+def read_records(
+    file_path: str | Path, index: dict, start: int = 0, end: int = None
+) -> Iterator[str]:
+    """Lazily read a range of records from the given ss output file by seeking straight to the first of them.
+
+    Args:
+        file_path: The path to the uncompressed ss output file.
+        index: The index of the file, as returned by load_index.
+        start: The number of the first record that should be read.
+        end: The number of the record after the last one that should be read (default: the end of the file).
+
+    Yields:
+        The ss records in the range, i.e. the two joined lines of each ss measurement.
+    """
+    offsets = index["offsets"]
+    start, end, _ = slice(start, end).indices(len(offsets))
+    if start >= end:
+        return
+
+    with open(file_path, "rb") as file:
+        file.seek(offsets[start])
+        lines = (line.decode() for line in file)
+        yield from itertools.islice(ss_parser.iter_records(lines), end - start)
+
+
+def get_warmup_end(rtts: np.ndarray, threshold: float) -> int:
+    """Get the number of the first measurement after the warmup period of the given rtts.
+
+    The warmup period lasts until the cumulative rtt of the measurements exceeds the threshold,
+    so the first measurement after it is the one after the measurement that exceeds the threshold.
+
+    Args:
+        rtts: The rtt (ms) of each of the measurements of a flow, or 0 if a measurement has no rtt.
+        threshold: The cumulative rtt (ms) that ends the warmup period, e.g. 30000 for 30 seconds.
+
+    Returns:
+        The number of the first measurement after the warmup period, or the number of measurements if there is none.
+    """
+    exceeding = np.searchsorted(np.cumsum(rtts), threshold, side="right")
+    return min(int(exceeding) + 1, len(rtts))
+
+
+def is_record_of_flow(data: bytes, position: int, local: bytes, peer: bytes) -> bool:
+    """Check whether the record containing the given position in its second line belongs to the given flow.
+
+    The first line of the record is compared as bytes the same way as in ss_parser.get_flow,
+    so it does not have to be decoded.
+
+    Args:
+        data: The content of the ss output file.
+        position: A position in the second line of a record.
+        local: The local address of the flow.
+        peer: The peer address of the flow.
+
+    Returns:
+        True if the record belongs to the flow.
+    """
+    line_start = data.rfind(b"\n", 0, position) + 1
+    record_start = data.rfind(b"\n", 0, max(line_start - 1, 0)) + 1
+    tokens = data[record_start:line_start].split(maxsplit=6)
+    if tokens[:1] == [b"tcp"]:
+        tokens = tokens[1:]
+
+    if len(tokens) < 5 or tokens[3] != local:
+        return False
+
+    peer_match = ADDRESS_REGEX.match(tokens[4])
+    return peer_match is not None and peer_match.group() == peer
+
+
+def create_warmup() -> dict:
+    """Create the warmup period of a flow before any of its rtts have been scanned.
+
+    Returns:
+        A dictionary with the cumulative rtt (ms) under "cumulative_rtt" and the min and max rtt (ms)
+        under "min_rtt" and "max_rtt", which are None until an rtt has been scanned.
+    """
+    return {"cumulative_rtt": 0.0, "min_rtt": None, "max_rtt": None}
+
+
+def scan_warmup(
+    data: bytes,
+    threshold: float,
+    flow: str | None,
+    warmup: dict,
+    start: int = 0,
+    end: int = None,
+) -> int | None:
+    """Scan the rtt tokens in the given range of the ss output for the end of the warmup period.
+
+    Args:
+        data: The content of the ss output, e.g. a memory map.
+        threshold: The cumulative rtt (ms) that ends the warmup period, e.g. 30000 for 30 seconds.
+        flow: The flow whose rtts are summed, see ss_parser.get_flow, or None to sum the rtts of all records.
+        warmup: The cumulative, min and max rtt (ms) of the warmup period scanned so far, see create_warmup,
+            which are updated with the rtts in the range.
+        start: The offset at which the range starts.
+        end: The offset at which the range ends (default: the end of the data).
+
+    Returns:
+        The byte offset of the line after the record at which the cumulative rtt exceeds the threshold,
+        or None if it does not exceed it in the range.
+    """
+    end = len(data) if end is None else end
+    local, _, peer = (flow or "").encode().partition(b" ")
+    for match in RTT_REGEX.finditer(data, start, end):
+        if flow is not None and not is_record_of_flow(
+            data, match.start(), local, peer
+        ):
+            continue
+
+        rtt = float(match.group(1))
+        warmup["cumulative_rtt"] += rtt
+        if warmup["min_rtt"] is None or rtt < warmup["min_rtt"]:
+            warmup["min_rtt"] = rtt
+        if warmup["max_rtt"] is None or rtt > warmup["max_rtt"]:
+            warmup["max_rtt"] = rtt
+        if warmup["cumulative_rtt"] > threshold:
+            line_end = data.find(b"\n", match.end(), end)
+            return end if line_end == -1 else line_end + 1
+
+    return None
+
+
+def find_warmup_offset(data: bytes, threshold: float, flow: str = None) -> int:
+    """Find the byte offset at which the measurements after the warmup period start in the given ss output.
+
+    Only the rtt tokens are searched for and the search stops at the first one at which the cumulative rtt
+    exceeds the threshold, so nothing after the offset is read. See get_warmup_end.
+
+    Args:
+        data: The content of the ss output file, e.g. a memory map.
+        threshold: The cumulative rtt (ms) that ends the warmup period, e.g. 30000 for 30 seconds.
+        flow: The flow whose rtts are summed, see ss_parser.get_flow (default: all records).
+
+    Returns:
+        The byte offset of the line after the last record of the warmup period,
+        or the length of the data if the cumulative rtt never exceeds the threshold.
+    """
+    offset = scan_warmup(data, threshold, flow, create_warmup())
+    return len(data) if offset is None else offset
+
+
+def stream_warmup(file: BinaryIO, threshold: float, flow: str, warmup: dict) -> int:
+    """Scan the given ss output stream for the end of the warmup period, WARMUP_CHUNK_SIZE bytes at a time.
+
+    The incomplete line at the end of a chunk is only scanned once the next chunk completes it, and
+    the last complete line before it is kept along with it, as it may be the first line of its record.
+
+    Args:
+        file: The ss output stream, opened in binary mode.
+        threshold: The cumulative rtt (ms) that ends the warmup period.
+        flow: The flow whose rtts are summed, or None to sum the rtts of all records.
+        warmup: The warmup period, see create_warmup, which is updated with the scanned rtts.
+
+    Returns:
+        The byte offset in the stream as returned by find_warmup_offset.
+    """
+    buffer = b""
+    buffer_offset = 0
+    scanned = 0
+    while chunk := file.read(WARMUP_CHUNK_SIZE):
+        buffer += chunk
+        complete = buffer.rfind(b"\n") + 1
+        offset = scan_warmup(buffer, threshold, flow, warmup, scanned, complete)
+        if offset is not None:
+            return buffer_offset + offset
+
+        kept = buffer.rfind(b"\n", 0, max(complete - 1, 0)) + 1
+        buffer = buffer[kept:]
+        buffer_offset += kept
+        scanned = complete - kept
+
+    offset = scan_warmup(buffer, threshold, flow, warmup, scanned)
+    return buffer_offset + (len(buffer) if offset is None else offset)
+
+
+def locate_warmup(file_path: str | Path, threshold: float, flow: str = None) -> dict:
+    """Locate the warmup period of the given ss output file.
+
+    Uncompressed files are memory mapped, so only the pages containing rtt tokens are scanned, and gzip
+    compressed files are decompressed a chunk at a time until the end of the warmup period is found.
+
+    Args:
+        file_path: The path to the ss output file. The offset of a gzip compressed file is in the decompressed data.
+        threshold: The cumulative rtt (ms) that ends the warmup period, e.g. 30000 for 30 seconds.
+        flow: The flow whose rtts are summed, see ss_parser.get_flow (default: all records).
+
+    Returns:
+        The warmup period, see create_warmup, along with the byte offset at which the measurements after it
+        start, as returned by find_warmup_offset, under "offset". The min and max rtt include the rtt
+        of the record at which the cumulative rtt exceeds the threshold, as in txt_to_csv.iter_samples.
+    """
+    warmup = create_warmup()
+    if Path(file_path).suffix == ".gz":
+        with gzip.open(file_path, "rb") as file:
+            warmup["offset"] = stream_warmup(file, threshold, flow, warmup)
+            return warmup
+
+    with open(file_path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            warmup["offset"] = 0
+            return warmup
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            offset = scan_warmup(data, threshold, flow, warmup)
+            warmup["offset"] = len(data) if offset is None else offset
+            return warmup
+
+
+def locate_warmup_end(file_path: str | Path, threshold: float, flow: str = None) -> int:
+    """Locate the byte offset at which the measurements after the warmup period start in the given ss output file.
+
+    Args:
+        file_path: The path to the ss output file. The offset of a gzip compressed file is in the decompressed data.
+        threshold: The cumulative rtt (ms) that ends the warmup period, e.g. 30000 for 30 seconds.
+        flow: The flow whose rtts are summed, see ss_parser.get_flow (default: all records).
+
+    Returns:
+        The byte offset, as returned by find_warmup_offset.
+    """
+    return locate_warmup(file_path, threshold, flow)["offset"]
@@ -0,0 +1,159 @@
+import numpy as np
+
+
+def get_segment_starts(timestamps: np.ndarray) -> np.ndarray:
+    """Find where each flow starts in the given timestamps of consecutive flows.
+
+    The timestamps of a flow increase with each measurement, so a new flow starts wherever they do not.
+
+    Args:
+        timestamps: The timestamps (ms) of the measurements, such as the timestamp column of txt_to_csv.
+
+    Returns:
+        A boolean array that is True for the first measurement of each flow.
+    """
+    segment_starts = np.ones(len(timestamps), dtype=bool)
+    segment_starts[1:] = np.diff(timestamps) <= 0
+    return segment_starts
+
+
+def get_loss_events(
+    cwnd: np.ndarray,
+    segment_starts: np.ndarray = None,
+    lost_segments: np.ndarray = None,
+    retrans: np.ndarray = None,
+) -> np.ndarray:
+    """Find the measurements at which a loss was detected.
+
+    A loss is detected when the congestion window is smaller than in the previous measurement, which is the drop
+    that label_packet in txt_to_csv labels the measurement before, or optionally when the kernel reports more lost
+    segments than in the previous measurement or any retransmissions.
+
+    Args:
+        cwnd: The congestion window of each measurement.
+        segment_starts: Where each flow starts, as returned by get_segment_starts (default: a single flow).
+        lost_segments: The number of segments currently considered lost of each measurement.
+        retrans: The number of retransmissions since the previous measurement, such as the total_retrans column of txt_to_csv.
+
+    Returns:
+        A boolean array that is True for each measurement at which a loss was detected.
+    """
+    cwnd = np.asarray(cwnd)
+    events = np.zeros(len(cwnd), dtype=bool)
+    events[1:] = cwnd[1:] < cwnd[:-1]
+
+    if lost_segments is not None:
+        lost_segments = np.asarray(lost_segments)
+        events[1:] |= lost_segments[1:] > lost_segments[:-1]
+
+    if retrans is not None:
+        events |= np.asarray(retrans) > 0
+
+    # The first measurement of a flow is compared to the previous flow, so it is never a loss.
+    if segment_starts is not None:
+        events &= ~segment_starts
+
+    return events
+
+
+def get_segment_ends(segment_starts: np.ndarray) -> np.ndarray:
+    """Get the last measurement of the flow of each measurement.
+
+    Args:
+        segment_starts: Where each flow starts, as returned by get_segment_starts.
+
+    Returns:
+        The index of the last measurement of the flow of each measurement.
+    """
+    starts = np.flatnonzero(segment_starts)
+    ends = np.append(starts[1:], len(segment_starts))[: len(starts)]
+    return np.repeat(ends - 1, ends - starts)
+
+
+def label_sample_horizons(
+    events: np.ndarray,
+    horizons: list,
+    segment_starts: np.ndarray = None,
+    repeats: np.ndarray = None,
+) -> dict:
+    """Label each measurement by whether a loss is detected within the given numbers of following measurements.
+
+    Each horizon takes a constant number of vectorized operations, using the cumulative number of losses.
+
+    Args:
+        events: The loss events, as returned by get_loss_events.
+        horizons: The numbers of following measurements, e.g. [1, 5, 10].
+        segment_starts: Where each flow starts, as returned by get_segment_starts (default: a single flow).
+        repeats: The number of measurements that each row stands for, such as the repeat column of txt_to_csv --coalesce,
+            so that the horizons count measurements instead of rows (default: one measurement per row).
+
+    Returns:
+        A dictionary with a boolean array of labels for each of the horizons, keyed by horizon.
+        The labels near the end of a flow only cover the measurements that are left.
+    """
+    if segment_starts is None:
+        segment_starts = np.zeros(len(events), dtype=bool)
+        segment_starts[:1] = True
+
+    cumulative_events = np.cumsum(events)
+    indices = np.arange(len(events))
+    segment_ends = get_segment_ends(segment_starts)
+
+    # The position of the first measurement of each row among all of the measurements.
+    positions = indices
+    if repeats is not None:
+        repeats = np.asarray(repeats)
+        positions = np.cumsum(repeats) - repeats
+
+    labels = {}
+    for horizon in horizons:
+        last_indices = indices + horizon
+        if repeats is not None:
+            last_indices = (
+                np.searchsorted(positions, positions + horizon, side="right") - 1
+            )
+
+        labels[horizon] = (
+            cumulative_events[np.minimum(last_indices, segment_ends)]
+            > cumulative_events
+        )
+
+    return labels
+
+
+def label_time_horizons(
+    events: np.ndarray,
+    timestamps: np.ndarray,
+    horizons: list,
+    segment_starts: np.ndarray = None,
+) -> dict:
+    """Label each measurement by whether a loss is detected within the given time after it.
+
+    The time until the next loss in the same flow is found once for all of the measurements,
+    so each horizon takes a single comparison.
+
+    Args:
+        events: The loss events, as returned by get_loss_events.
+        timestamps: The timestamps (ms) of the measurements.
+        horizons: The times after each measurement (ms), e.g. [100, 500].
+        segment_starts: Where each flow starts (default: as returned by get_segment_starts for the timestamps).
+
+    Returns:
+        A dictionary with a boolean array of labels for each of the horizons, keyed by horizon.
+        The labels near the end of a flow only cover the measurements that are left.
+    """
+    if segment_starts is None:
+        segment_starts = get_segment_starts(timestamps)
+
+    timestamps = np.asarray(timestamps)
+    segment_ends = get_segment_ends(segment_starts)
+
+    # The number of losses up to each measurement is the position of the next loss among all of the losses.
+    # A measurement without a next loss gets the number of measurements, which is after the end of its flow.
+    next_indices = np.append(np.flatnonzero(events), len(events))[np.cumsum(events)]
+    has_next = next_indices <= segment_ends
+
+    delays = np.full(len(events), np.inf)
+    delays[has_next] = timestamps[next_indices[has_next]] - timestamps[has_next]
+
+    return {horizon: delays <= horizon for horizon in horizons}
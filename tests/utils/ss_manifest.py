@@ -0,0 +1,189 @@
+import hashlib
+import json
+import os
+
+from pathlib import Path
+from utils import ss_parser
+
+# Increase whenever the rows that txt_to_csv creates from an ss output file change, e.g. when
+# a feature or the labeling changes, so that outdated shards are not reused.
+SS_MANIFEST_VERSION = 1
+
+# The file in the shard directory that describes the ss output file each of the shards was created from.
+MANIFEST_FILE = "manifest.json"
+
+
+def get_shard_directory(output_path: str | Path) -> Path:
+    """Get the path of the directory containing the shards and manifest of the given output file.
+
+    Args:
+        output_path: The path to the csv file created from the shards.
+
+    Returns:
+        The path of the shard directory, which is stored next to the output file.
+    """
+    output_path = Path(output_path)
+    return output_path.with_name(f"{output_path.name}.shards")
+
+
+def get_shard_name(file_path: str | Path) -> str:
+    """Get the name of the shard of the given ss output file.
+
+    The name is derived from the absolute path, so files with the same name in different directories get different shards.
+
+    Args:
+        file_path: The path to the ss output file.
+
+    Returns:
+        The file name of the shard.
+    """
+    path = str(Path(file_path).resolve())
+    return f"{hashlib.sha256(path.encode()).hexdigest()[:16]}.csv"
+
+
+def get_file_hash(file_path: str | Path) -> str:
+    """Hash the contents of the given file.
+
+    Args:
+        file_path: The path to the file.
+
+    Returns:
+        The hexadecimal SHA-256 digest of the file.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        # The file is read in chunks of 1 MiB, so hashing it does not require holding it in memory.
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def get_file_entry(file_path: str | Path, prev_entry: dict | None = None) -> dict:
+    """Get the entry that identifies the contents of the given ss output file in a manifest.
+
+    The file is only hashed if its size or modification time differs from the previous entry,
+    so checking a file that has not been touched does not require reading it.
+
+    Args:
+        file_path: The path to the ss output file.
+        prev_entry: The entry of the file in the previous manifest, if any.
+
+    Returns:
+        A dictionary containing the size, modification time and hash of the file.
+    """
+    stat = os.stat(file_path)
+    entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if prev_entry is not None and all(
+        prev_entry.get(name) == value for name, value in entry.items()
+    ):
+        entry["hash"] = prev_entry["hash"]
+    else:
+        entry["hash"] = get_file_hash(file_path)
+
+    return entry
+
+
+def create_manifest(columns: tuple) -> dict:
+    """Create a manifest without any shards.
+
+    Args:
+        columns: The columns of the rows in the shards.
+
+    Returns:
+        A dictionary containing the versions of the parser and the manifest, the columns, and the entry
+        of each of the ss output files that a shard was created from keyed by their absolute path under "files".
+    """
+    return {
+        "version": SS_MANIFEST_VERSION,
+        "parser_version": ss_parser.SS_PARSER_VERSION,
+        "columns": list(columns),
+        "files": {},
+    }
+
+
+def load_manifest(shard_directory: str | Path, columns: tuple) -> dict:
+    """Load the manifest of the given shard directory.
+
+    Args:
+        shard_directory: The path to the shard directory.
+        columns: The columns of the rows that the shards should contain.
+
+    Returns:
+        The manifest as returned by create_manifest. A manifest without any shards is returned if there is
+        no manifest, or if it was created with a different parser, manifest version or columns.
+    """
+    manifest = create_manifest(columns)
+    manifest_path = Path(shard_directory) / MANIFEST_FILE
+    if not manifest_path.is_file():
+        return manifest
+
+    try:
+        with open(manifest_path) as manifest_file:
+            prev_manifest = json.load(manifest_file)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring invalid manifest {manifest_path}: {e}")
+        return manifest
+
+    if any(
+        prev_manifest.get(name) != value
+        for name, value in manifest.items()
+        if name != "files"
+    ):
+        return manifest
+
+    return prev_manifest
+
+
+def save_manifest(shard_directory: str | Path, manifest: dict) -> None:
+    """Save the manifest in the given shard directory.
+
+    The manifest is replaced atomically, so an interrupted rebuild never leaves a manifest behind
+    that describes shards that were not written.
+
+    Args:
+        shard_directory: The path to the shard directory.
+        manifest: The manifest as returned by create_manifest.
+    """
+    manifest_path = Path(shard_directory) / MANIFEST_FILE
+    temp_path = manifest_path.with_name(f"{MANIFEST_FILE}.tmp")
+    with open(temp_path, "w") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+
+    os.replace(temp_path, manifest_path)
+
+
+def get_stale_paths(
+    shard_directory: str | Path, manifest: dict, file_paths: list
+) -> tuple:
+    """Find the ss output files whose shards are missing or outdated.
+
+    Args:
+        shard_directory: The path to the shard directory.
+        manifest: The manifest of the shard directory, as returned by load_manifest.
+        file_paths: The absolute paths to the ss output files.
+
+    Returns:
+        A tuple containing a list of the paths whose shards have to be created and a dictionary with the
+        current entry of each of the files keyed by path, see get_file_entry, along with the name of its shard.
+        The entries of files whose shards are current also contain their number of rows.
+    """
+    stale_paths = []
+    entries = {}
+    for file_path in file_paths:
+        prev_entry = manifest["files"].get(str(file_path))
+        entry = get_file_entry(file_path, prev_entry)
+        entry["shard"] = get_shard_name(file_path)
+        shard_path = Path(shard_directory) / entry["shard"]
+        if (
+            prev_entry is None
+            or prev_entry["hash"] != entry["hash"]
+            or not shard_path.is_file()
+        ):
+            stale_paths.append(file_path)
+        else:
+            entry["rows"] = prev_entry["rows"]
+
+        entries[str(file_path)] = entry
+
+    return stale_paths, entries
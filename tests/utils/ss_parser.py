@@ -0,0 +1,470 @@
+import functools
+import gzip
+import re
+
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, NamedTuple, TextIO
+from utils import types
+
+DIGITS_REGEX = re.compile(r"(\d+)")
+
+# Matches an address and port, which is followed directly by the info line when there is no timer.
+ADDRESS_REGEX = re.compile(r"\S*:(?:\d+|\*)")
+
+# The kinds of ss fields. Counters only ever grow during a connection, gauges describe its current state.
+COUNTER = "counter"
+GAUGE = "gauge"
+
+# ss prints these fields as "key value" instead of "key:value".
+SPACE_SEPARATED_KEYS = ("send", "pacing_rate", "delivery_rate")
+
+# Increase whenever the parsing changes, so that outdated parsed captures are not reused.
+SS_PARSER_VERSION = 4
+
+# The key of the token with the time each measurement was captured at, which capture_ss.py adds to the ss output.
+CAPTURE_TIME = "capture_time"
+
+# Divisors (< 1 for multiples of Mbps) used to convert an ss rate to Mbps.
+RATE_UNITS = {"": 1000000.0, "k": 1000.0, "M": 1.0, "G": 0.001}
+
+
+def open_ss(file_path: str | Path) -> TextIO:
+    """Open the ss output file located at the given path for reading.
+
+    Files ending in .gz, such as the merged files created by merge_data.py, are decompressed on the fly.
+
+    Args:
+        file_path: The path to the ss output file.
+
+    Returns:
+        The opened file in text mode.
+    """
+    if Path(file_path).suffix == ".gz":
+        return gzip.open(file_path, "rt")
+
+    return open(file_path)
+
+
+def is_header(line: str) -> bool:
+    """Check if the given line is the header ss prints before each poll.
+
+    Args:
+        line: A line of the ss output.
+
+    Returns:
+        True if the line is a header, False otherwise.
+    """
+    return "Netid" in line or line.startswith("State")
+
+
+def iter_records(lines: Iterable[str]) -> Iterator[str]:
+    """Lazily join the two lines of each ss measurement in the given lines into a record.
+
+    The first line of a measurement describes the socket and the second, indented line contains
+    its statistics. Headers and sockets without statistics, e.g. in the TIME-WAIT state, are skipped.
+
+    Args:
+        lines: The lines of the ss output, for example an open file.
+
+    Yields:
+        The ss records, i.e. the two joined lines of each ss measurement.
+    """
+    packet = None
+    for line in lines:
+        if not line.strip() or is_header(line):
+            continue
+
+        if not line[0].isspace():
+            packet = line.strip()
+        elif packet is not None:
+            yield packet + line.strip()
+            packet = None
+
+
+def add_capture_time(output: str, capture_time: float) -> str:
+    """Stamp each of the measurements in the given ss output with the time it was captured at.
+
+    The time is appended as a capture_time token to the indented statistics line of each measurement,
+    so it ends up in the record and is extracted like any other field. Headers and socket lines are unchanged.
+
+    Args:
+        output: The ss output of a single poll.
+        capture_time: The time the poll was captured at in ms, e.g. since the start of the capture.
+
+    Returns:
+        The stamped ss output.
+    """
+    token = f" {CAPTURE_TIME}:{capture_time:.3f}"
+    return "".join(
+        f"{line.rstrip()}{token}\n" if line[:1].isspace() and line.strip() else line
+        for line in output.splitlines(keepends=True)
+    )
+
+
+def get_flow(record: str) -> str | None:
+    """Get the flow, i.e. the local and peer address and port, of the given ss record.
+
+    Args:
+        record: The ss record, i.e. the two joined lines of an ss measurement.
+
+    Returns:
+        The local and peer address separated by a space, e.g. "10.1.1.100:5001 10.2.2.100:5201",
+        or None if the record does not contain them.
+    """
+    # The Netid column is only printed when ss is not limited to tcp sockets with -t.
+    tokens = record.split(maxsplit=6)
+    if tokens and tokens[0] == "tcp":
+        tokens = tokens[1:]
+
+    if len(tokens) < 5:
+        return None
+
+    peer_address = ADDRESS_REGEX.match(tokens[4])
+    if peer_address is None:
+        return None
+
+    return f"{tokens[3]} {peer_address.group()}"
+
+
+def split_flows(records: Iterable[str]) -> dict:
+    """Split the given ss records into one stream per flow in a single pass.
+
+    A single unfiltered ss poll contains one record for each open socket, so the
+    records of the different flows are interleaved in the ss output.
+
+    Args:
+        records: The ss records.
+
+    Returns:
+        A dictionary with the flows as keys, in the order they first appeared,
+        and lists containing the records of each flow as values.
+    """
+    flows = {}
+    for record in records:
+        flows.setdefault(get_flow(record), []).append(record)
+
+    return flows
+
+
+def iter_ss(file_path: str | Path) -> Iterator[str]:
+    """Lazily read the ss records in the file located at the given path.
+
+    Only the current measurement is held in memory, so the memory usage does not depend on the size of the file.
+
+    Args:
+        file_path: The path to the ss output file, which may be gzip compressed.
+
+    Yields:
+        The ss records, i.e. the two joined lines of each ss measurement.
+    """
+    with open_ss(file_path) as data:
+        yield from iter_records(data)
+
+
+def tokenize(record: str) -> dict:
+    """Split the given ss record into its key/value tokens.
+
+    Args:
+        record: The ss record, i.e. the two joined lines of an ss measurement.
+
+    Returns:
+        A dictionary with the ss field names as keys and their raw values as values.
+    """
+    for key in SPACE_SEPARATED_KEYS:
+        record = record.replace(f" {key} ", f" {key}:")
+
+    return dict(token.split(":", 1) for token in record.split() if ":" in token)
+
+
+def parse_int(value: str | None) -> int | None:
+    """Parse an integer ss value.
+
+    Args:
+        value: The raw value of the token.
+
+    Returns:
+        The value as an integer or None if the value was missing or invalid.
+    """
+    if value is None:
+        return None
+
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return int(float(value))
+        except ValueError:
+            return None
+
+
+def parse_float(value: str | None) -> float | None:
+    """Parse a floating point ss value.
+
+    Args:
+        value: The raw value of the token.
+
+    Returns:
+        The value as a float or None if the value was missing or invalid.
+    """
+    if value is None:
+        return None
+
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def parse_duration(value: str | None) -> int | None:
+    """Parse an ss duration in ms such as 504ms or 48ms(9.5%).
+
+    Args:
+        value: The raw value of the token.
+
+    Returns:
+        The duration in ms or None if the value was missing or invalid.
+    """
+    if value is None:
+        return None
+
+    duration, unit, _ = value.partition("ms")
+    return parse_int(duration) if unit else None
+
+
+def parse_rate(value: str | None) -> float | None:
+    """Parse an ss rate such as 115Mbps or 950kbps and convert it to Mbps.
+
+    Args:
+        value: The raw value of the token.
+
+    Returns:
+        The rate in Mbps or None if the value was missing or invalid.
+    """
+    if value is None or not value.endswith("bps"):
+        return None
+
+    number = value[:-3]
+    unit = ""
+    if number and number[-1] in RATE_UNITS:
+        number, unit = number[:-1], number[-1]
+
+    try:
+        rate = float(number)
+    except ValueError:
+        return None
+
+    divisor = RATE_UNITS[unit]
+    return rate / divisor if divisor >= 1 else rate * round(1 / divisor)
+
+
+def parse_timer(value: str | None) -> tuple:
+    """Parse an ss timer value such as (on,300ms,0).
+
+    Args:
+        value: The raw value of the token.
+
+    Returns:
+        A tuple containing the timer name, expire time and retrans,
+        or a tuple of Nones if the value was missing or invalid.
+    """
+    if value is None:
+        return None, None, None
+
+    # The closing parenthesis may be directly followed by the start of the second line.
+    timer_info = value.partition(")")[0].lstrip("(").split(",")
+    if len(timer_info) != 3:
+        return None, None, None
+
+    timer_name, expire_time, retrans = timer_info
+    expire_time_match = DIGITS_REGEX.search(expire_time)
+    retrans = parse_int(retrans)
+    if expire_time_match is None or retrans is None:
+        return None, None, None
+
+    return timer_name, int(expire_time_match.group(1)), retrans
+
+
+def parse_rtt(value: str | None) -> tuple:
+    """Parse an ss rtt value such as 99.413/0.261.
+
+    Args:
+        value: The raw value of the token.
+
+    Returns:
+        A tuple containing the rtt and rtt variance,
+        or a tuple of Nones if the value was missing or invalid.
+    """
+    if value is None:
+        return None, None
+
+    rtt, _, rtt_var = value.partition("/")
+    try:
+        return float(rtt), float(rtt_var)
+    except ValueError:
+        return None, None
+
+
+def parse_retrans(value: str | None) -> tuple:
+    """Parse an ss retrans value such as 49/49.
+
+    Args:
+        value: The raw value of the token.
+
+    Returns:
+        A tuple containing the number of segments that are currently being retransmitted
+        and the total number of retransmissions, or a tuple of Nones if the value was missing or invalid.
+    """
+    if value is None:
+        return None, None
+
+    retrans, _, total_retrans = value.partition("/")
+    retrans, total_retrans = parse_int(retrans), parse_int(total_retrans)
+    if retrans is None or total_retrans is None:
+        return None, None
+
+    return retrans, total_retrans
+
+
+class SsField(NamedTuple):
+    """Description of a single field of an ss record.
+
+    Attributes:
+        name: The name of the field in the parsed records and csv files.
+        token: The key of the ss token that contains the field.
+        parse: The function that parses the raw value of the token (and normalizes its unit).
+        type: The type of the parsed value.
+        kind: Whether the field is a COUNTER or a GAUGE.
+        part: The index of the field in the tuple returned by parse, for tokens that contain several fields.
+        default: The value used when ss omits the token, which it does for most fields that are zero.
+    """
+
+    name: str
+    token: str
+    parse: Callable
+    type: type
+    kind: str
+    part: int | None = None
+    default: int | float | None = None
+
+
+# All of the fields of an ss record that can be extracted.
+SS_SCHEMA = (
+    SsField("timer_name", "timer", parse_timer, str, GAUGE, part=0),
+    SsField("expire_time", "timer", parse_timer, int, GAUGE, part=1),
+    SsField("retrans", "timer", parse_timer, int, GAUGE, part=2),
+    SsField("rto", "rto", parse_int, int, GAUGE),
+    SsField("rtt", "rtt", parse_rtt, float, GAUGE, part=0),
+    SsField("rtt_variance", "rtt", parse_rtt, float, GAUGE, part=1),
+    SsField("cwnd", "cwnd", parse_int, int, GAUGE),
+    SsField("ssthresh", "ssthresh", parse_int, int, GAUGE),
+    SsField("data_segments_sent", "data_segs_out", parse_int, int, COUNTER),
+    SsField("last_send", "lastsnd", parse_int, int, GAUGE),
+    SsField("pacing_rate", "pacing_rate", parse_rate, float, GAUGE),
+    SsField("bytes_sent", "bytes_sent", parse_int, int, COUNTER, default=0),
+    SsField("bytes_retrans", "bytes_retrans", parse_int, int, COUNTER, default=0),
+    SsField("bytes_acked", "bytes_acked", parse_int, int, COUNTER, default=0),
+    SsField("delivery_rate", "delivery_rate", parse_rate, float, GAUGE, default=0),
+    SsField("send_rate", "send", parse_rate, float, GAUGE),
+    SsField("unacked", "unacked", parse_int, int, GAUGE, default=0),
+    SsField("retrans_in_flight", "retrans", parse_retrans, int, GAUGE, 0, default=0),
+    SsField("total_retrans", "retrans", parse_retrans, int, COUNTER, 1, default=0),
+    SsField("lost_segments", "lost", parse_int, int, GAUGE, default=0),
+    SsField("sacked", "sacked", parse_int, int, GAUGE, default=0),
+    SsField("notsent", "notsent", parse_int, int, GAUGE, default=0),
+    SsField("path_min_rtt", "minrtt", parse_float, float, GAUGE),
+    SsField("busy_time", "busy", parse_duration, int, COUNTER, default=0),
+    SsField("rwnd_limited", "rwnd_limited", parse_duration, int, COUNTER, default=0),
+    SsField(CAPTURE_TIME, CAPTURE_TIME, parse_float, float, GAUGE),
+)
+
+SS_SCHEMA_FIELDS = {field.name: field for field in SS_SCHEMA}
+
+# The fields the models are trained on, in the order they are written to the csv files.
+SS_RECORD_FIELDS = (
+    "timer_name",
+    "expire_time",
+    "retrans",
+    "rto",
+    "rtt",
+    "rtt_variance",
+    "cwnd",
+    "ssthresh",
+    "data_segments_sent",
+    "last_send",
+    "pacing_rate",
+)
+
+# The field of a parsed record that contains each feature.
+FEATURE_FIELDS = {
+    types.Feature.CWND: "cwnd",
+    types.Feature.SSTHRESH: "ssthresh",
+    types.Feature.EXPIRE_TIME: "expire_time",
+    types.Feature.RETRANS: "retrans",
+    types.Feature.RTO: "rto",
+    types.Feature.RTT: "rtt",
+    types.Feature.RTT_VAR: "rtt_variance",
+    types.Feature.LAST_SEND: "last_send",
+    types.Feature.PACING_RATE: "pacing_rate",
+}
+
+
+@functools.lru_cache
+def compile_extractor(fields: tuple = SS_RECORD_FIELDS) -> Callable[[str], dict]:
+    """Compile a function that extracts the given fields from an ss record.
+
+    Each token is looked up and parsed only once, even if it contains several of the fields,
+    so extracting more fields does not require more passes over the record.
+
+    Args:
+        fields: The names of the fields in SS_SCHEMA_FIELDS that should be extracted.
+
+    Returns:
+        A function that takes an ss record and returns a dictionary
+        with the given fields as keys and their parsed values as values.
+    """
+    schema = [SS_SCHEMA_FIELDS[name] for name in fields]
+    token_parsers = tuple({field.token: field.parse for field in schema}.items())
+    selectors = tuple(
+        (field.name, field.token, field.part, field.default) for field in schema
+    )
+
+    def extract(record: str) -> dict:
+        tokens = tokenize(record)
+        values = {token: parse(tokens.get(token)) for token, parse in token_parsers}
+
+        parsed_record = {}
+        for name, token, part, default in selectors:
+            value = values[token] if part is None else values[token][part]
+            parsed_record[name] = default if value is None else value
+
+        return parsed_record
+
+    return extract
+
+
+def parse_record(record: str, fields: tuple = SS_RECORD_FIELDS) -> dict:
+    """Parse the given ss record into a fixed-schema dictionary in a single pass.
+
+    Every one of the given fields is present in the returned dictionary.
+    Fields that were missing from the record are set to their default, which is None for the SS_RECORD_FIELDS.
+
+    Args:
+        record: The ss record, i.e. the two joined lines of an ss measurement.
+        fields: The names of the fields in SS_SCHEMA_FIELDS that should be extracted (default: SS_RECORD_FIELDS).
+
+    Returns:
+        A dictionary with the given fields as keys and their parsed values as values.
+    """
+    return compile_extractor(tuple(fields))(record)
+
+
+def record_complete(record: dict) -> bool:
+    """Check if all of the fields of the given parsed record are present.
+
+    Args:
+        record: A record returned by parse_record.
+
+    Returns:
+        True if none of the fields are missing, False otherwise.
+    """
+    return None not in record.values()
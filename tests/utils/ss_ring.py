@@ -0,0 +1,391 @@
+import math
+import struct
+import time
+import numpy as np
+
+from multiprocessing import resource_tracker, shared_memory
+from utils import sock_diag, ss_parser
+
+# Identifies a shared memory block as a ring and the version of its layout.
+MAGIC = b"SSRING01"
+
+# The header at the start of a ring: the magic, the number of slots, the number of columns and the length
+# of their comma separated names, which directly follow the header.
+HEADER = struct.Struct("=8sIII")
+
+# The alignment of the sections of a ring (bytes), so that the head, which the producer updates with every
+# record, does not share a cache line with the header that the consumers read once.
+ALIGNMENT = 64
+
+# The default number of slots of a ring.
+RING_CAPACITY = 1024
+
+# The interval at which a consumer checks the ring for new records (s).
+POLL_INTERVAL = 0.0001
+
+# The columns of the measurements that the collectors write to a ring, i.e. the fields the models are
+# trained on and the time each measurement was captured at.
+MEASUREMENT_COLUMNS = (*ss_parser.SS_RECORD_FIELDS, ss_parser.CAPTURE_TIME)
+
+# The names of the rings created by this process, which are unlinked by it.
+created_rings = set()
+
+
+def align(size: int) -> int:
+    """Round the given size up to the next multiple of ALIGNMENT.
+
+    Args:
+        size: The size in bytes.
+
+    Returns:
+        The aligned size in bytes.
+    """
+    return (size + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def get_layout(capacity: int, width: int, names_size: int) -> dict:
+    """Get the offsets of the sections of a ring with the given dimensions.
+
+    Args:
+        capacity: The number of slots.
+        width: The number of columns of each record.
+        names_size: The length of the encoded names of the columns.
+
+    Returns:
+        A dictionary with the offsets of the head, the sequence numbers of the slots and the records
+        and the total size of the ring in bytes.
+    """
+    head = align(HEADER.size + names_size)
+    sequences = head + ALIGNMENT
+    records = align(sequences + capacity * 8)
+    return {
+        "head": head,
+        "sequences": sequences,
+        "records": records,
+        "size": records + capacity * width * 8,
+    }
+
+
+def map_ring(shm: shared_memory.SharedMemory, capacity: int, columns: tuple) -> dict:
+    """Map the sections of the ring in the given shared memory block.
+
+    Args:
+        shm: The shared memory block of the ring.
+        capacity: The number of slots.
+        columns: The names of the columns of each record.
+
+    Returns:
+        A dictionary with the shared memory block, the capacity, the columns and arrays that view the head,
+        i.e. the number of records that have been pushed, the sequence numbers of the slots and the records.
+    """
+    names_size = len(",".join(columns).encode())
+    layout = get_layout(capacity, len(columns), names_size)
+    return {
+        "shm": shm,
+        "capacity": capacity,
+        "columns": columns,
+        "head": np.ndarray((1,), np.uint64, shm.buf, layout["head"]),
+        "sequences": np.ndarray(
+            (capacity,), np.uint64, shm.buf, layout["sequences"]
+        ),
+        "records": np.ndarray(
+            (capacity, len(columns)), np.float64, shm.buf, layout["records"]
+        ),
+    }
+
+
+def create_ring(name: str, columns: tuple, capacity: int = RING_CAPACITY) -> dict:
+    """Create a single-producer/single-consumer ring of fixed-width records in shared memory.
+
+    Each record is a row of float64 values, one per column. The ring is created by its producer,
+    which is the only process that pushes to it, and attached to by its consumer, see attach_ring.
+
+    Args:
+        name: The name of the shared memory block, which the consumer attaches to.
+        columns: The names of the columns of each record.
+        capacity: The number of slots, i.e. how many records the consumer can fall behind before it misses them.
+
+    Returns:
+        The ring, see map_ring.
+    """
+    names = ",".join(columns).encode()
+    layout = get_layout(capacity, len(columns), len(names))
+    shm = shared_memory.SharedMemory(name, create=True, size=layout["size"])
+    created_rings.add(name)
+    shm.buf[: HEADER.size] = HEADER.pack(MAGIC, capacity, len(columns), len(names))
+    shm.buf[HEADER.size : HEADER.size + len(names)] = names
+
+    ring = map_ring(shm, capacity, tuple(columns))
+    ring["head"][0] = 0
+    ring["sequences"][:] = 0
+
+    return ring
+
+
+def attach_ring(name: str, timeout: float = 0) -> dict:
+    """Attach to the ring with the given name that another process created.
+
+    Args:
+        name: The name of the shared memory block of the ring.
+        timeout: How long to wait for the producer to create the ring in seconds.
+
+    Returns:
+        The ring, see map_ring.
+
+    Raises:
+        FileNotFoundError: If the ring was not created within the timeout.
+        ValueError: If the shared memory block is not a ring.
+    """
+    end = time.monotonic() + timeout
+    while True:
+        try:
+            shm = shared_memory.SharedMemory(name)
+            break
+        except FileNotFoundError:
+            if time.monotonic() >= end:
+                raise
+            time.sleep(0.01)
+
+    # Only the producer unlinks the ring. Without this, the resource tracker would unlink it when the consumer exits.
+    if name not in created_rings:
+        resource_tracker.unregister(shm._name, "shared_memory")
+
+    magic, capacity, _, names_size = HEADER.unpack_from(shm.buf)
+    if magic != MAGIC:
+        shm.close()
+        raise ValueError(f"Shared memory block {name} is not a ring.")
+
+    names = bytes(shm.buf[HEADER.size : HEADER.size + names_size]).decode()
+    return map_ring(shm, capacity, tuple(names.split(",")))
+
+
+def close_ring(ring: dict, unlink: bool = False) -> None:
+    """Close the given ring.
+
+    Args:
+        ring: The ring.
+        unlink: Whether or not the shared memory block is removed, which only the producer should do.
+    """
+    shm = ring["shm"]
+    if unlink:
+        created_rings.discard(shm.name)
+
+    # The views of the shared memory block have to be released before it can be closed.
+    ring.clear()
+    shm.close()
+    if unlink:
+        shm.unlink()
+
+
+def get_head(ring: dict) -> int:
+    """Get the number of records that have been pushed to the given ring.
+
+    Args:
+        ring: The ring.
+
+    Returns:
+        The sequence number of the next record.
+    """
+    return int(ring["head"][0])
+
+
+def push(ring: dict, values: list | np.ndarray) -> int:
+    """Push a record to the given ring, overwriting the oldest record if the ring is full.
+
+    The slot is marked as being written before and stamped with the sequence number of the record after
+    its values are written, so a consumer that reads the slot in the meantime detects it, see read_record.
+    This relies on the stores becoming visible in program order, which x86-64 guarantees.
+
+    Args:
+        ring: The ring.
+        values: The values of the record, one per column.
+
+    Returns:
+        The sequence number of the record.
+    """
+    sequence = get_head(ring)
+    slot = sequence % ring["capacity"]
+    ring["sequences"][slot] = 2 * sequence + 1
+    ring["records"][slot] = values
+    ring["sequences"][slot] = 2 * sequence + 2
+    ring["head"][0] = sequence + 1
+
+    return sequence
+
+
+def read_record(ring: dict, sequence: int, out: np.ndarray) -> bool:
+    """Copy the record with the given sequence number from the given ring.
+
+    Args:
+        ring: The ring.
+        sequence: The sequence number of the record.
+        out: The array that the values of the record are copied to.
+
+    Returns:
+        True if the record was copied, False if it has been or was being overwritten by a newer record.
+    """
+    slot = sequence % ring["capacity"]
+    stamp = 2 * sequence + 2
+    if ring["sequences"][slot] != stamp:
+        return False
+
+    out[:] = ring["records"][slot]
+    return ring["sequences"][slot] == stamp
+
+
+def create_reader(ring: dict, from_start: bool = False) -> dict:
+    """Create the state of the consumer of the given ring.
+
+    Args:
+        ring: The ring.
+        from_start: Whether or not the records that have already been pushed are read,
+            or only the ones that are pushed from now on.
+
+    Returns:
+        A dictionary with the ring, the sequence number of the next record to read under "cursor",
+        the number of records that were overwritten before they could be read under "overruns"
+        and the buffer that the records are copied to.
+    """
+    return {
+        "ring": ring,
+        "cursor": 0 if from_start else get_head(ring),
+        "overruns": 0,
+        "buffer": np.empty(len(ring["columns"])),
+    }
+
+
+def read_records(reader: dict) -> list:
+    """Read the records that have been pushed to the ring of the given reader since its last read.
+
+    Records that were overwritten before they could be read are skipped and counted as overruns.
+
+    Args:
+        reader: The reader, see create_reader, which is updated.
+
+    Returns:
+        A list of tuples containing the sequence number and a copy of the values of each record.
+    """
+    ring = reader["ring"]
+    head = get_head(ring)
+    cursor = reader["cursor"]
+    if head - cursor > ring["capacity"]:
+        reader["overruns"] += head - cursor - ring["capacity"]
+        cursor = head - ring["capacity"]
+
+    records = []
+    buffer = reader["buffer"]
+    for sequence in range(cursor, head):
+        if read_record(ring, sequence, buffer):
+            records.append((sequence, buffer.copy()))
+        else:
+            reader["overruns"] += 1
+
+    reader["cursor"] = head
+    return records
+
+
+def wait_for_records(reader: dict, timeout: float) -> list:
+    """Wait until records have been pushed to the ring of the given reader, and read them, see read_records.
+
+    Args:
+        reader: The reader, see create_reader, which is updated.
+        timeout: How long to wait in seconds.
+
+    Returns:
+        The records, or an empty list if none were pushed within the timeout.
+    """
+    end = time.monotonic() + timeout
+    while not (records := read_records(reader)) and time.monotonic() < end:
+        time.sleep(POLL_INTERVAL)
+
+    return records
+
+
+def encode_record(record: dict, columns: tuple) -> list:
+    """Encode the given parsed measurement or sample as the values of a record.
+
+    Missing values are NaN and the names of the timers are stored as their index in sock_diag.TIMER_NAMES.
+
+    Args:
+        record: The values keyed by their column.
+        columns: The columns of the record.
+
+    Returns:
+        The values of the record, one per column.
+    """
+    values = []
+    for column in columns:
+        value = record[column]
+        if value is None:
+            value = math.nan
+        elif isinstance(value, str):
+            value = sock_diag.TIMER_NAMES.index(value)
+        values.append(value)
+
+    return values
+
+
+def decode_record(values: np.ndarray, columns: tuple) -> dict:
+    """Decode the values of a record into the parsed measurement or sample it was encoded from, see encode_record.
+
+    The values of the fields of ss_parser.SS_SCHEMA are converted back to their type, the others are floats.
+
+    Args:
+        values: The values of the record, one per column.
+        columns: The columns of the record.
+
+    Returns:
+        A dictionary with the values keyed by their column, where missing values are None.
+    """
+    record = {}
+    for column, value in zip(columns, values.tolist()):
+        field = ss_parser.SS_SCHEMA_FIELDS.get(column)
+        if math.isnan(value):
+            value = None
+        elif field is not None and field.type is str:
+            value = sock_diag.TIMER_NAMES[int(value)]
+        elif field is not None:
+            value = field.type(value)
+        record[column] = value
+
+    return record
+
+
+def encode_measurement(
+    output: str, flow: str, columns: tuple = MEASUREMENT_COLUMNS
+) -> list | None:
+    """Parse the measurement of the given flow from an ss poll and encode it as the values of a record.
+
+    Args:
+        output: The ss output of a single poll.
+        flow: The flow whose measurement is encoded.
+        columns: The columns of the record.
+
+    Returns:
+        The values of the record, see encode_record, or None if the poll does not contain the flow.
+    """
+    records = ss_parser.split_flows(ss_parser.iter_records(output.splitlines()))
+    if flow not in records:
+        return None
+
+    record = ss_parser.parse_record(records[flow][-1], columns)
+    return encode_record(record, columns)
+
+
+def push_measurement(ring: dict, output: str, flow: str) -> bool:
+    """Parse the measurement of the given flow from an ss poll and push it to the given ring.
+
+    Args:
+        ring: The ring, whose columns are the MEASUREMENT_COLUMNS.
+        output: The ss output of a single poll.
+        flow: The flow whose measurement is pushed.
+
+    Returns:
+        True if the measurement was pushed, False if the poll does not contain the flow.
+    """
+    values = encode_measurement(output, flow, ring["columns"])
+    if values is None:
+        return False
+
+    push(ring, values)
+    return True
@@ -0,0 +1,172 @@
+import operator
+
+from typing import Callable, Iterable, Iterator
+from utils import ss_parser
+
+# The features that ss_features derives from the measurements of a flow and the types of their values,
+# in the order of their columns. The timestamp is a float, since it is taken from the capture times
+# of stamped measurements, see ss_features.create_features.
+DERIVED_FEATURE_TYPES = {
+    "timestamp": float,
+    "min_rtt": float,
+    "max_rtt": float,
+    "cwnd_diff": int,
+    "min_cwnd": int,
+    "max_cwnd": int,
+    "min_ssthresh": int,
+    "max_ssthresh": int,
+}
+DERIVED_FEATURES = tuple(DERIVED_FEATURE_TYPES)
+
+# The column that contains whether or not a loss followed the measurement, see label_packet in txt_to_csv.
+LABEL = "lost"
+
+# The column that contains the number of consecutive measurements that a coalesced sample stands for, see coalesce.
+REPEAT = "repeat"
+
+# All of the fields a sample can have: its flow, the fields of the schema, the derived features, its label
+# and its repeat count.
+SAMPLE_FIELDS = ("flow", *ss_parser.SS_SCHEMA_FIELDS, *DERIVED_FEATURES, LABEL, REPEAT)
+
+# The type of the values of each of the fields of a sample.
+SAMPLE_FIELD_TYPES = {
+    "flow": str,
+    **{field.name: field.type for field in ss_parser.SS_SCHEMA},
+    **DERIVED_FEATURE_TYPES,
+    LABEL: bool,
+    REPEAT: int,
+}
+
+# The fields that change between the snapshots of a connection whose state did not change, i.e. the
+# timestamp, the time since the last send and the countdown of the retransmission timer.
+VOLATILE_FIELDS = ("timestamp", "last_send", "expire_time")
+
+
+class SsSample:
+    """The features of a single ss measurement of a flow.
+
+    The values are stored in fixed slots instead of a dictionary per measurement, which takes a fraction
+    of the memory and does not repeat the field names for each of the measurements. Fields that have not
+    been set, such as fields that were not parsed or features that could not be derived, are None.
+    """
+
+    __slots__ = SAMPLE_FIELDS
+
+    def __init__(self, **values):
+        """Initializes the sample with the given values.
+
+        Args:
+            **values: The values of the sample keyed by their field in SAMPLE_FIELDS.
+        """
+        for field, value in values.items():
+            setattr(self, field, value)
+
+    def __getattr__(self, name: str):
+        """Get the value of a field that has not been set, which is None.
+
+        Args:
+            name: The name of the field.
+        """
+        if name in SAMPLE_FIELDS:
+            return None
+
+        raise AttributeError(f"'SsSample' object has no attribute '{name}'")
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, SsSample):
+            return NotImplemented
+
+        return to_dict(self) == to_dict(other)
+
+    def __repr__(self) -> str:
+        values = ", ".join(
+            f"{field}={value!r}" for field, value in to_dict(self).items()
+        )
+        return f"SsSample({values})"
+
+
+def to_dict(sample: SsSample) -> dict:
+    """Get the fields of the given sample that are not None.
+
+    Args:
+        sample: The sample.
+
+    Returns:
+        A dictionary with the values of the sample keyed by field, in the order of SAMPLE_FIELDS.
+    """
+    return {
+        field: value
+        for field in SAMPLE_FIELDS
+        if (value := getattr(sample, field)) is not None
+    }
+
+
+def get_columns(
+    fields: tuple = ss_parser.SS_RECORD_FIELDS, include_flow: bool = False
+) -> tuple:
+    """Get the columns of the features of the samples with the given fields.
+
+    The order of the columns is the order of the features the models are trained on,
+    so it is the same for the csv files, the columnar datasets and the input of the classifier.
+
+    Args:
+        fields: The fields of the parsed measurements that are included.
+        include_flow: Whether or not the flow of each measurement is the first column.
+
+    Returns:
+        The names of the columns: the flow, the given fields and the derived features.
+        The label is not included, since it is only known for the training data.
+    """
+    return ("flow",) * include_flow + tuple(fields) + DERIVED_FEATURES
+
+
+def create_row_getter(columns: tuple) -> Callable[[SsSample], tuple]:
+    """Create a function that gets the values of the given columns of a sample.
+
+    Args:
+        columns: The names of the columns, as returned by get_columns.
+
+    Returns:
+        A function that takes a sample and returns a tuple with the values of the columns in the given order.
+    """
+    if len(columns) == 1:
+        getter = operator.attrgetter(columns[0])
+        return lambda sample: (getter(sample),)
+
+    return operator.attrgetter(*columns)
+
+
+def coalesce(samples: Iterable[SsSample], columns: tuple) -> Iterator[SsSample]:
+    """Coalesce each run of consecutive samples whose state did not change into the first sample of the run.
+
+    Two samples have the same state if all of the given columns except the VOLATILE_FIELDS are the same.
+    The columns should include the label, so that a run never spans samples with different labels.
+    The first sample keeps its timestamp and stores the number of samples in the run in its repeat field,
+    so the run covers repeat consecutive measurements from its timestamp.
+
+    Args:
+        samples: The samples of a single flow, in the order they were measured.
+        columns: The columns that are compared, as returned by get_columns.
+
+    Yields:
+        The first sample of each run, as soon as the run ends.
+    """
+    get_state = create_row_getter(
+        tuple(column for column in columns if column not in VOLATILE_FIELDS)
+    )
+
+    first_sample = first_state = None
+    for sample in samples:
+        state = get_state(sample)
+        if first_sample is not None and state == first_state:
+            first_sample.repeat += 1
+            continue
+
+        if first_sample is not None:
+            yield first_sample
+
+        first_sample, first_state = sample, state
+        first_sample.repeat = 1
+
+    if first_sample is not None:
+        yield first_sample
@@ -0,0 +1,392 @@
+import os
+import selectors
+import socket
+import struct
+import time
+import numpy as np
+
+from typing import Callable, Iterator
+from utils import ss_ring
+
+# The types of the messages. The columns message names the columns of the sample records or feature vectors
+# that follow it on the same connection, so they do not have to be repeated in each message.
+COLUMNS = 0
+SAMPLE = 1
+FEATURES = 2
+PREDICTION = 3
+
+MESSAGE_NAMES = {
+    COLUMNS: "columns",
+    SAMPLE: "sample",
+    FEATURES: "features",
+    PREDICTION: "prediction",
+}
+
+# The header of each frame: the length of the payload and the type of the message.
+FRAME_HEADER = struct.Struct("<IB")
+
+# The header of the payload of the samples, features and predictions: the time the message was created at
+# in ns from time.monotonic_ns, which all processes on a host share, and the length of the flow, which
+# directly follows the header.
+EVENT_HEADER = struct.Struct("<QH")
+
+# The maximum length of a payload, so that a corrupt length does not make the receiver buffer indefinitely.
+MAX_PAYLOAD_SIZE = 1 << 20
+
+# The size of the buffer that is received into (bytes).
+RECEIVE_SIZE = 65536
+
+
+def encode_frame(message_type: int, payload: bytes) -> bytes:
+    """Encode the given payload as a frame.
+
+    Args:
+        message_type: The type of the message, e.g. SAMPLE.
+        payload: The payload of the message.
+
+    Returns:
+        The frame, i.e. the header followed by the payload.
+    """
+    return FRAME_HEADER.pack(len(payload), message_type) + payload
+
+
+def encode_columns(columns: tuple) -> bytes:
+    """Encode the names of the columns of the sample records or feature vectors that follow on a connection.
+
+    Args:
+        columns: The names of the columns.
+
+    Returns:
+        The frame of the message.
+    """
+    return encode_frame(COLUMNS, ",".join(columns).encode())
+
+
+def encode_event(
+    message_type: int, flow: str, body: bytes, timestamp: int | None = None
+) -> bytes:
+    """Encode a sample record, feature vector or prediction event of the given flow.
+
+    Args:
+        message_type: The type of the message.
+        flow: The flow of the message, i.e. its local and peer address separated by a space.
+        body: The encoded values or prediction.
+        timestamp: The time of the event in ns from time.monotonic_ns (default: now).
+
+    Returns:
+        The frame of the message.
+    """
+    if timestamp is None:
+        timestamp = time.monotonic_ns()
+
+    flow = flow.encode()
+    return encode_frame(
+        message_type, EVENT_HEADER.pack(timestamp, len(flow)) + flow + body
+    )
+
+
+def encode_record(
+    message_type: int, flow: str, values, timestamp: int | None = None
+) -> bytes:
+    """Encode a sample record or feature vector of the given flow.
+
+    Args:
+        message_type: SAMPLE or FEATURES.
+        flow: The flow of the record.
+        values: The values of the record, one per column, where missing values are NaN.
+        timestamp: The time of the record in ns from time.monotonic_ns (default: now).
+
+    Returns:
+        The frame of the message.
+    """
+    body = np.asarray(values, dtype="<f8").tobytes()
+    return encode_event(message_type, flow, body, timestamp)
+
+
+def encode_measurement(output: str, flow: str) -> bytes | None:
+    """Parse the measurement of the given flow from an ss poll and encode it as a sample record.
+
+    Args:
+        output: The ss output of a single poll.
+        flow: The flow whose measurement is encoded.
+
+    Returns:
+        The frame of the message, whose columns are the ss_ring.MEASUREMENT_COLUMNS,
+        or None if the poll does not contain the flow.
+    """
+    values = ss_ring.encode_measurement(output, flow)
+    if values is None:
+        return None
+
+    return encode_record(SAMPLE, flow, values)
+
+
+def encode_prediction(
+    flow: str, prediction: bool, timestamp: int | None = None
+) -> bytes:
+    """Encode a prediction event of the given flow.
+
+    Args:
+        flow: The flow that the prediction was made for.
+        prediction: Whether or not a loss is predicted.
+        timestamp: The time of the prediction in ns from time.monotonic_ns (default: now).
+
+    Returns:
+        The frame of the message.
+    """
+    return encode_event(PREDICTION, flow, bytes((int(prediction),)), timestamp)
+
+
+def decode_message(message_type: int, payload: bytes, columns: tuple | None) -> dict:
+    """Decode the payload of a message.
+
+    Args:
+        message_type: The type of the message.
+        payload: The payload of the message.
+        columns: The columns that were last received on the connection, or None.
+
+    Returns:
+        A dictionary with the name of the type of the message under "type" and, for a columns message,
+        the names of the columns under "columns", or otherwise its timestamp and flow and, for a sample
+        or features message, its values as an array under "values" along with the columns,
+        or for a prediction message, the prediction under "prediction".
+
+    Raises:
+        ValueError: If the type of the message is unknown or its payload is truncated.
+    """
+    if message_type not in MESSAGE_NAMES:
+        raise ValueError(f"Unknown message type {message_type}.")
+
+    message = {"type": MESSAGE_NAMES[message_type]}
+    if message_type == COLUMNS:
+        message["columns"] = tuple(payload.decode().split(","))
+        return message
+
+    timestamp, flow_size = EVENT_HEADER.unpack_from(payload)
+    flow_end = EVENT_HEADER.size + flow_size
+    body = payload[flow_end:]
+    if len(payload) < flow_end or (message_type == PREDICTION and len(body) != 1):
+        raise ValueError(f"Truncated {message['type']} message.")
+
+    message["timestamp"] = timestamp
+    message["flow"] = payload[EVENT_HEADER.size : flow_end].decode()
+    if message_type == PREDICTION:
+        message["prediction"] = bool(body[0])
+    else:
+        message["values"] = np.frombuffer(body, dtype="<f8")
+        message["columns"] = columns
+
+    return message
+
+
+def iter_frames(buffer: bytearray) -> Iterator[tuple]:
+    """Lazily take the complete frames from the start of the given buffer.
+
+    Args:
+        buffer: The received bytes, from which the frames are removed.
+
+    Yields:
+        Tuples containing the type and the payload of each frame.
+
+    Raises:
+        ValueError: If the length of a payload exceeds MAX_PAYLOAD_SIZE.
+    """
+    while len(buffer) >= FRAME_HEADER.size:
+        size, message_type = FRAME_HEADER.unpack_from(buffer)
+        if size > MAX_PAYLOAD_SIZE:
+            raise ValueError(f"Payload of {size} bytes exceeds the maximum size.")
+
+        end = FRAME_HEADER.size + size
+        if len(buffer) < end:
+            return
+
+        payload = bytes(buffer[FRAME_HEADER.size : end])
+        del buffer[:end]
+        yield message_type, payload
+
+
+def connect(path: str, timeout: float = 0) -> socket.socket:
+    """Connect to the Unix socket with the given path.
+
+    Args:
+        path: The path of the socket.
+        timeout: How long to wait for the receiver to listen on the socket in seconds.
+
+    Returns:
+        The connected socket.
+
+    Raises:
+        OSError: If the receiver did not listen on the socket within the timeout.
+    """
+    end = time.monotonic() + timeout
+    while True:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(path)
+            return sock
+        except (FileNotFoundError, ConnectionRefusedError):
+            sock.close()
+            if time.monotonic() >= end:
+                raise
+            time.sleep(0.01)
+
+
+def create_sender(
+    path: str, columns: tuple | None = None, timeout: float | None = 5
+) -> dict:
+    """Connect to the receiver listening on the given Unix socket.
+
+    Args:
+        path: The path of the socket.
+        columns: The columns of the records that are sent, which are sent first on each connection.
+        timeout: How long to wait for the receiver to listen on the socket in seconds,
+            or None to only connect once the first message is sent, for receivers that are started later.
+
+    Returns:
+        A dictionary with the path of the socket, the columns and the connected socket under "sock".
+    """
+    sender = {"path": path, "columns": columns, "sock": None}
+    if timeout is not None:
+        sender["sock"] = connect(path, timeout)
+        if columns is not None:
+            sender["sock"].sendall(encode_columns(columns))
+
+    return sender
+
+
+def send(sender: dict, frame: bytes) -> bool:
+    """Send the given frame, reconnecting once if the receiver was restarted.
+
+    Args:
+        sender: The sender, see create_sender, which is updated.
+        frame: The frame of the message.
+
+    Returns:
+        True if the frame was sent, False if the receiver is not listening, in which case the frame is dropped.
+    """
+    for _ in range(2):
+        try:
+            if sender["sock"] is None:
+                sender["sock"] = connect(sender["path"])
+                if sender["columns"] is not None:
+                    sender["sock"].sendall(encode_columns(sender["columns"]))
+
+            sender["sock"].sendall(frame)
+            return True
+        except OSError:
+            if sender["sock"] is not None:
+                sender["sock"].close()
+                sender["sock"] = None
+
+    return False
+
+
+def send_measurement(sender: dict, output: str, flow: str) -> bool:
+    """Parse the measurement of the given flow from an ss poll and send it as a sample record.
+
+    Args:
+        sender: The sender, whose columns are the ss_ring.MEASUREMENT_COLUMNS.
+        output: The ss output of a single poll.
+        flow: The flow whose measurement is sent.
+
+    Returns:
+        True if the measurement was sent, False if the poll does not contain the flow or it could not be sent.
+    """
+    frame = encode_measurement(output, flow)
+    if frame is None:
+        return False
+
+    return send(sender, frame)
+
+
+def close_sender(sender: dict) -> None:
+    """Close the connection of the given sender.
+
+    Args:
+        sender: The sender.
+    """
+    if sender["sock"] is not None:
+        sender["sock"].close()
+        sender["sock"] = None
+
+
+def listen(path: str) -> socket.socket:
+    """Listen on the Unix socket with the given path, replacing the socket of a previous receiver.
+
+    Args:
+        path: The path of the socket.
+
+    Returns:
+        The listening socket.
+    """
+    if os.path.exists(path):
+        os.unlink(path)
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(path)
+    sock.listen()
+    return sock
+
+
+def serve(
+    path: str, on_message: Callable[[dict], None], timeout: float | None = 5
+) -> None:
+    """Receive the messages of any number of senders on the given Unix socket.
+
+    Each sender has its own connection, so senders can be restarted independently of the receiver.
+    A connection that sends a corrupt frame or fails is closed without affecting the others.
+
+    Args:
+        path: The path of the socket.
+        on_message: The function that is called with each message except the columns, see decode_message.
+        timeout: How long to wait for a message before returning in seconds, or None to wait indefinitely.
+    """
+    selector = selectors.DefaultSelector()
+    server = listen(path)
+    selector.register(server, selectors.EVENT_READ)
+    deadline = None if timeout is None else time.monotonic() + timeout
+
+    try:
+        while deadline is None or time.monotonic() < deadline:
+            wait = None if deadline is None else deadline - time.monotonic()
+            for key, _ in selector.select(wait):
+                if key.fileobj is server:
+                    connection, _ = server.accept()
+                    selector.register(
+                        connection,
+                        selectors.EVENT_READ,
+                        {"buffer": bytearray(), "columns": None},
+                    )
+                    continue
+
+                connection, state = key.fileobj, key.data
+                try:
+                    data = connection.recv(RECEIVE_SIZE)
+                    if not data:
+                        raise EOFError()
+
+                    state["buffer"] += data
+                    for message_type, payload in iter_frames(state["buffer"]):
+                        message = decode_message(
+                            message_type, payload, state["columns"]
+                        )
+                        if message_type == COLUMNS:
+                            state["columns"] = message["columns"]
+                        else:
+                            on_message(message)
+                            if timeout is not None:
+                                deadline = time.monotonic() + timeout
+                except (
+                    EOFError,
+                    OSError,
+                    ValueError,
+                    struct.error,
+                    UnicodeDecodeError,
+                ):
+                    selector.unregister(connection)
+                    connection.close()
+    finally:
+        for key in list(selector.get_map().values()):
+            key.fileobj.close()
+        selector.close()
+        os.unlink(path)
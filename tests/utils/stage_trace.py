@@ -0,0 +1,210 @@
+import os
+import re
+import time
+import numpy as np
+
+from utils import ss_parser
+
+# The directory in the output directory of a run that the modules write their trace files to.
+# The modules only trace the samples if it exists, so tracing is enabled for a run by creating it.
+TRACE_DIRECTORY = "trace"
+
+# The file in the output directory of a run that the latency report is written to, next to metrics.txt.
+LATENCY_FILE = "latency.txt"
+
+# The column of the csv of the data persistence module that carries the trace id to the prediction module.
+TRACE_COLUMN = "trace_id"
+
+# The stage boundaries of the prediction loop in order, from the ss snapshot to the ECN toggle.
+# The latency of a stage is the time from the previous boundary to its boundary.
+CAPTURE = "capture"
+CAPTURE_WRITE = "capture_write"
+PREPARE_EVENT = "prepare_event"
+CREATE_CSV = "create_csv"
+PREDICT_EVENT = "predict_event"
+PREDICT = "predict"
+WRITE_PREDICTION = "write_prediction"
+TOGGLE_ECN = "toggle_ecn"
+
+STAGES = (
+    CAPTURE,
+    CAPTURE_WRITE,
+    PREPARE_EVENT,
+    CREATE_CSV,
+    PREDICT_EVENT,
+    PREDICT,
+    WRITE_PREDICTION,
+    TOGGLE_ECN,
+)
+
+# The name of the latency from the ss snapshot to the ECN toggle in the report.
+END_TO_END = "end_to_end"
+
+# The percentiles of the latency that are reported (%).
+LATENCY_PERCENTILES = (50, 99)
+
+# Matches the capture time that the measurements of a poll are stamped with.
+CAPTURE_TIME_PATTERN = re.compile(rf"\b{ss_parser.CAPTURE_TIME}:(\S+)")
+
+
+def get_trace_id(capture_time: float) -> str:
+    """Get the trace id of the sample with the given capture time.
+
+    The capture time identifies the poll of a run, so it is used as the trace id of its samples
+    in the same format as the ss output is stamped with, see ss_parser.add_capture_time.
+
+    Args:
+        capture_time: The time the poll was captured at in ms since the start of the capture.
+
+    Returns:
+        The trace id.
+    """
+    return f"{capture_time:.3f}"
+
+
+def find_trace_id(output: str) -> str | None:
+    """Find the trace id of the given stamped ss poll.
+
+    Args:
+        output: The ss output of a single poll.
+
+    Returns:
+        The trace id, or None if the poll is not stamped with its capture time.
+    """
+    match = CAPTURE_TIME_PATTERN.search(output)
+    return None if match is None else match.group(1)
+
+
+def create_tracer(directory_path: str, name: str) -> dict | None:
+    """Create the tracer of a module, which writes the stage boundaries it reaches to its own trace file.
+
+    Args:
+        directory_path: The output directory of the run.
+        name: The name of the module, which names its trace file.
+
+    Returns:
+        A dictionary with the trace file, or None if tracing is not enabled for the run, see TRACE_DIRECTORY.
+    """
+    trace_directory = os.path.join(directory_path, TRACE_DIRECTORY)
+    if not os.path.isdir(trace_directory):
+        return None
+
+    # Line buffered, so the boundaries are kept if the module is stopped.
+    path = os.path.join(trace_directory, f"{name}.txt")
+    return {"file": open(path, "a", buffering=1)}
+
+
+def record(
+    tracer: dict | None,
+    trace_id: str | None,
+    stage: str,
+    timestamp: int | None = None,
+) -> None:
+    """Record that the sample with the given trace id reached the boundary of the given stage.
+
+    Args:
+        tracer: The tracer, or None if tracing is not enabled, in which case nothing is recorded.
+        trace_id: The trace id of the sample, or None if it is unknown, in which case nothing is recorded.
+        stage: The stage, see STAGES.
+        timestamp: The time the boundary was reached at in ns from time.monotonic_ns (default: now),
+            which all processes on a host share.
+    """
+    if tracer is None or trace_id is None:
+        return
+
+    if timestamp is None:
+        timestamp = time.monotonic_ns()
+
+    tracer["file"].write(f"{trace_id} {stage} {timestamp}\n")
+
+
+def close_tracer(tracer: dict | None) -> None:
+    """Close the trace file of the given tracer.
+
+    Args:
+        tracer: The tracer, or None.
+    """
+    if tracer is not None:
+        tracer["file"].close()
+
+
+def read_traces(directory_path: str) -> dict:
+    """Read the trace files of the modules of a run.
+
+    A sample can reach a boundary more than once, e.g. if a write triggers multiple watchdog events,
+    in which case the first time is used.
+
+    Args:
+        directory_path: The output directory of the run.
+
+    Returns:
+        A dictionary with the times each sample reached each boundary in ns, keyed by trace id and stage.
+    """
+    trace_directory = os.path.join(directory_path, TRACE_DIRECTORY)
+    traces = {}
+    for file_name in sorted(os.listdir(trace_directory)):
+        with open(os.path.join(trace_directory, file_name)) as file:
+            for line in file:
+                fields = line.split()
+                if len(fields) != 3:
+                    continue
+
+                trace_id, stage, timestamp = fields[0], fields[1], int(fields[2])
+                stages = traces.setdefault(trace_id, {})
+                stages[stage] = min(timestamp, stages.get(stage, timestamp))
+
+    return traces
+
+
+def create_latency_report(traces: dict) -> dict:
+    """Create the per-stage latency report of the given traces.
+
+    Args:
+        traces: The traces, see read_traces.
+
+    Returns:
+        A dictionary with the number of samples, the percentiles and the max of the latency in ms of each stage
+        after the first, keyed by stage, and of the whole loop under END_TO_END.
+    """
+    boundaries = [*zip(STAGES, STAGES[1:]), (STAGES[0], STAGES[-1])]
+    names = [*STAGES[1:], END_TO_END]
+    latencies = {name: [] for name in names}
+    for stages in traces.values():
+        for name, (start, end) in zip(names, boundaries):
+            if start in stages and end in stages:
+                latencies[name].append((stages[end] - stages[start]) / 1e6)
+
+    report = {}
+    for name, values in latencies.items():
+        summary = {f"p{percentile}": 0.0 for percentile in LATENCY_PERCENTILES}
+        summary["max"] = 0.0
+        if values:
+            percentiles = np.percentile(values, LATENCY_PERCENTILES)
+            summary = {
+                f"p{percentile}": value.item()
+                for percentile, value in zip(LATENCY_PERCENTILES, percentiles)
+            } | {"max": max(values)}
+        report[name] = {"count": len(values)} | summary
+
+    return report
+
+
+def format_latency_report(report: dict) -> str:
+    """Format the given latency report as a table.
+
+    Args:
+        report: The report, see create_latency_report.
+
+    Returns:
+        The formatted report.
+    """
+    names = [f"p{percentile}" for percentile in LATENCY_PERCENTILES] + ["max"]
+    header = "".join(f"{name + ' (ms)':>13}" for name in names)
+    lines = [f"{'Stage':<18}{'Samples':>9}{header}"]
+    for stage, summary in report.items():
+        lines.append(
+            f"{stage:<18}{summary['count']:>9}"
+            + "".join(f"{summary[name]:>13.3f}" for name in names)
+        )
+
+    return "\n".join(lines)
@@ -0,0 +1,236 @@
+import os
+import socket
+import threading
+import time
+
+from typing import Callable
+from utils import sock_diag, ss_features
+
+# The size of the payload that is sent with each sendfile call (bytes).
+PAYLOAD_SIZE = 1 << 20
+
+# The size of the buffer that is received into (bytes).
+RECEIVE_BUFFER_SIZE = 1 << 20
+
+# The maximum length of the name of a congestion control algorithm, see TCP_CA_NAME_MAX in linux/tcp.h.
+TCP_CA_NAME_MAX = 16
+
+
+def get_socket_flow(sock: socket.socket) -> str:
+    """Get the flow of the given connected socket as ss prints it.
+
+    Args:
+        sock: The connected tcp socket.
+
+    Returns:
+        The local and peer address separated by a space, e.g. "10.1.1.100:5001 10.2.2.100:5201".
+    """
+    addresses = []
+    for host, port, *_ in (sock.getsockname(), sock.getpeername()):
+        address = socket.inet_pton(sock.family, host).ljust(16, b"\0")
+        addresses.append(sock_diag.join_address(sock.family, address, port))
+
+    return " ".join(addresses)
+
+
+def get_cc_algo(sock: socket.socket) -> str:
+    """Get the name of the congestion control algorithm of the given socket.
+
+    Args:
+        sock: The tcp socket.
+
+    Returns:
+        The name of the congestion control algorithm, e.g. "cubic".
+    """
+    name = sock.getsockopt(
+        socket.IPPROTO_TCP, socket.TCP_CONGESTION, TCP_CA_NAME_MAX
+    )
+    return name.split(b"\0", 1)[0].decode()
+
+
+def read_tcp_info(sock: socket.socket) -> dict:
+    """Read the tcp_info of the given socket with getsockopt.
+
+    Args:
+        sock: The tcp socket.
+
+    Returns:
+        The decoded tcp_info, see sock_diag.decode_tcp_info.
+    """
+    return sock_diag.decode_tcp_info(
+        sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_INFO, sock_diag.TCP_INFO.size)
+    )
+
+
+def create_message(
+    flow: str, cc_algo: str, info: dict, timer_message: dict | None = None
+) -> dict:
+    """Create the decoded reply of the kernel for a socket from its tcp_info, see sock_diag.decode_message.
+
+    The tcp_info does not contain the timer of the socket, which is only reported through sock_diag.
+    Its timer, expire time and retrans are taken from the given reply, if there is one.
+
+    Args:
+        flow: The flow of the socket, see get_socket_flow.
+        cc_algo: The name of the congestion control algorithm of the socket.
+        info: The decoded tcp_info of the socket, see read_tcp_info.
+        timer_message: The reply for the socket, see sock_diag.query_flow, which contains its timer.
+
+    Returns:
+        A dictionary with the same keys as sock_diag.decode_message, so the measurement can be decoded
+        with sock_diag.decode_record and formatted with sock_diag.format_record.
+    """
+    message = {
+        "flow": flow,
+        "state": info["state"],
+        "timer": 0,
+        "retrans": 0,
+        "expires": 0,
+        "rqueue": 0,
+        "wqueue": 0,
+        "info": info,
+        "cc_algo": cc_algo,
+        "cong_info": {},
+    }
+    if timer_message is not None:
+        for key in ("timer", "retrans", "expires", "rqueue", "wqueue", "cong_info"):
+            message[key] = timer_message[key]
+
+    return message
+
+
+def sample_tcp_info(
+    sock: socket.socket,
+    on_sample: Callable[[dict], None],
+    stop: threading.Event,
+    interval: float = ss_features.TIMESTAMP_INTERVAL,
+    timers: bool = True,
+) -> int:
+    """Sample the tcp_info of the given socket at a fixed cadence until the given event is set or the socket is closed.
+
+    The samples are scheduled at multiples of the interval from the first sample, so a slow sample
+    delays the next one but does not shift the ones after it. Meant to run in a dedicated thread
+    next to the thread that sends or receives on the socket.
+
+    Args:
+        sock: The connected tcp socket.
+        on_sample: The function that is called with each sample, i.e. a dictionary with the time the
+            tcp_info was read in microseconds from time.monotonic_ns under "timestamp" and the
+            measurement (see create_message) under "message".
+        stop: The event that stops the sampling.
+        interval: The interval between the samples in ms.
+        timers: Whether or not the timer of the socket is queried through sock_diag for each sample,
+            which is needed for the timer fields of the measurements.
+
+    Returns:
+        The number of samples.
+    """
+    flow = get_socket_flow(sock)
+    cc_algo = get_cc_algo(sock)
+    diag_sock = sock_diag.open_socket() if timers else None
+
+    samples = 0
+    next_sample = time.monotonic()
+    try:
+        while not stop.is_set():
+            timestamp = time.monotonic_ns() // 1000
+            try:
+                info = read_tcp_info(sock)
+            except OSError:
+                break
+
+            timer_message = None
+            if diag_sock is not None:
+                timer_message = sock_diag.query_flow(diag_sock, flow)
+
+            on_sample(
+                {
+                    "timestamp": timestamp,
+                    "message": create_message(flow, cc_algo, info, timer_message),
+                }
+            )
+            samples += 1
+
+            next_sample += interval / 1000
+            stop.wait(max(next_sample - time.monotonic(), 0))
+    finally:
+        if diag_sock is not None:
+            diag_sock.close()
+
+    return samples
+
+
+def start_sampler(
+    sock: socket.socket,
+    on_sample: Callable[[dict], None],
+    interval: float = ss_features.TIMESTAMP_INTERVAL,
+    timers: bool = True,
+) -> tuple:
+    """Start sampling the tcp_info of the given socket in a dedicated thread, see sample_tcp_info.
+
+    Args:
+        sock: The connected tcp socket.
+        on_sample: The function that is called with each sample.
+        interval: The interval between the samples in ms.
+        timers: Whether or not the timer of the socket is queried through sock_diag for each sample.
+
+    Returns:
+        A tuple containing the thread and the event that stops it.
+    """
+    stop = threading.Event()
+    thread = threading.Thread(
+        target=sample_tcp_info,
+        args=(sock, on_sample, stop, interval, timers),
+        daemon=True,
+    )
+    thread.start()
+
+    return thread, stop
+
+
+def send_bulk(
+    sock: socket.socket, duration: float, payload_size: int = PAYLOAD_SIZE
+) -> int:
+    """Send as much data as possible on the given socket for the given duration.
+
+    The payload is a memfd of zeros that is sent with sendfile, so it is not copied through user space.
+
+    Args:
+        sock: The connected tcp socket.
+        duration: The duration to send for in seconds.
+        payload_size: The number of bytes sent with each sendfile call.
+
+    Returns:
+        The number of bytes sent.
+    """
+    payload = os.memfd_create("payload")
+    try:
+        os.ftruncate(payload, payload_size)
+        sent = 0
+        end = time.monotonic() + duration
+        while time.monotonic() < end:
+            sent += os.sendfile(sock.fileno(), payload, 0, payload_size)
+    finally:
+        os.close(payload)
+
+    return sent
+
+
+def receive_bulk(sock: socket.socket, buffer_size: int = RECEIVE_BUFFER_SIZE) -> int:
+    """Receive and discard data on the given socket until the peer closes the connection.
+
+    The data is received into a single preallocated buffer, so nothing is allocated per receive.
+
+    Args:
+        sock: The connected tcp socket.
+        buffer_size: The size of the buffer that is received into.
+
+    Returns:
+        The number of bytes received.
+    """
+    buffer = memoryview(bytearray(buffer_size))
+    received = 0
+    while size := sock.recv_into(buffer):
+        received += size
+
+    return received
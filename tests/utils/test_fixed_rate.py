@@ -0,0 +1,57 @@
+import time
+import unittest
+import fixed_rate
+
+
+class TestFixedRateFunctions(unittest.TestCase):
+    def test_run_at_fixed_rate(self):
+        times = []
+        report = fixed_rate.run_at_fixed_rate(times.append, 10, 0.2)
+
+        self.assertEqual(report["runs"], len(times))
+        self.assertEqual(report["runs"] + report["missed"], 20)
+        self.assertEqual(report["target_rate"], 100)
+        # The runs are scheduled from the start, so their times do not drift.
+        for index, run_time in enumerate(times):
+            self.assertGreaterEqual(run_time, index * 10 - 0.001)
+
+    def test_run_at_fixed_rate_with_overruns(self):
+        times = []
+
+        def task(run_time: float) -> None:
+            times.append(run_time)
+            time.sleep(0.025)
+
+        report = fixed_rate.run_at_fixed_rate(task, 10, 0.2)
+
+        # Each run misses the next deadline, which is skipped instead of being caught up,
+        # and delays the one after it.
+        self.assertLessEqual(report["runs"], 8)
+        self.assertGreaterEqual(report["missed"], report["runs"] - 1)
+        self.assertGreater(report["jitter"]["max"], 4)
+        self.assertEqual(report["runs"] + report["missed"], 20)
+        self.assertLess(report["rate"], 50)
+
+    def test_run_at_fixed_rate_until_stopped(self):
+        times = []
+        report = fixed_rate.run_at_fixed_rate(
+            times.append, 10, float("inf"), lambda: len(times) == 5
+        )
+
+        self.assertEqual(report["runs"], 5)
+        self.assertEqual(len(times), 5)
+
+    def test_create_report(self):
+        report = fixed_rate.create_report([float(i) for i in range(101)], 3, 2.0, 20)
+
+        self.assertEqual((report["runs"], report["missed"]), (101, 3))
+        self.assertEqual((report["target_rate"], report["rate"]), (50, 50.5))
+        self.assertEqual(
+            report["jitter"], {"p50": 50.0, "p90": 90.0, "p99": 99.0, "max": 100.0}
+        )
+        self.assertIn("missed 3 deadlines", fixed_rate.format_report(report))
+        self.assertEqual(fixed_rate.create_report([], 0, 0.0, 0)["rate"], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
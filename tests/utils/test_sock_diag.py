@@ -0,0 +1,168 @@
+import socket
+import struct
+import unittest
+import sock_diag
+
+from utils import ss_parser
+
+FLOW = "10.1.1.100:5001 10.2.2.100:5201"
+
+TCP_INFO = dict.fromkeys(sock_diag.TCP_INFO_NAMES, 0) | {
+    "state": 1,
+    "options": 0x7,
+    "wscale": 0x99,
+    "rto": 300000,
+    "snd_mss": 1448,
+    "rcv_mss": 536,
+    "unacked": 822,
+    "sacked": 101,
+    "lost": 101,
+    "retrans": 49,
+    "last_data_sent": 12,
+    "last_data_recv": 556,
+    "pmtu": 1500,
+    "rcv_ssthresh": 42242,
+    "rtt": 99413,
+    "rttvar": 261,
+    "snd_ssthresh": 412,
+    "snd_cwnd": 669,
+    "advmss": 1448,
+    "rcv_space": 14480,
+    "total_retrans": 49,
+    "pacing_rate": 14375000,
+    "max_pacing_rate": sock_diag.UNSET_U64,
+    "bytes_acked": 1180158,
+    "segs_out": 1689,
+    "segs_in": 829,
+    "notsent_bytes": 4464744,
+    "min_rtt": 50036,
+    "data_segs_out": 1687,
+    "delivery_rate": 5975000,
+    "busy_time": 504312,
+    "rwnd_limited": 48100,
+    "delivered": 918,
+    "bytes_sent": 2441365,
+    "bytes_retrans": 70952,
+}
+
+MESSAGE = {
+    "flow": FLOW,
+    "state": 1,
+    "timer": 1,
+    "retrans": 0,
+    "expires": 300,
+    "rqueue": 0,
+    "wqueue": 5655000,
+    "info": TCP_INFO,
+    "cc_algo": "reno",
+    "cong_info": {},
+}
+
+
+def create_message(timer: dict = {}, **info) -> dict:
+    return MESSAGE | timer | {"info": TCP_INFO | info}
+
+
+class TestSockDiagFunctions(unittest.TestCase):
+    def test_decode_record(self):
+        # Values that ss omits, rounds or prints in other units than the tcp_info.
+        messages = [
+            MESSAGE,
+            create_message({"expires": 1200, "retrans": 3}),
+            create_message({"timer": 2, "expires": 72000}),
+            create_message({"expires": 0}),
+            create_message({"timer": 0}),
+            create_message(snd_ssthresh=0x7FFFFFFF, min_rtt=sock_diag.UNSET_U32),
+            create_message(busy_time=0, retrans=0, total_retrans=0, unacked=0),
+            create_message(rtt=0, pacing_rate=sock_diag.UNSET_U64, delivery_rate=0),
+            create_message(rto=201500, rtt=1234567, last_data_sent=0, snd_cwnd=0),
+        ]
+        fields = tuple(ss_parser.SS_SCHEMA_FIELDS)
+
+        for message in messages:
+            with self.subTest(message=message):
+                lines = sock_diag.format_record(message).splitlines()
+                record = "".join(line.strip() for line in lines)
+                self.assertEqual(ss_parser.get_flow(record), FLOW)
+                self.assertEqual(
+                    sock_diag.decode_record(message, fields),
+                    ss_parser.parse_record(record, fields),
+                )
+
+        record = sock_diag.decode_record(MESSAGE, fields)
+        self.assertEqual(record["expire_time"], 300)
+        self.assertEqual((record["rtt"], record["rtt_variance"]), (99.413, 0.261))
+        self.assertEqual(record["pacing_rate"], 115.0)
+        self.assertEqual(record["delivery_rate"], 47.8)
+        self.assertEqual((record["busy_time"], record["rwnd_limited"]), (504, 48))
+
+    def test_decode_message(self):
+        sockid = sock_diag.pack_sockid(FLOW)[1]
+        info = sock_diag.TCP_INFO.pack(*TCP_INFO.values())[:120]
+        bbr_info = struct.pack("=IIIII", 1000, 0, 50036, 256, 512)
+        attributes = b""
+        for attribute_type, data in (
+            (sock_diag.INET_DIAG_INFO, info),
+            (sock_diag.INET_DIAG_CONG, b"bbr\0"),
+            (sock_diag.INET_DIAG_BBRINFO, bbr_info),
+        ):
+            attribute = sock_diag.NLATTR.pack(4 + len(data), attribute_type) + data
+            attributes += attribute.ljust((len(attribute) + 3) & ~3, b"\0")
+
+        payload = (
+            struct.pack("=BBBB", socket.AF_INET, 1, 1, 2)
+            + sockid
+            + struct.pack("=IIIII", 300, 0, 5655000, 0, 0)
+            + attributes
+        )
+        message = sock_diag.decode_message(payload)
+
+        self.assertEqual(message["flow"], FLOW)
+        self.assertEqual(
+            (message["state"], message["timer"], message["retrans"]), (1, 1, 2)
+        )
+        self.assertEqual((message["expires"], message["wqueue"]), (300, 5655000))
+        self.assertEqual(message["cc_algo"], "bbr")
+        self.assertEqual(message["cong_info"]["bbr_min_rtt"], 50036)
+        self.assertEqual(message["info"]["snd_cwnd"], 669)
+        # The fields after the truncated tcp_info of an older kernel are 0.
+        self.assertEqual(message["info"]["bytes_acked"], 0)
+
+    def test_query_flow(self):
+        try:
+            sock = sock_diag.open_socket()
+        except OSError as e:
+            self.skipTest(f"netlink is not available: {e}")
+
+        with sock, socket.create_server(("127.0.0.1", 0)) as server:
+            with socket.create_connection(server.getsockname()) as client:
+                connection, _ = server.accept()
+                with connection:
+                    client.sendall(b"x" * 100000)
+                    connection.recv(100000)
+
+                    host, port = client.getsockname()
+                    flow = f"{host}:{port} {host}:{server.getsockname()[1]}"
+                    message = sock_diag.query_flow(sock, flow)
+                    poll = sock_diag.format_poll(sock_diag.dump_flows(sock, {flow}))
+
+        self.assertEqual(message["flow"], flow)
+        self.assertEqual(sock_diag.TCP_STATES[message["state"]], "ESTAB")
+        self.assertGreater(message["info"]["bytes_sent"], 0)
+        self.assertNotEqual(message["cc_algo"], "")
+        self.assertIsNotNone(sock_diag.decode_record(message)["cwnd"])
+        records = ss_parser.iter_records(poll.splitlines())
+        self.assertEqual([ss_parser.get_flow(record) for record in records], [flow])
+
+    def test_query_missing_flow(self):
+        try:
+            sock = sock_diag.open_socket()
+        except OSError as e:
+            self.skipTest(f"netlink is not available: {e}")
+
+        with sock:
+            self.assertIsNone(sock_diag.query_flow(sock, "127.0.0.1:1 127.0.0.1:2"))
+
+
+if __name__ == "__main__":
+    unittest.main()
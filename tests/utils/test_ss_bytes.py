@@ -0,0 +1,90 @@
+import tempfile
+import unittest
+import numpy as np
+import ss_bytes
+import util as utils
+
+from pathlib import Path
+from utils import ss_parser
+
+SOCKET = "tcp   ESTAB 0      5655000    10.1.1.100:5001   10.2.2.100:5201 timer:(on,300ms,0)"
+
+STATS = "\t ts sack ecn reno wscale:9,9 rto:300 rtt:99.413/0.261 mss:1448 pmtu:1500 rcvmss:536 advmss:1448 cwnd:669 ssthresh:412 bytes_sent:2441365 bytes_retrans:70952 bytes_acked:1180158 segs_out:1689 segs_in:829 data_segs_out:1687 send 78Mbps lastsnd:12 lastrcv:556 pacing_rate 115Mbps delivery_rate 47.8Mbps delivered:918 busy:504ms rwnd_limited:48ms(9.5%) unacked:822 retrans:49/49 lost:101 sacked:101 rcv_space:14480 rcv_ssthresh:42242 notsent:4464744 minrtt:50.036"
+
+HEADER = "Netid State Recv-Q Send-Q Local Address:Port  Peer Address:Port Process"
+
+# Lines covering the cases that ss_parser handles specially, such as headers, blank lines, sockets
+# without statistics, other flows and units, and missing, invalid or repeated values.
+SS_LINES = [
+    HEADER,
+    SOCKET,
+    STATS,
+    "State  Recv-Q Send-Q Local Address:Port  Peer Address:Port",
+    SOCKET.replace("tcp   ", "").replace("5001", "5002"),
+    "",
+    STATS.replace("cwnd:669", "cwnd:12.7").replace("115Mbps", "950kbps"),
+    "TIME-WAIT 0 0 10.1.1.100:5003 10.2.2.100:5201",
+    SOCKET.replace("timer:(on,300ms,0)", "timer:(keepalive,1min12sec,3)"),
+    "   ",
+    STATS.replace(" lastsnd:12", "").replace("delivery_rate 47.8Mbps", "delivery_rate 1.1Gbps"),
+    STATS,
+    SOCKET.replace("(on,300ms,0)", "(on,300ms)"),
+    STATS.replace("rtt:99.413/0.261", "rtt:99.413").replace("busy:504ms", "busy:504"),
+    SOCKET.replace(" timer:(on,300ms,0)", ""),
+    STATS.replace("cwnd:669", "cwnd:abc").replace("send 78Mbps", "send 500bps")
+    + " lost:7 unacked:1.5",
+    SOCKET.replace("10.2.2.100:5201", "[::ffff:10.2.2.100]:5201"),
+    STATS.replace("ts sack ecn reno", "ts sack ecn cubic").replace("115Mbps", "115"),
+]
+
+
+class TestSsBytesFunctions(unittest.TestCase):
+    def assert_parsed_ss_equal(self, ss_output: str):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "ss_data.txt"
+            path.write_text(ss_output)
+            expected = utils.create_parsed_ss(ss_parser.iter_ss(path))
+            parsed_ss = ss_bytes.parse_file(path)
+
+        self.assertEqual(parsed_ss["cc_algo"], expected["cc_algo"])
+        self.assertEqual(list(parsed_ss["columns"]), list(expected["columns"]))
+        for field, column in expected["columns"].items():
+            with self.subTest(field=field):
+                self.assertEqual(parsed_ss["columns"][field].dtype, column.dtype)
+                np.testing.assert_array_equal(
+                    np.ma.getmaskarray(parsed_ss["columns"][field]),
+                    np.ma.getmaskarray(column),
+                )
+                np.testing.assert_array_equal(
+                    parsed_ss["columns"][field].data, column.data
+                )
+
+    def test_parse_file(self):
+        self.assert_parsed_ss_equal("\n".join(SS_LINES) + "\n")
+
+    def test_parse_file_without_trailing_newline(self):
+        self.assert_parsed_ss_equal("\n".join(SS_LINES))
+
+    def test_parse_file_from_offset(self):
+        ss_output = "\n".join(SS_LINES)
+        offset = len("\n".join(SS_LINES[:3])) + 1
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "ss_data.txt"
+            path.write_text(ss_output)
+            parsed_ss = ss_bytes.parse_file(path, offset)
+            end = ss_bytes.parse_file(path, len(ss_output))
+
+        expected = utils.create_parsed_ss(ss_parser.iter_records(SS_LINES[3:]))
+        self.assertEqual(parsed_ss["cc_algo"], expected["cc_algo"])
+        self.assertEqual(
+            parsed_ss["columns"]["cwnd"].tolist(), expected["columns"]["cwnd"].tolist()
+        )
+        self.assertEqual(len(end["columns"]["flow"]), 0)
+
+    def test_parse_file_without_records(self):
+        self.assert_parsed_ss_equal("")
+        self.assert_parsed_ss_equal(HEADER + "\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
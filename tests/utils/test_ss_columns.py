@@ -0,0 +1,52 @@
+import unittest
+import ss_columns
+
+from utils import types
+
+SS_RECORD = """tcp   ESTAB 0      5655000    10.1.1.100:5001   10.2.2.100:5201 timer:(on,300ms,0)ts sack ecn reno wscale:9,9 rto:300 rtt:99.413/0.261 mss:1448 pmtu:1500 rcvmss:536 advmss:1448 cwnd:669 ssthresh:412 bytes_sent:2441365 bytes_retrans:70952 bytes_acked:1180158 segs_out:1689 segs_in:829 data_segs_out:1687 send 78Mbps lastsnd:12 lastrcv:556 pacing_rate 115Mbps delivery_rate 47.8Mbps delivered:918 busy:504ms rwnd_limited:48ms(9.5%) unacked:822 retrans:49/49 lost:101 sacked:101 rcv_space:14480 rcv_ssthresh:42242 notsent:4464744 minrtt:50.036"""
+
+
+class TestSsColumnsFunctions(unittest.TestCase):
+    def test_extract_columns(self):
+        columns = ss_columns.extract_columns([SS_RECORD])
+        self.assertEqual(columns[types.Feature.CWND].tolist(), [669])
+        self.assertEqual(columns[types.Feature.SSTHRESH].tolist(), [412])
+        self.assertEqual(columns[types.Feature.EXPIRE_TIME].tolist(), [300])
+        self.assertEqual(columns[types.Feature.RETRANS].tolist(), [0])
+        self.assertEqual(columns[types.Feature.RTO].tolist(), [300])
+        self.assertEqual(columns[types.Feature.RTT].tolist(), [99.413])
+        self.assertEqual(columns[types.Feature.RTT_VAR].tolist(), [0.261])
+        self.assertEqual(columns[types.Feature.LAST_SEND].tolist(), [12])
+        self.assertEqual(columns[types.Feature.PACING_RATE].tolist(), [115.0])
+
+    def test_extract_columns_with_missing_fields(self):
+        ss_outputs = [
+            SS_RECORD.replace(" lastsnd:12", ""),
+            SS_RECORD.replace("cwnd:669", "cwnd:550"),
+            SS_RECORD.replace("timer:(on,300ms,0)", ""),
+        ]
+        columns = ss_columns.extract_columns(
+            ss_outputs,
+            [types.Feature.CWND, types.Feature.LAST_SEND, types.Feature.EXPIRE_TIME],
+        )
+        self.assertEqual(columns[types.Feature.CWND].tolist(), [669, 550, 669])
+        self.assertEqual(columns[types.Feature.LAST_SEND].tolist(), [None, 12, 12])
+        self.assertEqual(columns[types.Feature.EXPIRE_TIME].tolist(), [300, 300, None])
+
+    def test_extract_rates(self):
+        ss_outputs = [
+            SS_RECORD.replace("pacing_rate 115Mbps", f"pacing_rate {rate}")
+            for rate in ("950kbps", "1.1Gbps", "500bps", "115")
+        ]
+        pacing_rates = ss_columns.extract_columns(
+            ss_outputs, [types.Feature.PACING_RATE]
+        )[types.Feature.PACING_RATE]
+        self.assertEqual(pacing_rates.tolist(), [0.95, 1100.0, 0.0005, None])
+
+    def test_extract_columns_without_ss_outputs(self):
+        columns = ss_columns.extract_columns([], [types.Feature.CWND])
+        self.assertEqual(columns[types.Feature.CWND].tolist(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import tempfile
+import unittest
+import ss_dataset
+
+from utils import ss_sample
+
+from pathlib import Path
+
+
+class TestSsDatasetFunctions(unittest.TestCase):
+    def test_parse_directory_path(self):
+        metadata = ss_dataset.parse_directory_path(
+            "output/text/reno/2bg_flows/100ms_50mbit_312500bytes_60s_half"
+        )
+        self.assertEqual(
+            metadata,
+            {
+                "cc_algo": "reno",
+                "bg_flows": 2,
+                "delay": 100,
+                "bandwidth": 50,
+                "queue_size": 312500,
+                "duration": 60,
+                "scenario": "half",
+            },
+        )
+
+        metadata = ss_dataset.parse_directory_path(
+            Path("cubic/0bg_flows/20ms_10mbit_1000bytes_30s")
+        )
+        self.assertEqual(metadata["cc_algo"], "cubic")
+        self.assertEqual(metadata["scenario"], "")
+
+        metadata = ss_dataset.parse_directory_path("output/test")
+        self.assertEqual(metadata, ss_dataset.METADATA_COLUMNS)
+
+    def test_create_and_load_dataset(self):
+        columns = ("timer_name", "rtt", "cwnd", "lost")
+        rows = [
+            ss_sample.SsSample(timer_name="on", rtt=99.4, cwnd=669, lost=False),
+            ss_sample.SsSample(timer_name="keepalive", rtt=50.0, cwnd=10, lost=True),
+        ]
+        row_groups = [
+            ({"cc_algo": "reno", "delay": 100}, rows),
+            ({"cc_algo": "cubic", "delay": 20}, []),
+            ({"cc_algo": "cubic", "delay": 20}, rows[:1]),
+        ]
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "dataset"
+            self.assertEqual(ss_dataset.create_dataset(row_groups, path, columns), 3)
+
+            dataset = ss_dataset.load_dataset(path)
+            self.assertEqual(dataset["row_groups"].tolist(), [2, 1])
+            self.assertEqual(dataset["columns"]["rtt"].tolist(), [99.4, 50.0, 99.4])
+            self.assertEqual(dataset["columns"]["cwnd"].dtype.kind, "i")
+            self.assertEqual(
+                dataset["columns"]["lost"].tolist(), [False, True, False]
+            )
+            self.assertEqual(dataset["columns"]["timer_name"].tolist(), [0, 1, 0])
+            self.assertEqual(
+                ss_dataset.get_column(dataset, "timer_name").tolist(),
+                ["on", "keepalive", "on"],
+            )
+            self.assertEqual(
+                ss_dataset.get_column(dataset, "cc_algo").tolist(),
+                ["reno", "reno", "cubic"],
+            )
+            self.assertEqual(dataset["columns"]["delay"].tolist(), [100, 100, 20])
+
+    def test_create_dataset_of_stamped_and_unstamped_files(self):
+        # The timestamps of unstamped measurements start as integers, the ones of stamped measurements are
+        # taken from their capture times.
+        unstamped = [ss_sample.SsSample(timestamp=0, min_rtt=0, cwnd=10)]
+        stamped = [ss_sample.SsSample(timestamp=20.125, min_rtt=50.5, cwnd=12)]
+        columns = ("timestamp", "min_rtt", "cwnd")
+
+        with tempfile.TemporaryDirectory() as directory:
+            ss_dataset.create_dataset(
+                [({"delay": 100}, unstamped), ({"delay": 20}, stamped)],
+                directory,
+                columns,
+            )
+
+            dataset = ss_dataset.load_dataset(directory)
+            self.assertEqual(dataset["columns"]["timestamp"].tolist(), [0.0, 20.125])
+            self.assertEqual(dataset["columns"]["min_rtt"].tolist(), [0.0, 50.5])
+            self.assertEqual(dataset["columns"]["cwnd"].dtype.kind, "i")
+
+    def test_add_columns(self):
+        rows = [
+            ss_sample.SsSample(cwnd=10, lost=False),
+            ss_sample.SsSample(cwnd=5, lost=True),
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            ss_dataset.create_dataset(
+                [({"cc_algo": "reno"}, rows)], directory, ("cwnd", "lost")
+            )
+            ss_dataset.add_columns(directory, {"lost_next_1": [True, False]})
+            ss_dataset.add_columns(directory, {"cc_algo": [1.5, 2.5]})
+
+            dataset = ss_dataset.load_dataset(directory)
+            self.assertEqual(
+                list(dataset["columns"]), ["cwnd", "lost", "cc_algo", "lost_next_1"]
+            )
+            self.assertEqual(dataset["columns"]["lost_next_1"].tolist(), [True, False])
+            self.assertEqual(dataset["columns"]["cc_algo"].tolist(), [1.5, 2.5])
+            self.assertEqual(dataset["categories"], {})
+
+            with self.assertRaises(ValueError):
+                ss_dataset.add_columns(directory, {"lost_next_2": [True]})
+
+    def test_create_empty_dataset(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.assertEqual(ss_dataset.create_dataset([], directory, ("cwnd",)), 0)
+            self.assertEqual(ss_dataset.load_dataset(directory)["columns"], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+import ss_features
+
+from utils import ss_parser, ss_sample
+
+
+def create_record(cwnd: int | None, rtt: float = 100.0, **fields) -> dict:
+    record = dict.fromkeys(ss_parser.SS_RECORD_FIELDS, 1)
+    record.update(rtt=rtt, cwnd=cwnd, ssthresh=50, data_segments_sent=10)
+    record.update(fields)
+    return record
+
+
+class TestSsFeaturesFunctions(unittest.TestCase):
+    def test_add_cwnd_diff(self):
+        state = ss_features.create_state()
+        cwnd_diffs = []
+        for cwnd in [10, 10, 20, 20, 20, 15, 15, 30]:
+            sample = ss_sample.SsSample()
+            ss_features.add_cwnd_diff(state, sample, cwnd)
+            cwnd_diffs.append(sample.cwnd_diff)
+
+        self.assertEqual(cwnd_diffs, [0, 0, 10, 10, 10, -5, -5, 15])
+
+    def test_add_cwnd_diff_on_long_plateau(self):
+        state = ss_features.create_state()
+        ss_features.add_cwnd_diff(state, ss_sample.SsSample(), 10)
+        for _ in range(100000):
+            sample = ss_sample.SsSample()
+            ss_features.add_cwnd_diff(state, sample, 12)
+
+        self.assertEqual(sample.cwnd_diff, 2)
+
+    def test_create_features(self):
+        state = ss_features.create_state()
+        ss_features.add_rtt(state, 50.0)
+
+        first = ss_features.create_features(
+            state, create_record(10, rtt=100.0, data_segments_sent=5)
+        )
+        second = ss_features.create_features(
+            state, create_record(None, rtt=80.0, data_segments_sent=12)
+        )
+        third = ss_features.create_features(state, create_record(20))
+
+        self.assertEqual(first.timestamp, 0)
+        self.assertEqual(second.timestamp, 20)
+        self.assertEqual((first.min_rtt, first.max_rtt), (50.0, 100.0))
+        self.assertEqual((second.min_rtt, second.max_rtt), (50.0, 100.0))
+        self.assertEqual(first.data_segments_sent, 5)
+        self.assertEqual(second.data_segments_sent, 7)
+        self.assertIsNone(second.cwnd_diff)
+        self.assertEqual(third.cwnd_diff, 10)
+        self.assertEqual((third.min_cwnd, third.max_cwnd), (10, 20))
+        self.assertEqual(list(ss_sample.to_dict(first))[-1], "max_ssthresh")
+
+    def test_create_features_with_capture_time(self):
+        state = ss_features.create_state()
+        timestamps = []
+        for capture_time in (1000.25, 1021.5, 1037.75, None):
+            sample = ss_features.create_features(state, create_record(10), capture_time)
+            timestamps.append(sample.timestamp)
+
+        # The timestamps are the time since the first measurement instead of multiples of 20.
+        self.assertEqual(timestamps, [0, 21.25, 37.5, 57.5])
+
+
+if __name__ == "__main__":
+    unittest.main()
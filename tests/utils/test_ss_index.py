@@ -0,0 +1,168 @@
+import gzip
+import tempfile
+import unittest
+import unittest.mock
+import ss_index
+import numpy as np
+
+from pathlib import Path
+
+FIRST_LINE = "tcp   ESTAB 0      5655000    10.1.1.100:5001   10.2.2.100:5201 timer:(on,300ms,0)"
+SECOND_LINE = "ts sack ecn reno wscale:9,9 rto:300 rtt:{rtt}/0.261 mss:1448 cwnd:{cwnd} ssthresh:412"
+HEADER = "Netid State Recv-Q Send-Q Local Address:Port Peer Address:Port"
+
+
+def create_ss_file(directory: str, rtts: list) -> Path:
+    lines = [HEADER]
+    for cwnd, rtt in enumerate(rtts):
+        lines += [FIRST_LINE, "\t" + SECOND_LINE.format(rtt=rtt, cwnd=cwnd)]
+
+    file_path = Path(directory) / "ss_data.txt"
+    file_path.write_text("\n".join(lines) + "\n")
+    return file_path
+
+
+class TestSsIndexFunctions(unittest.TestCase):
+    def test_build_index(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = create_ss_file(directory, [10, 20.5, 30])
+            index = ss_index.build_index(file_path)
+
+            content = file_path.read_bytes()
+            self.assertEqual(len(index["offsets"]), 3)
+            for offset in index["offsets"]:
+                self.assertTrue(content[offset:].startswith(FIRST_LINE.encode()))
+            self.assertEqual(index["cumulative_rtts"].tolist(), [0, 10, 30.5])
+
+    def test_read_records(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = create_ss_file(directory, [10, 20, 30, 40])
+            index = ss_index.load_index(file_path)
+
+            records = list(ss_index.read_records(file_path, index, 1, 3))
+            self.assertEqual(len(records), 2)
+            self.assertIn("cwnd:1 ", records[0])
+            self.assertIn("cwnd:2 ", records[1])
+            self.assertEqual(len(list(ss_index.read_records(file_path, index, 3))), 1)
+            self.assertEqual(list(ss_index.read_records(file_path, index, 5)), [])
+
+    def test_load_index(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = create_ss_file(directory, [10, 20])
+            self.assertEqual(len(ss_index.load_index(file_path)["offsets"]), 2)
+            self.assertTrue(ss_index.get_index_path(file_path).is_file())
+
+            # The index is rebuilt when the ss output file changes.
+            create_ss_file(directory, [10, 20, 30])
+            self.assertEqual(len(ss_index.load_index(file_path)["offsets"]), 3)
+
+    def test_get_record_at_rtt(self):
+        index = {
+            "offsets": np.arange(5),
+            "flows": np.array(["a", "a", "b", "a", "a"]),
+            "cumulative_rtts": np.array([0, 10, 0, 30, 60]),
+        }
+        self.assertEqual(ss_index.get_record_at_rtt(index, 0, "a"), 1)
+        self.assertEqual(ss_index.get_record_at_rtt(index, 10, "a"), 3)
+        self.assertEqual(ss_index.get_record_at_rtt(index, 100, "a"), 5)
+        self.assertEqual(ss_index.get_record_at_rtt(index, 0, "b"), 5)
+
+    def test_build_index_with_multiple_flows(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = Path(directory) / "ss_data.txt"
+            second_flow = FIRST_LINE.replace("5001", "5002").replace("5201", "5202")
+            file_path.write_text(
+                f"{HEADER}\n{FIRST_LINE}\n\t{SECOND_LINE.format(rtt=10, cwnd=1)}\n"
+                f"{second_flow}\n\t{SECOND_LINE.format(rtt=20, cwnd=2)}\n"
+                f"{FIRST_LINE}\n\t{SECOND_LINE.format(rtt=30, cwnd=3)}\n"
+            )
+            index = ss_index.build_index(file_path)
+
+            self.assertEqual(
+                index["flows"].tolist(),
+                [
+                    "10.1.1.100:5001 10.2.2.100:5201",
+                    "10.1.1.100:5002 10.2.2.100:5202",
+                    "10.1.1.100:5001 10.2.2.100:5201",
+                ],
+            )
+            self.assertEqual(index["cumulative_rtts"].tolist(), [0, 0, 10])
+
+
+    def test_get_warmup_end(self):
+        self.assertEqual(ss_index.get_warmup_end(np.array([10, 0, 10, 5, 5]), 15), 3)
+        self.assertEqual(ss_index.get_warmup_end(np.array([10, 10]), 15), 2)
+        self.assertEqual(ss_index.get_warmup_end(np.array([10, 10]), 30), 2)
+        self.assertEqual(ss_index.get_warmup_end(np.array([]), 30), 0)
+
+    def test_locate_warmup_end(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = create_ss_file(directory, [10, 20, 30, 40])
+            index = ss_index.build_index(file_path)
+
+            size = len(file_path.read_bytes())
+            offset = ss_index.locate_warmup_end(file_path, 25)
+            self.assertEqual(offset, index["offsets"][2])
+            self.assertEqual(ss_index.locate_warmup_end(file_path, 100), size)
+            self.assertEqual(
+                ss_index.locate_warmup_end(file_path, 25, "10.1.1.100:5002 x"), size
+            )
+
+            gzip_path = Path(directory) / "ss_data.txt.gz"
+            gzip_path.write_bytes(gzip.compress(file_path.read_bytes()))
+            self.assertEqual(ss_index.locate_warmup_end(gzip_path, 25), offset)
+
+    def test_locate_warmup(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = create_ss_file(directory, [20, 10, 30, 40])
+            index = ss_index.build_index(file_path)
+
+            warmup = ss_index.locate_warmup(file_path, 25)
+            self.assertEqual(warmup["offset"], index["offsets"][2])
+            self.assertEqual((warmup["min_rtt"], warmup["max_rtt"]), (10, 20))
+
+            warmup = ss_index.locate_warmup(file_path, 25, "10.1.1.100:5002 x")
+            self.assertEqual(warmup["offset"], len(file_path.read_bytes()))
+            self.assertEqual((warmup["min_rtt"], warmup["max_rtt"]), (None, None))
+
+    def test_locate_warmup_end_in_chunks(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = create_ss_file(directory, [10, 20, 30, 40])
+            gzip_path = Path(directory) / "ss_data.txt.gz"
+            gzip_path.write_bytes(gzip.compress(file_path.read_bytes()))
+            flow = "10.1.1.100:5001 10.2.2.100:5201"
+
+            # Chunks that end in the middle of the first and second lines of the records.
+            for chunk_size in (7, 64, 100):
+                with self.subTest(chunk_size=chunk_size), unittest.mock.patch.object(
+                    ss_index, "WARMUP_CHUNK_SIZE", chunk_size
+                ):
+                    for threshold in (25, 100):
+                        self.assertEqual(
+                            ss_index.locate_warmup(gzip_path, threshold, flow),
+                            ss_index.locate_warmup(file_path, threshold, flow),
+                        )
+
+    def test_locate_warmup_end_of_flow(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = Path(directory) / "ss_data.txt"
+            second_flow = FIRST_LINE.replace("5001", "5002").replace("5201", "5202")
+            file_path.write_text(
+                f"{HEADER}\n{FIRST_LINE}\n\t{SECOND_LINE.format(rtt=10, cwnd=1)}\n"
+                f"{second_flow}\n\t{SECOND_LINE.format(rtt=50, cwnd=2)}\n"
+                f"{FIRST_LINE}\n\t{SECOND_LINE.format(rtt=30, cwnd=3)}\n"
+                f"{FIRST_LINE}\n\t{SECOND_LINE.format(rtt=30, cwnd=4)}\n"
+            )
+            index = ss_index.build_index(file_path)
+
+            self.assertEqual(
+                ss_index.locate_warmup_end(file_path, 25), index["offsets"][2]
+            )
+            offset = ss_index.locate_warmup_end(
+                file_path, 25, "10.1.1.100:5001 10.2.2.100:5201"
+            )
+            self.assertEqual(offset, index["offsets"][3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+import ss_labels
+import numpy as np
+
+
+class TestSsLabelsFunctions(unittest.TestCase):
+    def test_get_segment_starts(self):
+        segment_starts = ss_labels.get_segment_starts([20, 40, 60, 20, 40, 20])
+        self.assertEqual(
+            segment_starts.tolist(), [True, False, False, True, False, True]
+        )
+        self.assertEqual(
+            ss_labels.get_segment_ends(segment_starts).tolist(), [2, 2, 2, 4, 4, 5]
+        )
+
+    def test_get_loss_events(self):
+        cwnd = [10, 12, 6, 8, 8, 4]
+        self.assertEqual(
+            ss_labels.get_loss_events(cwnd).tolist(),
+            [False, False, True, False, False, True],
+        )
+
+        # A drop between two flows is not a loss.
+        segment_starts = np.array([True, False, True, False, False, False])
+        events = ss_labels.get_loss_events(
+            cwnd,
+            segment_starts,
+            lost_segments=[0, 1, 0, 0, 0, 0],
+            retrans=[0, 0, 0, 0, 2, 0],
+        )
+        self.assertEqual(events.tolist(), [False, True, False, False, True, True])
+
+        # Neither are the retransmissions counted from the previous flow.
+        events = ss_labels.get_loss_events(
+            [10, 10, 10, 10, 10],
+            np.array([True, False, False, True, False]),
+            retrans=[7, 0, 0, 3, 0],
+        )
+        self.assertEqual(events.tolist(), [False, False, False, False, False])
+
+    def test_label_sample_horizons(self):
+        events = np.array([False, False, False, True, False, False, False, True])
+        segment_starts = np.zeros(len(events), dtype=bool)
+        segment_starts[[0, 5]] = True
+        labels = ss_labels.label_sample_horizons(events, [1, 3], segment_starts)
+
+        self.assertEqual(
+            labels[1].tolist(), [False, False, True, False, False, False, True, False]
+        )
+        self.assertEqual(
+            labels[3].tolist(), [True, True, True, False, False, True, True, False]
+        )
+
+    def test_label_sample_horizons_of_coalesced_rows(self):
+        events = np.array([False, False, True, False])
+        repeats = np.array([3, 1, 2, 1])
+        labels = ss_labels.label_sample_horizons(events, [1, 4], repeats=repeats)
+
+        # The loss is detected 4 measurements after the first row and 1 after the second.
+        self.assertEqual(labels[1].tolist(), [False, True, False, False])
+        self.assertEqual(labels[4].tolist(), [True, True, False, False])
+
+    def test_label_time_horizons(self):
+        events = np.array([False, False, True, False, False, True])
+        timestamps = np.array([20, 40, 100, 20, 40, 60])
+        labels = ss_labels.label_time_horizons(events, timestamps, [20, 60])
+
+        self.assertEqual(
+            labels[20].tolist(), [False, False, False, False, True, False]
+        )
+        self.assertEqual(labels[60].tolist(), [False, True, False, True, True, False])
+
+    def test_label_time_horizons_of_many_flows(self):
+        rng = np.random.default_rng(0)
+        timestamps = np.concatenate(
+            [np.cumsum(rng.integers(1, 40, 500)) for _ in range(4)]
+        )
+        events = rng.random(len(timestamps)) < 0.05
+        horizons = [500, 10, 100, 40]
+        labels = ss_labels.label_time_horizons(events, timestamps, horizons)
+
+        segment_ends = ss_labels.get_segment_ends(
+            ss_labels.get_segment_starts(timestamps)
+        )
+        for horizon in horizons:
+            expected = [
+                any(
+                    events[j] and timestamps[j] <= timestamps[i] + horizon
+                    for j in range(i + 1, segment_ends[i] + 1)
+                )
+                for i in range(len(timestamps))
+            ]
+            self.assertEqual(labels[horizon].tolist(), expected)
+
+    def test_label_without_events(self):
+        labels = ss_labels.label_time_horizons(np.array([], dtype=bool), [], [20])
+        self.assertEqual(labels[20].tolist(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
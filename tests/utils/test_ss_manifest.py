@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+import ss_manifest
+
+from pathlib import Path
+
+
+class TestSsManifestFunctions(unittest.TestCase):
+    def test_get_file_entry(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = Path(directory) / "ss_output.txt"
+            file_path.write_text("rtt:100/1\n")
+
+            entry = ss_manifest.get_file_entry(file_path)
+            self.assertEqual(entry["size"], 10)
+            self.assertEqual(entry["hash"], ss_manifest.get_file_hash(file_path))
+
+            # The hash of an untouched file is reused without reading it.
+            prev_entry = {**entry, "hash": "previous"}
+            self.assertEqual(
+                ss_manifest.get_file_entry(file_path, prev_entry)["hash"], "previous"
+            )
+
+            os.utime(file_path, ns=(0, 0))
+            self.assertEqual(
+                ss_manifest.get_file_entry(file_path, prev_entry)["hash"],
+                entry["hash"],
+            )
+
+    def test_save_and_load_manifest(self):
+        with tempfile.TemporaryDirectory() as directory:
+            manifest = ss_manifest.create_manifest(("rtt", "lost"))
+            manifest["files"]["a.txt"] = {"hash": "a", "shard": "a.csv", "rows": 1}
+            ss_manifest.save_manifest(directory, manifest)
+
+            self.assertEqual(
+                ss_manifest.load_manifest(directory, ("rtt", "lost")), manifest
+            )
+            self.assertEqual(
+                ss_manifest.load_manifest(directory, ("rtt",))["files"], {}
+            )
+
+            (Path(directory) / ss_manifest.MANIFEST_FILE).write_text("{")
+            self.assertEqual(
+                ss_manifest.load_manifest(directory, ("rtt", "lost"))["files"], {}
+            )
+
+    def test_get_stale_paths(self):
+        with tempfile.TemporaryDirectory() as directory:
+            directory = Path(directory)
+            file_paths = [directory / "a.txt", directory / "b.txt"]
+            for file_path in file_paths:
+                file_path.write_text(file_path.name)
+
+            manifest = ss_manifest.create_manifest(("rtt",))
+            stale_paths, entries = ss_manifest.get_stale_paths(
+                directory, manifest, file_paths
+            )
+            self.assertEqual(stale_paths, file_paths)
+
+            for entry in entries.values():
+                (directory / entry["shard"]).write_text("")
+                entry["rows"] = 0
+            manifest["files"] = entries
+
+            self.assertEqual(
+                ss_manifest.get_stale_paths(directory, manifest, file_paths)[0], []
+            )
+
+            file_paths[1].write_text("changed")
+            (directory / entries[str(file_paths[0])]["shard"]).unlink()
+            self.assertEqual(
+                ss_manifest.get_stale_paths(directory, manifest, file_paths)[0],
+                file_paths,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
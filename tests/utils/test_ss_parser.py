@@ -0,0 +1,169 @@
+import gzip
+import tempfile
+import unittest
+import ss_parser
+
+from pathlib import Path
+
+SS_RECORD = """tcp   ESTAB 0      5655000    10.1.1.100:5001   10.2.2.100:5201 timer:(on,300ms,0)ts sack ecn reno wscale:9,9 rto:300 rtt:99.413/0.261 mss:1448 pmtu:1500 rcvmss:536 advmss:1448 cwnd:669 ssthresh:412 bytes_sent:2441365 bytes_retrans:70952 bytes_acked:1180158 segs_out:1689 segs_in:829 data_segs_out:1687 send 78Mbps lastsnd:12 lastrcv:556 pacing_rate 115Mbps delivery_rate 47.8Mbps delivered:918 busy:504ms rwnd_limited:48ms(9.5%) unacked:822 retrans:49/49 lost:101 sacked:101 rcv_space:14480 rcv_ssthresh:42242 notsent:4464744 minrtt:50.036"""
+
+
+class TestSsParserFunctions(unittest.TestCase):
+    def test_tokenize(self):
+        tokens = ss_parser.tokenize(SS_RECORD)
+        self.assertEqual(tokens["timer"], "(on,300ms,0)ts")
+        self.assertEqual(tokens["rtt"], "99.413/0.261")
+        self.assertEqual(tokens["ssthresh"], "412")
+        self.assertEqual(tokens["rcv_ssthresh"], "42242")
+        self.assertEqual(tokens["pacing_rate"], "115Mbps")
+        self.assertEqual(tokens["delivery_rate"], "47.8Mbps")
+
+    def test_parse_record(self):
+        self.assertEqual(
+            ss_parser.parse_record(SS_RECORD),
+            {
+                "timer_name": "on",
+                "expire_time": 300,
+                "retrans": 0,
+                "rto": 300,
+                "rtt": 99.413,
+                "rtt_variance": 0.261,
+                "cwnd": 669,
+                "ssthresh": 412,
+                "data_segments_sent": 1687,
+                "last_send": 12,
+                "pacing_rate": 115.0,
+            },
+        )
+
+    def test_parse_record_with_missing_fields(self):
+        record = ss_parser.parse_record(
+            SS_RECORD.replace(" lastsnd:12", "").replace("timer:(on,300ms,0)", "")
+        )
+        self.assertEqual(tuple(record.keys()), ss_parser.SS_RECORD_FIELDS)
+        self.assertIsNone(record["last_send"])
+        self.assertIsNone(record["timer_name"])
+        self.assertEqual(record["cwnd"], 669)
+        self.assertFalse(ss_parser.record_complete(record))
+        self.assertTrue(ss_parser.record_complete(ss_parser.parse_record(SS_RECORD)))
+
+    def test_parse_rate(self):
+        self.assertEqual(ss_parser.parse_rate("115Mbps"), 115.0)
+        self.assertEqual(ss_parser.parse_rate("950kbps"), 0.95)
+        self.assertEqual(ss_parser.parse_rate("1.1Gbps"), 1100.0)
+        self.assertEqual(ss_parser.parse_rate("500bps"), 0.0005)
+        self.assertIsNone(ss_parser.parse_rate(None))
+
+    def test_parse_record_with_schema_fields(self):
+        fields = ("cwnd", "bytes_retrans", "delivery_rate", "send_rate", "busy_time")
+        fields += ("rwnd_limited", "retrans_in_flight", "total_retrans", "path_min_rtt")
+        self.assertEqual(
+            ss_parser.parse_record(SS_RECORD, fields),
+            {
+                "cwnd": 669,
+                "bytes_retrans": 70952,
+                "delivery_rate": 47.8,
+                "send_rate": 78.0,
+                "busy_time": 504,
+                "rwnd_limited": 48,
+                "retrans_in_flight": 49,
+                "total_retrans": 49,
+                "path_min_rtt": 50.036,
+            },
+        )
+
+        # ss omits most fields that are zero, but not the ones without a default.
+        record = SS_RECORD.replace(" lost:101", "").replace(" minrtt:50.036", "")
+        parsed_record = ss_parser.parse_record(record, ("lost_segments", "path_min_rtt"))
+        self.assertEqual(parsed_record, {"lost_segments": 0, "path_min_rtt": None})
+
+    def test_schema(self):
+        self.assertEqual(len(ss_parser.SS_SCHEMA_FIELDS), len(ss_parser.SS_SCHEMA))
+        for field in ss_parser.SS_SCHEMA:
+            self.assertIn(field.kind, (ss_parser.COUNTER, ss_parser.GAUGE))
+        for field in ss_parser.SS_RECORD_FIELDS:
+            self.assertIsNone(ss_parser.SS_SCHEMA_FIELDS[field].default)
+
+    def test_add_capture_time(self):
+        first_line, second_line = SS_RECORD[:80], SS_RECORD[80:]
+        output = (
+            "Netid State Recv-Q Send-Q Local Address:Port Peer Address:Port\n"
+            f"{first_line}\n\t{second_line}\n"
+        )
+        lines = ss_parser.add_capture_time(output, 1234.5678).splitlines()
+        self.assertEqual(lines[:2], output.splitlines()[:2])
+
+        records = list(ss_parser.iter_records(lines))
+        self.assertEqual(records, [f"{SS_RECORD} capture_time:1234.568"])
+        fields = ("path_min_rtt", "capture_time")
+        self.assertEqual(
+            ss_parser.parse_record(records[0], fields),
+            {"path_min_rtt": 50.036, "capture_time": 1234.568},
+        )
+        self.assertIsNone(ss_parser.parse_record(SS_RECORD, fields)["capture_time"])
+
+    def test_iter_records(self):
+        first_line, second_line = SS_RECORD[:80], SS_RECORD[80:]
+        lines = [
+            "Netid State Recv-Q Send-Q Local Address:Port Peer Address:Port\n",
+            f"\t{second_line}\n",
+            f"{first_line}\n",
+            "Netid State Recv-Q Send-Q Local Address:Port Peer Address:Port\n",
+            f"\t{second_line}\n",
+            f"{first_line}\n",
+        ]
+        records = ss_parser.iter_records(iter(lines))
+        self.assertEqual(next(records), SS_RECORD)
+        self.assertEqual(list(records), [])
+
+    def test_iter_records_without_netid(self):
+        lines = [
+            "State Recv-Q Send-Q Local Address:Port Peer Address:Port Process\n",
+            "TIME-WAIT 0 0 10.1.1.100:40000 10.2.2.100:5201 timer:(timewait,50sec,0)\n",
+            "ESTAB 0 5655000 10.1.1.100:5001 10.2.2.100:5201 timer:(on,300ms,0)\n",
+            "\t ts sack cubic wscale:9,9 rto:300 cwnd:10\n",
+        ]
+        records = list(ss_parser.iter_records(lines))
+        self.assertEqual(len(records), 1)
+        self.assertTrue(records[0].startswith("ESTAB"))
+        self.assertEqual(
+            ss_parser.get_flow(records[0]), "10.1.1.100:5001 10.2.2.100:5201"
+        )
+
+    def test_get_flow(self):
+        flow = "10.1.1.100:5001 10.2.2.100:5201"
+        self.assertEqual(ss_parser.get_flow(SS_RECORD), flow)
+        self.assertEqual(
+            ss_parser.get_flow(
+                "ESTAB 0 0 10.1.1.100:5001 10.2.2.100:5201cubic wscale:9,9 rto:204"
+            ),
+            flow,
+        )
+        self.assertIsNone(ss_parser.get_flow("ESTAB 0 0"))
+
+    def test_split_flows(self):
+        background_record = SS_RECORD.replace("5001", "5002")
+        flows = ss_parser.split_flows([SS_RECORD, background_record, SS_RECORD])
+        self.assertEqual(
+            flows,
+            {
+                "10.1.1.100:5001 10.2.2.100:5201": [SS_RECORD, SS_RECORD],
+                "10.1.1.100:5002 10.2.2.100:5201": [background_record],
+            },
+        )
+
+    def test_iter_ss(self):
+        content = f"{SS_RECORD[:80]}\n\t{SS_RECORD[80:]}\n" * 3
+        with tempfile.TemporaryDirectory() as directory:
+            text_path = Path(directory) / "ss_data.txt"
+            text_path.write_text(content)
+            gzip_path = Path(directory) / "ss_data.txt.gz"
+            with gzip.open(gzip_path, "wt") as gzip_file:
+                gzip_file.write(content)
+
+            self.assertEqual(list(ss_parser.iter_ss(text_path)), [SS_RECORD] * 3)
+            self.assertEqual(list(ss_parser.iter_ss(gzip_path)), [SS_RECORD] * 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
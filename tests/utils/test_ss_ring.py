@@ -0,0 +1,93 @@
+import os
+import unittest
+import numpy as np
+import ss_ring
+
+from utils import ss_parser
+
+FLOW = "10.1.1.100:5001 10.2.2.100:5201"
+
+SS_POLL = f"""State Recv-Q Send-Q Local Address:Port Peer Address:Port Process
+ESTAB 0 5655000 {FLOW} timer:(on,300ms,0)
+\t ts sack ecn reno wscale:9,9 rto:300 rtt:99.413/0.261 cwnd:669 ssthresh:412 data_segs_out:1687 lastsnd:12 pacing_rate 115Mbps capture_time:20.500
+ESTAB 0 0 10.1.1.100:5002 10.2.2.100:5202
+\t ts sack ecn reno wscale:9,9 rto:300 rtt:50/0.1 cwnd:10
+"""
+
+
+class TestSsRingFunctions(unittest.TestCase):
+    def setUp(self):
+        self.name = f"ss_ring_test_{os.getpid()}"
+        self.ring = ss_ring.create_ring(self.name, ("a", "b", "c"), capacity=4)
+        self.addCleanup(ss_ring.close_ring, self.ring, True)
+
+    def attach(self) -> dict:
+        ring = ss_ring.attach_ring(self.name)
+        self.addCleanup(ss_ring.close_ring, ring)
+        return ring
+
+    def test_push_and_read(self):
+        consumer = self.attach()
+        reader = ss_ring.create_reader(consumer)
+        self.assertEqual(consumer["columns"], ("a", "b", "c"))
+        self.assertEqual(ss_ring.read_records(reader), [])
+
+        ss_ring.push(self.ring, [1, 2, 3])
+        ss_ring.push(self.ring, [4, 5, np.nan])
+        records = ss_ring.read_records(reader)
+
+        self.assertEqual([sequence for sequence, _ in records], [0, 1])
+        self.assertEqual(records[0][1].tolist(), [1.0, 2.0, 3.0])
+        self.assertTrue(np.isnan(records[1][1][2]))
+        self.assertEqual((reader["cursor"], reader["overruns"]), (2, 0))
+
+    def test_overrun(self):
+        consumer = self.attach()
+        reader = ss_ring.create_reader(consumer)
+        for value in range(10):
+            ss_ring.push(self.ring, [value] * 3)
+
+        records = ss_ring.read_records(reader)
+
+        # The ring only holds the last 4 records, the others were overwritten before they were read.
+        self.assertEqual([sequence for sequence, _ in records], [6, 7, 8, 9])
+        self.assertEqual(records[0][1].tolist(), [6.0] * 3)
+        self.assertEqual(reader["overruns"], 6)
+
+    def test_read_record_being_written(self):
+        ss_ring.push(self.ring, [1, 2, 3])
+        out = np.empty(3)
+        self.assertTrue(ss_ring.read_record(self.ring, 0, out))
+
+        # The slot is marked as being written by the record 4 slots later.
+        self.ring["sequences"][0] = 2 * 4 + 1
+        self.assertFalse(ss_ring.read_record(self.ring, 0, out))
+        self.assertFalse(ss_ring.read_record(self.ring, 4, out))
+
+    def test_attach_missing_ring(self):
+        with self.assertRaises(FileNotFoundError):
+            ss_ring.attach_ring(f"{self.name}_missing")
+
+    def test_push_measurement(self):
+        name = f"{self.name}_measurements"
+        ring = ss_ring.create_ring(name, ss_ring.MEASUREMENT_COLUMNS)
+        self.addCleanup(ss_ring.close_ring, ring, True)
+        reader = ss_ring.create_reader(ring)
+
+        self.assertTrue(ss_ring.push_measurement(ring, SS_POLL, FLOW))
+        self.assertFalse(ss_ring.push_measurement(ring, SS_POLL, "1.1.1.1:1 2.2.2.2:2"))
+        ((_, values),) = ss_ring.read_records(reader)
+        record = ss_ring.decode_record(values, ring["columns"])
+
+        self.assertEqual(
+            record,
+            ss_parser.parse_record(
+                "".join(SS_POLL.splitlines()[1:3]), ss_ring.MEASUREMENT_COLUMNS
+            ),
+        )
+        self.assertEqual(record["timer_name"], "on")
+        self.assertEqual((record["cwnd"], record["capture_time"]), (669, 20.5))
+
+
+if __name__ == "__main__":
+    unittest.main()
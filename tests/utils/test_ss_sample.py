@@ -0,0 +1,61 @@
+import pickle
+import unittest
+import ss_sample
+
+from utils import ss_parser
+
+
+class TestSsSampleFunctions(unittest.TestCase):
+    def test_sample(self):
+        sample = ss_sample.SsSample(rtt=99.4, cwnd=669)
+        sample.lost = False
+
+        self.assertEqual(sample.cwnd, 669)
+        self.assertIsNone(sample.ssthresh)
+        self.assertEqual(
+            ss_sample.to_dict(sample), {"rtt": 99.4, "cwnd": 669, "lost": False}
+        )
+        self.assertEqual(pickle.loads(pickle.dumps(sample)), sample)
+        self.assertFalse(hasattr(sample, "__dict__"))
+
+        with self.assertRaises(AttributeError):
+            sample.rtt_ms = 99.4
+        with self.assertRaises(AttributeError):
+            sample.rtt_ms
+
+    def test_get_columns(self):
+        columns = ss_sample.get_columns(include_flow=True)
+        self.assertEqual(columns[0], "flow")
+        self.assertEqual(
+            columns[1 : len(ss_parser.SS_RECORD_FIELDS) + 1],
+            ss_parser.SS_RECORD_FIELDS,
+        )
+        self.assertEqual(columns[-1], "max_ssthresh")
+        self.assertNotIn(ss_sample.LABEL, columns)
+
+    def test_create_row_getter(self):
+        sample = ss_sample.SsSample(flow="a b", rtt=99.4, cwnd=669)
+        get_row = ss_sample.create_row_getter(("cwnd", "flow", "ssthresh"))
+        self.assertEqual(get_row(sample), (669, "a b", None))
+        self.assertEqual(ss_sample.create_row_getter(("rtt",))(sample), (99.4,))
+
+    def test_coalesce(self):
+        columns = ("cwnd", "last_send", "timestamp", ss_sample.LABEL)
+        values = [(10, 1, False), (10, 2, False), (10, 3, True), (12, 4, False)]
+        values += [(12, 5, False), (12, 6, False)]
+        samples = [
+            ss_sample.SsSample(
+                cwnd=cwnd, last_send=last_send, timestamp=i * 20, lost=lost
+            )
+            for i, (cwnd, last_send, lost) in enumerate(values)
+        ]
+
+        coalesced = list(ss_sample.coalesce(samples, columns))
+        self.assertEqual([sample.timestamp for sample in coalesced], [0, 40, 60])
+        self.assertEqual([sample.repeat for sample in coalesced], [2, 1, 3])
+        self.assertEqual([sample.last_send for sample in coalesced], [1, 3, 4])
+        self.assertEqual(list(ss_sample.coalesce([], columns)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import os
+import tempfile
+import threading
+import unittest
+import numpy as np
+import ss_stream
+
+FLOW = "10.1.1.100:5001 10.2.2.100:5201"
+
+
+class TestSsStreamFunctions(unittest.TestCase):
+    def test_encode_and_decode(self):
+        frame = ss_stream.encode_record(
+            ss_stream.FEATURES, FLOW, [1.5, np.nan], timestamp=42
+        )
+        ((message_type, payload),) = ss_stream.iter_frames(bytearray(frame))
+        message = ss_stream.decode_message(message_type, payload, ("a", "b"))
+
+        self.assertEqual(message["type"], "features")
+        self.assertEqual((message["timestamp"], message["flow"]), (42, FLOW))
+        self.assertEqual(message["columns"], ("a", "b"))
+        self.assertEqual(message["values"][0], 1.5)
+        self.assertTrue(np.isnan(message["values"][1]))
+
+        frame = ss_stream.encode_prediction(FLOW, True, timestamp=7)
+        ((message_type, payload),) = ss_stream.iter_frames(bytearray(frame))
+        self.assertEqual(
+            ss_stream.decode_message(message_type, payload, None),
+            {"type": "prediction", "timestamp": 7, "flow": FLOW, "prediction": True},
+        )
+
+    def test_iter_frames_partial(self):
+        columns = ss_stream.encode_columns(("a", "b"))
+        frame = ss_stream.encode_prediction(FLOW, False)
+        buffer = bytearray(columns + frame[:5])
+
+        self.assertEqual(
+            list(ss_stream.iter_frames(buffer)), [(ss_stream.COLUMNS, b"a,b")]
+        )
+        self.assertEqual(buffer, frame[:5])
+
+        buffer += frame[5:]
+        ((message_type, _),) = ss_stream.iter_frames(buffer)
+        self.assertEqual((message_type, buffer), (ss_stream.PREDICTION, bytearray()))
+
+    def test_iter_frames_oversize(self):
+        buffer = bytearray(
+            ss_stream.FRAME_HEADER.pack(ss_stream.MAX_PAYLOAD_SIZE + 1, 1)
+        )
+        with self.assertRaises(ValueError):
+            list(ss_stream.iter_frames(buffer))
+
+    def test_serve(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "test.sock")
+        messages = []
+        receiver = threading.Thread(
+            target=ss_stream.serve, args=(path, messages.append, 0.5)
+        )
+        receiver.start()
+
+        sender = ss_stream.create_sender(path, ("a", "b"))
+        sample = ss_stream.encode_record(ss_stream.SAMPLE, FLOW, [1, 2])
+        prediction = ss_stream.encode_prediction(FLOW, True)
+        self.assertTrue(ss_stream.send(sender, sample))
+
+        # A second sender that is connected at the same time.
+        other = ss_stream.create_sender(path)
+        self.assertTrue(ss_stream.send(other, prediction))
+        ss_stream.close_sender(other)
+        ss_stream.close_sender(sender)
+        receiver.join()
+
+        self.assertEqual(
+            [message["type"] for message in messages], ["sample", "prediction"]
+        )
+        self.assertEqual(messages[0]["columns"], ("a", "b"))
+        self.assertEqual(messages[0]["values"].tolist(), [1.0, 2.0])
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(ss_stream.send(sender, prediction))
+
+    def test_serve_truncated_message(self):
+        truncated = ss_stream.encode_event(ss_stream.PREDICTION, FLOW, b"")
+        ((message_type, payload),) = ss_stream.iter_frames(bytearray(truncated))
+        with self.assertRaises(ValueError):
+            ss_stream.decode_message(message_type, payload, None)
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "test.sock")
+        messages = []
+        receiver = threading.Thread(
+            target=ss_stream.serve, args=(path, messages.append, 0.5)
+        )
+        receiver.start()
+
+        # Only the connection of the corrupt sender is closed.
+        corrupt = ss_stream.create_sender(path)
+        sender = ss_stream.create_sender(path)
+        self.assertTrue(ss_stream.send(corrupt, truncated))
+        self.assertTrue(ss_stream.send(sender, ss_stream.encode_prediction(FLOW, True)))
+        ss_stream.close_sender(corrupt)
+        ss_stream.close_sender(sender)
+        receiver.join()
+
+        self.assertEqual([message["prediction"] for message in messages], [True])
+
+
+if __name__ == "__main__":
+    unittest.main()
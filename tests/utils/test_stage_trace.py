@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+import stage_trace
+
+
+class TestStageTraceFunctions(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory_path = directory.name
+
+    def test_tracing_disabled(self):
+        self.assertIsNone(stage_trace.create_tracer(self.directory_path, "capture"))
+        stage_trace.record(None, "1.000", stage_trace.CAPTURE)
+
+    def test_find_trace_id(self):
+        poll = "ESTAB 0 0 a b\n\t rto:300 cwnd:10 capture_time:20.500\n"
+        self.assertEqual(stage_trace.find_trace_id(poll), "20.500")
+        self.assertEqual(stage_trace.get_trace_id(20.5), "20.500")
+        self.assertIsNone(stage_trace.find_trace_id("ESTAB 0 0 a b\n\t cwnd:10\n"))
+
+    def test_record_and_report(self):
+        os.mkdir(os.path.join(self.directory_path, stage_trace.TRACE_DIRECTORY))
+        capture = stage_trace.create_tracer(self.directory_path, "capture")
+        toggle = stage_trace.create_tracer(self.directory_path, "toggle_ecn")
+        for index, trace_id in enumerate(("0.000", "10.000")):
+            start = index * 10**9
+            for offset, stage in enumerate(stage_trace.STAGES[:-1]):
+                stage_trace.record(capture, trace_id, stage, start + offset * 10**6)
+            stage_trace.record(toggle, trace_id, stage_trace.TOGGLE_ECN, start + 10**7)
+        # The second time a sample reaches a boundary is ignored.
+        stage_trace.record(toggle, "0.000", stage_trace.TOGGLE_ECN, 2 * 10**7)
+        # A sample that was dropped by the data persistence module.
+        stage_trace.record(capture, "20.000", stage_trace.CAPTURE, 2 * 10**9)
+        stage_trace.close_tracer(capture)
+        stage_trace.close_tracer(toggle)
+
+        traces = stage_trace.read_traces(self.directory_path)
+        report = stage_trace.create_latency_report(traces)
+
+        self.assertEqual(len(traces), 3)
+        self.assertEqual(
+            list(report), [*stage_trace.STAGES[1:], stage_trace.END_TO_END]
+        )
+        self.assertEqual(
+            report[stage_trace.CAPTURE_WRITE],
+            {"count": 2, "p50": 1.0, "p99": 1.0, "max": 1.0},
+        )
+        self.assertEqual(report[stage_trace.TOGGLE_ECN]["max"], 4.0)
+        self.assertEqual(report[stage_trace.END_TO_END]["p50"], 10.0)
+        self.assertIn("end_to_end", stage_trace.format_latency_report(report))
+
+
+if __name__ == "__main__":
+    unittest.main()
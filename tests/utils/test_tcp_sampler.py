@@ -0,0 +1,74 @@
+import socket
+import threading
+import unittest
+import sock_diag
+import tcp_sampler
+
+from utils import ss_parser
+
+
+class TestTcpSamplerFunctions(unittest.TestCase):
+    def test_sample_tcp_info(self):
+        samples = []
+        with socket.create_server(("127.0.0.1", 0)) as server:
+            sender = socket.create_connection(server.getsockname())
+            connection, _ = server.accept()
+            received = []
+            receiver = threading.Thread(
+                target=lambda: received.append(tcp_sampler.receive_bulk(connection))
+            )
+            receiver.start()
+
+            thread, stop = tcp_sampler.start_sampler(
+                sender, samples.append, interval=10, timers=False
+            )
+            sent = tcp_sampler.send_bulk(sender, 0.3, payload_size=65536)
+            stop.set()
+            thread.join()
+
+            flow = tcp_sampler.get_socket_flow(sender)
+            sender.close()
+            receiver.join()
+            connection.close()
+
+        self.assertEqual(received, [sent])
+        self.assertGreater(len(samples), 10)
+        timestamps = [sample["timestamp"] for sample in samples]
+        self.assertEqual(timestamps, sorted(timestamps))
+
+        message = samples[-1]["message"]
+        self.assertEqual(message["flow"], flow)
+        self.assertNotEqual(message["cc_algo"], "")
+        self.assertGreater(message["info"]["bytes_acked"], 0)
+        self.assertIsNotNone(sock_diag.decode_record(message)["cwnd"])
+
+        poll = sock_diag.format_poll([message])
+        records = list(ss_parser.iter_records(poll.splitlines()))
+        self.assertEqual([ss_parser.get_flow(record) for record in records], [flow])
+
+    def test_create_message(self):
+        info = dict.fromkeys(sock_diag.TCP_INFO_NAMES, 0) | {"state": 1}
+        flow = "10.1.1.100:5001 10.2.2.100:5201"
+        timer_message = {
+            "timer": 1,
+            "retrans": 2,
+            "expires": 300,
+            "rqueue": 0,
+            "wqueue": 1448,
+            "cong_info": {},
+        }
+
+        message = tcp_sampler.create_message(flow, "cubic", info, timer_message)
+        self.assertEqual((message["timer"], message["expires"]), (1, 300))
+        record = sock_diag.decode_record(message)
+        self.assertEqual(
+            (record["timer_name"], record["expire_time"], record["retrans"]),
+            ("on", 300, 2),
+        )
+
+        record = sock_diag.decode_record(tcp_sampler.create_message(flow, "", info))
+        self.assertIsNone(record["timer_name"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,15 @@
+import os
+import tempfile
 import unittest
 import util as utils
 
+from pathlib import Path
+from utils import types
+
+SS_OUTPUT = """tcp   ESTAB 0      5655000    10.1.1.100:5001   10.2.2.100:5201 timer:(on,300ms,0)
+	    ts sack ecn cubic wscale:9,9 rto:300 rtt:99.413/0.261 mss:1448 cwnd:669 ssthresh:412 data_segs_out:1687 send 78Mbps lastsnd:12 pacing_rate 115Mbps delivery_rate 47.8Mbps
+"""
+
 
 class TestUtilFunctions(unittest.TestCase):
     def test_calculate_queue_size(self):
@@ -41,6 +50,84 @@ class TestUtilFunctions(unittest.TestCase):
         ]
         self.assertEqual(utils.get_cwnd_values(ss_data), [669, 550])
 
+    def test_get_feature_values(self):
+        # The ss outputs are records, i.e. the two lines of a measurement joined, as read by read_ss.
+        record = SS_OUTPUT.replace("\n", "")
+        ss_outputs = [record, record.replace(" lastsnd:12", "")]
+        self.assertEqual(
+            utils.get_feature_values(ss_outputs, types.Feature.RTT_VAR), [0.261, 0.261]
+        )
+        self.assertEqual(
+            utils.get_feature_values(ss_outputs, types.Feature.LAST_SEND), [12]
+        )
+
+    def test_read_parsed_ss(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = Path(directory) / "ss_data.txt"
+            file_path.write_text(SS_OUTPUT + SS_OUTPUT.replace(" lastsnd:12", ""))
+
+            parsed_ss = utils.read_parsed_ss(file_path)
+            self.assertTrue(utils.get_ss_cache_path(file_path).is_file())
+            self.assertEqual(parsed_ss["cc_algo"], "cubic")
+            self.assertEqual(parsed_ss["columns"]["cwnd"].tolist(), [669, 669])
+            self.assertEqual(parsed_ss["columns"]["last_send"].tolist(), [12, None])
+
+            cached_parsed_ss = utils.load_ss_cache(file_path)
+            self.assertEqual(cached_parsed_ss["cc_algo"], "cubic")
+            self.assertEqual(
+                list(utils.iter_parsed_records(cached_parsed_ss)),
+                list(utils.iter_parsed_records(parsed_ss)),
+            )
+
+            # The cache is invalidated when the ss output file changes.
+            file_path.write_text(SS_OUTPUT)
+            os.utime(file_path, ns=(0, 0))
+            self.assertIsNone(utils.load_ss_cache(file_path))
+            self.assertEqual(
+                utils.read_parsed_ss(file_path)["columns"]["cwnd"].tolist(), [669]
+            )
+
+    def test_select_flow(self):
+        background_output = SS_OUTPUT.replace("5001", "5002").replace(
+            "cwnd:669", "cwnd:10"
+        )
+        parsed_ss = utils.create_parsed_ss([SS_OUTPUT, background_output, SS_OUTPUT])
+        foreground = utils.select_flow(parsed_ss, utils.FOREGROUND_FLOW)
+        self.assertEqual(foreground["columns"]["cwnd"].tolist(), [669, 669])
+        background = utils.select_flow(parsed_ss, "10.1.1.100:5002 10.2.2.100:5201")
+        self.assertEqual(background["columns"]["cwnd"].tolist(), [10])
+        self.assertEqual(utils.select_flow(parsed_ss)["columns"]["cwnd"].count(), 3)
+
+    def test_get_flows(self):
+        background_output = SS_OUTPUT.replace("5001", "5002")
+        parsed_ss = utils.create_parsed_ss([background_output, SS_OUTPUT] * 2)
+        self.assertEqual(
+            utils.get_flows(parsed_ss),
+            ["10.1.1.100:5002 10.2.2.100:5201", utils.FOREGROUND_FLOW],
+        )
+
+    def test_iter_parsed_records(self):
+        ss_outputs = [SS_OUTPUT.replace("\n\t    ", ""), SS_OUTPUT.replace("timer", "")]
+        records = list(utils.iter_parsed_records(utils.create_parsed_ss(ss_outputs)))
+        fields = tuple(utils.ss_parser.SS_SCHEMA_FIELDS)
+        self.assertEqual(
+            records,
+            [
+                {
+                    "flow": utils.FOREGROUND_FLOW,
+                    **utils.ss_parser.parse_record(output, fields),
+                }
+                for output in ss_outputs
+            ],
+        )
+        self.assertIsInstance(records[0]["cwnd"], int)
+        self.assertIsNone(records[1]["timer_name"])
+
+        chunked_records = utils.iter_parsed_records(
+            utils.create_parsed_ss(ss_outputs), chunk_size=1
+        )
+        self.assertEqual(list(chunked_records), records)
+
 
 if __name__ == "__main__":
     unittest.main()
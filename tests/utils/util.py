@@ -1,11 +1,25 @@
 import re
 import os
+import math
 import csv
+import gzip
 import time
 import timeit
+import numpy as np
 import matplotlib.pyplot as plt
 
+from pathlib import Path
+from typing import Iterable, Iterator
 from utils import types
+from utils import ss_bytes
+from utils import ss_columns
+from utils import ss_parser
+from utils import ss_index
+from utils import ss_sample
+from utils import stage_trace
+
+# The flow of the iperf3 connection that is being predicted on, see run_iperf_and_ss in bash_functions.sh.
+FOREGROUND_FLOW = "10.1.1.100:5001 10.2.2.100:5201"
 
 
 def add_timer_info(ss_dict: dict, measurement: str) -> tuple:
@@ -268,34 +282,6 @@ def add_min_and_max_rtt(ss_dict: dict, rtt: int, min_rtt: int, max_rtt: int) ->
     return min_rtt, max_rtt
 
 
-def add_cwnd_diff(
-    ss_dicts: list, ss_dict: dict, cwnd: int, prev_cwnd: int, current_index: int
-) -> None:
-    """Add the difference between the current congestion window and the previous congestion window value that was not the same.
-       The previous value in this case refers to an earlier value in the same measurement that was not the same as the current.
-       Meaning, that if the current congestion window is 10 and the one directly before it was also 10, the previous congestion
-       window will the one before that, and so on.
-
-    Args:
-        ss_dicts: The list of dictionaries that contain the measurements from ss.
-        ss_dict. The dictionary to add the cwnd diff to.
-        cwnd: The current congestion window value.
-        prev_cwnd: The previous congestion window value that was not the same.
-        current_index: The index of the current measurement in in ss_dicts.
-    """
-    if current_index == 0:
-        ss_dict["cwnd_diff"] = 0
-        return
-
-    if cwnd == prev_cwnd:
-        prev_cwnd = ss_dicts[current_index - 1]["cwnd"]
-        if prev_cwnd == cwnd:
-            return add_cwnd_diff(ss_dicts, ss_dict, cwnd, prev_cwnd, current_index - 1)
-        else:
-            ss_dict["cwnd_diff"] = cwnd - prev_cwnd
-            return
-
-
 def add_cwnd_diff_simple(ss_dict: dict, prev_cwnd: int) -> tuple:
     """Add the difference between the current congestion window and the previous congestion window value.
 
@@ -360,41 +346,56 @@ def read_ss_single_output(file_path: str) -> str:
         return ""
 
 
-def read_ss(file_path: str) -> list:
-    """Read the ss outputs in the text file located at the given file_path.
+def read_ss_poll(file_path: str) -> dict:
+    """Read the ss output of each of the flows in the single ss poll in the text file located at the given file_path.
 
     Args:
         file_path: The path to the ss output file that should be loaded and parsed.
 
     Returns:
-        A list containing the ss outputs from the file.
+        A dictionary with the flow of each of the ss outputs in the file (see ss_parser.get_flow) as key
+        and the ss output as value, in the order the flows appear in the file,
+        or an empty dictionary if the output file was not valid.
     """
-
-    ss_data = []
     try:
         with open(file_path) as data:
-            lines = [line for line in data.readlines() if "Netid" not in line]
+            return {
+                ss_parser.get_flow(record): record
+                for record in ss_parser.iter_records(data)
+            }
+    except Exception as e:
+        print(f"Error loading input data: {e}")
+        return {}
+
 
-            # Append every first and second line to the packet string,
-            # then append packet to the ss_data list.
-            i = 0
-            packet = ""
-            for line in lines:
-                if i == 0:
-                    if "tcp" not in line:
-                        continue
-                    packet = line.strip()
-                    i += 1
-                elif i == 1:
-                    packet += line.strip()
-                    ss_data.append(packet)
-                    packet = ""
-                    i = 0
+def iter_ss(file_path: str) -> Iterator[str]:
+    """Lazily read the ss outputs in the text file located at the given file_path.
+
+    Args:
+        file_path: The path to the ss output file that should be loaded and parsed.
+            Files ending in .gz are decompressed on the fly.
+
+    Yields:
+        The ss outputs from the file, one at a time.
+    """
+    try:
+        yield from ss_parser.iter_ss(file_path)
     except FileNotFoundError as e:
         print(f"File not found: {e}")
         raise SystemExit()
 
-    return ss_data
+
+def read_ss(file_path: str) -> list:
+    """Read the ss outputs in the text file located at the given file_path.
+
+    Args:
+        file_path: The path to the ss output file that should be loaded and parsed.
+            Files ending in .gz are decompressed on the fly.
+
+    Returns:
+        A list containing the ss outputs from the file.
+    """
+    return list(iter_ss(file_path))
 
 
 def calculate_ss_interval(total_time: int, ss_polls: int) -> float:
@@ -410,6 +411,365 @@ def calculate_ss_interval(total_time: int, ss_polls: int) -> float:
     return total_time / ss_polls
 
 
+def get_window(
+    total_time: int, ss_polls: int, start_time: float = None, end_time: float = None
+) -> tuple:
+    """Get the range of measurements that were made in the given time window.
+
+    Args:
+        total_time: The total time the iperf test ran.
+        ss_polls: The number of times ss was polled.
+        start_time: The start of the window in seconds (default: the start of the test).
+        end_time: The end of the window in seconds (default: the end of the test).
+
+    Returns:
+        A tuple containing the interval between each measurement in seconds, the number
+        of the first measurement in the window and the number of the measurement after the last one.
+    """
+    ss_interval = calculate_ss_interval(total_time, ss_polls)
+    start = 0 if start_time is None else int(start_time / ss_interval)
+    end = ss_polls
+    if end_time is not None:
+        end = min(math.ceil(end_time / ss_interval), ss_polls)
+
+    return ss_interval, start, end
+
+
+def read_ss_window(
+    file_path: str,
+    total_time: int,
+    start_time: float = None,
+    end_time: float = None,
+    flow: str = None,
+) -> tuple:
+    """Read the ss outputs of the given flow that were measured in the given time window.
+
+    If a window is given, the sidecar index of the file is used to seek straight to the first
+    ss output in the window, instead of reading the file from the start.
+
+    Args:
+        file_path: The path to the ss output file that should be loaded and parsed.
+        total_time: The total time the iperf test ran.
+        start_time: The start of the window in seconds (default: the start of the test).
+        end_time: The end of the window in seconds (default: the end of the test).
+        flow: The flow whose ss outputs should be read, see ss_parser.get_flow (default: all flows).
+
+    Returns:
+        A tuple containing the ss outputs in the window, the interval between each measurement
+        in seconds and the number of the first ss output in the window among the ss outputs of the flow.
+    """
+    if start_time is None and end_time is None:
+        ss_outputs = [
+            ss_output
+            for ss_output in iter_ss(file_path)
+            if flow is None or ss_parser.get_flow(ss_output) == flow
+        ]
+        return ss_outputs, calculate_ss_interval(total_time, len(ss_outputs)), 0
+
+    try:
+        index = ss_index.load_index(file_path)
+    except FileNotFoundError as e:
+        print(f"File not found: {e}")
+        raise SystemExit()
+
+    records = ss_index.get_flow_records(index, flow)
+    ss_interval, start, end = get_window(total_time, len(records), start_time, end_time)
+    if start >= end:
+        return [], ss_interval, start
+
+    ss_outputs = [
+        ss_output
+        for ss_output in ss_index.read_records(
+            file_path, index, records[start], records[end - 1] + 1
+        )
+        if flow is None or ss_parser.get_flow(ss_output) == flow
+    ]
+
+    return ss_outputs, ss_interval, start
+
+
+def create_parsed_ss(ss_outputs: Iterable[str]) -> dict:
+    """Parse the given ss outputs into their columnar form.
+
+    Args:
+        ss_outputs: The ss outputs.
+
+    Returns:
+        A dictionary containing the congestion control algorithm under "cc_algo" and a dictionary with
+        the flow (see ss_parser.get_flow) and one masked array per field in ss_parser.SS_SCHEMA under "columns".
+        The arrays have one entry per ss output and the missing values are masked.
+    """
+    cc_algo = ""
+    fields = tuple(ss_parser.SS_SCHEMA_FIELDS)
+    flows = []
+    values = {field: [] for field in fields}
+    for ss_output in ss_outputs:
+        if cc_algo == "":
+            cc_algo = get_cc_algo([ss_output])
+
+        flows.append(ss_parser.get_flow(ss_output) or "")
+        for field, value in ss_parser.parse_record(ss_output, fields).items():
+            values[field].append(value)
+
+    columns = {"flow": np.ma.MaskedArray(np.array(flows, dtype=str))}
+    for field in ss_parser.SS_SCHEMA:
+        mask = np.array([value is None for value in values[field.name]], dtype=bool)
+        data = np.array(
+            [field.type() if value is None else value for value in values[field.name]],
+            dtype=field.type,
+        )
+        columns[field.name] = np.ma.MaskedArray(data, mask=mask)
+
+    return {"cc_algo": cc_algo, "columns": columns}
+
+
+def parse_ss_file(file_path: str, offset: int = 0) -> dict:
+    """Parse the ss outputs in the given file into their columnar form.
+
+    Uncompressed files are parsed directly from the bytes of a memory map with ss_bytes,
+    while gzip compressed files are decompressed and parsed record by record with create_parsed_ss.
+
+    Args:
+        file_path: The path to the ss output file.
+        offset: The byte offset of the line at which to start parsing, e.g. as returned by
+            ss_index.locate_warmup_end (default: the start of the file). The ss outputs before it are not parsed.
+
+    Returns:
+        The columnar form as returned by create_parsed_ss.
+    """
+    if Path(file_path).suffix == ".gz":
+        with gzip.open(file_path, "rb") as file:
+            file.seek(offset)
+            lines = (line.decode() for line in file)
+            return create_parsed_ss(ss_parser.iter_records(lines))
+
+    return ss_bytes.parse_file(file_path, offset)
+
+
+def slice_parsed_ss(parsed_ss: dict, start: int, end: int) -> dict:
+    """Get the given range of ss outputs from the given columnar form.
+
+    Args:
+        parsed_ss: The columnar form returned by create_parsed_ss.
+        start: The number of the first ss output in the range.
+        end: The number of the ss output after the last one in the range.
+
+    Returns:
+        The columnar form of the ss outputs in the range.
+    """
+    return {
+        "cc_algo": parsed_ss["cc_algo"],
+        "columns": {
+            field: column[start:end] for field, column in parsed_ss["columns"].items()
+        },
+    }
+
+
+def select_flow(parsed_ss: dict, flow: str = None) -> dict:
+    """Get the ss outputs of the given flow from the given columnar form.
+
+    Args:
+        parsed_ss: The columnar form returned by create_parsed_ss.
+        flow: The flow, see ss_parser.get_flow (default: all flows).
+
+    Returns:
+        The columnar form of the ss outputs of the flow.
+    """
+    if flow is None:
+        return parsed_ss
+
+    in_flow = parsed_ss["columns"]["flow"].data == flow
+    if in_flow.all():
+        return parsed_ss
+
+    return {
+        "cc_algo": parsed_ss["cc_algo"],
+        "columns": {
+            field: column[in_flow] for field, column in parsed_ss["columns"].items()
+        },
+    }
+
+
+def get_flows(parsed_ss: dict) -> list:
+    """Get the flows of the ss outputs in the given columnar form.
+
+    Args:
+        parsed_ss: The columnar form returned by create_parsed_ss.
+
+    Returns:
+        The flows, see ss_parser.get_flow, in the order they first appear in the ss outputs.
+    """
+    flows, first_outputs = np.unique(
+        parsed_ss["columns"]["flow"].data, return_index=True
+    )
+    return flows[np.argsort(first_outputs)].tolist()
+
+
+def iter_parsed_records(parsed_ss: dict, chunk_size: int = 4096) -> Iterator[dict]:
+    """Lazily turn the given columnar form back into parsed records.
+
+    The columns are converted a chunk at a time, so only a chunk of records is held as Python objects at once.
+
+    Args:
+        parsed_ss: The columnar form returned by create_parsed_ss.
+        chunk_size: The number of records to convert at a time.
+
+    Yields:
+        The records in the same form as returned by ss_parser.parse_record for all
+        of the fields in ss_parser.SS_SCHEMA, along with their flow under "flow".
+    """
+    fields = list(parsed_ss["columns"])
+    columns = list(parsed_ss["columns"].values())
+    for start in range(0, len(parsed_ss["columns"]["flow"]), chunk_size):
+        values = [column[start : start + chunk_size].tolist() for column in columns]
+        for record_values in zip(*values):
+            yield dict(zip(fields, record_values))
+
+
+def get_ss_cache_path(file_path: str) -> Path:
+    """Get the path of the cache of the given ss output file.
+
+    Args:
+        file_path: The path to the ss output file.
+
+    Returns:
+        The path of the cache, which is stored next to the ss output file.
+    """
+    file_path = Path(file_path)
+    return file_path.with_name(f"{file_path.name}.cache.npz")
+
+
+def get_ss_file_key(file_path: str) -> dict:
+    """Get the key that identifies the given ss output file and how it was parsed.
+
+    Args:
+        file_path: The path to the ss output file.
+
+    Returns:
+        A dictionary containing the absolute path, size and modification time of the file,
+        as well as the version of the parser.
+    """
+    stat = os.stat(file_path)
+    return {
+        "path": str(Path(file_path).resolve()),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "parser_version": ss_parser.SS_PARSER_VERSION,
+    }
+
+
+def load_ss_cache(file_path: str) -> dict | None:
+    """Load the cached columnar form of the given ss output file.
+
+    Args:
+        file_path: The path to the ss output file.
+
+    Returns:
+        The columnar form as returned by create_parsed_ss, or None if there is no cache
+        or if the file or the parser changed since the cache was created.
+    """
+    cache_path = get_ss_cache_path(file_path)
+    if not cache_path.is_file():
+        return None
+
+    try:
+        key = get_ss_file_key(file_path)
+        with np.load(cache_path) as cache:
+            if any(cache[name].item() != value for name, value in key.items()):
+                return None
+
+            columns = {
+                field: np.ma.MaskedArray(cache[field], mask=cache[f"{field}_mask"])
+                for field in ("flow", *ss_parser.SS_SCHEMA_FIELDS)
+            }
+            return {"cc_algo": cache["cc_algo"].item(), "columns": columns}
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Ignoring invalid cache {cache_path}: {e}")
+        return None
+
+
+def save_ss_cache(file_path: str, parsed_ss: dict) -> None:
+    """Save the columnar form of the given ss output file as a compressed .npz file next to it.
+
+    Args:
+        file_path: The path to the ss output file.
+        parsed_ss: The columnar form returned by create_parsed_ss.
+    """
+    arrays = {}
+    for field, column in parsed_ss["columns"].items():
+        arrays[field] = column.data
+        arrays[f"{field}_mask"] = np.ma.getmaskarray(column)
+
+    np.savez_compressed(
+        get_ss_cache_path(file_path),
+        cc_algo=parsed_ss["cc_algo"],
+        **get_ss_file_key(file_path),
+        **arrays,
+    )
+
+
+def read_parsed_ss(file_path: str) -> dict:
+    """Read the columnar form of the given ss output file, using the cache next to it if it is valid.
+
+    The cache is created or replaced if it is missing or outdated, so later reads of the same file
+    do not have to read and parse the ss outputs again.
+
+    Args:
+        file_path: The path to the ss output file that should be loaded and parsed.
+            Files ending in .gz are decompressed on the fly.
+
+    Returns:
+        The columnar form as returned by create_parsed_ss.
+    """
+    parsed_ss = load_ss_cache(file_path)
+    if parsed_ss is None:
+        parsed_ss = parse_ss_file(file_path)
+        save_ss_cache(file_path, parsed_ss)
+
+    return parsed_ss
+
+
+def read_parsed_ss_window(
+    file_path: str,
+    total_time: int,
+    start_time: float = None,
+    end_time: float = None,
+    flow: str = None,
+) -> tuple:
+    """Read the columnar form of the ss outputs of the given flow that were measured in the given time window.
+
+    A valid cache is sliced directly. Without one, a window is read with the sidecar index
+    (see read_ss_window), while the whole file is parsed and cached.
+
+    Args:
+        file_path: The path to the ss output file that should be loaded and parsed.
+        total_time: The total time the iperf test ran.
+        start_time: The start of the window in seconds (default: the start of the test).
+        end_time: The end of the window in seconds (default: the end of the test).
+        flow: The flow whose ss outputs should be read, see ss_parser.get_flow (default: all flows).
+
+    Returns:
+        A tuple containing the columnar form of the ss outputs in the window, the interval between each
+        measurement in seconds and the number of the first ss output in the window among the ss outputs of the flow.
+    """
+    parsed_ss = load_ss_cache(file_path)
+    if parsed_ss is None:
+        if start_time is not None or end_time is not None:
+            ss_outputs, ss_interval, start = read_ss_window(
+                file_path, total_time, start_time, end_time, flow
+            )
+            return create_parsed_ss(ss_outputs), ss_interval, start
+
+        parsed_ss = parse_ss_file(file_path)
+        save_ss_cache(file_path, parsed_ss)
+
+    parsed_ss = select_flow(parsed_ss, flow)
+    ss_polls = len(parsed_ss["columns"]["flow"])
+    ss_interval, start, end = get_window(total_time, ss_polls, start_time, end_time)
+
+    return slice_parsed_ss(parsed_ss, start, end), ss_interval, start
+
+
 def get_cc_algo(ss_outputs: list) -> str:
     """Get the congestion control algorithm that was used.
 
@@ -588,6 +948,7 @@ def create_and_save_cwnd_plot(
     predictions_and_timestamps: dict = None,
     show_plot: bool = False,
     larger_fonts: bool = False,
+    first_timestamp: float = 0.0,
 ) -> None:
     """Create and save a plot of the congestion window over time."""
 
@@ -596,7 +957,9 @@ def create_and_save_cwnd_plot(
     else:
         plt.rcParams.update({"font.size": 10})
 
-    timestamps = [i * timestamp_interval for i in range(len(cwnd_values))]
+    timestamps = [
+        first_timestamp + i * timestamp_interval for i in range(len(cwnd_values))
+    ]
 
     _, ax = plt.subplots()
     ax.plot(timestamps, cwnd_values, label="cwnd")
@@ -605,8 +968,17 @@ def create_and_save_cwnd_plot(
         true_predictions = {
             ts: pred for ts, pred in predictions_and_timestamps.items() if pred == 1
         }
-        x_values = [float(ts) for ts in true_predictions.keys()]
-        y_values = [cwnd_values[int(float(ts) / timestamp_interval)] for ts in x_values]
+        # Only plot the predictions that were made in the plotted time window.
+        end_timestamp = first_timestamp + len(cwnd_values) * timestamp_interval
+        x_values = [
+            float(ts)
+            for ts in true_predictions.keys()
+            if first_timestamp <= float(ts) < end_timestamp
+        ]
+        y_values = [
+            cwnd_values[int((ts - first_timestamp) / timestamp_interval)]
+            for ts in x_values
+        ]
 
         ax.scatter(
             x_values, y_values, label="Predictions", color="red", marker="x", s=75
@@ -654,6 +1026,7 @@ def create_and_save_cwnd_plot_without_title_and_caption(
     predictions_and_timestamps: dict = None,
     show_plot: bool = False,
     larger_fonts: bool = False,
+    first_timestamp: float = 0.0,
 ) -> None:
     """Create and save a plot of the congestion window over time.
 
@@ -664,13 +1037,16 @@ def create_and_save_cwnd_plot_without_title_and_caption(
         predictions_and_timestamps: The predictions and timestamps that should be plotted.
         show_plot: Whether or not to show the plot after it has been created.
         larger_fonts: Whether or not to use larger fonts in the plot.
+        first_timestamp: The timestamp of the first cwnd value in seconds.
     """
     if larger_fonts:
         plt.rcParams.update({"font.size": 14})
     else:
         plt.rcParams.update({"font.size": 10})
 
-    timestamps = [i * timestamp_interval for i in range(len(cwnd_values))]
+    timestamps = [
+        first_timestamp + i * timestamp_interval for i in range(len(cwnd_values))
+    ]
 
     _, ax = plt.subplots()
     ax.plot(timestamps, cwnd_values, label="cwnd")
@@ -679,8 +1055,17 @@ def create_and_save_cwnd_plot_without_title_and_caption(
         true_predictions = {
             ts: pred for ts, pred in predictions_and_timestamps.items() if pred == 1
         }
-        x_values = [float(ts) for ts in true_predictions.keys()]
-        y_values = [cwnd_values[int(float(ts) / timestamp_interval)] for ts in x_values]
+        # Only plot the predictions that were made in the plotted time window.
+        end_timestamp = first_timestamp + len(cwnd_values) * timestamp_interval
+        x_values = [
+            float(ts)
+            for ts in true_predictions.keys()
+            if first_timestamp <= float(ts) < end_timestamp
+        ]
+        y_values = [
+            cwnd_values[int((ts - first_timestamp) / timestamp_interval)]
+            for ts in x_values
+        ]
 
         ax.scatter(
             x_values, y_values, label="Predictions", color="red", marker="x", s=75
@@ -832,6 +1217,39 @@ def create_csv(packet: dict, output_path: str, print: bool = False) -> None:
         print(f"Input data successfully prepared at {output_path}")
 
 
+def create_csv_rows(
+    packets: list,
+    columns: tuple,
+    output_path: str,
+    print: bool = False,
+    trace_id: str | None = None,
+) -> None:
+    """Create a csv file with a row for each of the given packets.
+
+    Args:
+        packets: The samples of the packets that have been parsed, see ss_sample.SsSample.
+        columns: The columns of the samples to write, in order, see ss_sample.get_columns.
+        output_path: The path to the output file.
+        print: Whether or not to print the output path.
+        trace_id: The trace id of the packets, which is written as an additional last column
+            if given, see stage_trace.TRACE_COLUMN.
+    """
+
+    with open(output_path, "w") as csv_file:
+        writer = csv.writer(csv_file)
+
+        rows = map(ss_sample.create_row_getter(columns), packets)
+        if trace_id is None:
+            writer.writerow(columns)
+            writer.writerows(rows)
+        else:
+            writer.writerow((*columns, stage_trace.TRACE_COLUMN))
+            writer.writerows((*row, trace_id) for row in rows)
+
+    if print:
+        print(f"Input data successfully prepared at {output_path}")
+
+
 def time_execution(func: object, func_name: str, num_executions: int = 100000) -> None:
     """Time the execution of the given function and print the result in ms.
 
@@ -1247,6 +1665,9 @@ def calculate_percentage_change_simple(data: dict, baseline_data: dict) -> dict:
 def get_feature_values(ss_outputs: list, feature: types.Feature) -> list:
     """Get the feature values from the given ss outputs for the specified feature.
 
+    The values are extracted from all of the ss outputs at once with ss_columns, with the type of the field
+    of the feature in ss_parser.SS_SCHEMA. ss outputs that do not contain the feature are skipped.
+
     Args:
         ss_outputs: The ss outputs.
         feature: The feature that should be extracted.
@@ -1254,28 +1675,11 @@ def get_feature_values(ss_outputs: list, feature: types.Feature) -> list:
     Returns:
         A list containing the feature values.
     """
+    if feature not in ss_parser.FEATURE_FIELDS:
+        raise ValueError("Invalid feature given.")
 
-    match feature:
-        case feature.CWND:
-            return get_cwnd_values(ss_outputs)
-        case feature.SSTHRESH:
-            return get_ssthresh_values(ss_outputs)
-        case feature.EXPIRE_TIME:
-            return get_expire_time_values(ss_outputs)
-        case feature.RETRANS:
-            return get_retrans_values(ss_outputs)
-        case feature.RTO:
-            return get_rto_values(ss_outputs)
-        case feature.RTT:
-            return get_rtt_values(ss_outputs)
-        case feature.RTT_VAR:
-            return get_rtt_var_values(ss_outputs)
-        case feature.LAST_SEND:
-            return get_last_send_values(ss_outputs)
-        case feature.PACING_RATE:
-            return get_pacing_rate_values(ss_outputs)
-        case _:
-            raise ValueError("Invalid feature given.")
+    column = ss_columns.extract_columns(ss_outputs, [feature])[feature]
+    return column.compressed().tolist()
 
 
 def create_and_save_line_chart(